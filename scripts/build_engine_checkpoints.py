@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Build persisted engine checkpoints for the time-evolving liquidation heatmap.
+
+A checkpoint is the active position book at a period boundary (daily by
+default) for one symbol / interval / leverage distribution. The
+heatmap-timeseries endpoint loads the nearest checkpoint at or before the
+requested window and replays only the candles after it, so positions opened
+before the window are kept and long windows do not replay from scratch.
+
+The script is incremental: it resumes from the newest stored checkpoint and
+only advances the book through candles after it. Run it on a schedule
+(e.g. after daily ingestion).
+
+Usage:
+    # Build daily checkpoints for BTCUSDT 15m over the last year (first run)
+    uv run python scripts/build_engine_checkpoints.py --symbol BTCUSDT --days 365
+
+    # Extend existing checkpoints up to now
+    uv run python scripts/build_engine_checkpoints.py --symbol BTCUSDT
+
+    # Custom interval and leverage distribution
+    uv run python scripts/build_engine_checkpoints.py --symbol ETHUSDT --interval 1h \
+        --leverage-weights "10:0.5,25:0.3,50:0.2"
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import duckdb  # noqa: F401
+except ImportError:
+    print("Error: duckdb not installed. Run: uv add duckdb")
+    sys.exit(1)
+
+from src.liquidationheatmap.models.time_evolving_heatmap import (  # noqa: E402
+    build_book_checkpoints,
+    leverage_weights_key,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Build persisted engine checkpoints for the time-evolving heatmap",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--symbol",
+        type=str,
+        default="BTCUSDT",
+        help="Trading pair symbol (default: BTCUSDT)",
+    )
+
+    parser.add_argument(
+        "--interval",
+        type=str,
+        default="15m",
+        choices=["5m", "15m", "30m", "1h", "2h", "4h", "8h", "12h", "1d"],
+        help="Candle interval the engine is advanced with (default: 15m)",
+    )
+
+    parser.add_argument(
+        "--leverage-weights",
+        type=str,
+        default=None,
+        help="Leverage distribution, same format as the API (default: model defaults)",
+    )
+
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=365,
+        help="History to cover when no checkpoint exists yet (default: 365)",
+    )
+
+    parser.add_argument(
+        "--every-hours",
+        type=int,
+        default=24,
+        help="Hours between checkpoints (default: 24)",
+    )
+
+    parser.add_argument(
+        "--db-path",
+        type=str,
+        default="data/processed/liquidations.duckdb",
+        help="Path to DuckDB database (default: data/processed/liquidations.duckdb)",
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Calculate but don't persist to database",
+    )
+
+    return parser.parse_args()
+
+
+def build_checkpoints(
+    symbol: str,
+    interval: str,
+    leverage_weights: list[tuple[int, Decimal]] | None,
+    days: int,
+    every: timedelta,
+    db_path: str,
+    dry_run: bool,
+) -> dict:
+    """
+    Advance the engine from the newest checkpoint and persist new checkpoints.
+
+    Args:
+        symbol: Trading pair (e.g., BTCUSDT)
+        interval: Candle interval (5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d)
+        leverage_weights: Leverage distribution, or None for defaults
+        days: History to cover when starting without a checkpoint
+        every: Spacing between checkpoints
+        db_path: Path to DuckDB database
+        dry_run: If True, don't persist to database
+
+    Returns:
+        Statistics dict with build results
+    """
+    from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+    stats = {
+        "resumed_from": None,
+        "candles_replayed": 0,
+        "checkpoints_built": 0,
+        "checkpoints_persisted": 0,
+        "total_time_ms": 0,
+    }
+    build_start = time.perf_counter()
+
+    weights_key = leverage_weights_key(leverage_weights)
+    db_service = DuckDBService(db_path)
+
+    latest = db_service.load_book_checkpoint(symbol, interval, weights_key)
+    end_time = datetime.now()
+    if latest is not None:
+        start_time = latest.timestamp
+        stats["resumed_from"] = latest.timestamp
+        logger.info(f"Resuming from checkpoint {latest.timestamp} ({len(latest)} positions)")
+    else:
+        start_time = end_time - timedelta(days=days)
+        logger.info(f"No checkpoint for {symbol}/{interval}/{weights_key}, starting {start_time}")
+
+    inputs = db_service.load_heatmap_inputs(symbol, interval, start_time, end_time)
+    stats["candles_replayed"] = len(inputs)
+    logger.info(f"Loaded {len(inputs)} candles")
+
+    checkpoints = build_book_checkpoints(
+        candles=inputs,
+        leverage_weights=leverage_weights,
+        checkpoint=latest,
+        every=every,
+    )
+    stats["checkpoints_built"] = len(checkpoints)
+    logger.info(f"Built {len(checkpoints)} checkpoints")
+
+    if not dry_run:
+        for checkpoint in checkpoints:
+            db_service.save_book_checkpoint(symbol, interval, weights_key, checkpoint)
+            stats["checkpoints_persisted"] += 1
+        if checkpoints:
+            logger.info(f"Persisted checkpoints up to {checkpoints[-1].timestamp}")
+
+    stats["total_time_ms"] = (time.perf_counter() - build_start) * 1000
+    return stats
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+
+    db_path = Path(args.db_path)
+    if not db_path.exists():
+        logger.error(f"Database not found: {db_path}")
+        logger.error("Run data ingestion first or specify correct --db-path")
+        sys.exit(1)
+
+    # Same parsing and normalization as the heatmap-timeseries endpoint, so that
+    # the checkpoint key matches the one requests look up
+    from src.liquidationheatmap.api.main import LeverageWeightsParseError, parse_leverage_weights
+
+    try:
+        weights = parse_leverage_weights(args.leverage_weights)
+    except LeverageWeightsParseError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    try:
+        stats = build_checkpoints(
+            symbol=args.symbol,
+            interval=args.interval,
+            leverage_weights=weights,
+            days=args.days,
+            every=timedelta(hours=args.every_hours),
+            db_path=str(db_path),
+            dry_run=args.dry_run,
+        )
+
+        print("\n" + "=" * 60)
+        print("ENGINE CHECKPOINT SUMMARY")
+        print("=" * 60)
+        print(f"Symbol:                {args.symbol}")
+        print(f"Interval:              {args.interval}")
+        print(f"Resumed from:          {stats['resumed_from'] or '-'}")
+        print(f"Candles replayed:      {stats['candles_replayed']}")
+        print(f"Checkpoints built:     {stats['checkpoints_built']}")
+        print(f"Checkpoints persisted: {stats['checkpoints_persisted']}")
+        print(f"Total time:            {stats['total_time_ms']:.2f}ms")
+        print("=" * 60)
+
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"Failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compact the partitioned Parquet store of pre-computed heatmap snapshots.
+
+Every precompute_heatmap.py batch adds one file per symbol / interval / date
+partition it touches, and re-computed snapshots are added next to the ones
+they supersede. Compaction merges the files of each partition into a single
+file sorted by timestamp and drops superseded snapshots. Readers keep being
+served while it runs. Run it on a schedule (e.g. after daily pre-computation).
+
+Usage:
+    # Compact every partition with more than one file
+    uv run python scripts/compact_snapshot_store.py --store data/processed/snapshots
+
+    # Only BTCUSDT 15m, and only partitions with at least 8 files
+    uv run python scripts/compact_snapshot_store.py --symbol BTCUSDT --interval 15m \
+        --min-files 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import duckdb  # noqa: F401
+except ImportError:
+    print("Error: duckdb not installed. Run: uv add duckdb")
+    sys.exit(1)
+
+from src.liquidationheatmap.ingestion.snapshot_store import ParquetSnapshotStore  # noqa: E402
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Merge small files of the Parquet heatmap snapshot store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=os.getenv("LH_SNAPSHOT_STORE_DIR"),
+        help="Root of the snapshot store (default: $LH_SNAPSHOT_STORE_DIR)",
+    )
+
+    parser.add_argument(
+        "--symbol",
+        type=str,
+        default=None,
+        help="Only compact this trading pair (default: all)",
+    )
+
+    parser.add_argument(
+        "--interval",
+        type=str,
+        default=None,
+        help="Only compact this interval (default: all)",
+    )
+
+    parser.add_argument(
+        "--min-files",
+        type=int,
+        default=2,
+        help="Leave partitions with fewer files untouched (default: 2)",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+
+    if not args.store or not Path(args.store).is_dir():
+        logger.error(f"Snapshot store not found: {args.store}")
+        logger.error("Pass --store or set LH_SNAPSHOT_STORE_DIR")
+        sys.exit(1)
+
+    try:
+        start = time.perf_counter()
+        stats = ParquetSnapshotStore(args.store).compact(
+            symbol=args.symbol, interval=args.interval, min_files=args.min_files
+        )
+        total_ms = (time.perf_counter() - start) * 1000
+
+        print("\n" + "=" * 60)
+        print("SNAPSHOT STORE COMPACTION SUMMARY")
+        print("=" * 60)
+        print(f"Store:               {args.store}")
+        print(f"Partitions:          {stats['partitions']}")
+        print(f"Files merged:        {stats['files_merged']}")
+        print(f"Bytes before:        {stats['bytes_before']}")
+        print(f"Bytes after:         {stats['bytes_after']}")
+        print(f"Total time:          {total_ms:.2f}ms")
+        print("=" * 60)
+
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"Failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
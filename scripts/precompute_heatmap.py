@@ -17,10 +17,15 @@ Usage:
 
     # Pre-compute with custom interval
     uv run python scripts/precompute_heatmap.py --symbol BTCUSDT --days 30 --interval 15m
+
+    # Write snapshots to the partitioned Parquet store instead of DuckDB
+    uv run python scripts/precompute_heatmap.py --symbol BTCUSDT --days 30 \
+        --snapshot-store data/processed/snapshots
 """
 
 import argparse
 import logging
+import os
 import sys
 import time
 from datetime import datetime, timedelta
@@ -39,6 +44,7 @@ except ImportError:
 
 from src.liquidationheatmap.models.time_evolving_heatmap import (  # noqa: E402
     calculate_time_evolving_heatmap,
+    leverage_weights_key,
 )
 
 # Configure logging
@@ -123,6 +129,14 @@ Examples:
         help="Path to DuckDB database (default: data/processed/liquidations.duckdb)",
     )
 
+    parser.add_argument(
+        "--snapshot-store",
+        type=str,
+        default=os.getenv("LH_SNAPSHOT_STORE_DIR"),
+        help="Write snapshots to this partitioned Parquet store instead of the "
+        "database (default: $LH_SNAPSHOT_STORE_DIR)",
+    )
+
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -172,6 +186,7 @@ def precompute_heatmap(
     batch_size: int,
     dry_run: bool,
     verbose: bool,
+    snapshot_store: str | None = None,
 ) -> dict:
     """
     Pre-compute heatmap snapshots and persist to database.
@@ -186,6 +201,9 @@ def precompute_heatmap(
         batch_size: Snapshots per persistence batch
         dry_run: If True, don't persist to database
         verbose: Enable verbose logging
+        snapshot_store: Root of a Parquet snapshot store to write to instead
+            of the liquidation_snapshots table (coverage is still recorded in
+            the database)
 
     Returns:
         Statistics dict with computation results
@@ -205,6 +223,8 @@ def precompute_heatmap(
     logger.info(f"  Interval: {interval}")
     logger.info(f"  Price bin size: {price_bin_size}")
     logger.info(f"  Database: {db_path}")
+    if snapshot_store:
+        logger.info(f"  Snapshot store: {snapshot_store}")
     logger.info(f"  Dry run: {dry_run}")
 
     # Calculate total expected snapshots
@@ -217,131 +237,73 @@ def precompute_heatmap(
 
     try:
         # Import DuckDBService here to avoid module-level import issues
-        from dataclasses import dataclass
-
         from src.liquidationheatmap.ingestion.db_service import DuckDBService
 
-        @dataclass
-        class Candle:
-            """Candle data for heatmap calculation."""
-
-            open_time: datetime
-            open: Decimal
-            high: Decimal
-            low: Decimal
-            close: Decimal
-            volume: Decimal
-
         # Get database service
         db_service = DuckDBService(db_path)
 
-        # Determine kline table based on interval
-        interval_table_map = {
-            "5m": "klines_5m_history",
-            "15m": "klines_15m_history",
-            "30m": "klines_5m_history",  # Aggregate from 5m
-            "1h": "klines_5m_history",
-            "4h": "klines_5m_history",
-        }
-        kline_table = interval_table_map.get(interval, "klines_15m_history")
-
-        # Query candles from database
-        logger.info(f"Fetching candles from {kline_table}...")
-        candle_query = f"""
-        SELECT
-            open_time,
-            CAST(open AS DECIMAL(18,8)) as open,
-            CAST(high AS DECIMAL(18,8)) as high,
-            CAST(low AS DECIMAL(18,8)) as low,
-            CAST(close AS DECIMAL(18,8)) as close,
-            CAST(volume AS DECIMAL(18,8)) as volume
-        FROM {kline_table}
-        WHERE symbol = ? AND open_time >= ? AND open_time <= ?
-        ORDER BY open_time
-        """
-        candles_df = db_service.conn.execute(candle_query, [symbol, start_time, end_time]).df()
-
-        if candles_df.empty:
+        # Resume from the nearest engine checkpoint, as the API does, so that
+        # persisted snapshots match what heatmap-timeseries would compute
+        weights_key = leverage_weights_key(None)
+        checkpoint = db_service.load_book_checkpoint(symbol, interval, weights_key, start_time)
+        replay_start = checkpoint.timestamp if checkpoint is not None else start_time
+
+        # Columnar candles with OI deltas joined in SQL
+        logger.info("Fetching candles and OI deltas...")
+        inputs = db_service.load_heatmap_inputs(symbol, interval, replay_start, end_time)
+
+        if inputs.index_at(start_time) == len(inputs):
             logger.warning(f"No candle data found for {symbol} in range {start_time} to {end_time}")
             stats["snapshots_generated"] = 0
             return stats
 
-        logger.info(f"Loaded {len(candles_df)} candles")
-
-        # Query OI data with delta calculation
-        logger.info("Fetching OI deltas...")
-        oi_query = """
-        SELECT
-            timestamp,
-            open_interest_value,
-            open_interest_value - LAG(open_interest_value) OVER (ORDER BY timestamp) as oi_delta
-        FROM open_interest_history
-        WHERE symbol = ? AND timestamp >= ? AND timestamp <= ?
-        ORDER BY timestamp
-        """
-        oi_df = db_service.conn.execute(oi_query, [symbol, start_time, end_time]).df()
-        logger.info(f"Loaded {len(oi_df)} OI data points")
-
-        # Convert to candle objects
-        candles = [
-            Candle(
-                open_time=row["open_time"].to_pydatetime()
-                if hasattr(row["open_time"], "to_pydatetime")
-                else row["open_time"],
-                open=Decimal(str(row["open"])),
-                high=Decimal(str(row["high"])),
-                low=Decimal(str(row["low"])),
-                close=Decimal(str(row["close"])),
-                volume=Decimal(str(row["volume"])),
-            )
-            for _, row in candles_df.iterrows()
-        ]
-
-        # Match OI deltas to candles (approximate by nearest timestamp)
-        oi_deltas = []
-        oi_timestamps = oi_df["timestamp"].tolist() if not oi_df.empty else []
-        oi_values = oi_df["oi_delta"].fillna(0).tolist() if not oi_df.empty else []
-
-        for candle in candles:
-            delta = Decimal("0")
-            min_diff = float("inf")
-            if oi_timestamps:
-                for i, oi_ts in enumerate(oi_timestamps):
-                    oi_ts_dt = oi_ts.to_pydatetime() if hasattr(oi_ts, "to_pydatetime") else oi_ts
-                    diff = abs((candle.open_time - oi_ts_dt).total_seconds())
-                    if diff < 900 and diff < min_diff:  # 15 min window
-                        min_diff = diff
-                        delta = Decimal(str(oi_values[i])) if oi_values[i] else Decimal("0")
-            oi_deltas.append(delta)
+        logger.info(f"Loaded {len(inputs)} candles (replaying from {replay_start})")
 
         # Calculate heatmap snapshots
         logger.info("Calculating time-evolving heatmap...")
 
         snapshots = calculate_time_evolving_heatmap(
-            candles=candles,
-            oi_deltas=oi_deltas,
+            candles=inputs,
+            oi_deltas=None,
             symbol=symbol,
             price_bucket_size=Decimal(str(price_bin_size)),
+            precision="float64",
+            checkpoint=checkpoint,
+            emit_from=start_time,
         )
 
         stats["snapshots_generated"] = len(snapshots)
         logger.info(f"Generated {len(snapshots)} snapshots")
 
         if not dry_run and snapshots:
+            save = db_service.save_snapshots
+            if snapshot_store:
+                from src.liquidationheatmap.ingestion.snapshot_store import (
+                    ParquetSnapshotStore,
+                )
+
+                save = ParquetSnapshotStore(snapshot_store).write
+
             # Persist snapshots in batches
-            logger.info(f"Persisting snapshots to database (batch size: {batch_size})...")
+            logger.info(f"Persisting snapshots (batch size: {batch_size})...")
 
             for i in range(0, len(snapshots), batch_size):
                 batch = snapshots[i : i + batch_size]
-                for snapshot in batch:
-                    try:
-                        db_service.save_snapshot(snapshot)
-                        stats["snapshots_persisted"] += 1
-                    except Exception as e:
-                        stats["errors"].append(
-                            f"Failed to save snapshot at {snapshot.timestamp}: {e}"
-                        )
-                        logger.warning(f"Failed to save snapshot: {e}")
+                # One upsert per batch; a failed batch is rolled back as a whole
+                try:
+                    save(
+                        batch,
+                        interval=interval,
+                        price_bin_size=price_bin_size,
+                        weights_key=weights_key,
+                    )
+                    stats["snapshots_persisted"] += len(batch)
+                except Exception as e:
+                    stats["errors"].append(
+                        f"Failed to save snapshots {batch[0].timestamp} to "
+                        f"{batch[-1].timestamp}: {e}"
+                    )
+                    logger.warning(f"Failed to save snapshot batch: {e}")
 
                 # Progress update
                 progress = min(i + batch_size, len(snapshots))
@@ -349,6 +311,19 @@ def precompute_heatmap(
 
             logger.info(f"Persistence complete: {stats['snapshots_persisted']} snapshots saved")
 
+            # Only a complete run makes the range servable by heatmap-timeseries
+            if not stats["errors"]:
+                covered = db_service.save_snapshot_coverage(
+                    symbol,
+                    interval,
+                    price_bin_size,
+                    weights_key,
+                    snapshots[0].timestamp,
+                    snapshots[-1].timestamp,
+                    max_gap=timedelta(minutes=interval_to_minutes(interval)),
+                )
+                logger.info(f"Pre-computed coverage: {covered[0]} to {covered[1]}")
+
     except Exception as e:
         stats["errors"].append(f"Computation failed: {e}")
         logger.error(f"Computation failed: {e}")
@@ -398,6 +373,7 @@ def main():
             batch_size=args.batch_size,
             dry_run=args.dry_run,
             verbose=args.verbose,
+            snapshot_store=args.snapshot_store,
         )
 
         # Print summary
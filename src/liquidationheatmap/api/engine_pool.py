@@ -0,0 +1,230 @@
+"""Heatmap engine replays in worker processes.
+
+The float64 engine advances its position book candle by candle in Python, so a
+replay holds the GIL for its whole run. Run on a thread, a long replay would
+still stall the event loop and every other request of the API worker, /health
+included. EnginePool runs the replays in a pool of spawned processes instead;
+the compute pool threads only do the DuckDB I/O and wait for the result.
+
+Jobs are sent the plain engine inputs (CandleColumns, an optional
+BookCheckpoint, leverage weights) and send back EngineColumns: the snapshots or
+delta frames as SnapshotColumns plus flat arrays, which pickle as a handful of
+array buffers rather than one object per cell. Processes are spawned, not
+forked, because the API process runs threads (DuckDB, the price refresh) that
+a fork would copy mid-flight; the children only import this module and the
+engine.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from src.liquidationheatmap.models.position import HeatmapFrame, HeatmapSnapshot
+from src.liquidationheatmap.models.position_book import BookCheckpoint
+from src.liquidationheatmap.models.time_evolving_heatmap import (
+    SnapshotColumns,
+    calculate_heatmap_frames,
+    calculate_heatmap_scenarios,
+    calculate_rolling_heatmap,
+    calculate_time_evolving_heatmap,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EngineColumns:
+    """Engine snapshots or delta frames in the form they leave a worker process.
+
+    columns holds the levels in CSR form (for frames, including the emptied
+    levels); the arrays hold the engine's per-snapshot volume totals and, for
+    delta frames, whether each frame is a keyframe and its removal scale.
+    """
+
+    columns: SnapshotColumns
+    total_long_volume: np.ndarray  # float64, one row per snapshot
+    total_short_volume: np.ndarray
+    keyframe: Optional[np.ndarray] = None  # bool, frames only
+    scale: Optional[np.ndarray] = None  # float64, frames only
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @classmethod
+    def from_snapshots(cls, snapshots: list[HeatmapSnapshot]) -> "EngineColumns":
+        """Columns of engine snapshots (float64 or decimal)."""
+        return cls(
+            columns=SnapshotColumns.from_snapshots(snapshots),
+            total_long_volume=np.array(
+                [float(s.total_long_volume) for s in snapshots], dtype=np.float64
+            ),
+            total_short_volume=np.array(
+                [float(s.total_short_volume) for s in snapshots], dtype=np.float64
+            ),
+        )
+
+    @classmethod
+    def from_frames(cls, frames: list[HeatmapFrame]) -> "EngineColumns":
+        """Columns of delta frames, keeping the zero-density levels that mark removals."""
+        return cls(
+            columns=SnapshotColumns.from_snapshots(frames, keep_empty=True),
+            total_long_volume=np.array([f.total_long_volume for f in frames], dtype=np.float64),
+            total_short_volume=np.array([f.total_short_volume for f in frames], dtype=np.float64),
+            keyframe=np.array([f.keyframe for f in frames], dtype=bool),
+            scale=np.array([f.scale for f in frames], dtype=np.float64),
+        )
+
+
+# Jobs for the worker processes; keyword arguments are passed on to the engine
+def replay_heatmap(**kwargs: Any) -> EngineColumns:
+    """calculate_time_evolving_heatmap() as columns."""
+    return EngineColumns.from_snapshots(calculate_time_evolving_heatmap(**kwargs))
+
+
+def replay_rolling_heatmap(**kwargs: Any) -> tuple[EngineColumns, Optional[BookCheckpoint]]:
+    """calculate_rolling_heatmap() with its snapshots as columns."""
+    snapshots, frozen = calculate_rolling_heatmap(**kwargs)
+    return EngineColumns.from_snapshots(snapshots), frozen
+
+
+def replay_heatmap_frames(**kwargs: Any) -> EngineColumns:
+    """calculate_heatmap_frames() as columns."""
+    return EngineColumns.from_frames(calculate_heatmap_frames(**kwargs))
+
+
+def replay_heatmap_scenarios(**kwargs: Any) -> list[EngineColumns]:
+    """calculate_heatmap_scenarios() as columns, one per scenario."""
+    return [EngineColumns.from_snapshots(s) for s in calculate_heatmap_scenarios(**kwargs)]
+
+
+def _timed(fn: Callable[..., Any], args: tuple, kwargs: dict) -> tuple[float, Any]:
+    """Run fn in a worker process and report when it started (wall clock)."""
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class EnginePool:
+    """Runs engine replays in worker processes and tracks their queue.
+
+    call() blocks its (compute pool) thread until the result is back, without
+    holding the GIL. With max_workers=0 jobs run inline in the calling thread,
+    as before the pool existed. A worker that dies (e.g. killed for memory)
+    breaks the executor; the job fails and the next one starts a new pool.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """Initialize pool.
+
+        Args:
+            max_workers: Number of worker processes (0 runs jobs inline)
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the executor on first use (and after it broke)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) in a worker process and return its result.
+
+        fn must be importable by name (a module-level function) and its
+        arguments and result picklable. Exceptions raised by fn propagate.
+
+        Args:
+            fn: Module-level callable, e.g. replay_heatmap
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Whatever fn returns
+        """
+        submitted = time.time()
+        with self._lock:
+            self._pending += 1
+        try:
+            if self.max_workers == 0:
+                started, result = _timed(fn, args, kwargs)
+            else:
+                executor = self._get_executor()
+                try:
+                    started, result = executor.submit(_timed, fn, args, kwargs).result()
+                except BrokenProcessPool:
+                    with self._lock:
+                        if self._executor is executor:
+                            self._executor = None
+                            self._restarts += 1
+                    executor.shutdown(wait=False)
+                    logger.error("Engine worker process died; restarting the engine pool")
+                    raise
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+                self._completed += 1
+            raise
+
+        finished = time.time()
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._wait_total += max(started - submitted, 0.0)
+            self._wait_max = max(self._wait_max, started - submitted)
+            self._run_total += finished - started
+        return result
+
+    def get_stats(self) -> dict:
+        """Get pool statistics.
+
+        Jobs are handed to the processes in order, so of the pending jobs the
+        first `workers` are counted as running and the rest as queued (inline
+        jobs all run).
+
+        Returns:
+            dict with workers, queue_depth, running, completed, failed,
+            restarts and wait/run times in milliseconds (of successful jobs)
+        """
+        with self._lock:
+            succeeded = self._completed - self._failed
+            running = min(self._pending, self.max_workers or self._pending)
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self._pending - running,
+                "running": running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "restarts": self._restarts,
+                "avg_wait_ms": (
+                    round(self._wait_total / succeeded * 1000, 2) if succeeded else 0.0
+                ),
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / succeeded * 1000, 2) if succeeded else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes once queued jobs are done."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -1,26 +1,140 @@
 """FastAPI application for liquidation heatmap API."""
 
+import asyncio
+import functools
+import gzip
+import hashlib
+import importlib.util
 import json
 import logging
 import os
+import threading
 import time
-from collections import defaultdict
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Literal, Optional
-from urllib.request import urlopen
+from typing import Any, Awaitable, Callable, Literal, Optional
 
 import numpy as np
-from fastapi import FastAPI, HTTPException, Query, Request, Response
+import pydantic_core
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from ..ingestion.price_cache import get_price_cache
+from ..models.time_evolving_heatmap import (
+    DEFAULT_KEYFRAME_INTERVAL,
+    SnapshotColumns,
+    leverage_weights_key,
+)
+from ..streaming.heatmap_stream import HeatmapStreamHub
+from .engine_pool import (
+    EngineColumns,
+    EnginePool,
+    replay_heatmap,
+    replay_heatmap_frames,
+    replay_heatmap_scenarios,
+    replay_rolling_heatmap,
+)
+
 # =============================================================================
 # CACHING LAYER (T058-T060)
 # =============================================================================
 
+# Cached responses at least this large also keep a gzip copy (0 disables)
+GZIP_MIN_BYTES = int(os.getenv("LH_GZIP_MIN_BYTES", "65536"))
+
+
+class EncodedResponse:
+    """A response serialized once, ready to be sent as-is.
+
+    Cache hits return the stored bytes in a raw Response, so FastAPI neither
+    re-validates nor re-serializes the model tree. Bodies of at least
+    `gzip_min_bytes` also keep a precompressed copy for clients that accept gzip.
+    """
+
+    __slots__ = ("body", "gzip_body", "media_type")
+
+    def __init__(
+        self,
+        body: bytes,
+        gzip_body: Optional[bytes] = None,
+        media_type: str = "application/json",
+    ):
+        self.body = body
+        self.gzip_body = gzip_body
+        self.media_type = media_type
+
+    @classmethod
+    def from_bytes(
+        cls,
+        body: bytes,
+        media_type: str = "application/json",
+        gzip_min_bytes: int = GZIP_MIN_BYTES,
+    ) -> "EncodedResponse":
+        """Wrap an encoded body, adding a gzip copy if it is large enough.
+
+        Args:
+            body: Encoded response body
+            media_type: Content type of the body
+            gzip_min_bytes: Minimum body size for a gzip copy (0 disables)
+
+        Returns:
+            EncodedResponse holding the body
+        """
+        gzip_body = None
+        if gzip_min_bytes and len(body) >= gzip_min_bytes:
+            gzip_body = gzip.compress(body, compresslevel=6)
+        return cls(body, gzip_body, media_type)
+
+    @classmethod
+    def from_model(
+        cls, model: BaseModel, gzip_min_bytes: int = GZIP_MIN_BYTES
+    ) -> "EncodedResponse":
+        """Serialize a model with pydantic-core's JSON encoder.
+
+        Args:
+            model: Response model
+            gzip_min_bytes: Minimum body size for a gzip copy (0 disables)
+
+        Returns:
+            EncodedResponse holding the JSON bytes
+        """
+        return cls.from_bytes(pydantic_core.to_json(model), gzip_min_bytes=gzip_min_bytes)
+
+    def __len__(self) -> int:
+        return len(self.body) + len(self.gzip_body or b"")
+
+    def to_response(self, request: Request) -> Response:
+        """Build the HTTP response, gzip-encoded if the client accepts it."""
+        if self.gzip_body is None:
+            return Response(self.body, media_type=self.media_type)
+        headers = {"Vary": "Accept-Encoding"}
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+def _serialize_result(build: Callable[..., BaseModel]) -> Callable[..., EncodedResponse]:
+    """Make a response builder return its model as an EncodedResponse.
+
+    Applied to the functions run on the compute pool, so serialization happens
+    on the worker rather than on the event loop.
+    """
+
+    @functools.wraps(build)
+    def wrapper(*args: Any) -> EncodedResponse:
+        return EncodedResponse.from_model(build(*args))
+
+    return wrapper
+
 
 class HeatmapCache:
     """In-memory cache with TTL for heatmap timeseries responses.
@@ -28,20 +142,58 @@ class HeatmapCache:
     T058: Add in-memory cache layer with TTL to API endpoint
     T059: Implement cache-first query strategy
     T060: Add cache metrics logging for hit/miss ratio
+
+    get_or_compute() coalesces concurrent misses: requests for a key that is
+    already being computed await the same computation instead of starting
+    their own. Entries that expired less than `stale_seconds` ago are still
+    returned while one background refresh replaces them
+    (stale-while-revalidate).
+
+    Entries are kept in least-recently-used order and evicted from the cold
+    end once either `max_size` entries or `max_bytes` of serialized responses
+    are exceeded. A response larger than the whole byte budget is not cached.
+
+    Callers build keys from canonical request parameters and may pass the raw
+    parameters as `alias`. A hit whose alias has not been seen for that entry
+    would have been a miss under raw keys; those are counted separately, so
+    get_stats() reports the hit rate with and without canonical keys.
     """
 
-    def __init__(self, ttl_seconds: int = 300, max_size: int = 100):
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_size: int = 100,
+        stale_seconds: int = 0,
+        max_bytes: Optional[int] = None,
+    ):
         """Initialize cache.
 
         Args:
             ttl_seconds: Time-to-live for cache entries (default: 5 minutes)
             max_size: Maximum number of cache entries
+            stale_seconds: How long past expiry get_or_compute() may serve an
+                entry while refreshing it (0 disables stale serving)
+            max_bytes: Memory budget for cached responses, measured as their
+                serialized size including any gzip copy (None for no byte limit)
         """
         self.ttl_seconds = ttl_seconds
         self.max_size = max_size
-        self._cache: dict[str, tuple[float, any]] = {}  # key -> (expiry_time, value)
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        # key -> (expiry_time, value, size_bytes), least recently used first
+        self._cache: OrderedDict[str, tuple[float, Any, int]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}  # key -> running computation
+        self._aliases: dict[str, set[str]] = {}  # key -> raw request keys served by it
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._stale_hits = 0
+        self._coalesced = 0
+        self._failures = 0
+        self._evictions = 0
+        self._evicted_bytes = 0
+        self._oversized = 0
+        self._canonical_hits = 0
 
     def _make_key(
         self,
@@ -51,9 +203,14 @@ class HeatmapCache:
         interval: str,
         price_bin_size: float,
         leverage_weights: Optional[str],
+        variant: str = "",
     ) -> str:
-        """Create cache key from request parameters."""
-        return f"{symbol}:{start_time}:{end_time}:{interval}:{price_bin_size}:{leverage_weights}"
+        """Create cache key from request parameters.
+
+        `variant` distinguishes response encodings of the same heatmap.
+        """
+        key = f"{symbol}:{start_time}:{end_time}:{interval}:{price_bin_size}:{leverage_weights}"
+        return f"{key}:{variant}" if variant else key
 
     def get(
         self,
@@ -63,19 +220,21 @@ class HeatmapCache:
         interval: str,
         price_bin_size: float,
         leverage_weights: Optional[str],
+        variant: str = "",
     ) -> Optional[any]:
         """Get cached response if exists and not expired."""
         key = self._make_key(
-            symbol, start_time, end_time, interval, price_bin_size, leverage_weights
+            symbol, start_time, end_time, interval, price_bin_size, leverage_weights, variant
         )
         if key in self._cache:
-            expiry, value = self._cache[key]
+            expiry, value, _ = self._cache[key]
             if time.time() < expiry:
                 self._hits += 1
+                self._cache.move_to_end(key)
                 return value
-            else:
-                # Expired, remove from cache
-                del self._cache[key]
+            elif time.time() >= expiry + self.stale_seconds:
+                # Expired past the stale window, remove from cache
+                self._remove(key)
 
         self._misses += 1
         return None
@@ -89,46 +248,538 @@ class HeatmapCache:
         price_bin_size: float,
         leverage_weights: Optional[str],
         value: any,
+        variant: str = "",
     ) -> None:
         """Store response in cache."""
-        # Evict oldest entries if at max size
-        if len(self._cache) >= self.max_size:
-            oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k][0])
-            del self._cache[oldest_key]
-
         key = self._make_key(
-            symbol, start_time, end_time, interval, price_bin_size, leverage_weights
+            symbol, start_time, end_time, interval, price_bin_size, leverage_weights, variant
         )
+        self._store(key, value)
+
+    @staticmethod
+    def _entry_size(value: Any) -> int:
+        """Approximate memory weight of a response: its serialized JSON size."""
+        if isinstance(value, (bytes, bytearray, EncodedResponse)):
+            return len(value)
+        if isinstance(value, BaseModel):
+            return len(value.model_dump_json())
+        return len(json.dumps(value, default=str))
+
+    def _store(self, key: str, value: Any) -> None:
+        """Store a value under a prepared key, evicting least recently used entries."""
+        size = self._entry_size(value)
+        if key in self._cache:
+            # A refresh replaces the value but keeps the entry's aliases
+            _, _, old_size = self._cache.pop(key)
+            self._bytes -= old_size
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._aliases.pop(key, None)
+            self._oversized += 1
+            logger.warning(
+                f"Heatmap response of {size} bytes exceeds the cache budget "
+                f"({self.max_bytes} bytes); not cached"
+            )
+            return
+
         expiry = time.time() + self.ttl_seconds
-        self._cache[key] = (expiry, value)
+        self._cache[key] = (expiry, value, size)
+        self._bytes += size
+        while len(self._cache) > self.max_size or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            evicted_key, (_, _, evicted_size) = self._cache.popitem(last=False)
+            self._aliases.pop(evicted_key, None)
+            self._bytes -= evicted_size
+            self._evictions += 1
+            self._evicted_bytes += evicted_size
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry and release its bytes."""
+        _, _, size = self._cache.pop(key)
+        self._aliases.pop(key, None)
+        self._bytes -= size
+
+    async def get_or_compute(
+        self,
+        symbol: str,
+        start_time: Optional[str],
+        end_time: Optional[str],
+        interval: str,
+        price_bin_size: float,
+        leverage_weights: Optional[str],
+        compute: Callable[[], Awaitable[Any]],
+        variant: str = "",
+        alias: Optional[str] = None,
+    ) -> Any:
+        """Return the cached response, computing it at most once per key.
+
+        Args:
+            symbol, start_time, end_time, interval, price_bin_size,
+            leverage_weights, variant: Cache key parts, as for get()
+            compute: Coroutine function producing the response on a miss
+            alias: The request's raw (non-canonical) key, for hit-rate stats
+
+        Returns:
+            Cached, shared or freshly computed response
+
+        Raises:
+            Whatever compute() raises; every request waiting on it gets the error
+            and nothing is cached
+        """
+        key = self._make_key(
+            symbol, start_time, end_time, interval, price_bin_size, leverage_weights, variant
+        )
+        entry = self._cache.get(key)
+        if entry is not None:
+            expiry, value, _ = entry
+            now = time.time()
+            if now < expiry:
+                self._hits += 1
+                self._cache.move_to_end(key)
+                if alias is not None:
+                    aliases = self._aliases.setdefault(key, set())
+                    if alias not in aliases:
+                        self._canonical_hits += 1
+                        aliases.add(alias)
+                return value
+            if now < expiry + self.stale_seconds:
+                self._stale_hits += 1
+                self._cache.move_to_end(key)
+                if alias is not None:
+                    self._aliases.setdefault(key, set()).add(alias)
+                if key not in self._inflight:
+                    self._start(key, compute)
+                return value
+            self._remove(key)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced += 1
+            # Shielded: a disconnecting client must not cancel the shared computation
+            return await asyncio.shield(inflight)
+
+        self._misses += 1
+        return await asyncio.shield(self._start(key, compute, alias))
+
+    def _start(
+        self, key: str, compute: Callable[[], Awaitable[Any]], alias: Optional[str] = None
+    ) -> asyncio.Task:
+        """Start computing a key in the background and register it as in flight."""
+
+        async def run() -> Any:
+            try:
+                value = await compute()
+                # A clear() while computing dropped this task; its value predates the clear
+                if self._inflight.get(key) is task:
+                    self._store(key, value)
+                    if alias is not None and key in self._cache:
+                        self._aliases.setdefault(key, set()).add(alias)
+                return value
+            finally:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+        task = asyncio.ensure_future(run())
+        task.add_done_callback(self._on_done)
+        self._inflight[key] = task
+        return task
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """Log failed computations, including refreshes nobody awaits."""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self._failures += 1
+            logger.warning(f"Heatmap cache computation failed: {error}")
 
     def get_stats(self) -> dict:
         """Get cache statistics."""
         total = self._hits + self._misses
         hit_rate = (self._hits / total * 100) if total > 0 else 0.0
+        raw_hits = self._hits - self._canonical_hits
+        raw_hit_rate = (raw_hits / total * 100) if total > 0 else 0.0
         return {
             "hits": self._hits,
             "misses": self._misses,
             "total_requests": total,
             "hit_rate_percent": round(hit_rate, 2),
+            # Hits only canonical keys produced, and the hit rate raw keys would get
+            "canonical_key_hits": self._canonical_hits,
+            "raw_key_hit_rate_percent": round(raw_hit_rate, 2),
             "cached_entries": len(self._cache),
             "max_size": self.max_size,
             "ttl_seconds": self.ttl_seconds,
+            "stale_hits": self._stale_hits,
+            "coalesced_requests": self._coalesced,
+            "in_flight": len(self._inflight),
+            "failed_computations": self._failures,
+            "stale_seconds": self.stale_seconds,
+            "bytes_used": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
+            "evicted_bytes": self._evicted_bytes,
+            "oversized_rejections": self._oversized,
         }
 
     def clear(self) -> None:
-        """Clear all cached entries."""
+        """Clear all cached entries.
+
+        Computations already running still answer the requests waiting on
+        them, but their results are not cached.
+        """
         self._cache.clear()
+        self._inflight.clear()
+        self._aliases.clear()
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._stale_hits = 0
+        self._coalesced = 0
+        self._failures = 0
+        self._evictions = 0
+        self._evicted_bytes = 0
+        self._oversized = 0
+        self._canonical_hits = 0
 
 
 # Global heatmap cache instance (TTL from env or default 5 minutes)
 _heatmap_cache = HeatmapCache(
     ttl_seconds=int(os.getenv("LH_CACHE_TTL", "300")),
     max_size=int(os.getenv("LH_CACHE_MAX_SIZE", "100")),
+    stale_seconds=int(os.getenv("LH_CACHE_STALE_SECONDS", "300")),
+    max_bytes=int(os.getenv("LH_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
 )
 
+# =============================================================================
+# COMPUTE POOL
+# =============================================================================
+
+
+class ComputePool:
+    """Runs blocking DuckDB queries off the event loop.
+
+    Endpoints hand their blocking work to a bounded thread pool and await the
+    result, so a slow query no longer stalls every other request (including
+    /health) on the same worker: DuckDB releases the GIL while it runs. The
+    engine replays inside these jobs hold the GIL, so they are sent on to
+    _engine_pool's worker processes and the thread only waits for them. Jobs
+    that query DuckDB go through run_query(), which opens the read-only
+    service on the event loop and lends the job a cursor from the service's
+    cursor pool, because a DuckDB connection must not be shared between
+    threads.
+
+    Tracks queue depth and how long jobs waited for a free worker.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """Initialize pool.
+
+        Args:
+            max_workers: Number of worker threads (jobs beyond this queue up)
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the executor on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="lh-compute"
+                )
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in the pool and return its result.
+
+        Exceptions raised by fn propagate to the caller. If the caller is
+        cancelled before a worker picked the job up, the job is dropped.
+
+        Args:
+            fn: Blocking callable
+            *args: Positional arguments for fn
+
+        Returns:
+            Whatever fn returns
+        """
+        submitted = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += started - submitted
+                self._wait_max = max(self._wait_max, started - submitted)
+            failed = True
+            try:
+                result = fn(*args)
+                failed = False
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._failed += failed
+                    self._run_total += time.monotonic() - started
+
+        executor = self._get_executor()
+        with self._lock:
+            self._queued += 1
+        future = executor.submit(job)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    async def run_query(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(db, *args) in the pool against the read-only database.
+
+        The DuckDBService singleton is resolved here, on the event loop, and the
+        job receives a view of it with a private cursor, checked out of the
+        service's cursor pool for the duration of the job.
+
+        Args:
+            fn: Blocking callable taking a DuckDBService as first argument
+            *args: Further positional arguments for fn
+
+        Returns:
+            Whatever fn returns
+        """
+        service = DuckDBService(read_only=True)
+
+        def job():
+            with service.thread_view() as db:
+                return fn(db, *args)
+
+        return await self.run(job)
+
+    def get_stats(self) -> dict:
+        """Get pool statistics.
+
+        Returns:
+            dict with workers, queue_depth, running, completed, failed and
+            wait/run times in milliseconds
+        """
+        with self._lock:
+            completed = self._completed
+            started = completed + self._running
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "failed": self._failed,
+                "avg_wait_ms": round(self._wait_total / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once queued jobs are done."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Global compute pool (size from env, default 4 workers)
+_compute_pool = ComputePool(max_workers=int(os.getenv("LH_COMPUTE_WORKERS", "4")))
+
+# Engine replays run in worker processes (size from env, default 2; 0 runs them inline)
+_engine_pool = EnginePool(max_workers=int(os.getenv("LH_ENGINE_WORKERS", "2")))
+
+# =============================================================================
+# ROLLING WINDOWS
+# =============================================================================
+
+
+class RollingHeatmap:
+    """Engine state behind the latest response for a window ending now.
+
+    Holds the position book frozen before the window's last candle and the
+    converted snapshots before it, so the next, later window only replays the
+    candles from there on. `origin` is the persisted engine checkpoint the run
+    started from, or None if it started from an empty book at `start`.
+    """
+
+    __slots__ = ("checkpoint", "origin", "start", "times", "data", "volumes")
+
+    def __init__(
+        self,
+        checkpoint: Any,
+        origin: Optional[datetime],
+        start: datetime,
+        times: list[datetime],
+        data: list,
+        volumes: list[tuple[float, float]],
+    ):
+        self.checkpoint = checkpoint
+        self.origin = origin
+        self.start = start
+        self.times = times
+        self.data = data
+        self.volumes = volumes
+
+    def covers(self, start_dt: datetime, end_dt: datetime) -> bool:
+        """Whether a window can be served by extending this one.
+
+        A run from an empty book depends on its window start, so it can only
+        be extended at the end. A run from a persisted checkpoint continues
+        the same history as any later checkpoint, so its start can move too.
+        """
+        if start_dt < self.start or end_dt < self.checkpoint.timestamp:
+            return False
+        return self.origin is not None or start_dt == self.start
+
+
+class RollingHeatmapStore:
+    """Bounded LRU of RollingHeatmap states, one per rolling-window request.
+
+    Accessed from compute pool workers, so every method takes a lock. States
+    are never modified once stored; an extension stores a new one.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        """Initialize store.
+
+        Args:
+            max_entries: Maximum number of windows to keep (0 disables the store)
+        """
+        self.max_entries = max_entries
+        self._states: OrderedDict[tuple, RollingHeatmap] = OrderedDict()
+        self._lock = threading.Lock()
+        self._extensions = 0
+        self._full_runs = 0
+        self._replayed = 0
+        self._extension_replayed = 0
+
+    def get(self, key: tuple) -> Optional[RollingHeatmap]:
+        """Return the state for a window, marking it recently used."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def put(self, key: tuple, state: RollingHeatmap) -> None:
+        """Store the state for a window, evicting the least recently used."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+    def record(self, extended: bool, replayed: int) -> None:
+        """Count one engine run and the candles it replayed."""
+        with self._lock:
+            self._replayed += replayed
+            if extended:
+                self._extensions += 1
+                self._extension_replayed += replayed
+            else:
+                self._full_runs += 1
+
+    def get_stats(self) -> dict:
+        """Get store statistics.
+
+        Returns:
+            dict with windows held, extensions versus full runs and the average
+            number of candles each replayed
+        """
+        with self._lock:
+            full_replayed = self._replayed - self._extension_replayed
+            return {
+                "windows": len(self._states),
+                "max_windows": self.max_entries,
+                "extensions": self._extensions,
+                "full_runs": self._full_runs,
+                "avg_extension_candles": round(self._extension_replayed / self._extensions, 2)
+                if self._extensions
+                else 0.0,
+                "avg_full_run_candles": round(full_replayed / self._full_runs, 2)
+                if self._full_runs
+                else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drop every state and reset the statistics."""
+        with self._lock:
+            self._states.clear()
+            self._extensions = 0
+            self._full_runs = 0
+            self._replayed = 0
+            self._extension_replayed = 0
+
+
+# Global rolling-window store (size from env, default 16 windows)
+_rolling_heatmaps = RollingHeatmapStore(max_entries=int(os.getenv("LH_ROLLING_WINDOWS", "16")))
+
+# =============================================================================
+# CONDITIONAL REQUESTS
+# =============================================================================
+
+
+async def _data_watermark(
+    symbol: str, interval: str, include_open_interest: bool = True
+) -> Optional[tuple]:
+    """Latest ingested data times behind a response, or None if they cannot be read.
+
+    See DuckDBService.get_data_watermark(). Failures are not fatal: the request
+    then proceeds without an ETag and reports its own errors.
+    """
+    try:
+        return await _compute_pool.run_query(
+            lambda db: db.get_data_watermark(symbol, interval, include_open_interest)
+        )
+    except Exception as e:
+        logger.debug(f"Data watermark unavailable for {symbol} {interval}: {e}")
+        return None
+
+
+def _make_etag(request: Request, watermark: tuple, interval: Optional[str] = None) -> str:
+    """Weak ETag over the request path, its query parameters and the data watermark.
+
+    Pass `interval` for requests whose range ends "now": the current interval
+    slot is then part of the tag, so it changes as the window rolls forward
+    even if no new data was ingested.
+    """
+    slot = None
+    if interval is not None:
+        slot = int(time.time() // (HEATMAP_INTERVAL_MINUTES.get(interval, 15) * 60))
+    params = sorted(request.query_params.multi_items())
+    digest = hashlib.sha1(repr((request.url.path, params, watermark, slot)).encode())
+    return f'W/"{digest.hexdigest()[:24]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names this ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _validator_headers(etag: str) -> dict[str, str]:
+    """Headers that make browsers revalidate polled responses with If-None-Match."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
 
 # Simple rate limiter (in-memory, suitable for single-server deployments)
 class SimpleRateLimiter:
@@ -221,7 +872,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from ..ingestion.db_service import DuckDBService
+from ..ingestion.db_service import HEATMAP_INTERVAL_MINUTES, DuckDBService
 from ..models.binance_standard import BinanceStandardModel
 from ..models.ensemble import EnsembleModel
 from ..models.funding_adjusted import FundingAdjustedModel
@@ -292,10 +943,27 @@ TIME_WINDOW_CONFIG: dict[str, dict] = {
     "1y": {"hours": 8760, "klines_interval": "1d", "agg_minutes": 1440},
 }
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: refresh mark prices in the background while serving.
+
+    On shutdown, stop heatmap streams, the price refresh, the compute pool's
+    threads and the engine worker processes.
+    """
+    get_price_cache().start(SUPPORTED_SYMBOLS)
+    yield
+    _heatmap_streams.shutdown()
+    get_price_cache().stop()
+    _compute_pool.shutdown()
+    _engine_pool.shutdown()
+
+
 app = FastAPI(
     title="Liquidation Heatmap API",
     description="Calculate and visualize cryptocurrency liquidation levels",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Rate limiting middleware (configurable via RATE_LIMIT_RPM and RATE_LIMIT_ENABLED env vars)
@@ -647,9 +1315,12 @@ async def get_cache_stats():
     Returns cache hit/miss ratio and other metrics for monitoring.
 
     Returns:
-        dict: Cache statistics including hit rate
+        dict: Cache statistics including hit rate, plus the rolling-window
+        engine states under "rolling_windows"
     """
-    return _heatmap_cache.get_stats()
+    stats = _heatmap_cache.get_stats()
+    stats["rolling_windows"] = _rolling_heatmaps.get_stats()
+    return stats
 
 
 @app.delete("/cache/clear")
@@ -662,9 +1333,39 @@ async def clear_cache():
         dict: Confirmation message
     """
     _heatmap_cache.clear()
+    _rolling_heatmaps.clear()
     return {"message": "Cache cleared", "status": "ok"}
 
 
+@app.get("/compute/stats")
+async def get_compute_stats():
+    """Get compute pool statistics.
+
+    Returns queue depth and wait times for the worker pool that runs blocking
+    heatmap, klines and liquidation-level work, checkout statistics of the
+    DuckDB cursor pools its jobs query through, and the same for the engine
+    processes that run heatmap replays.
+
+    Returns:
+        dict: Compute pool statistics
+    """
+    stats = _compute_pool.get_stats()
+    stats["cursor_pools"] = DuckDBService.get_cursor_pool_stats()
+    stats["engine"] = _engine_pool.get_stats()
+    return stats
+
+
+@app.get("/prices/stats")
+async def get_price_stats():
+    """Get background price cache statistics.
+
+    Returns:
+        dict: Cached price, source and age per symbol, refresh counts and how
+        reads were served (fresh price, kline close fallback, stale, none)
+    """
+    return get_price_cache().get_stats()
+
+
 @app.get(
     "/liquidations/levels",
     response_model=LiquidationResponse,
@@ -727,31 +1428,20 @@ async def get_liquidation_levels(
             detail=f"Invalid symbol '{symbol}'. Supported symbols: {sorted(SUPPORTED_SYMBOLS)}",
         )
 
-    # Get real-time current price from Binance API
+    # The OI-model query blocks on DuckDB I/O; run it on a compute pool worker
+    def fetch(db: DuckDBService) -> LiquidationResponse:
+        # Mark price from the background price cache (never calls the exchange)
+        current_price = float(db.get_current_price(symbol))
 
-    try:
-        with urlopen(
-            f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}", timeout=5
-        ) as resp:
-            data = json.loads(resp.read().decode())
-            current_price = float(data["price"])
-    except Exception as e:
-        # Fallback to historical price if API fails
-        logging.warning(f"Binance API price fetch failed for {symbol}: {e}")
-        with DuckDBService(read_only=True) as db_fallback:
-            price_decimal, _ = db_fallback.get_latest_open_interest(symbol)
-            current_price = float(price_decimal)
-
-    # Dynamic bin size based on timeframe (Coinglass approach)
-    if timeframe <= 7:
-        bin_size = 200.0  # 7d: High granularity
-    elif timeframe <= 30:
-        bin_size = 500.0  # 30d: Medium granularity
-    else:  # 90 days
-        bin_size = 1500.0  # 90d: Low granularity
-
-    # Calculate liquidations using OI-based model
-    with DuckDBService(read_only=True) as db:
+        # Dynamic bin size based on timeframe (Coinglass approach)
+        if timeframe <= 7:
+            bin_size = 200.0  # 7d: High granularity
+        elif timeframe <= 30:
+            bin_size = 500.0  # 30d: Medium granularity
+        else:  # 90 days
+            bin_size = 1500.0  # 90d: Low granularity
+
+        # Calculate liquidations using OI-based model
         # OI-based model: distributes current Open Interest based on volume profile
         bins_df = db.calculate_liquidations_oi_based(
             symbol=symbol,
@@ -780,38 +1470,40 @@ async def get_liquidation_levels(
                 inplace=True,
             )
 
-    logger.info(f"SQL returned {len(bins_df)} aggregated bins")
+        logger.info(f"SQL returned {len(bins_df)} aggregated bins")
 
-    # Convert DataFrame to API response format
-    long_liqs = []
-    short_liqs = []
+        # Convert DataFrame to API response format
+        long_liqs = []
+        short_liqs = []
 
-    for _, row in bins_df.iterrows():
-        liq_entry = {
-            "price_level": str(row["price_bucket"]),
-            "volume": str(row["total_volume"]),
-            "count": int(row["count"]),
-            "leverage": f"{int(row['leverage'])}x",
-        }
+        for _, row in bins_df.iterrows():
+            liq_entry = {
+                "price_level": str(row["price_bucket"]),
+                "volume": str(row["total_volume"]),
+                "count": int(row["count"]),
+                "leverage": f"{int(row['leverage'])}x",
+            }
 
-        if row["side"] == "buy":  # Long positions
-            long_liqs.append(liq_entry)
-        else:  # Short positions
-            short_liqs.append(liq_entry)
+            if row["side"] == "buy":  # Long positions
+                long_liqs.append(liq_entry)
+            else:  # Short positions
+                short_liqs.append(liq_entry)
 
-    # Sort: longs descending (high to low), shorts ascending (low to high)
-    long_liqs = sorted(long_liqs, key=lambda x: float(x["price_level"]), reverse=True)
-    short_liqs = sorted(short_liqs, key=lambda x: float(x["price_level"]))
+        # Sort: longs descending (high to low), shorts ascending (low to high)
+        long_liqs = sorted(long_liqs, key=lambda x: float(x["price_level"]), reverse=True)
+        short_liqs = sorted(short_liqs, key=lambda x: float(x["price_level"]))
 
-    logger.info(f"Formatted response: {len(long_liqs)} long, {len(short_liqs)} short")
+        logger.info(f"Formatted response: {len(long_liqs)} long, {len(short_liqs)} short")
 
-    return LiquidationResponse(
-        symbol=symbol,
-        model=model,
-        current_price=str(current_price),
-        long_liquidations=long_liqs,
-        short_liquidations=short_liqs,
-    )
+        return LiquidationResponse(
+            symbol=symbol,
+            model=model,
+            current_price=str(current_price),
+            long_liquidations=long_liqs,
+            short_liquidations=short_liqs,
+        )
+
+    return await _compute_pool.run_query(fetch)
 
 
 @app.get("/liquidations/heatmap")
@@ -849,10 +1541,7 @@ async def get_heatmap(
 
     from .heatmap_models import HeatmapDataPoint, HeatmapMetadata, HeatmapResponse
 
-    # Connect to database
-    db = DuckDBService(read_only=True)
-
-    try:
+    def fetch(db: DuckDBService) -> HeatmapResponse:
         # Query liquidation_snapshots table (contains actual data)
         # Aggregate by timestamp and price_bucket, compute density and volume
         query = """
@@ -939,8 +1628,7 @@ async def get_heatmap(
             metadata=metadata,
         )
 
-    finally:
-        db.close()
+    return await _compute_pool.run_query(fetch)
 
 
 @app.get("/liquidations/history")
@@ -964,9 +1652,8 @@ async def get_liquidation_history(
     Returns:
         List of historical liquidation records or aggregated data
     """
-    db = DuckDBService(read_only=True)
 
-    try:
+    def fetch(db: DuckDBService) -> list[dict]:
         # Check if liquidation_history table exists
         table_check = db.conn.execute("""
             SELECT COUNT(*) as count
@@ -1051,8 +1738,7 @@ async def get_liquidation_history(
                 for rec in df.to_dict(orient="records")
             ]
 
-    finally:
-        db.close()
+    return await _compute_pool.run_query(fetch)
 
 
 @app.get("/liquidations/compare-models")
@@ -1146,6 +1832,8 @@ async def compare_models(
 
 @app.get("/prices/klines")
 async def get_klines(
+    request: Request,
+    response: Response,
     symbol: str = Query(
         "BTCUSDT",
         description="Trading pair symbol",
@@ -1177,6 +1865,9 @@ async def get_klines(
     within that time range (ignoring limit). This allows the heatmap frontend
     to fetch klines matching exactly the heatmap data time range.
 
+    Responses carry an ETag derived from the query and the latest ingested
+    candle; a request whose If-None-Match still matches gets 304 Not Modified.
+
     Args:
         symbol: Trading pair (e.g., BTCUSDT)
         interval: Kline interval (5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d)
@@ -1210,33 +1901,113 @@ async def get_klines(
         except ValueError as e:
             raise HTTPException(status_code=400, detail=f"Invalid time format: {e}")
 
-    db = DuckDBService(read_only=True)
+    # Conditional GET: nothing new was ingested since the client's copy
+    watermark = await _data_watermark(symbol, interval, include_open_interest=False)
+    if watermark is not None:
+        etag = _make_etag(request, watermark)
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=_validator_headers(etag))
+        response.headers.update(_validator_headers(etag))
 
-    try:
-        # Map intervals to aggregation minutes (matches heatmap-timeseries logic)
-        interval_agg_map = {
-            "5m": 5,
-            "15m": 15,
-            "30m": 30,
-            "1h": 60,
-            "2h": 120,
-            "4h": 240,
-            "8h": 480,
-            "12h": 720,
-            "1d": 1440,
-        }
-        agg_minutes = interval_agg_map.get(interval, 15)
-
-        # For intervals > 15m, aggregate from base tables
-        # 30m uses 5m base table (6 candles), all others use 15m
-        if agg_minutes > 15:
-            base_table = "klines_5m_history" if interval == "30m" else "klines_15m_history"
-            base_minutes = 5 if interval == "30m" else 15
-
-            if use_time_range:
-                # Time-range based query
-                query = f"""
-                WITH raw_klines AS (
+    # Blocking DuckDB query and row formatting; runs on a compute pool worker
+    def fetch(db: DuckDBService) -> dict:
+        try:
+            # Map intervals to aggregation minutes (matches heatmap-timeseries logic)
+            interval_agg_map = {
+                "5m": 5,
+                "15m": 15,
+                "30m": 30,
+                "1h": 60,
+                "2h": 120,
+                "4h": 240,
+                "8h": 480,
+                "12h": 720,
+                "1d": 1440,
+            }
+            agg_minutes = interval_agg_map.get(interval, 15)
+
+            # For intervals > 15m, aggregate from base tables
+            # 30m uses 5m base table (6 candles), all others use 15m
+            if agg_minutes > 15:
+                base_table = "klines_5m_history" if interval == "30m" else "klines_15m_history"
+                base_minutes = 5 if interval == "30m" else 15
+
+                if use_time_range:
+                    # Time-range based query
+                    query = f"""
+                    WITH raw_klines AS (
+                        SELECT
+                            open_time as timestamp,
+                            CAST(open AS DOUBLE) as open,
+                            CAST(high AS DOUBLE) as high,
+                            CAST(low AS DOUBLE) as low,
+                            CAST(close AS DOUBLE) as close,
+                            CAST(volume AS DOUBLE) as volume
+                        FROM {base_table}
+                        WHERE symbol = ? AND open_time >= ? AND open_time <= ?
+                        ORDER BY open_time
+                    ),
+                    aggregated AS (
+                        SELECT
+                            time_bucket(INTERVAL '{agg_minutes} minutes', timestamp) as bucket,
+                            FIRST(open ORDER BY timestamp) as open,
+                            MAX(high) as high,
+                            MIN(low) as low,
+                            LAST(close ORDER BY timestamp) as close,
+                            SUM(volume) as volume
+                        FROM raw_klines
+                        GROUP BY bucket
+                        ORDER BY bucket
+                    )
+                    SELECT bucket as timestamp, open, high, low, close, volume
+                    FROM aggregated
+                    ORDER BY timestamp
+                    """
+                    df = db.conn.execute(query, [symbol, start_dt, end_dt]).df()
+                else:
+                    # Limit-based query (original behavior)
+                    # Calculate raw_limit based on base table interval
+                    raw_limit = limit * (agg_minutes // base_minutes) + agg_minutes // base_minutes
+
+                    query = f"""
+                    WITH raw_klines AS (
+                        SELECT
+                            open_time as timestamp,
+                            CAST(open AS DOUBLE) as open,
+                            CAST(high AS DOUBLE) as high,
+                            CAST(low AS DOUBLE) as low,
+                            CAST(close AS DOUBLE) as close,
+                            CAST(volume AS DOUBLE) as volume
+                        FROM {base_table}
+                        WHERE symbol = ?
+                        ORDER BY open_time DESC
+                        LIMIT ?
+                    ),
+                    aggregated AS (
+                        SELECT
+                            time_bucket(INTERVAL '{agg_minutes} minutes', timestamp) as bucket,
+                            FIRST(open ORDER BY timestamp) as open,
+                            MAX(high) as high,
+                            MIN(low) as low,
+                            LAST(close ORDER BY timestamp) as close,
+                            SUM(volume) as volume
+                        FROM raw_klines
+                        GROUP BY bucket
+                        ORDER BY bucket DESC
+                        LIMIT ?
+                    )
+                    SELECT bucket as timestamp, open, high, low, close, volume
+                    FROM aggregated
+                    ORDER BY timestamp DESC
+                    """
+                    df = db.conn.execute(query, [symbol, raw_limit, limit]).df()
+            else:
+                # Direct query for 5m and 15m intervals
+                table_name = f"klines_{interval}_history"
+
+                if use_time_range:
+                    # Time-range based query
+                    query = f"""
                     SELECT
                         open_time as timestamp,
                         CAST(open AS DOUBLE) as open,
@@ -1244,34 +2015,14 @@ async def get_klines(
                         CAST(low AS DOUBLE) as low,
                         CAST(close AS DOUBLE) as close,
                         CAST(volume AS DOUBLE) as volume
-                    FROM {base_table}
+                    FROM {table_name}
                     WHERE symbol = ? AND open_time >= ? AND open_time <= ?
                     ORDER BY open_time
-                ),
-                aggregated AS (
-                    SELECT
-                        time_bucket(INTERVAL '{agg_minutes} minutes', timestamp) as bucket,
-                        FIRST(open ORDER BY timestamp) as open,
-                        MAX(high) as high,
-                        MIN(low) as low,
-                        LAST(close ORDER BY timestamp) as close,
-                        SUM(volume) as volume
-                    FROM raw_klines
-                    GROUP BY bucket
-                    ORDER BY bucket
-                )
-                SELECT bucket as timestamp, open, high, low, close, volume
-                FROM aggregated
-                ORDER BY timestamp
-                """
-                df = db.conn.execute(query, [symbol, start_dt, end_dt]).df()
-            else:
-                # Limit-based query (original behavior)
-                # Calculate raw_limit based on base table interval
-                raw_limit = limit * (agg_minutes // base_minutes) + agg_minutes // base_minutes
-
-                query = f"""
-                WITH raw_klines AS (
+                    """
+                    df = db.conn.execute(query, [symbol, start_dt, end_dt]).df()
+                else:
+                    # Limit-based query (original behavior)
+                    query = f"""
                     SELECT
                         open_time as timestamp,
                         CAST(open AS DOUBLE) as open,
@@ -1279,96 +2030,43 @@ async def get_klines(
                         CAST(low AS DOUBLE) as low,
                         CAST(close AS DOUBLE) as close,
                         CAST(volume AS DOUBLE) as volume
-                    FROM {base_table}
+                    FROM {table_name}
                     WHERE symbol = ?
                     ORDER BY open_time DESC
                     LIMIT ?
-                ),
-                aggregated AS (
-                    SELECT
-                        time_bucket(INTERVAL '{agg_minutes} minutes', timestamp) as bucket,
-                        FIRST(open ORDER BY timestamp) as open,
-                        MAX(high) as high,
-                        MIN(low) as low,
-                        LAST(close ORDER BY timestamp) as close,
-                        SUM(volume) as volume
-                    FROM raw_klines
-                    GROUP BY bucket
-                    ORDER BY bucket DESC
-                    LIMIT ?
-                )
-                SELECT bucket as timestamp, open, high, low, close, volume
-                FROM aggregated
-                ORDER BY timestamp DESC
-                """
-                df = db.conn.execute(query, [symbol, raw_limit, limit]).df()
-        else:
-            # Direct query for 5m and 15m intervals
-            table_name = f"klines_{interval}_history"
-
-            if use_time_range:
-                # Time-range based query
-                query = f"""
-                SELECT
-                    open_time as timestamp,
-                    CAST(open AS DOUBLE) as open,
-                    CAST(high AS DOUBLE) as high,
-                    CAST(low AS DOUBLE) as low,
-                    CAST(close AS DOUBLE) as close,
-                    CAST(volume AS DOUBLE) as volume
-                FROM {table_name}
-                WHERE symbol = ? AND open_time >= ? AND open_time <= ?
-                ORDER BY open_time
-                """
-                df = db.conn.execute(query, [symbol, start_dt, end_dt]).df()
-            else:
-                # Limit-based query (original behavior)
-                query = f"""
-                SELECT
-                    open_time as timestamp,
-                    CAST(open AS DOUBLE) as open,
-                    CAST(high AS DOUBLE) as high,
-                    CAST(low AS DOUBLE) as low,
-                    CAST(close AS DOUBLE) as close,
-                    CAST(volume AS DOUBLE) as volume
-                FROM {table_name}
-                WHERE symbol = ?
-                ORDER BY open_time DESC
-                LIMIT ?
-                """
-                df = db.conn.execute(query, [symbol, limit]).df()
+                    """
+                    df = db.conn.execute(query, [symbol, limit]).df()
 
-        if df.empty:
-            return {"symbol": symbol, "interval": interval, "data": []}
+            if df.empty:
+                return {"symbol": symbol, "interval": interval, "data": []}
 
-        # Sort ascending for chart display
-        df = df.sort_values("timestamp")
+            # Sort ascending for chart display
+            df = df.sort_values("timestamp")
 
-        klines = [
-            {
-                "timestamp": row["timestamp"].isoformat(),
-                "open": row["open"],
-                "high": row["high"],
-                "low": row["low"],
-                "close": row["close"],
-                "volume": row["volume"],
-            }
-            for _, row in df.iterrows()
-        ]
+            klines = [
+                {
+                    "timestamp": row["timestamp"].isoformat(),
+                    "open": row["open"],
+                    "high": row["high"],
+                    "low": row["low"],
+                    "close": row["close"],
+                    "volume": row["volume"],
+                }
+                for _, row in df.iterrows()
+            ]
 
-        return {
-            "symbol": symbol,
-            "interval": interval,
-            "count": len(klines),
-            "data": klines,
-        }
+            return {
+                "symbol": symbol,
+                "interval": interval,
+                "count": len(klines),
+                "data": klines,
+            }
 
-    except Exception as e:
-        logger.error(f"Error fetching klines: {e}")
-        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+        except Exception as e:
+            logger.error(f"Error fetching klines: {e}")
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
-    finally:
-        db.close()
+    return await _compute_pool.run_query(fetch)
 
 
 # =============================================================================
@@ -1405,6 +2103,10 @@ class HeatmapTimeseriesMetadata(BaseModel):
     total_long_volume: float
     total_short_volume: float
     total_consumed: int
+    checkpoint_time: Optional[str] = None  # Engine checkpoint the run resumed from
+    # "computed" (engine run), "precomputed" (liquidation_snapshots) or "stitched"
+    # (precomputed snapshots with the uncovered head/tail computed)
+    source: str = "computed"
 
 
 class HeatmapTimeseriesResponse(BaseModel):
@@ -1414,6 +2116,68 @@ class HeatmapTimeseriesResponse(BaseModel):
     meta: HeatmapTimeseriesMetadata
 
 
+class HeatmapFrameResponse(BaseModel):
+    """Delta-encoded heatmap state at a single timestamp.
+
+    Keyframes list every active level. Other frames list only the levels that
+    changed since the previous frame: multiply every previous level by `scale`,
+    then overwrite the listed levels (zero on both sides means removed).
+    """
+
+    timestamp: str
+    keyframe: bool
+    scale: float
+    levels: list[HeatmapLevel]
+    positions_created: int
+    positions_consumed: int
+
+
+class HeatmapTimeseriesDeltaResponse(BaseModel):
+    """Response model for heatmap-timeseries with encoding=delta."""
+
+    encoding: Literal["delta"] = "delta"
+    keyframe_interval: int
+    data: list[HeatmapFrameResponse]
+    meta: HeatmapTimeseriesMetadata
+
+
+class HeatmapTimeseriesColumnarResponse(BaseModel):
+    """Response model for heatmap-timeseries with format=columnar.
+
+    `prices` is the sorted union of every active price level. With layout
+    "dense", long_density[t][p] is the density at timestamps[t] and prices[p].
+    With layout "sparse" the matrices are in CSR form: the levels of snapshot t
+    are entries offsets[t] to offsets[t + 1] of price_index, long_density and
+    short_density.
+    """
+
+    format: Literal["columnar"] = "columnar"
+    layout: Literal["dense", "sparse"]
+    timestamps: list[str]
+    prices: list[float]
+    long_density: list
+    short_density: list
+    offsets: Optional[list[int]] = None  # sparse layout only
+    price_index: Optional[list[int]] = None  # sparse layout only
+    positions_created: list[int]
+    positions_consumed: list[int]
+    meta: HeatmapTimeseriesMetadata
+
+
+class HeatmapScenarioResult(BaseModel):
+    """Heatmap timeseries for one leverage-weight scenario."""
+
+    leverage_weights: str  # Normalized distribution, "default" for the model defaults
+    data: list[HeatmapSnapshotResponse]
+    meta: HeatmapTimeseriesMetadata
+
+
+class HeatmapScenariosResponse(BaseModel):
+    """Response model for heatmap-timeseries/scenarios, in request order."""
+
+    scenarios: list[HeatmapScenarioResult]
+
+
 class LeverageWeightsParseError(ValueError):
     """Raised when leverage_weights query param is invalid."""
 
@@ -1423,6 +2187,15 @@ class LeverageWeightsParseError(ValueError):
 # Valid leverage tiers (must match LiquidationLevel validation)
 VALID_LEVERAGE_TIERS = {5, 10, 25, 50, 100}
 
+# Maximum leverage-weight scenarios evaluated per request
+MAX_WEIGHT_SCENARIOS = int(os.getenv("LH_MAX_WEIGHT_SCENARIOS", "16"))
+
+# Binary heatmap-timeseries formats and the optional package each one needs
+# (pip install liquidationheatmap[formats])
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+FORMAT_DEPENDENCIES = {"arrow": "pyarrow", "msgpack": "msgpack"}
+
 
 def parse_leverage_weights(weights_str: str | None) -> list[tuple[int, Decimal]] | None:
     """Parse leverage weights from query string.
@@ -1484,8 +2257,583 @@ def parse_leverage_weights(weights_str: str | None) -> list[tuple[int, Decimal]]
         raise LeverageWeightsParseError(f"Invalid leverage_weights: {weights_str} - {e}")
 
 
-@app.get("/liquidations/heatmap-timeseries", response_model=HeatmapTimeseriesResponse)
-async def get_heatmap_timeseries(
+def _parse_heatmap_time_range(
+    time_window: Optional[str], start_time: Optional[str], end_time: Optional[str]
+) -> tuple[datetime, datetime]:
+    """Resolve heatmap query parameters to a (start, end) datetime range.
+
+    Raises:
+        HTTPException: 400 if a timestamp is not valid ISO 8601
+    """
+    try:
+        if end_time:
+            end_dt = datetime.fromisoformat(end_time.replace("Z", "+00:00")).replace(tzinfo=None)
+        else:
+            end_dt = datetime.now()
+
+        if time_window:
+            # Calculate start_time from time_window hours
+            config = TIME_WINDOW_CONFIG[time_window]
+            start_dt = end_dt - timedelta(hours=config["hours"])
+        elif start_time:
+            start_dt = datetime.fromisoformat(start_time.replace("Z", "+00:00")).replace(
+                tzinfo=None
+            )
+        else:
+            start_dt = end_dt - timedelta(days=7)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid time format: {e}")
+
+    return start_dt, end_dt
+
+
+def _snap_heatmap_range(
+    start_dt: datetime,
+    end_dt: datetime,
+    interval: str,
+    latest_candle: Optional[datetime] = None,
+) -> tuple[datetime, datetime]:
+    """Snap a heatmap range to the candles it covers, for canonical cache keys.
+
+    The start moves back to the open of the candle containing it. The end is
+    clamped to the latest ingested candle, then moved to the open time of the
+    last base-table candle (5m or 15m) inside its interval candle, so that
+    candle is always loaded whole. Requests that cover the same candles
+    therefore resolve to the same range, whatever their exact timestamps.
+    """
+    minutes = HEATMAP_INTERVAL_MINUTES.get(interval, 15)
+    base_minutes = 5 if interval == "30m" else min(minutes, 15)
+    grid = timedelta(minutes=minutes)
+    # time_bucket() origin; every supported interval divides a day
+    origin = datetime(2000, 1, 3)
+
+    if latest_candle is not None:
+        end_dt = min(end_dt, latest_candle)
+    start_dt -= (start_dt - origin) % grid
+    end_dt -= (end_dt - origin) % grid
+    return start_dt, end_dt + grid - timedelta(minutes=base_minutes)
+
+
+def _timeseries_from_responses(
+    data: list[HeatmapSnapshotResponse],
+    volumes: list[tuple[float, float]],
+    symbol: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    interval: str,
+    checkpoint_time: Optional[str] = None,
+    source: str = "computed",
+) -> HeatmapTimeseriesResponse:
+    """Build a timeseries response from converted snapshots and their (long, short) volumes."""
+    occupied = [snapshot.levels for snapshot in data if snapshot.levels]
+    meta = HeatmapTimeseriesMetadata(
+        symbol=symbol,
+        start_time=start_dt.isoformat(),
+        end_time=end_dt.isoformat(),
+        interval=interval,
+        total_snapshots=len(data),
+        price_range={
+            "min": min(levels[0].price for levels in occupied) if occupied else 0,
+            "max": max(levels[-1].price for levels in occupied) if occupied else 0,
+        },
+        total_long_volume=sum(long for long, _ in volumes),
+        total_short_volume=sum(short for _, short in volumes),
+        total_consumed=sum(snapshot.positions_consumed for snapshot in data),
+        checkpoint_time=checkpoint_time,
+        source=source,
+    )
+    return HeatmapTimeseriesResponse(data=data, meta=meta)
+
+
+class ColumnarTimeseries:
+    """A full heatmap timeseries held as SnapshotColumns plus its metadata.
+
+    Pre-computed snapshots are served in this form: the columnar formats read
+    the arrays directly, and only format=json builds per-level objects.
+    """
+
+    __slots__ = ("columns", "meta")
+
+    def __init__(self, columns: SnapshotColumns, meta: HeatmapTimeseriesMetadata):
+        self.columns = columns
+        self.meta = meta
+
+    def to_response(self) -> HeatmapTimeseriesResponse:
+        """Expand into the per-level JSON response."""
+        return HeatmapTimeseriesResponse(data=_columns_to_responses(self.columns), meta=self.meta)
+
+
+def _column_levels(columns: SnapshotColumns) -> list[list[HeatmapLevel]]:
+    """The levels of each snapshot in snapshot columns, as response objects."""
+    prices = columns.price.tolist()
+    longs = columns.long_density.tolist()
+    shorts = columns.short_density.tolist()
+    bounds = columns.offsets.tolist()
+    return [
+        [
+            HeatmapLevel(price=price, long_density=long, short_density=short)
+            for price, long, short in zip(prices[lo:hi], longs[lo:hi], shorts[lo:hi])
+        ]
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def _columns_to_responses(columns: SnapshotColumns) -> list[HeatmapSnapshotResponse]:
+    """Expand snapshot columns into per-level snapshot responses."""
+    return [
+        HeatmapSnapshotResponse(
+            timestamp=timestamp.isoformat(),
+            levels=levels,
+            positions_created=created,
+            positions_consumed=consumed,
+        )
+        for timestamp, levels, created, consumed in zip(
+            columns.timestamps(),
+            _column_levels(columns),
+            columns.positions_created.tolist(),
+            columns.positions_consumed.tolist(),
+        )
+    ]
+
+
+def _engine_timeseries(
+    result: EngineColumns,
+    symbol: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    interval: str,
+    checkpoint_time: Optional[str] = None,
+) -> ColumnarTimeseries:
+    """Wrap computed engine columns, with the engine's own volume totals in the metadata."""
+    meta = _columns_metadata(
+        result.columns,
+        symbol,
+        start_dt,
+        end_dt,
+        interval,
+        checkpoint_time,
+        volumes=(result.total_long_volume, result.total_short_volume),
+    )
+    return ColumnarTimeseries(result.columns, meta)
+
+
+def _columns_metadata(
+    columns: SnapshotColumns,
+    symbol: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    interval: str,
+    checkpoint_time: Optional[str] = None,
+    source: str = "computed",
+    volumes: Optional[tuple[np.ndarray, np.ndarray]] = None,
+) -> HeatmapTimeseriesMetadata:
+    """Timeseries metadata computed from snapshot columns.
+
+    `volumes` are per-snapshot (long, short) totals reported by the engine;
+    without them the level densities are summed.
+    """
+    occupied = len(columns.price) > 0
+    if volumes is not None:
+        total_long, total_short = (sum(totals.tolist()) for totals in volumes)
+    else:
+        total_long = float(columns.long_density.sum())
+        total_short = float(columns.short_density.sum())
+    return HeatmapTimeseriesMetadata(
+        symbol=symbol,
+        start_time=start_dt.isoformat(),
+        end_time=end_dt.isoformat(),
+        interval=interval,
+        total_snapshots=len(columns),
+        price_range={
+            "min": float(columns.price.min()) if occupied else 0,
+            "max": float(columns.price.max()) if occupied else 0,
+        },
+        total_long_volume=total_long,
+        total_short_volume=total_short,
+        total_consumed=int(columns.positions_consumed.sum()),
+        checkpoint_time=checkpoint_time,
+        source=source,
+    )
+
+
+def _timeseries_to_columnar(
+    response: HeatmapTimeseriesResponse, layout: str = "dense"
+) -> HeatmapTimeseriesColumnarResponse:
+    """Pivot a full timeseries response onto one shared, sorted price axis."""
+    counts = np.fromiter((len(s.levels) for s in response.data), np.int64, len(response.data))
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    levels = [level for snapshot in response.data for level in snapshot.levels]
+    columns = SnapshotColumns(
+        timestamp=np.array([s.timestamp for s in response.data], dtype="datetime64[us]"),
+        positions_created=np.array([s.positions_created for s in response.data], np.int64),
+        positions_consumed=np.array([s.positions_consumed for s in response.data], np.int64),
+        offsets=offsets,
+        price=np.fromiter((level.price for level in levels), np.float64, len(levels)),
+        long_density=np.fromiter((level.long_density for level in levels), np.float64, len(levels)),
+        short_density=np.fromiter(
+            (level.short_density for level in levels), np.float64, len(levels)
+        ),
+    )
+    return _columns_to_columnar(columns, response.meta, layout)
+
+
+def _columns_to_columnar(
+    columns: SnapshotColumns, meta: HeatmapTimeseriesMetadata, layout: str = "dense"
+) -> HeatmapTimeseriesColumnarResponse:
+    """Pivot snapshot columns onto one shared, sorted price axis."""
+    counts = np.diff(columns.offsets)
+    prices, price_index = np.unique(columns.price, return_inverse=True)
+
+    matrices = {}
+    if layout == "dense":
+        rows = np.repeat(np.arange(len(counts)), counts)
+        for name, values in (
+            ("long_density", columns.long_density),
+            ("short_density", columns.short_density),
+        ):
+            matrix = np.zeros((len(counts), len(prices)))
+            matrix[rows, price_index] = values
+            matrices[name] = matrix.tolist()
+    else:
+        matrices = {
+            "long_density": columns.long_density.tolist(),
+            "short_density": columns.short_density.tolist(),
+            "offsets": columns.offsets.tolist(),
+            "price_index": price_index.tolist(),
+        }
+
+    return HeatmapTimeseriesColumnarResponse(
+        layout=layout,
+        timestamps=[timestamp.isoformat() for timestamp in columns.timestamps()],
+        prices=prices.tolist(),
+        positions_created=columns.positions_created.tolist(),
+        positions_consumed=columns.positions_consumed.tolist(),
+        meta=meta,
+        **matrices,
+    )
+
+
+def _columnar_to_arrow(columnar: HeatmapTimeseriesColumnarResponse) -> bytes:
+    """Encode a columnar response as an Arrow IPC stream (one row per snapshot).
+
+    Densities are list<double> columns. In the dense layout every list spans the
+    whole price axis, so a column flattens to a (snapshots x prices) matrix; the
+    sparse layout adds a list<int32> price_index column. The price axis, layout
+    and metadata go in the schema metadata.
+    """
+    import pyarrow as pa
+
+    if columnar.layout == "dense":
+        width = len(columnar.prices)
+        # Plain lists rather than fixed_size_list, which cannot have zero width
+        offsets = pa.array(np.arange(len(columnar.timestamps) + 1) * width, type=pa.int32())
+        density_columns = {
+            name: pa.ListArray.from_arrays(
+                offsets, pa.array(np.asarray(matrix, dtype=np.float64).reshape(-1))
+            )
+            for name, matrix in (
+                ("long_density", columnar.long_density),
+                ("short_density", columnar.short_density),
+            )
+        }
+    else:
+        offsets = pa.array(columnar.offsets, type=pa.int32())
+        density_columns = {
+            "price_index": pa.ListArray.from_arrays(
+                offsets, pa.array(columnar.price_index, type=pa.int32())
+            ),
+            "long_density": pa.ListArray.from_arrays(
+                offsets, pa.array(columnar.long_density, type=pa.float64())
+            ),
+            "short_density": pa.ListArray.from_arrays(
+                offsets, pa.array(columnar.short_density, type=pa.float64())
+            ),
+        }
+
+    table = pa.table(
+        {
+            "timestamp": pa.array(columnar.timestamps).cast(pa.timestamp("us")),
+            "positions_created": pa.array(columnar.positions_created, type=pa.int64()),
+            "positions_consumed": pa.array(columnar.positions_consumed, type=pa.int64()),
+            **density_columns,
+        }
+    )
+    table = table.replace_schema_metadata(
+        {
+            "layout": columnar.layout,
+            "prices": json.dumps(columnar.prices),
+            "meta": columnar.meta.model_dump_json(),
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode_heatmap_timeseries(
+    response: HeatmapTimeseriesResponse | HeatmapTimeseriesDeltaResponse | ColumnarTimeseries,
+    response_format: str = "json",
+    layout: str = "dense",
+) -> EncodedResponse:
+    """Serialize a heatmap-timeseries response in the requested format.
+
+    A ColumnarTimeseries goes to the columnar formats without building
+    per-level response objects.
+    """
+    if response_format == "json":
+        if isinstance(response, ColumnarTimeseries):
+            response = response.to_response()
+        return EncodedResponse.from_model(response)
+
+    if isinstance(response, ColumnarTimeseries):
+        columnar = _columns_to_columnar(response.columns, response.meta, layout)
+    else:
+        columnar = _timeseries_to_columnar(response, layout)
+    if response_format == "columnar":
+        return EncodedResponse.from_model(columnar)
+    if response_format == "arrow":
+        return EncodedResponse.from_bytes(_columnar_to_arrow(columnar), ARROW_STREAM_MEDIA_TYPE)
+
+    import msgpack
+
+    return EncodedResponse.from_bytes(
+        msgpack.packb(columnar.model_dump(), use_bin_type=True), MSGPACK_MEDIA_TYPE
+    )
+
+
+def _compute_heatmap_columns(
+    db: DuckDBService,
+    symbol: str,
+    interval: str,
+    weights: Optional[list],
+    price_bin_size: float,
+    start_dt: datetime,
+    end_dt: datetime,
+    emit_from: datetime,
+) -> tuple[EngineColumns, Optional[str]]:
+    """Run the float64 engine, emitting snapshots from `emit_from` to `end_dt`.
+
+    Resumes from the nearest engine checkpoint at or before `emit_from`, or
+    replays from `start_dt` when there is none. The replay runs on the engine
+    pool; this thread only loads its inputs.
+
+    Returns:
+        Tuple of (snapshot columns, ISO time of the checkpoint used or None)
+    """
+    checkpoint = db.load_book_checkpoint(symbol, interval, leverage_weights_key(weights), emit_from)
+    return _replay_heatmap_columns(
+        db, symbol, interval, weights, price_bin_size, checkpoint, start_dt, end_dt, emit_from
+    )
+
+
+def _replay_heatmap_columns(
+    db: DuckDBService,
+    symbol: str,
+    interval: str,
+    weights: Optional[list],
+    price_bin_size: float,
+    checkpoint,  # BookCheckpoint from models.position_book, or None
+    start_dt: datetime,
+    end_dt: datetime,
+    emit_from: datetime,
+) -> tuple[EngineColumns, Optional[str]]:
+    """_compute_heatmap_columns() from an already loaded checkpoint (or None)."""
+    replay_start = checkpoint.timestamp if checkpoint is not None else start_dt
+    inputs = db.load_heatmap_inputs(symbol, interval, replay_start, end_dt)
+    if inputs.index_at(emit_from) == len(inputs):
+        return EngineColumns.from_snapshots([]), None
+
+    result = _engine_pool.call(
+        replay_heatmap,
+        candles=inputs,
+        oi_deltas=None,
+        symbol=symbol,
+        leverage_weights=weights,
+        price_bucket_size=Decimal(str(price_bin_size)),
+        precision="float64",
+        checkpoint=checkpoint,
+        emit_from=emit_from,
+    )
+    return result, checkpoint.timestamp.isoformat() if checkpoint is not None else None
+
+
+def _compute_rolling_timeseries(
+    db: DuckDBService,
+    key: tuple,
+    symbol: str,
+    interval: str,
+    weights: Optional[list],
+    price_bin_size: float,
+    start_dt: datetime,
+    end_dt: datetime,
+    compaction_quantum: Optional[float] = None,
+) -> HeatmapTimeseriesResponse:
+    """Compute a window ending at the latest candle, extending the previous one if possible.
+
+    The previous response for the same rolling window (`key`) left the engine
+    book frozen before its last candle. When the new window can continue it,
+    only the candles from there on are loaded and replayed, and the snapshots
+    before the new start are dropped. Otherwise the window is computed in full
+    from the nearest engine checkpoint. Either way the result becomes the
+    state for the next request.
+    """
+    state = _rolling_heatmaps.get(key)
+    if state is not None and state.covers(start_dt, end_dt):
+        checkpoint, origin = state.checkpoint, state.origin
+        keep = slice(
+            bisect_left(state.times, start_dt), bisect_left(state.times, checkpoint.timestamp)
+        )
+        times, data, volumes = state.times[keep], state.data[keep], state.volumes[keep]
+    else:
+        state = None
+        checkpoint = db.load_book_checkpoint(
+            symbol, interval, leverage_weights_key(weights), start_dt
+        )
+        origin = checkpoint.timestamp if checkpoint is not None else None
+        times, data, volumes = [], [], []
+
+    replay_start = checkpoint.timestamp if checkpoint is not None else start_dt
+    inputs = db.load_heatmap_inputs(symbol, interval, replay_start, end_dt)
+    result, frozen = _engine_pool.call(
+        replay_rolling_heatmap,
+        candles=inputs,
+        oi_deltas=None,
+        symbol=symbol,
+        leverage_weights=weights,
+        price_bucket_size=Decimal(str(price_bin_size)),
+        checkpoint=checkpoint,
+        emit_from=start_dt,
+        compaction_quantum=(
+            Decimal(str(compaction_quantum)) if compaction_quantum is not None else None
+        ),
+    )
+    _rolling_heatmaps.record(extended=state is not None, replayed=len(inputs))
+
+    times += result.columns.timestamps()
+    data += _columns_to_responses(result.columns)
+    volumes += zip(result.total_long_volume.tolist(), result.total_short_volume.tolist())
+    if frozen is not None:
+        _rolling_heatmaps.put(key, RollingHeatmap(frozen, origin, start_dt, times, data, volumes))
+
+    return _timeseries_from_responses(
+        data,
+        volumes,
+        symbol,
+        start_dt,
+        end_dt,
+        interval,
+        checkpoint_time=origin.isoformat() if origin is not None and data else None,
+    )
+
+
+def _stitch_precomputed_columns(
+    db: DuckDBService,
+    symbol: str,
+    interval: str,
+    weights: Optional[list],
+    price_bin_size: float,
+    start_dt: datetime,
+    end_dt: datetime,
+) -> Optional[ColumnarTimeseries]:
+    """Serve a heatmap timeseries from pre-computed snapshots where they cover it.
+
+    Snapshots persisted by scripts/precompute_heatmap.py are loaded as columns
+    for the covered part of the range; only the uncovered head and tail are
+    computed. A tail is only stitched when an engine checkpoint at or before
+    the end of the stored range exists: it resumes from there and continues
+    the stored history. Without one it would replay the whole window from
+    its start, at the cost of a full computation, so the range is left to be
+    computed instead. Snapshots with no levels store no rows and are served
+    empty, with zero position counts.
+
+    Returns:
+        ColumnarTimeseries, or None if no pre-computed range overlaps or the
+        tail has no checkpoint to resume from
+    """
+    weights_key = leverage_weights_key(weights)
+    covered = db.load_snapshot_coverage(
+        symbol, interval, price_bin_size, weights_key, start_dt, end_dt
+    )
+    if covered is None:
+        return None
+
+    covered_start, covered_end = covered
+    tail_checkpoint = None
+    if end_dt > covered_end:
+        tail_checkpoint = db.load_book_checkpoint(symbol, interval, weights_key, covered_end)
+        if tail_checkpoint is None:
+            logger.debug(
+                f"No checkpoint at or before {covered_end} for {symbol} {interval}; "
+                "computing instead of stitching"
+            )
+            return None
+    stored = db.load_snapshot_columns(
+        symbol,
+        covered_start,
+        covered_end,
+        interval=interval,
+        price_bin_size=price_bin_size,
+        weights_key=weights_key,
+    )
+    if not len(stored):
+        return None
+
+    # Snapshots without any level store no rows; put them back on the candle grid
+    grid = db.load_candle_times(symbol, interval, covered_start, covered_end)
+    stored = stored.reindex(grid)
+
+    head = tail = SnapshotColumns.from_snapshots([])
+    head_checkpoint_time = tail_checkpoint_time = None
+    if start_dt < covered_start:
+        computed, head_checkpoint_time = _compute_heatmap_columns(
+            db, symbol, interval, weights, price_bin_size, start_dt, covered_start, start_dt
+        )
+        head = computed.columns
+        head = head.reindex(head.timestamp[head.timestamp < np.datetime64(covered_start, "us")])
+    if tail_checkpoint is not None:
+        computed, tail_checkpoint_time = _replay_heatmap_columns(
+            db,
+            symbol,
+            interval,
+            weights,
+            price_bin_size,
+            tail_checkpoint,
+            start_dt,
+            end_dt,
+            covered_end,
+        )
+        tail = computed.columns
+        tail = tail.reindex(tail.timestamp[tail.timestamp > np.datetime64(covered_end, "us")])
+
+    logger.debug(
+        f"Serving {symbol} {interval} from {len(stored)} pre-computed snapshots "
+        f"({len(head)} head and {len(tail)} tail snapshots computed)"
+    )
+    if len(head) or len(tail):
+        stored = SnapshotColumns.concatenate([head, stored, tail])
+    meta = _columns_metadata(
+        stored,
+        symbol,
+        start_dt,
+        end_dt,
+        interval,
+        checkpoint_time=tail_checkpoint_time or head_checkpoint_time,
+        source="stitched" if len(head) or len(tail) else "precomputed",
+    )
+    return ColumnarTimeseries(stored, meta)
+
+
+@app.get(
+    "/liquidations/heatmap-timeseries",
+    response_model=HeatmapTimeseriesResponse
+    | HeatmapTimeseriesDeltaResponse
+    | HeatmapTimeseriesColumnarResponse,
+    responses={200: {"content": {ARROW_STREAM_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}}},
+)
+async def get_heatmap_timeseries(
+    request: Request,
     symbol: str = Query(
         ...,
         description="Trading pair symbol (e.g., BTCUSDT)",
@@ -1525,6 +2873,42 @@ async def get_heatmap_timeseries(
         description="Comma-separated list of exchanges to include (e.g., 'binance,hyperliquid'). "
         "Default: all exchanges. T059-T061",
     ),
+    encoding: Literal["full", "delta"] = Query(
+        "full",
+        description="'full' returns every level of every snapshot. 'delta' returns a keyframe "
+        "followed by frames holding only the levels that changed, plus a scale factor.",
+    ),
+    keyframe_interval: int = Query(
+        DEFAULT_KEYFRAME_INTERVAL,
+        ge=1,
+        le=10000,
+        description="Frames between full keyframes (encoding=delta only)",
+    ),
+    precision: Literal["float64", "decimal"] = Query(
+        "float64",
+        description="'float64' (fast, default) or 'decimal' (reference engine for audits, "
+        "slower; not combinable with encoding=delta)",
+    ),
+    compaction_quantum: Optional[float] = Query(
+        None,
+        gt=0,
+        le=10000,
+        description="Merge same-side, same-leverage positions whose liquidation prices fall "
+        "in the same tick of this size (USD) into one entry. Bounds engine memory on long "
+        "windows; each merged level may move by up to one tick. Requires precision=float64",
+    ),
+    response_format: Literal["json", "columnar", "arrow", "msgpack"] = Query(
+        "json",
+        alias="format",
+        description="'json' (one object per level), 'columnar' (JSON price axis, timestamp "
+        "axis and density matrices), 'arrow' (Arrow IPC stream) or 'msgpack'. "
+        "Non-json formats require encoding=full",
+    ),
+    layout: Literal["dense", "sparse"] = Query(
+        "dense",
+        description="Density matrix layout for columnar, arrow and msgpack formats: "
+        "'dense' (snapshots x prices) or 'sparse' (CSR offsets and price indices)",
+    ),
 ):
     """Get time-evolving liquidation heatmap.
 
@@ -1536,7 +2920,36 @@ async def get_heatmap_timeseries(
     The optimal klines interval is auto-selected for each window.
 
     **CACHING**: Responses are cached for 5 minutes (configurable via LH_CACHE_TTL).
-    Use GET /cache/stats to monitor cache performance.
+    Concurrent requests for the same uncached heatmap share one computation, and
+    an expired response keeps being served for LH_CACHE_STALE_SECONDS while a
+    single refresh runs. The cache stores the encoded JSON (plus a gzip copy for
+    large responses), which hits send as-is. Cache keys use the requested range
+    snapped to the interval grid and clamped to the latest candle, so the
+    response covers every candle overlapping the range and requests for the
+    same candles share an entry. Use GET /cache/stats to monitor cache
+    performance.
+
+    **ROLLING WINDOWS**: For windows that end now (no `end_time`), the engine
+    state behind the latest response is kept per window (LH_ROLLING_WINDOWS).
+    When new candles arrive, the next request replays only the candles since
+    the previous response's last one and drops the snapshots before the new
+    start. A moving window start (e.g. `time_window=7d`) needs persisted engine
+    checkpoints; without them only the end is extended.
+
+    **CONDITIONAL GET**: Responses carry an ETag derived from the query and the
+    latest ingested candle and open interest row. A request whose If-None-Match
+    still matches gets 304 Not Modified without running the engine.
+
+    **DELTA ENCODING**: With `encoding=delta` the response holds a keyframe every
+    `keyframe_interval` snapshots and, in between, only the price levels that
+    changed. Rebuild a snapshot by multiplying the previous levels by `scale`
+    and overwriting the listed levels; a level with zero density is removed.
+
+    **FORMATS**: `format=columnar` returns one sorted price axis, the timestamp
+    axis and long/short density matrices (`layout=dense` or CSR `layout=sparse`)
+    instead of one object per level. `format=arrow` sends the same data as an
+    Arrow IPC stream and `format=msgpack` as MessagePack; both need the optional
+    `formats` extra.
 
     Args:
         symbol: Trading pair (e.g., BTCUSDT)
@@ -1547,15 +2960,19 @@ async def get_heatmap_timeseries(
         price_bin_size: Price bucket size in USD for aggregation
         leverage_weights: Custom leverage distribution weights
         exchanges: Comma-separated list of exchanges to filter (default: all)
+        encoding: "full" snapshots or "delta" frames
+        keyframe_interval: Frames between keyframes when encoding is "delta"
+        precision: "float64" engine or "decimal" reference engine
+        compaction_quantum: Optional price tick for position compaction
+        response_format: "json", "columnar", "arrow" or "msgpack"
+        layout: "dense" or "sparse" density matrices for non-json formats
 
     Returns:
-        HeatmapTimeseriesResponse with snapshots and metadata
+        HeatmapTimeseriesResponse with snapshots and metadata,
+        HeatmapTimeseriesDeltaResponse when encoding is "delta", or
+        HeatmapTimeseriesColumnarResponse (or its Arrow/MessagePack encoding)
+        for the other formats
     """
-    from dataclasses import dataclass
-    from datetime import datetime, timedelta
-
-    from ..models.time_evolving_heatmap import calculate_time_evolving_heatmap
-
     # T059-T061: Validate and parse exchanges parameter
     try:
         validated_exchanges = validate_exchanges(exchanges)
@@ -1575,17 +2992,184 @@ async def get_heatmap_timeseries(
         # Default to 15m if neither time_window nor interval provided
         effective_interval = "15m"
 
-    # T059: Check cache first (cache-first query strategy)
-    # Use effective values for cache key
+    # Raw start as the pre-canonical cache keys had it (reported as the cache alias)
     cache_key_start = effective_start_time if not time_window else f"tw:{time_window}"
-    cached_response = _heatmap_cache.get(
-        symbol, cache_key_start, end_time, effective_interval, price_bin_size, leverage_weights
-    )
-    if cached_response is not None:
-        logger.debug(f"Cache HIT for {symbol} heatmap-timeseries")
-        return cached_response
+    if encoding == "delta" and precision == "decimal":
+        raise HTTPException(status_code=400, detail="encoding=delta requires precision=float64")
+    cache_variant = f"delta:{keyframe_interval}" if encoding == "delta" else ""
+    if precision == "decimal":
+        if compaction_quantum is not None:
+            raise HTTPException(
+                status_code=400, detail="compaction_quantum requires precision=float64"
+            )
+        cache_variant = "decimal"
+    if compaction_quantum is not None:
+        cache_variant = f"{cache_variant}|q:{compaction_quantum}"
+    if response_format != "json":
+        if encoding == "delta":
+            raise HTTPException(
+                status_code=400, detail=f"format={response_format} requires encoding=full"
+            )
+        dependency = FORMAT_DEPENDENCIES.get(response_format)
+        if dependency is not None and importlib.util.find_spec(dependency) is None:
+            raise HTTPException(
+                status_code=501,
+                detail=f"format={response_format} requires the optional '{dependency}' package",
+            )
+        cache_variant = f"{cache_variant}|fmt:{response_format}:{layout}"
+
+    # Blocking DuckDB reads and engine replay; runs on a compute pool worker
+    def build(db: DuckDBService, start_dt: datetime, end_dt: datetime, weights):
+        try:
+            # Serve from snapshots persisted by scripts/precompute_heatmap.py when
+            # they cover the request (plain float64 snapshots only)
+            if encoding == "full" and precision == "float64" and compaction_quantum is None:
+                stitched = _stitch_precomputed_columns(
+                    db, symbol, effective_interval, weights, price_bin_size, start_dt, end_dt
+                )
+                if stitched is not None:
+                    return stitched
+
+            # Windows ending now extend the engine state of the previous response
+            if rolling_key is not None:
+                return _compute_rolling_timeseries(
+                    db,
+                    rolling_key,
+                    symbol,
+                    effective_interval,
+                    weights,
+                    price_bin_size,
+                    start_dt,
+                    end_dt,
+                    compaction_quantum,
+                )
+
+            # Resume from the nearest engine checkpoint at or before the window start
+            # (see scripts/build_engine_checkpoints.py). Positions opened before the
+            # window are kept and only the candles after the checkpoint are replayed.
+            # The decimal reference engine always replays from the window start.
+            checkpoint = None
+            if precision == "float64":
+                checkpoint = db.load_book_checkpoint(
+                    symbol, effective_interval, leverage_weights_key(weights), start_dt
+                )
+            replay_start = checkpoint.timestamp if checkpoint is not None else start_dt
+            if checkpoint is not None:
+                logger.debug(
+                    f"Resuming {symbol} {effective_interval} from checkpoint "
+                    f"{checkpoint.timestamp} ({len(checkpoint)} positions)"
+                )
+
+            # Columnar candles with OI deltas joined in SQL
+            inputs = db.load_heatmap_inputs(symbol, effective_interval, replay_start, end_dt)
+
+            if inputs.index_at(start_dt) == len(inputs):
+                empty_meta = HeatmapTimeseriesMetadata(
+                    symbol=symbol,
+                    start_time=start_dt.isoformat(),
+                    end_time=end_dt.isoformat(),
+                    interval=effective_interval,
+                    total_snapshots=0,
+                    price_range={"min": 0, "max": 0},
+                    total_long_volume=0.0,
+                    total_short_volume=0.0,
+                    total_consumed=0,
+                )
+                if encoding == "delta":
+                    return HeatmapTimeseriesDeltaResponse(
+                        keyframe_interval=keyframe_interval, data=[], meta=empty_meta
+                    )
+                return HeatmapTimeseriesResponse(data=[], meta=empty_meta)
+
+            checkpoint_time = checkpoint.timestamp.isoformat() if checkpoint is not None else None
+            quantum = Decimal(str(compaction_quantum)) if compaction_quantum is not None else None
+
+            if encoding == "delta":
+                # Delta encoding: the engine emits only changed levels between keyframes
+                frames = _engine_pool.call(
+                    replay_heatmap_frames,
+                    candles=inputs,
+                    oi_deltas=None,
+                    symbol=symbol,
+                    leverage_weights=weights,
+                    price_bucket_size=Decimal(str(price_bin_size)),
+                    keyframe_interval=keyframe_interval,
+                    checkpoint=checkpoint,
+                    emit_from=start_dt,
+                    compaction_quantum=quantum,
+                )
+
+                # Convert to response format; zero-density levels are kept: they
+                # mark removed levels
+                columns = frames.columns
+                response_data = [
+                    HeatmapFrameResponse(
+                        timestamp=timestamp.isoformat(),
+                        keyframe=keyframe,
+                        scale=scale,
+                        levels=levels,
+                        positions_created=created,
+                        positions_consumed=consumed,
+                    )
+                    for timestamp, keyframe, scale, levels, created, consumed in zip(
+                        columns.timestamps(),
+                        frames.keyframe.tolist(),
+                        frames.scale.tolist(),
+                        _column_levels(columns),
+                        columns.positions_created.tolist(),
+                        columns.positions_consumed.tolist(),
+                    )
+                ]
+                all_prices = columns.price[(columns.long_density + columns.short_density) > 0]
+
+                meta = HeatmapTimeseriesMetadata(
+                    symbol=symbol,
+                    start_time=start_dt.isoformat(),
+                    end_time=end_dt.isoformat(),
+                    interval=effective_interval,
+                    total_snapshots=len(response_data),
+                    price_range={
+                        "min": float(all_prices.min()) if len(all_prices) else 0,
+                        "max": float(all_prices.max()) if len(all_prices) else 0,
+                    },
+                    total_long_volume=sum(frames.total_long_volume.tolist()),
+                    total_short_volume=sum(frames.total_short_volume.tolist()),
+                    total_consumed=int(columns.positions_consumed.sum()),
+                    checkpoint_time=checkpoint_time,
+                )
+                response = HeatmapTimeseriesDeltaResponse(
+                    keyframe_interval=keyframe_interval, data=response_data, meta=meta
+                )
+            else:
+                # Calculate time-evolving heatmap
+                result = _engine_pool.call(
+                    replay_heatmap,
+                    candles=inputs,
+                    oi_deltas=None,
+                    symbol=symbol,
+                    leverage_weights=weights,
+                    price_bucket_size=Decimal(str(price_bin_size)),
+                    precision=precision,
+                    checkpoint=checkpoint,
+                    emit_from=start_dt,
+                    compaction_quantum=quantum,
+                )
+                response = _engine_timeseries(
+                    result, symbol, start_dt, end_dt, effective_interval, checkpoint_time
+                )
+
+            return response
+
+        except Exception as e:
+            logger.error(f"Error calculating heatmap timeseries: {e}")
+            raise HTTPException(status_code=500, detail=f"Calculation error: {e}")
+
+    # Serialize on the worker too, in the requested format
+    def encode(db: DuckDBService, *args: Any) -> EncodedResponse:
+        return _encode_heatmap_timeseries(build(db, *args), response_format, layout)
 
-    logger.debug(f"Cache MISS for {symbol} heatmap-timeseries - computing...")
+    async def compute():
+        return await _compute_pool.run_query(encode, start_dt, end_dt, weights)
 
     # Validate symbol against whitelist
     if symbol not in SUPPORTED_SYMBOLS:
@@ -1594,25 +3178,7 @@ async def get_heatmap_timeseries(
             detail=f"Invalid symbol '{symbol}'. Supported: {sorted(SUPPORTED_SYMBOLS)}",
         )
 
-    # Parse time range
-    try:
-        if end_time:
-            end_dt = datetime.fromisoformat(end_time.replace("Z", "+00:00")).replace(tzinfo=None)
-        else:
-            end_dt = datetime.now()
-
-        if time_window:
-            # Calculate start_time from time_window hours
-            config = TIME_WINDOW_CONFIG[time_window]
-            start_dt = end_dt - timedelta(hours=config["hours"])
-        elif effective_start_time:
-            start_dt = datetime.fromisoformat(effective_start_time.replace("Z", "+00:00")).replace(
-                tzinfo=None
-            )
-        else:
-            start_dt = end_dt - timedelta(days=7)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid time format: {e}")
+    start_dt, end_dt = _parse_heatmap_time_range(time_window, effective_start_time, end_time)
 
     # Parse leverage weights
     try:
@@ -1620,236 +3186,354 @@ async def get_heatmap_timeseries(
     except LeverageWeightsParseError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    # Mock candle class for algorithm
-    @dataclass
-    class Candle:
-        open_time: datetime
-        open: Decimal
-        high: Decimal
-        low: Decimal
-        close: Decimal
-        volume: Decimal
+    # Full float64 windows that end now keep their engine state between requests
+    rolling_key = None
+    if end_time is None and encoding == "full" and precision == "float64":
+        rolling_key = (
+            symbol,
+            cache_key_start,
+            effective_interval,
+            price_bin_size,
+            leverage_weights_key(weights),
+            compaction_quantum,
+        )
 
-    db = DuckDBService(read_only=True)
+    # Conditional GET: nothing new was ingested since the client's copy. The
+    # watermark is also part of the cache key, so a cached body always matches
+    # the ETag it is sent with.
+    etag = None
+    watermark = await _data_watermark(symbol, effective_interval)
+    if watermark is not None:
+        etag = _make_etag(request, watermark, None if end_time else effective_interval)
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=_validator_headers(etag))
+        cache_variant = f"{cache_variant}|wm:{'|'.join(map(str, watermark))}"
+
+    # Canonical range: requests covering the same candles share a cache key
+    start_dt, end_dt = _snap_heatmap_range(
+        start_dt, end_dt, effective_interval, watermark[0] if watermark else None
+    )
 
-    try:
-        # Query candles - use appropriate base table and aggregate for larger intervals
-        # Extended to support new time windows (30m, 2h, 8h, 12h, 1d)
-        interval_agg_map = {
-            "5m": 5,  # Direct from 5m table
-            "15m": 15,  # Direct from 15m table
-            "30m": 30,  # Aggregate from 5m (6 candles)
-            "1h": 60,  # Aggregate from 15m (4 candles)
-            "2h": 120,  # Aggregate from 15m (8 candles)
-            "4h": 240,  # Aggregate from 15m (16 candles)
-            "8h": 480,  # Aggregate from 15m (32 candles)
-            "12h": 720,  # Aggregate from 15m (48 candles)
-            "1d": 1440,  # Aggregate from 15m (96 candles)
-        }
-        agg_minutes = interval_agg_map.get(effective_interval, 15)
+    # T059: Cache-first; concurrent misses for the same key share one computation
+    # and expired entries are served while a single refresh runs. The cache holds
+    # the encoded body, which is sent without re-validating the response model.
+    encoded = await _heatmap_cache.get_or_compute(
+        symbol,
+        start_dt.isoformat(),
+        end_dt.isoformat(),
+        effective_interval,
+        price_bin_size,
+        leverage_weights_key(weights),
+        compute,
+        cache_variant,
+        alias=f"{cache_key_start}|{end_time}|{leverage_weights}",
+    )
+    response = encoded.to_response(request)
+    if etag is not None:
+        response.headers.update(_validator_headers(etag))
+    return response
 
-        if agg_minutes <= 15:
-            # Direct query for 5m or 15m
-            table_name = f"klines_{effective_interval}_history"
-            candle_query = f"""
-            SELECT
-                open_time,
-                CAST(open AS DECIMAL(18,8)) as open,
-                CAST(high AS DECIMAL(18,8)) as high,
-                CAST(low AS DECIMAL(18,8)) as low,
-                CAST(close AS DECIMAL(18,8)) as close,
-                CAST(volume AS DECIMAL(18,8)) as volume
-            FROM {table_name}
-            WHERE symbol = ? AND open_time >= ? AND open_time <= ?
-            ORDER BY open_time
-            """
-            candles_df = db.conn.execute(candle_query, [symbol, start_dt, end_dt]).df()
-        else:
-            # Aggregate candles into larger intervals
-            # 30m uses 5m base table, all others use 15m
-            if effective_interval == "30m":
-                base_table = "klines_5m_history"
-            else:
-                base_table = "klines_15m_history"
-
-            candle_query = f"""
-            WITH aggregated AS (
-                SELECT
-                    time_bucket(INTERVAL '{agg_minutes} minutes', open_time) as bucket,
-                    FIRST(open ORDER BY open_time) as open,
-                    MAX(high) as high,
-                    MIN(low) as low,
-                    LAST(close ORDER BY open_time) as close,
-                    SUM(volume) as volume
-                FROM {base_table}
-                WHERE symbol = ? AND open_time >= ? AND open_time <= ?
-                GROUP BY bucket
-            )
-            SELECT
-                bucket as open_time,
-                CAST(open AS DECIMAL(18,8)) as open,
-                CAST(high AS DECIMAL(18,8)) as high,
-                CAST(low AS DECIMAL(18,8)) as low,
-                CAST(close AS DECIMAL(18,8)) as close,
-                CAST(volume AS DECIMAL(18,8)) as volume
-            FROM aggregated
-            ORDER BY open_time
-            """
-            candles_df = db.conn.execute(candle_query, [symbol, start_dt, end_dt]).df()
 
-        if candles_df.empty:
-            return HeatmapTimeseriesResponse(
-                data=[],
-                meta=HeatmapTimeseriesMetadata(
-                    symbol=symbol,
-                    start_time=start_dt.isoformat(),
-                    end_time=end_dt.isoformat(),
-                    interval=effective_interval,
-                    total_snapshots=0,
-                    price_range={"min": 0, "max": 0},
-                    total_long_volume=0.0,
-                    total_short_volume=0.0,
-                    total_consumed=0,
-                ),
-            )
-
-        # Query OI data with delta calculation - OPTIMIZED: aggregate to interval
-        # This reduces O(n*m) matching to O(n) dict lookup
-        oi_query = f"""
-        WITH oi_bucketed AS (
-            SELECT
-                time_bucket(INTERVAL '{agg_minutes} minutes', timestamp) as bucket,
-                AVG(open_interest_value) as avg_oi
-            FROM open_interest_history
-            WHERE symbol = ? AND timestamp >= ? AND timestamp <= ?
-            GROUP BY bucket
-        )
-        SELECT
-            bucket,
-            avg_oi,
-            avg_oi - LAG(avg_oi) OVER (ORDER BY bucket) as oi_delta
-        FROM oi_bucketed
-        ORDER BY bucket
-        """
+@app.get(
+    "/liquidations/heatmap-timeseries/scenarios",
+    response_model=HeatmapScenariosResponse,
+)
+async def get_heatmap_scenarios(
+    request: Request,
+    symbol: str = Query(
+        ...,
+        description="Trading pair symbol (e.g., BTCUSDT)",
+        pattern="^[A-Z]{6,12}$",
+        examples=["BTCUSDT", "ETHUSDT"],
+    ),
+    scenarios: list[str] = Query(
+        ...,
+        description="Leverage weights per scenario, repeated: "
+        "'scenarios=5:15,10:30,25:25,50:20,100:10&scenarios=10:50,25:50'. "
+        "Use 'default' for the model's default distribution.",
+    ),
+    time_window: Optional[TimeWindow] = Query(
+        None,
+        description="Time window preset (auto-selects optimal klines interval). "
+        "Overrides start_time and interval if provided.",
+    ),
+    start_time: Optional[str] = Query(
+        None,
+        description="Start of time range (ISO 8601). Ignored if time_window is set.",
+    ),
+    end_time: Optional[str] = Query(
+        None,
+        description="End of time range (ISO 8601). Defaults to now.",
+    ),
+    interval: Optional[Literal["5m", "15m", "30m", "1h", "2h", "4h", "8h", "12h", "1d"]] = Query(
+        None,
+        description="Time interval for snapshots. Auto-selected if time_window is used.",
+    ),
+    price_bin_size: float = Query(
+        100,
+        ge=1,
+        le=1000,
+        description="Price bucket size in USD",
+    ),
+):
+    """Get the time-evolving heatmap for several leverage distributions at once.
 
-        oi_df = db.conn.execute(oi_query, [symbol, start_dt, end_dt]).df()
-
-        # Convert to candle objects
-        candles = [
-            Candle(
-                open_time=row["open_time"].to_pydatetime()
-                if hasattr(row["open_time"], "to_pydatetime")
-                else row["open_time"],
-                open=Decimal(str(row["open"])),
-                high=Decimal(str(row["high"])),
-                low=Decimal(str(row["low"])),
-                close=Decimal(str(row["close"])),
-                volume=Decimal(str(row["volume"])),
-            )
-            for _, row in candles_df.iterrows()
-        ]
+    Equivalent to one /liquidations/heatmap-timeseries request per scenario
+    (float64, full encoding), but candles and open interest are loaded once and
+    the engine runs a single pass carrying one volume column per scenario.
 
-        # Match OI deltas to candles - OPTIMIZED: O(1) dict lookup
-        # Build lookup dict from pre-aggregated OI buckets
-        oi_lookup: dict[datetime, Decimal] = {}
-        if not oi_df.empty:
-            for _, row in oi_df.iterrows():
-                bucket = row["bucket"]
-                if hasattr(bucket, "to_pydatetime"):
-                    bucket = bucket.to_pydatetime()
-                delta_val = row["oi_delta"]
-                oi_lookup[bucket] = (
-                    Decimal(str(delta_val))
-                    if delta_val and delta_val == delta_val
-                    else Decimal("0")
-                )
+    Engine checkpoints are used when every scenario has one at the same
+    boundary before the window; otherwise all scenarios replay from the
+    window start.
 
-        oi_deltas = []
-        for candle in candles:
-            # Direct O(1) lookup - buckets should match exactly
-            delta = oi_lookup.get(candle.open_time, Decimal("0"))
-            oi_deltas.append(delta)
+    Args:
+        symbol: Trading pair (e.g., BTCUSDT)
+        scenarios: Leverage distributions, same format as leverage_weights
+        time_window: Preset time window (48h, 3d, 7d, 14d, 30d, 60d, 90d, 180d, 1y)
+        start_time: Start of time range (ISO 8601, ignored if time_window set)
+        end_time: End of time range (ISO 8601, defaults to now)
+        interval: Time interval for snapshots (auto-selected if time_window used)
+        price_bin_size: Price bucket size in USD for aggregation
 
-        # Calculate time-evolving heatmap
-        snapshots = calculate_time_evolving_heatmap(
-            candles=candles,
-            oi_deltas=oi_deltas,
-            symbol=symbol,
-            leverage_weights=weights,
-            price_bucket_size=Decimal(str(price_bin_size)),
+    Returns:
+        HeatmapScenariosResponse with one timeseries per scenario, in request order
+    """
+    if len(scenarios) > MAX_WEIGHT_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many scenarios ({len(scenarios)}). Maximum: {MAX_WEIGHT_SCENARIOS}",
         )
 
-        # Convert to response format
-        response_data = []
-        total_consumed = 0
-        total_long = 0.0
-        total_short = 0.0
-        all_prices = []
-
-        for snapshot in snapshots:
-            levels = []
-            for cell in snapshot.cells.values():
-                if cell.total_density > 0:
-                    levels.append(
-                        HeatmapLevel(
-                            price=float(cell.price_bucket),
-                            long_density=float(cell.long_density),
-                            short_density=float(cell.short_density),
-                        )
+    effective_interval = interval or "15m"
+    if time_window:
+        effective_interval = TIME_WINDOW_CONFIG[time_window]["klines_interval"]
+
+    # Raw key parts as the pre-canonical cache keys had them (the cache alias)
+    cache_key_start = start_time if not time_window else f"tw:{time_window}"
+    cache_key_weights = "|".join(scenarios)
+
+    @_serialize_result
+    def build(
+        db: DuckDBService,
+        start_dt: datetime,
+        end_dt: datetime,
+        weight_scenarios: list,
+        weights_keys: list[str],
+    ):
+        try:
+            # Checkpoints are only usable if all scenarios share a boundary
+            checkpoints = [
+                db.load_book_checkpoint(symbol, effective_interval, key, start_dt)
+                for key in weights_keys
+            ]
+            if all(checkpoint is not None for checkpoint in checkpoints):
+                common = min(checkpoint.timestamp for checkpoint in checkpoints)
+                checkpoints = [
+                    checkpoint
+                    if checkpoint.timestamp == common
+                    else db.load_book_checkpoint(symbol, effective_interval, key, common)
+                    for key, checkpoint in zip(weights_keys, checkpoints)
+                ]
+            if not all(
+                checkpoint is not None and checkpoint.timestamp == checkpoints[0].timestamp
+                for checkpoint in checkpoints
+            ):
+                checkpoints = None
+            replay_start = checkpoints[0].timestamp if checkpoints else start_dt
+
+            inputs = db.load_heatmap_inputs(symbol, effective_interval, replay_start, end_dt)
+
+            results = _engine_pool.call(
+                replay_heatmap_scenarios,
+                candles=inputs,
+                oi_deltas=None,
+                symbol=symbol,
+                weight_scenarios=weight_scenarios,
+                price_bucket_size=Decimal(str(price_bin_size)),
+                checkpoints=checkpoints,
+                emit_from=start_dt,
+            )
+            checkpoint_time = checkpoints[0].timestamp.isoformat() if checkpoints else None
+
+            scenario_results = []
+            for key, result in zip(weights_keys, results):
+                timeseries = _engine_timeseries(
+                    result, symbol, start_dt, end_dt, effective_interval, checkpoint_time
+                ).to_response()
+                scenario_results.append(
+                    HeatmapScenarioResult(
+                        leverage_weights=key, data=timeseries.data, meta=timeseries.meta
                     )
-                    all_prices.append(float(cell.price_bucket))
-
-            response_data.append(
-                HeatmapSnapshotResponse(
-                    timestamp=snapshot.timestamp.isoformat(),
-                    levels=sorted(levels, key=lambda x: x.price),
-                    positions_created=snapshot.positions_created,
-                    positions_consumed=snapshot.positions_consumed,
                 )
-            )
+            return HeatmapScenariosResponse(scenarios=scenario_results)
 
-            total_consumed += snapshot.positions_consumed
-            total_long += float(snapshot.total_long_volume)
-            total_short += float(snapshot.total_short_volume)
+        except Exception as e:
+            logger.error(f"Error calculating heatmap scenarios: {e}")
+            raise HTTPException(status_code=500, detail=f"Calculation error: {e}")
 
-        price_range = {
-            "min": min(all_prices) if all_prices else 0,
-            "max": max(all_prices) if all_prices else 0,
-        }
+    async def compute():
+        return await _compute_pool.run_query(
+            build, start_dt, end_dt, weight_scenarios, weights_keys
+        )
 
-        response = HeatmapTimeseriesResponse(
-            data=response_data,
-            meta=HeatmapTimeseriesMetadata(
-                symbol=symbol,
-                start_time=start_dt.isoformat(),
-                end_time=end_dt.isoformat(),
-                interval=effective_interval,
-                total_snapshots=len(snapshots),
-                price_range=price_range,
-                total_long_volume=total_long,
-                total_short_volume=total_short,
-                total_consumed=total_consumed,
-            ),
+    if symbol not in SUPPORTED_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid symbol '{symbol}'. Supported: {sorted(SUPPORTED_SYMBOLS)}",
         )
 
-        # T059: Cache the response for future requests
-        # Use same cache key as lookup (with time_window prefix if applicable)
-        _heatmap_cache.set(
-            symbol,
-            cache_key_start,
-            end_time,
-            effective_interval,
-            price_bin_size,
-            leverage_weights,
-            response,
+    start_dt, end_dt = _parse_heatmap_time_range(time_window, start_time, end_time)
+
+    try:
+        weight_scenarios = [
+            None if scenario == "default" else parse_leverage_weights(scenario)
+            for scenario in scenarios
+        ]
+    except LeverageWeightsParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    weights_keys = [leverage_weights_key(weights) for weights in weight_scenarios]
+
+    # Canonical range and weights, as for heatmap-timeseries
+    cache_variant = "scenarios"
+    watermark = await _data_watermark(symbol, effective_interval)
+    if watermark is not None:
+        cache_variant = f"{cache_variant}|wm:{'|'.join(map(str, watermark))}"
+    start_dt, end_dt = _snap_heatmap_range(
+        start_dt, end_dt, effective_interval, watermark[0] if watermark else None
+    )
+
+    encoded = await _heatmap_cache.get_or_compute(
+        symbol,
+        start_dt.isoformat(),
+        end_dt.isoformat(),
+        effective_interval,
+        price_bin_size,
+        "|".join(weights_keys),
+        compute,
+        cache_variant,
+        alias=f"{cache_key_start}|{end_time}|{cache_key_weights}",
+    )
+    return encoded.to_response(request)
+
+
+# =============================================================================
+# HEATMAP STREAMING
+# =============================================================================
+
+# One engine per streamed (symbol, interval, price_bin_size), shared by its subscribers
+_heatmap_streams = HeatmapStreamHub(
+    _compute_pool.run_query,
+    poll_seconds=float(os.getenv("LH_STREAM_POLL_SECONDS", "15")),
+    warmup_candles=int(os.getenv("LH_STREAM_WARMUP_CANDLES", str(DEFAULT_KEYFRAME_INTERVAL))),
+    max_queue=int(os.getenv("LH_STREAM_QUEUE_SIZE", "32")),
+)
+
+# Idle streams send a keep-alive this often, so proxies do not close them
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+StreamInterval = Literal["5m", "15m", "30m", "1h", "2h", "4h", "8h", "12h", "1d"]
+
+
+@app.get(
+    "/liquidations/heatmap-stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_heatmap(
+    symbol: str = Query(
+        ...,
+        description="Trading pair symbol (e.g., BTCUSDT)",
+        pattern="^[A-Z]{6,12}$",
+    ),
+    interval: StreamInterval = Query("15m", description="Candle interval of the heatmap"),
+    price_bin_size: float = Query(100, ge=1, le=1000, description="Price bucket size in USD"),
+):
+    """Stream heatmap frames as server-sent events.
+
+    The first event (`keyframe`) holds every level of the current heatmap.
+    Each time a candle closes, a `delta` event follows with only the levels
+    that changed, in the `encoding=delta` frame format: multiply the previous
+    levels by `scale`, then overwrite the listed levels (zero density removes
+    a level). A client that falls too far behind receives a new `keyframe`
+    instead of the frames it missed.
+
+    All subscribers of a symbol, interval and bin size share one engine,
+    advanced once per closed candle. Idle streams send a comment line every
+    15 seconds. Use GET /stream/stats to monitor streams.
+    """
+    if symbol not in SUPPORTED_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid symbol '{symbol}'. Supported: {sorted(SUPPORTED_SYMBOLS)}",
         )
-        logger.debug(f"Cached response for {symbol} heatmap-timeseries")
 
-        return response
+    async def events():
+        subscription = _heatmap_streams.subscribe(symbol, interval, price_bin_size)
+        try:
+            while True:
+                message = await subscription.next(STREAM_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield b": keep-alive\n\n"
+                    continue
+                event, data = message
+                yield b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+        finally:
+            _heatmap_streams.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    except Exception as e:
-        logger.error(f"Error calculating heatmap timeseries: {e}")
-        raise HTTPException(status_code=500, detail=f"Calculation error: {e}")
 
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Return once the client disconnects; messages from the client are ignored."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@app.websocket("/liquidations/heatmap-stream/ws")
+async def stream_heatmap_ws(
+    websocket: WebSocket,
+    symbol: str = Query(..., pattern="^[A-Z]{6,12}$"),
+    interval: StreamInterval = Query("15m"),
+    price_bin_size: float = Query(100, ge=1, le=1000),
+):
+    """Stream heatmap frames over a WebSocket.
+
+    Same frames as GET /liquidations/heatmap-stream, one JSON text message
+    each; the `keyframe` field tells keyframes from deltas. Unsupported
+    symbols are refused with close code 1008.
+    """
+    if symbol not in SUPPORTED_SYMBOLS:
+        await websocket.close(code=1008, reason=f"Invalid symbol '{symbol}'")
+        return
+
+    await websocket.accept()
+    subscription = _heatmap_streams.subscribe(symbol, interval, price_bin_size)
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            receive = asyncio.create_task(subscription.next())
+            await asyncio.wait({receive, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                receive.cancel()
+                break
+            await websocket.send_text(receive.result()[1].decode())
     finally:
-        db.close()
+        disconnected.cancel()
+        _heatmap_streams.unsubscribe(subscription)
+
+
+@app.get("/stream/stats")
+async def get_stream_stats():
+    """Get heatmap streaming statistics.
+
+    Returns:
+        dict: Active topics and subscribers, engine advances, frames published
+        and messages delivered
+    """
+    return _heatmap_streams.get_stats()
@@ -1,21 +1,44 @@
 """DuckDB service for querying Open Interest and market data."""
 
-import json
 import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
 from decimal import Decimal
 from pathlib import Path
-from typing import Tuple
-from urllib.request import urlopen
+from typing import Iterator, Tuple
 
 import duckdb
+import numpy as np
 
 from .csv_loader import load_csv_glob, load_funding_rate_csv
+from .price_cache import get_price_cache
 
 logger = logging.getLogger(__name__)
 
+# Candle interval -> minutes per heatmap candle. 5m and 15m are read directly,
+# 30m is aggregated from 5m and everything larger from 15m.
+HEATMAP_INTERVAL_MINUTES = {
+    "5m": 5,
+    "15m": 15,
+    "30m": 30,
+    "1h": 60,
+    "2h": 120,
+    "4h": 240,
+    "8h": 480,
+    "12h": 720,
+    "1d": 1440,
+}
+
 # Lock file to prevent API from opening DB during ingestion
 INGESTION_LOCK_FILE = Path("/tmp/duckdb-ingestion.lock")
 
+# Cursors a DuckDBService keeps for concurrent thread_view() queries, and how
+# long a checkout waits for one before giving up
+CURSOR_POOL_SIZE = int(os.getenv("LH_DB_POOL_SIZE", "8"))
+CURSOR_POOL_TIMEOUT = float(os.getenv("LH_DB_POOL_TIMEOUT", "30"))
+
 
 class IngestionLockError(Exception):
     """Raised when trying to connect while ingestion is in progress."""
@@ -23,27 +46,8 @@ class IngestionLockError(Exception):
     pass
 
 
-def _fetch_binance_price(symbol: str, timeout: int = 5) -> Decimal:
-    """Fetch current price from Binance API.
-
-    Args:
-        symbol: Trading pair (e.g., BTCUSDT)
-        timeout: Request timeout in seconds
-
-    Returns:
-        Current market price as Decimal
-
-    Raises:
-        Exception: If API call fails
-    """
-    url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-    with urlopen(url, timeout=timeout) as resp:
-        data = json.loads(resp.read().decode())
-        return Decimal(data["price"])
-
-
 # Symbol-aware fallback prices (approximate, used when all other sources fail)
-# These are order-of-magnitude estimates - actual price fetched from Binance when possible
+# These are order-of-magnitude estimates - the price cache serves real prices when it can
 _SYMBOL_FALLBACK_PRICES = {
     "BTCUSDT": Decimal("95000.00"),
     "ETHUSDT": Decimal("3500.00"),
@@ -59,7 +63,7 @@ _SYMBOL_FALLBACK_PRICES = {
 
 
 def _get_fallback_price(symbol: str) -> Decimal:
-    """Get fallback price for a symbol when API and DB both fail.
+    """Get fallback price for a symbol when the price cache has none.
 
     Args:
         symbol: Trading pair (e.g., BTCUSDT, ETHUSDT)
@@ -70,6 +74,253 @@ def _get_fallback_price(symbol: str) -> Decimal:
     return _SYMBOL_FALLBACK_PRICES.get(symbol, Decimal("1000.00"))
 
 
+def _grid_size(start_time, end_time, interval: str | None) -> int | None:
+    """Number of interval candle open times within [start_time, end_time].
+
+    Candles open on multiples of the interval since the epoch. Returns None
+    for an unknown (or unspecified) interval.
+    """
+    from datetime import datetime, timedelta
+
+    minutes = HEATMAP_INTERVAL_MINUTES.get(interval)
+    if minutes is None:
+        return None
+    step = timedelta(minutes=minutes)
+    epoch = datetime(1970, 1, 1, tzinfo=start_time.tzinfo)
+    first = epoch - ((epoch - start_time) // step) * step
+    return max((end_time - first) // step + 1, 0)
+
+
+def query_snapshot_columns(
+    conn: duckdb.DuckDBPyConnection,
+    symbol: str,
+    start_time,
+    end_time,
+    interval: str | None = None,
+    price_bin_size: float | None = None,
+    weights_key: str | None = None,
+):
+    """Read stored heatmap snapshots as SnapshotColumns.
+
+    The long and short rows of each price level are pivoted into one row in
+    SQL and read with fetchnumpy(), so no per-cell Python objects are built.
+    Used by DuckDBService.load_snapshot_columns() and by the backtester, which
+    holds its own connection.
+
+    Args:
+        conn: DuckDB connection (or cursor)
+        symbol: Trading pair (e.g., BTCUSDT)
+        start_time: Start of time range (datetime, inclusive)
+        end_time: End of time range (datetime, inclusive)
+        interval: Only snapshots computed with this interval (None for any)
+        price_bin_size: Only snapshots computed with this bin size (None for any)
+        weights_key: Only snapshots computed with these weights (None for any)
+
+    Returns:
+        SnapshotColumns in timestamp order (empty when nothing is stored)
+    """
+    from src.liquidationheatmap.models.time_evolving_heatmap import SnapshotColumns
+
+    levels = conn.execute(
+        """
+        SELECT
+            timestamp,
+            CAST(price_bucket AS DOUBLE) AS price,
+            COALESCE(MAX(CAST(active_volume AS DOUBLE)) FILTER (WHERE side = 'long'), 0)
+                AS long_density,
+            COALESCE(MAX(CAST(active_volume AS DOUBLE)) FILTER (WHERE side = 'short'), 0)
+                AS short_density,
+            COALESCE(MAX(positions_created), 0) AS positions_created,
+            COALESCE(MAX(positions_consumed), 0) AS positions_consumed
+        FROM liquidation_snapshots
+        WHERE symbol = ?
+          AND timestamp >= ?
+          AND timestamp <= ?
+          AND (CAST(? AS VARCHAR) IS NULL OR interval = ?)
+          AND (CAST(? AS DOUBLE) IS NULL OR price_bin_size = ?)
+          AND (CAST(? AS VARCHAR) IS NULL OR weights_key = ?)
+        GROUP BY timestamp, price_bucket
+        ORDER BY timestamp, price_bucket
+        """,
+        [
+            symbol,
+            start_time,
+            end_time,
+            interval,
+            interval,
+            price_bin_size,
+            price_bin_size,
+            weights_key,
+            weights_key,
+        ],
+    ).fetchnumpy()
+
+    return SnapshotColumns.from_levels(
+        levels["timestamp"],
+        levels["price"],
+        levels["long_density"],
+        levels["short_density"],
+        levels["positions_created"],
+        levels["positions_consumed"],
+    )
+
+
+class CursorPoolTimeoutError(Exception):
+    """Raised when no pooled cursor becomes free within the checkout timeout."""
+
+    pass
+
+
+class CursorPool:
+    """Bounded pool of cursors on one DuckDB connection.
+
+    A cursor is a separate connection to the same database instance, so each
+    thread that holds one can query in parallel with the others on DuckDB's
+    multi-threaded engine. Cursors are reused across checkouts instead of
+    being opened per query; at most `max_size` exist at once, and a checkout
+    beyond that waits for a checkin. An idle cursor is health-checked before
+    it is handed out and replaced if it no longer answers.
+
+    Tracks checkouts, how many had to wait and how long.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, max_size: int = CURSOR_POOL_SIZE):
+        """Initialize pool.
+
+        Args:
+            conn: Connection the cursors are opened on
+            max_size: Maximum number of cursors (checked out plus idle)
+        """
+        self.conn = conn
+        self.max_size = max(1, max_size)
+        self._idle: list[duckdb.DuckDBPyConnection] = []
+        self._size = 0
+        self._closed = False
+        self._available = threading.Condition(threading.Lock())
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._created = 0
+        self._replaced = 0
+
+    @staticmethod
+    def _is_healthy(cursor: duckdb.DuckDBPyConnection) -> bool:
+        """Check that a cursor still answers queries."""
+        try:
+            cursor.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _acquire(self, timeout: float) -> duckdb.DuckDBPyConnection | None:
+        """Take an idle cursor, or reserve a slot for a new one (returns None)."""
+        started = time.monotonic()
+        waited = False
+        with self._available:
+            while not self._closed and not self._idle and self._size >= self.max_size:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise CursorPoolTimeoutError(
+                        f"No DuckDB cursor free after {timeout:.1f}s ({self.max_size} in use)"
+                    )
+                waited = True
+                self._available.wait(remaining)
+            if self._closed:
+                raise duckdb.ConnectionException("Cursor pool is closed")
+
+            wait = time.monotonic() - started
+            self._checkouts += 1
+            self._waits += waited
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+            return None
+
+    def _release(self, cursor: duckdb.DuckDBPyConnection | None) -> None:
+        """Return a cursor to the pool, or free its slot if it is gone."""
+        with self._available:
+            if cursor is not None and not self._closed:
+                self._idle.append(cursor)
+            else:
+                self._size -= 1
+                if cursor is not None:
+                    cursor.close()
+            self._available.notify()
+
+    @contextmanager
+    def checkout(self, timeout: float = CURSOR_POOL_TIMEOUT) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Borrow a cursor for the duration of the block.
+
+        Args:
+            timeout: Seconds to wait for a free cursor
+
+        Yields:
+            Cursor owned by the caller until the block exits
+
+        Raises:
+            CursorPoolTimeoutError: If no cursor became free within `timeout`
+        """
+        cursor = self._acquire(timeout)
+        try:
+            if cursor is not None and not self._is_healthy(cursor):
+                logger.warning("Replacing unhealthy pooled DuckDB cursor")
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                cursor = None
+                with self._available:
+                    self._replaced += 1
+            if cursor is None:
+                cursor = self.conn.cursor()
+                with self._available:
+                    self._created += 1
+        except BaseException:
+            self._release(None)
+            raise
+
+        try:
+            yield cursor
+        finally:
+            self._release(cursor)
+
+    def close(self) -> None:
+        """Close idle cursors; checked-out cursors are closed on checkin."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._available.notify_all()
+        for cursor in idle:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        """Get pool statistics.
+
+        Returns:
+            dict with max_size, in_use, idle, checkouts, waits, cursors
+            created and replaced, and wait times in milliseconds
+        """
+        with self._available:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._size - len(self._idle),
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "avg_wait_ms": round(self._wait_total / max(1, self._checkouts) * 1000, 3),
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+                "created": self._created,
+                "replaced": self._replaced,
+            }
+
+
 class DuckDBService:
     """Service for managing DuckDB connection and queries.
 
@@ -82,6 +333,7 @@ class DuckDBService:
 
     Thread-safe: Uses lock for concurrent singleton creation.
     Health-checked: Validates connection on access, auto-reconnects if stale.
+    Pooled: thread_view() lends worker threads cursors from a bounded CursorPool.
     """
 
     # Singletons keyed by (resolved_path, read_only)
@@ -101,7 +353,7 @@ class DuckDBService:
             # Reset all
             for instance in cls._instances.values():
                 try:
-                    instance.conn.close()
+                    instance._close_connection()
                 except Exception:
                     pass
             cls._instances.clear()
@@ -111,7 +363,7 @@ class DuckDBService:
             keys_to_remove = [k for k in cls._instances if k[0] == resolved]
             for key in keys_to_remove:
                 try:
-                    cls._instances[key].conn.close()
+                    cls._instances[key]._close_connection()
                 except Exception:
                     pass
                 del cls._instances[key]
@@ -134,7 +386,7 @@ class DuckDBService:
                 try:
                     instance = cls._instances[key]
                     if hasattr(instance, "conn") and instance.conn is not None:
-                        instance.conn.close()
+                        instance._close_connection()
                         instance._initialized = False
                         closed_count += 1
                         logger.info(f"Closed DuckDB instance: {key}")
@@ -146,6 +398,23 @@ class DuckDBService:
         logger.info(f"Closed {closed_count} DuckDB instances total")
         return closed_count
 
+    @classmethod
+    def get_cursor_pool_stats(cls) -> dict:
+        """Get cursor pool statistics of every open singleton.
+
+        Returns:
+            dict of "<path> (read-only|read-write)" to CursorPool.get_stats()
+        """
+        with cls._lock:
+            instances = list(cls._instances.items())
+        return {
+            f"{path} ({'read-only' if read_only else 'read-write'})": (
+                instance.cursor_pool.get_stats()
+            )
+            for (path, read_only), instance in instances
+            if getattr(instance, "_initialized", False)
+        }
+
     @classmethod
     def is_ingestion_locked(cls) -> bool:
         """Check if ingestion lock is active.
@@ -213,7 +482,7 @@ class DuckDBService:
                 if instance._initialized and not instance._is_connection_healthy():
                     logger.warning(f"Stale connection detected for {db_path}, reconnecting...")
                     try:
-                        instance.conn.close()
+                        instance._close_connection()
                     except Exception:
                         pass
                     instance._initialized = False
@@ -228,6 +497,17 @@ class DuckDBService:
 
         return cls._instances[key]
 
+    def _close_connection(self) -> None:
+        """Close the pooled cursors, then the connection itself.
+
+        The pool is marked closed first, so cursors still checked out by worker
+        threads are discarded on checkin instead of returning to a dead pool.
+        """
+        pool = getattr(self, "cursor_pool", None)
+        if pool is not None:
+            pool.close()
+        self.conn.close()
+
     def _is_connection_healthy(self) -> bool:
         """Check if the DuckDB connection is still valid.
 
@@ -267,8 +547,29 @@ class DuckDBService:
             self.conn = duckdb.connect(str(self.db_path))
             logger.info(f"DuckDB singleton (read-write) connected: {self.db_path}")
 
+        # Cursors for queries running in worker threads (see thread_view)
+        self.cursor_pool = CursorPool(self.conn)
         self._initialized = True
 
+    def get_current_price(self, symbol: str = "BTCUSDT") -> Decimal:
+        """Get the current price of a symbol without calling the exchange.
+
+        Served from the background price cache (see price_cache), which falls
+        back to the latest kline close in this database, then to a
+        symbol-aware estimate.
+
+        Args:
+            symbol: Trading pair (default: BTCUSDT)
+
+        Returns:
+            Current price as Decimal
+        """
+        price = get_price_cache().get_price(symbol, self.conn)
+        if price is None:
+            logger.warning(f"No cached price or kline close for {symbol}, using estimate")
+            return _get_fallback_price(symbol)
+        return price
+
     def get_latest_open_interest(self, symbol: str = "BTCUSDT") -> Tuple[Decimal, Decimal]:
         """Get latest Open Interest and current price for symbol.
 
@@ -295,14 +596,7 @@ class DuckDBService:
 
             if result:
                 oi_value = Decimal(str(result[0]))
-                # Fetch real-time price from Binance API
-                try:
-                    current_price = _fetch_binance_price(symbol)
-                except Exception as e:
-                    logger.warning(f"Binance API price fetch failed for {symbol}: {e}")
-                    # Fallback: symbol-aware estimate when API fails
-                    current_price = _get_fallback_price(symbol)
-                return current_price, oi_value
+                return self.get_current_price(symbol), oi_value
         except duckdb.CatalogException as e:
             # Table doesn't exist, load from CSV
             logger.debug(f"open_interest_history table not found, loading from CSV: {e}")
@@ -311,11 +605,7 @@ class DuckDBService:
         # Guard: read-only connections cannot write, return fallback
         if self.read_only:
             logger.warning(f"No OI data for {symbol} and connection is read-only, using fallback")
-            try:
-                current_price = _fetch_binance_price(symbol)
-            except Exception:
-                current_price = _get_fallback_price(symbol)
-            return current_price, Decimal("0")
+            return self.get_current_price(symbol), Decimal("0")
 
         return self._load_and_cache_data(symbol)
 
@@ -334,23 +624,13 @@ class DuckDBService:
         try:
             df = load_csv_glob(csv_pattern, conn=self.conn)
         except FileNotFoundError:
-            # No data available, fetch real price and return defaults
+            # No data available, return the current price and a default OI
             logger.warning(f"No CSV data found for {symbol}, using defaults")
-            try:
-                current_price = _fetch_binance_price(symbol)
-            except Exception as e:
-                logger.warning(f"Binance price fetch also failed for {symbol}: {e}")
-                current_price = _get_fallback_price(symbol)
-            return current_price, Decimal("100000000.00")
+            return self.get_current_price(symbol), Decimal("100000000.00")
 
         if df.empty:
             logger.warning(f"Empty CSV data for {symbol}, using defaults")
-            try:
-                current_price = _fetch_binance_price(symbol)
-            except Exception as e:
-                logger.warning(f"Binance price fetch failed for empty CSV {symbol}: {e}")
-                current_price = _get_fallback_price(symbol)
-            return current_price, Decimal("100000000.00")
+            return self.get_current_price(symbol), Decimal("100000000.00")
 
         # Create table if not exists with UNIQUE constraint
         self.conn.execute("""
@@ -385,14 +665,7 @@ class DuckDBService:
         latest = df.iloc[-1]
         oi_value = Decimal(str(latest["open_interest_value"]))
 
-        # Fetch real-time price from Binance API
-        try:
-            current_price = _fetch_binance_price(symbol)
-        except Exception as e:
-            logger.warning(f"Binance API price fetch failed for {symbol}: {e}")
-            current_price = _get_fallback_price(symbol)
-
-        return current_price, oi_value
+        return self.get_current_price(symbol), oi_value
 
     def get_latest_funding_rate(self, symbol: str = "BTCUSDT") -> Decimal:
         """Get latest funding rate for symbol.
@@ -483,7 +756,7 @@ class DuckDBService:
             return
 
         if self.conn:
-            self.conn.close()
+            self._close_connection()
             self._initialized = False
             # Clear singleton reference from dict
             resolved_path = str(self.db_path.resolve())
@@ -491,6 +764,32 @@ class DuckDBService:
             if key in DuckDBService._instances:
                 del DuckDBService._instances[key]
 
+    @contextmanager
+    def thread_view(self, timeout: float = CURSOR_POOL_TIMEOUT) -> Iterator["DuckDBService"]:
+        """Yield a copy of this service that queries through its own cursor.
+
+        A DuckDB connection must not execute from several threads at once. A
+        cursor is a separate connection to the same database instance, so code
+        running in a worker thread can use the yielded view while other threads
+        keep using the singleton. The cursor is checked out of cursor_pool and
+        returned on exit, so views in several threads query in parallel without
+        opening a cursor per query.
+
+        Args:
+            timeout: Seconds to wait for a free cursor
+
+        Yields:
+            DuckDBService sharing this instance's settings with a private cursor
+
+        Raises:
+            CursorPoolTimeoutError: If every pooled cursor stayed busy
+        """
+        with self.cursor_pool.checkout(timeout) as cursor:
+            view = object.__new__(type(self))
+            view.__dict__.update(self.__dict__)
+            view.conn = cursor
+            yield view
+
     def __enter__(self):
         """Context manager entry."""
         return self
@@ -981,6 +1280,8 @@ class DuckDBService:
 
         Creates the following tables if they don't exist:
         - liquidation_snapshots: Pre-computed heatmap snapshots for caching
+        - liquidation_snapshot_coverage: Time ranges fully covered by pre-computed
+          snapshots, per symbol, interval, bin size and leverage weights
         - position_events: Audit trail of position lifecycle events
 
         Per spec.md Phase 2 and data-model.md.
@@ -999,6 +1300,31 @@ class DuckDBService:
             )
         """)
 
+        # Computation parameters (databases created before they existed keep
+        # NULL there, which no parameterized lookup matches)
+        for column, column_type in (
+            ("interval", "VARCHAR"),
+            ("price_bin_size", "DOUBLE"),
+            ("weights_key", "VARCHAR"),
+            ("positions_created", "INTEGER DEFAULT 0"),
+            ("positions_consumed", "INTEGER DEFAULT 0"),
+        ):
+            self.conn.execute(
+                f"ALTER TABLE liquidation_snapshots ADD COLUMN IF NOT EXISTS {column} {column_type}"
+            )
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS liquidation_snapshot_coverage (
+                symbol VARCHAR(20) NOT NULL,
+                interval VARCHAR(10) NOT NULL,
+                price_bin_size DOUBLE NOT NULL,
+                weights_key VARCHAR NOT NULL,
+                start_time TIMESTAMP NOT NULL,
+                end_time TIMESTAMP NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         # Create indexes for efficient queries
         try:
             self.conn.execute("""
@@ -1012,6 +1338,21 @@ class DuckDBService:
         except Exception:
             pass  # Indexes may already exist
 
+        # Unique cell key that save_snapshots() upserts against (a failed
+        # build is not retried on every save)
+        if getattr(self, "_snapshot_key_indexed", None) is not False:
+            try:
+                self.conn.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_liq_snap_key
+                    ON liquidation_snapshots(timestamp, symbol, price_bucket, side,
+                                             interval, price_bin_size, weights_key)
+                """)
+                self._snapshot_key_indexed = True
+            except duckdb.Error as e:
+                # Duplicate cells written before the key existed block the index
+                logger.warning(f"Snapshot key index unavailable, upserts fall back: {e}")
+                self._snapshot_key_indexed = False
+
         # Create position_events table for audit trail
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS position_events (
@@ -1027,131 +1368,189 @@ class DuckDBService:
             )
         """)
 
-        logger.info("Snapshot tables ensured (liquidation_snapshots, position_events)")
+        logger.info(
+            "Snapshot tables ensured "
+            "(liquidation_snapshots, liquidation_snapshot_coverage, position_events)"
+        )
 
     def save_snapshot(
         self,
         snapshot,  # HeatmapSnapshot from models.position
         consumed_volume: Decimal = Decimal("0"),
+        interval: str | None = None,
+        price_bin_size: float | None = None,
+        weights_key: str | None = None,
     ) -> int:
         """Save a heatmap snapshot to the database.
 
         Persists the snapshot cells for later retrieval, enabling
-        cache-first query strategy for fast API responses.
+        cache-first query strategy for fast API responses. Snapshots saved
+        with interval, price_bin_size and weights_key can be served by
+        heatmap-timeseries once their range is recorded with
+        save_snapshot_coverage(). Use save_snapshots() to write many at once.
 
         Args:
             snapshot: HeatmapSnapshot with timestamp, symbol, and cells
             consumed_volume: Total volume consumed (liquidated) this period
+            interval: Candle interval the snapshot was computed with
+            price_bin_size: Price bucket size the snapshot was computed with
+            weights_key: leverage_weights_key() of the leverage distribution
 
         Returns:
             Number of rows inserted
 
         Per spec.md Phase 2 - database caching layer.
         """
-        self.ensure_snapshot_tables()
+        return self.save_snapshots(
+            [snapshot],
+            consumed_volume=consumed_volume,
+            interval=interval,
+            price_bin_size=price_bin_size,
+            weights_key=weights_key,
+        )
 
-        rows_inserted = 0
+    def save_snapshots(
+        self,
+        snapshots,  # Iterable of HeatmapSnapshot from models.position
+        consumed_volume: Decimal = Decimal("0"),
+        interval: str | None = None,
+        price_bin_size: float | None = None,
+        weights_key: str | None = None,
+    ) -> int:
+        """Upsert the cells of a batch of snapshots in one transaction.
 
-        # Insert each cell as a row (with upsert semantics for unique constraint)
-        for price_bucket, cell in snapshot.cells.items():
-            # Insert long density
-            if cell.long_density > 0:
-                # Check if row already exists (unique: timestamp, symbol, price_bucket, side)
-                existing = self.conn.execute(
-                    """
-                    SELECT id FROM liquidation_snapshots
-                    WHERE timestamp = ? AND symbol = ? AND price_bucket = ? AND side = 'long'
-                    """,
-                    [snapshot.timestamp, snapshot.symbol, str(price_bucket)],
-                ).fetchone()
+        All long and short cells with non-zero density are collected into one
+        DataFrame and written with a single INSERT ... ON CONFLICT against the
+        cell key (timestamp, symbol, price_bucket, side and the computation
+        parameters). Existing cells get the new volumes and counts. Snapshots
+        saved without computation parameters cannot conflict on NULL key
+        columns, so their matching rows are deleted and re-inserted instead.
 
-                if existing:
-                    # Update existing row
-                    self.conn.execute(
-                        """
-                        UPDATE liquidation_snapshots
-                        SET active_volume = ?, consumed_volume = ?
-                        WHERE id = ?
-                        """,
-                        [str(cell.long_density), str(consumed_volume), existing[0]],
-                    )
-                else:
-                    # Get next id and insert new row
-                    result = self.conn.execute(
-                        "SELECT COALESCE(MAX(id), 0) + 1 FROM liquidation_snapshots"
-                    ).fetchone()
-                    next_id = result[0]
+        Args:
+            snapshots: HeatmapSnapshots with timestamp, symbol, and cells
+            consumed_volume: Total volume consumed (liquidated) per snapshot
+            interval: Candle interval the snapshots were computed with
+            price_bin_size: Price bucket size the snapshots were computed with
+            weights_key: leverage_weights_key() of the leverage distribution
 
-                    self.conn.execute(
-                        """
-                        INSERT INTO liquidation_snapshots
-                        (id, timestamp, symbol, price_bucket, side, active_volume, consumed_volume, created_at)
-                        VALUES (?, ?, ?, ?, 'long', ?, ?, CURRENT_TIMESTAMP)
-                        """,
-                        [
-                            next_id,
-                            snapshot.timestamp,
-                            snapshot.symbol,
-                            str(price_bucket),
-                            str(cell.long_density),
-                            str(consumed_volume),
-                        ],
-                    )
-                    rows_inserted += 1
+        Returns:
+            Number of rows inserted (updated rows are not counted)
+        """
+        import pandas as pd
 
-            # Insert short density
-            if cell.short_density > 0:
-                # Check if row already exists
-                existing = self.conn.execute(
-                    """
-                    SELECT id FROM liquidation_snapshots
-                    WHERE timestamp = ? AND symbol = ? AND price_bucket = ? AND side = 'short'
-                    """,
-                    [snapshot.timestamp, snapshot.symbol, str(price_bucket)],
-                ).fetchone()
+        self.ensure_snapshot_tables()
 
-                if existing:
-                    # Update existing row
-                    self.conn.execute(
-                        """
-                        UPDATE liquidation_snapshots
-                        SET active_volume = ?, consumed_volume = ?
-                        WHERE id = ?
+        columns = {
+            "timestamp": [],
+            "symbol": [],
+            "price_bucket": [],
+            "side": [],
+            "active_volume": [],
+            "positions_created": [],
+            "positions_consumed": [],
+        }
+        for snapshot in snapshots:
+            for price_bucket, cell in snapshot.cells.items():
+                for side, density in (("long", cell.long_density), ("short", cell.short_density)):
+                    if density > 0:
+                        columns["timestamp"].append(snapshot.timestamp)
+                        columns["symbol"].append(snapshot.symbol)
+                        columns["price_bucket"].append(str(price_bucket))
+                        columns["side"].append(side)
+                        columns["active_volume"].append(str(density))
+                        columns["positions_created"].append(snapshot.positions_created)
+                        columns["positions_consumed"].append(snapshot.positions_consumed)
+        if not columns["timestamp"]:
+            return 0
+
+        # A later snapshot of the same timestamp wins, as with one save per snapshot
+        cells = pd.DataFrame(columns).drop_duplicates(
+            ["timestamp", "symbol", "price_bucket", "side"], keep="last"
+        )
+        params = [interval, price_bin_size, weights_key]
+        upsert = None not in params and self._snapshot_key_indexed
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.register("snapshot_cells_df", cells)
+            try:
+                existing = 0
+                if not upsert:
+                    match = """
+                        s.timestamp = c.timestamp AND s.symbol = c.symbol
+                        AND s.price_bucket = CAST(c.price_bucket AS DECIMAL(18, 2))
+                        AND s.side = c.side
+                        AND s.interval IS NOT DISTINCT FROM ?
+                        AND s.price_bin_size IS NOT DISTINCT FROM ?
+                        AND s.weights_key IS NOT DISTINCT FROM ?
+                    """
+                    existing = self.conn.execute(
+                        f"""
+                        SELECT COUNT(*) FROM snapshot_cells_df AS c
+                        WHERE EXISTS (SELECT 1 FROM liquidation_snapshots AS s WHERE {match})
                         """,
-                        [str(cell.short_density), str(consumed_volume), existing[0]],
+                        params,
+                    ).fetchone()[0]
+                    self.conn.execute(
+                        f"DELETE FROM liquidation_snapshots AS s "
+                        f"USING snapshot_cells_df AS c WHERE {match}",
+                        params,
                     )
-                else:
-                    # Get next id and insert new row
-                    result = self.conn.execute(
-                        "SELECT COALESCE(MAX(id), 0) + 1 FROM liquidation_snapshots"
-                    ).fetchone()
-                    next_id = result[0]
 
-                    self.conn.execute(
-                        """
-                        INSERT INTO liquidation_snapshots
-                        (id, timestamp, symbol, price_bucket, side, active_volume, consumed_volume, created_at)
-                        VALUES (?, ?, ?, ?, 'short', ?, ?, CURRENT_TIMESTAMP)
-                        """,
-                        [
-                            next_id,
-                            snapshot.timestamp,
-                            snapshot.symbol,
-                            str(price_bucket),
-                            str(cell.short_density),
-                            str(consumed_volume),
-                        ],
+                # New rows take consecutive ids above the current maximum
+                base_id = self.conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM liquidation_snapshots"
+                ).fetchone()[0]
+                insert = """
+                    INSERT INTO liquidation_snapshots
+                    (id, timestamp, symbol, price_bucket, side, active_volume, consumed_volume,
+                     created_at, interval, price_bin_size, weights_key,
+                     positions_created, positions_consumed)
+                    SELECT ? + row_number() OVER (), timestamp, symbol,
+                           CAST(price_bucket AS DECIMAL(18, 2)), side,
+                           CAST(active_volume AS DECIMAL(20, 8)), CAST(? AS DECIMAL(20, 8)),
+                           CURRENT_TIMESTAMP, ?, ?, ?, positions_created, positions_consumed
+                    FROM snapshot_cells_df
+                """
+                if upsert:
+                    insert += """
+                    ON CONFLICT (timestamp, symbol, price_bucket, side,
+                                 interval, price_bin_size, weights_key)
+                    DO UPDATE SET active_volume = EXCLUDED.active_volume,
+                                  consumed_volume = EXCLUDED.consumed_volume,
+                                  positions_created = EXCLUDED.positions_created,
+                                  positions_consumed = EXCLUDED.positions_consumed
+                    """
+                self.conn.execute(insert, [base_id, str(consumed_volume)] + params)
+                if upsert:
+                    # Updated rows keep their id, so only inserted rows lie above base_id
+                    existing = (
+                        len(cells)
+                        - self.conn.execute(
+                            "SELECT COUNT(*) FROM liquidation_snapshots WHERE id > ?", [base_id]
+                        ).fetchone()[0]
                     )
-                    rows_inserted += 1
+            finally:
+                self.conn.unregister("snapshot_cells_df")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
 
-        logger.debug(f"Saved snapshot for {snapshot.symbol} at {snapshot.timestamp}")
-        return rows_inserted
+        logger.debug(
+            f"Saved {len(cells)} snapshot cells ({len(cells) - existing} new) "
+            f"for {cells['timestamp'].nunique()} timestamps"
+        )
+        return len(cells) - existing
 
     def load_snapshots(
         self,
         symbol: str,
         start_time,
         end_time,
+        interval: str | None = None,
+        price_bin_size: float | None = None,
+        weights_key: str | None = None,
     ):
         """Load pre-computed heatmap snapshots from database.
 
@@ -1162,6 +1561,9 @@ class DuckDBService:
             symbol: Trading pair (e.g., BTCUSDT)
             start_time: Start of time range (datetime)
             end_time: End of time range (datetime)
+            interval: Only snapshots computed with this interval (None for any)
+            price_bin_size: Only snapshots computed with this bin size (None for any)
+            weights_key: Only snapshots computed with these weights (None for any)
 
         Returns:
             List of HeatmapSnapshot objects, or empty list
@@ -1172,7 +1574,8 @@ class DuckDBService:
 
         from src.liquidationheatmap.models.position import HeatmapSnapshot
 
-        self.ensure_snapshot_tables()
+        if not self.read_only:
+            self.ensure_snapshot_tables()
 
         try:
             result = self.conn.execute(
@@ -1183,14 +1586,29 @@ class DuckDBService:
                     price_bucket,
                     side,
                     active_volume,
-                    consumed_volume
+                    consumed_volume,
+                    positions_created,
+                    positions_consumed
                 FROM liquidation_snapshots
                 WHERE symbol = ?
                   AND timestamp >= ?
                   AND timestamp <= ?
+                  AND (CAST(? AS VARCHAR) IS NULL OR interval = ?)
+                  AND (CAST(? AS DOUBLE) IS NULL OR price_bin_size = ?)
+                  AND (CAST(? AS VARCHAR) IS NULL OR weights_key = ?)
                 ORDER BY timestamp, price_bucket
                 """,
-                [symbol, start_time, end_time],
+                [
+                    symbol,
+                    start_time,
+                    end_time,
+                    interval,
+                    interval,
+                    price_bin_size,
+                    price_bin_size,
+                    weights_key,
+                    weights_key,
+                ],
             ).fetchall()
 
             if not result:
@@ -1199,28 +1617,38 @@ class DuckDBService:
             # Group by timestamp
             snapshots_by_ts = defaultdict(list)
             for row in result:
-                ts, sym, price_bucket, side, active_vol, consumed_vol = row
+                ts, sym, price_bucket, side, active_vol, consumed_vol, created, consumed = row
                 snapshots_by_ts[ts].append(
                     {
                         "price_bucket": price_bucket,
                         "side": side,
                         "active_volume": active_vol,
                         "consumed_volume": consumed_vol,
+                        "positions_created": created or 0,
+                        "positions_consumed": consumed or 0,
                     }
                 )
 
             # Convert to list of HeatmapSnapshot objects
             snapshots = []
             for ts, cells_data in sorted(snapshots_by_ts.items()):
-                snapshot = HeatmapSnapshot(timestamp=ts, symbol=symbol)
+                snapshot = HeatmapSnapshot(
+                    timestamp=ts,
+                    symbol=symbol,
+                    positions_created=cells_data[0]["positions_created"],
+                    positions_consumed=cells_data[0]["positions_consumed"],
+                )
                 # Reconstruct cells from stored data
                 for cell_data in cells_data:
                     price_bucket = Decimal(str(cell_data["price_bucket"]))
                     cell = snapshot.get_cell(price_bucket)
+                    volume = Decimal(str(cell_data["active_volume"]))
                     if cell_data["side"] == "long":
-                        cell.long_density = Decimal(str(cell_data["active_volume"]))
+                        cell.long_density = volume
+                        snapshot.total_long_volume += volume
                     elif cell_data["side"] == "short":
-                        cell.short_density = Decimal(str(cell_data["active_volume"]))
+                        cell.short_density = volume
+                        snapshot.total_short_volume += volume
                 snapshots.append(snapshot)
 
             logger.debug(f"Loaded {len(snapshots)} cached snapshots for {symbol}")
@@ -1229,3 +1657,535 @@ class DuckDBService:
         except Exception as e:
             logger.warning(f"Failed to load snapshots: {e}")
             return []
+
+    def load_snapshot_columns(
+        self,
+        symbol: str,
+        start_time,
+        end_time,
+        interval: str | None = None,
+        price_bin_size: float | None = None,
+        weights_key: str | None = None,
+    ):
+        """Load pre-computed heatmap snapshots as columns.
+
+        Columnar counterpart of load_snapshots(): the same rows, pivoted to one
+        row per price level in SQL and returned as NumPy arrays (see
+        query_snapshot_columns()). With LH_SNAPSHOT_STORE_DIR set, the Parquet
+        snapshot store is read first; when it does not hold a snapshot for
+        every candle of the range, liquidation_snapshots fills the timestamps
+        it lacks (e.g. ranges persisted before the store was configured).
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            start_time: Start of time range (datetime)
+            end_time: End of time range (datetime)
+            interval: Only snapshots computed with this interval (None for any)
+            price_bin_size: Only snapshots computed with this bin size (None for any)
+            weights_key: Only snapshots computed with these weights (None for any)
+
+        Returns:
+            SnapshotColumns, empty if no cached data exists
+        """
+        from src.liquidationheatmap.models.time_evolving_heatmap import SnapshotColumns
+
+        from .snapshot_store import get_snapshot_store
+
+        stored = SnapshotColumns.from_snapshots([])
+        store = get_snapshot_store()
+        if store is not None:
+            try:
+                stored = store.load_columns(
+                    symbol, start_time, end_time, interval, price_bin_size, weights_key
+                )
+            except Exception as e:
+                logger.warning(f"Failed to load snapshots from {store.root}: {e}")
+            grid_size = _grid_size(start_time, end_time, interval)
+            if len(stored) and grid_size is not None and len(stored) >= grid_size:
+                logger.debug(f"Loaded {len(stored)} stored snapshots for {symbol} from Parquet")
+                return stored
+
+        if not self.read_only:
+            self.ensure_snapshot_tables()
+
+        try:
+            columns = query_snapshot_columns(
+                self.conn, symbol, start_time, end_time, interval, price_bin_size, weights_key
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load snapshot columns: {e}")
+            return stored
+
+        if len(stored):
+            # The store wins for every timestamp it holds; the table fills the rest
+            missing = np.flatnonzero(~np.isin(columns.timestamp, stored.timestamp))
+            merged = SnapshotColumns.concatenate([stored, columns.take(missing)])
+            logger.debug(
+                f"Loaded {len(stored)} stored snapshots for {symbol} from Parquet "
+                f"and {len(missing)} from liquidation_snapshots"
+            )
+            return merged.take(np.argsort(merged.timestamp, kind="stable"))
+
+        logger.debug(f"Loaded {len(columns)} cached snapshots for {symbol} as columns")
+        return columns
+
+    def save_snapshot_coverage(
+        self,
+        symbol: str,
+        interval: str,
+        price_bin_size: float,
+        weights_key: str,
+        start_time,
+        end_time,
+        max_gap=None,
+    ) -> tuple:
+        """Record that snapshots were persisted for every candle in a time range.
+
+        Ranges that overlap the new one, or lie within max_gap of it, are
+        merged into a single row.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval the snapshots were computed with
+            price_bin_size: Price bucket size the snapshots were computed with
+            weights_key: leverage_weights_key() of the leverage distribution
+            start_time: First snapshot timestamp of the range (datetime)
+            end_time: Last snapshot timestamp of the range (datetime)
+            max_gap: Largest gap (timedelta) still merged, usually one interval
+
+        Returns:
+            (start, end) of the merged range now recorded
+        """
+        from datetime import timedelta
+
+        self.ensure_snapshot_tables()
+
+        gap = max_gap or timedelta(0)
+        key = [symbol, interval, price_bin_size, weights_key]
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            merged = self.conn.execute(
+                """
+                SELECT LEAST(MIN(start_time), ?), GREATEST(MAX(end_time), ?)
+                FROM liquidation_snapshot_coverage
+                WHERE symbol = ? AND interval = ? AND price_bin_size = ? AND weights_key = ?
+                  AND start_time <= ? AND end_time >= ?
+                """,
+                [start_time, end_time] + key + [end_time + gap, start_time - gap],
+            ).fetchone()
+            merged_start, merged_end = merged
+            self.conn.execute(
+                """
+                DELETE FROM liquidation_snapshot_coverage
+                WHERE symbol = ? AND interval = ? AND price_bin_size = ? AND weights_key = ?
+                  AND start_time >= ? AND end_time <= ?
+                """,
+                key + [merged_start, merged_end],
+            )
+            self.conn.execute(
+                """
+                INSERT INTO liquidation_snapshot_coverage
+                    (symbol, interval, price_bin_size, weights_key, start_time, end_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                key + [merged_start, merged_end],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return merged_start, merged_end
+
+    def load_snapshot_coverage(
+        self,
+        symbol: str,
+        interval: str,
+        price_bin_size: float,
+        weights_key: str,
+        start_time,
+        end_time,
+    ):
+        """Find the pre-computed range that overlaps a requested range the most.
+
+        Safe on read-only connections: returns None if the snapshot tables
+        have not been created.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval
+            price_bin_size: Price bucket size
+            weights_key: leverage_weights_key() of the leverage distribution
+            start_time: Start of the requested range (datetime)
+            end_time: End of the requested range (datetime)
+
+        Returns:
+            (start, end) of the covered part of the requested range, or None
+        """
+        try:
+            row = self.conn.execute(
+                """
+                SELECT GREATEST(start_time, ?) AS covered_start,
+                       LEAST(end_time, ?) AS covered_end
+                FROM liquidation_snapshot_coverage
+                WHERE symbol = ? AND interval = ? AND price_bin_size = ? AND weights_key = ?
+                  AND start_time <= ? AND end_time >= ?
+                ORDER BY covered_end - covered_start DESC
+                LIMIT 1
+                """,
+                [
+                    start_time,
+                    end_time,
+                    symbol,
+                    interval,
+                    price_bin_size,
+                    weights_key,
+                    end_time,
+                    start_time,
+                ],
+            ).fetchone()
+        except duckdb.CatalogException:
+            return None
+
+        return tuple(row) if row is not None else None
+
+    def load_heatmap_inputs(
+        self,
+        symbol: str,
+        interval: str,
+        start_time,
+        end_time,
+    ):
+        """Load candles and per-candle OI deltas for the time-evolving heatmap.
+
+        Candles come from klines_5m_history / klines_15m_history, aggregated in
+        SQL for intervals above 15m. OI is averaged per interval bucket, the
+        delta taken against the previous bucket and joined to the candles in
+        the same query; candles without OI get a zero delta. The OI scan starts
+        one bucket before start_time so that the first candle gets a real
+        delta, which keeps a run resumed from a checkpoint identical to a
+        continuous one.
+
+        The result is read with fetchnumpy() into CandleColumns, so no per-row
+        Python objects are created.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval (5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d)
+            start_time: Start of time range (datetime, inclusive)
+            end_time: End of time range (datetime, inclusive)
+
+        Returns:
+            CandleColumns in open_time order (empty when there are no candles)
+        """
+        from datetime import timedelta
+
+        from src.liquidationheatmap.models.time_evolving_heatmap import CandleColumns
+
+        agg_minutes = HEATMAP_INTERVAL_MINUTES.get(interval, 15)
+
+        if agg_minutes <= 15:
+            # Direct query for 5m or 15m
+            candles_cte = f"""
+            SELECT open_time, open, high, low, close
+            FROM klines_{interval}_history
+            WHERE symbol = ? AND open_time >= ? AND open_time <= ?
+            """
+        else:
+            # Aggregate candles into larger intervals
+            # 30m uses 5m base table, all others use 15m
+            if interval == "30m":
+                base_table = "klines_5m_history"
+            else:
+                base_table = "klines_15m_history"
+
+            candles_cte = f"""
+            SELECT
+                time_bucket(INTERVAL '{agg_minutes} minutes', open_time) as open_time,
+                FIRST(open ORDER BY open_time) as open,
+                MAX(high) as high,
+                MIN(low) as low,
+                LAST(close ORDER BY open_time) as close
+            FROM {base_table}
+            WHERE symbol = ? AND open_time >= ? AND open_time <= ?
+            GROUP BY 1
+            """
+
+        query = f"""
+        WITH candles AS ({candles_cte}),
+        oi_bucketed AS (
+            SELECT
+                time_bucket(INTERVAL '{agg_minutes} minutes', timestamp) as bucket,
+                AVG(open_interest_value) as avg_oi
+            FROM open_interest_history
+            WHERE symbol = ? AND timestamp >= ? AND timestamp <= ?
+            GROUP BY bucket
+        ),
+        oi_deltas AS (
+            SELECT bucket, avg_oi - LAG(avg_oi) OVER (ORDER BY bucket) as oi_delta
+            FROM oi_bucketed
+        )
+        SELECT
+            c.open_time,
+            CAST(c.open AS DOUBLE) as open,
+            CAST(c.high AS DOUBLE) as high,
+            CAST(c.low AS DOUBLE) as low,
+            CAST(c.close AS DOUBLE) as close,
+            COALESCE(CAST(d.oi_delta AS DOUBLE), 0) as oi_delta
+        FROM candles c
+        LEFT JOIN oi_deltas d ON d.bucket = c.open_time
+        ORDER BY c.open_time
+        """
+        oi_start = start_time - timedelta(minutes=agg_minutes)
+        columns = self.conn.execute(
+            query, [symbol, start_time, end_time, symbol, oi_start, end_time]
+        ).fetchnumpy()
+
+        return CandleColumns(
+            open_time=np.asarray(columns["open_time"], dtype="datetime64[us]"),
+            open=np.asarray(columns["open"], dtype=np.float64),
+            high=np.asarray(columns["high"], dtype=np.float64),
+            low=np.asarray(columns["low"], dtype=np.float64),
+            close=np.asarray(columns["close"], dtype=np.float64),
+            # NaN deltas (NaN OI rows) count as no change, like missing OI
+            oi_delta=np.nan_to_num(np.asarray(columns["oi_delta"], dtype=np.float64), nan=0.0),
+        )
+
+    def load_candle_times(self, symbol: str, interval: str, start_time, end_time) -> np.ndarray:
+        """Open times of the candles load_heatmap_inputs() would return.
+
+        Reads only open_time from the same base klines table, bucketed in SQL
+        for intervals above 15m, without aggregating prices or joining OI.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval (5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d)
+            start_time: Start of time range (datetime, inclusive)
+            end_time: End of time range (datetime, inclusive)
+
+        Returns:
+            datetime64[us] array in ascending order
+        """
+        agg_minutes = HEATMAP_INTERVAL_MINUTES.get(interval, 15)
+        if agg_minutes <= 15:
+            base_table = f"klines_{interval}_history"
+            open_time = "open_time"
+        else:
+            base_table = "klines_5m_history" if interval == "30m" else "klines_15m_history"
+            open_time = f"time_bucket(INTERVAL '{agg_minutes} minutes', open_time)"
+
+        columns = self.conn.execute(
+            f"""
+            SELECT DISTINCT {open_time} as open_time
+            FROM {base_table}
+            WHERE symbol = ? AND open_time >= ? AND open_time <= ?
+            ORDER BY open_time
+            """,
+            [symbol, start_time, end_time],
+        ).fetchnumpy()
+        return np.asarray(columns["open_time"], dtype="datetime64[us]")
+
+    def get_data_watermark(self, symbol: str, interval: str, include_open_interest: bool = True):
+        """Latest ingested candle (and open interest) time for a symbol.
+
+        Heatmap and klines responses for a symbol only change when one of these
+        advances, so the API uses them as cache validators. Reads the same base
+        klines table as load_heatmap_inputs(); DuckDB answers MAX() from the
+        row-group zonemaps, so this stays cheap on large tables.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval (5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d)
+            include_open_interest: Also read the latest open_interest_history row
+
+        Returns:
+            Tuple of the latest kline open_time and, if requested, the latest
+            open interest timestamp (None for a missing table or no rows)
+        """
+        if interval in ("5m", "15m"):
+            klines_table = f"klines_{interval}_history"
+        elif interval == "30m":
+            klines_table = "klines_5m_history"
+        else:
+            klines_table = "klines_15m_history"
+
+        sources = [(klines_table, "open_time")]
+        if include_open_interest:
+            sources.append(("open_interest_history", "timestamp"))
+
+        watermark = []
+        for table, column in sources:
+            try:
+                row = self.conn.execute(
+                    f"SELECT MAX({column}) FROM {table} WHERE symbol = ?", [symbol]
+                ).fetchone()
+            except duckdb.CatalogException:
+                row = None
+            watermark.append(row[0] if row else None)
+        return tuple(watermark)
+
+    # ==========================================================================
+    # ENGINE CHECKPOINTS
+    # ==========================================================================
+
+    def ensure_checkpoint_tables(self) -> None:
+        """Ensure engine checkpoint tables exist.
+
+        Creates the following tables if they don't exist:
+        - engine_checkpoints: One row per checkpoint (symbol, interval, weights, time)
+        - engine_checkpoint_positions: Active positions held by each checkpoint
+        """
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS engine_checkpoints (
+                symbol VARCHAR(20) NOT NULL,
+                interval VARCHAR(10) NOT NULL,
+                weights_key VARCHAR NOT NULL,
+                checkpoint_time TIMESTAMP NOT NULL,
+                position_count INTEGER NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, interval, weights_key, checkpoint_time)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS engine_checkpoint_positions (
+                symbol VARCHAR(20) NOT NULL,
+                interval VARCHAR(10) NOT NULL,
+                weights_key VARCHAR NOT NULL,
+                checkpoint_time TIMESTAMP NOT NULL,
+                side TINYINT NOT NULL,
+                liq_price DOUBLE NOT NULL,
+                volume DOUBLE NOT NULL,
+                leverage SMALLINT NOT NULL
+            )
+        """)
+
+    def save_book_checkpoint(
+        self,
+        symbol: str,
+        interval: str,
+        weights_key: str,
+        checkpoint,  # BookCheckpoint from models.position_book
+    ) -> int:
+        """Persist a position book checkpoint, replacing any existing one at the same key.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval the book was advanced with
+            weights_key: leverage_weights_key() of the leverage distribution
+            checkpoint: BookCheckpoint to store
+
+        Returns:
+            Number of position rows written
+        """
+        import pandas as pd
+
+        self.ensure_checkpoint_tables()
+
+        key = [symbol, interval, weights_key, checkpoint.timestamp]
+        positions = pd.DataFrame(
+            {
+                "side": checkpoint.side,
+                "liq_price": checkpoint.liq_price,
+                "volume": checkpoint.volume,
+                "leverage": checkpoint.leverage,
+            }
+        )
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            for table in ("engine_checkpoint_positions", "engine_checkpoints"):
+                self.conn.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE symbol = ? AND interval = ? AND weights_key = ?
+                      AND checkpoint_time = ?
+                    """,
+                    key,
+                )
+            self.conn.execute(
+                """
+                INSERT INTO engine_checkpoints
+                    (symbol, interval, weights_key, checkpoint_time, position_count)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                key + [len(positions)],
+            )
+            self.conn.register("checkpoint_positions_df", positions)
+            try:
+                self.conn.execute(
+                    """
+                    INSERT INTO engine_checkpoint_positions
+                    SELECT ?, ?, ?, ?, side, liq_price, volume, leverage
+                    FROM checkpoint_positions_df
+                    """,
+                    key,
+                )
+            finally:
+                self.conn.unregister("checkpoint_positions_df")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        logger.debug(
+            f"Saved checkpoint {symbol}/{interval}/{weights_key} at {checkpoint.timestamp} "
+            f"({len(positions)} positions)"
+        )
+        return len(positions)
+
+    def load_book_checkpoint(
+        self,
+        symbol: str,
+        interval: str,
+        weights_key: str,
+        at_or_before=None,
+    ):
+        """Load the latest position book checkpoint at or before a time.
+
+        Safe on read-only connections: returns None if the checkpoint tables
+        have not been created.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            interval: Candle interval the book was advanced with
+            weights_key: leverage_weights_key() of the leverage distribution
+            at_or_before: Latest acceptable checkpoint time (datetime), or None for newest
+
+        Returns:
+            BookCheckpoint, or None if no checkpoint matches
+        """
+        from src.liquidationheatmap.models.position_book import BookCheckpoint
+
+        try:
+            row = self.conn.execute(
+                """
+                SELECT MAX(checkpoint_time)
+                FROM engine_checkpoints
+                WHERE symbol = ? AND interval = ? AND weights_key = ?
+                  AND (CAST(? AS TIMESTAMP) IS NULL OR checkpoint_time <= ?)
+                """,
+                [symbol, interval, weights_key, at_or_before, at_or_before],
+            ).fetchone()
+        except duckdb.CatalogException:
+            return None
+
+        if row is None or row[0] is None:
+            return None
+
+        checkpoint_time = row[0]
+        columns = self.conn.execute(
+            """
+            SELECT side, liq_price, volume, leverage
+            FROM engine_checkpoint_positions
+            WHERE symbol = ? AND interval = ? AND weights_key = ? AND checkpoint_time = ?
+            """,
+            [symbol, interval, weights_key, checkpoint_time],
+        ).fetchnumpy()
+
+        return BookCheckpoint(
+            timestamp=checkpoint_time,
+            side=np.asarray(columns["side"], dtype=np.int8),
+            liq_price=np.asarray(columns["liq_price"], dtype=np.float64),
+            volume=np.asarray(columns["volume"], dtype=np.float64),
+            leverage=np.asarray(columns["leverage"], dtype=np.int16),
+        )
@@ -0,0 +1,229 @@
+"""Background mark price cache, so request paths never call the exchange.
+
+A daemon thread fetches the mark prices of every tracked symbol from Binance
+Futures in one request, every LH_PRICE_REFRESH_SECONDS. Reads are served
+from memory. A symbol without a recent exchange price falls back to the
+close of its latest ingested kline, which is then kept in memory as well,
+and finally to the last exchange price however old it is.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+from urllib.request import urlopen
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+# Mark prices of all USD-M perpetuals in one response
+MARK_PRICE_URL = "https://fapi.binance.com/fapi/v1/premiumIndex"
+
+# Seconds between refreshes, and how old a price may be before the kline close
+# is preferred over it
+PRICE_REFRESH_SECONDS = float(os.getenv("LH_PRICE_REFRESH_SECONDS", "10"))
+PRICE_MAX_AGE_SECONDS = float(os.getenv("LH_PRICE_MAX_AGE_SECONDS", "120"))
+
+# Base kline tables searched for the latest close, finest first
+KLINE_TABLES = ("klines_5m_history", "klines_15m_history")
+
+
+def fetch_binance_mark_prices(timeout: float = 5.0) -> dict[str, Decimal]:
+    """Fetch the current mark price of every Binance Futures symbol.
+
+    Args:
+        timeout: Request timeout in seconds
+
+    Returns:
+        dict of symbol -> mark price
+
+    Raises:
+        Exception: If the API call fails
+    """
+    with urlopen(MARK_PRICE_URL, timeout=timeout) as resp:
+        data = json.loads(resp.read().decode())
+    return {item["symbol"]: Decimal(item["markPrice"]) for item in data}
+
+
+def latest_kline_close(conn: duckdb.DuckDBPyConnection, symbol: str) -> Optional[Decimal]:
+    """Close of the latest ingested kline of a symbol, or None if there is none."""
+    for table in KLINE_TABLES:
+        try:
+            row = conn.execute(
+                f"SELECT close FROM {table} WHERE symbol = ? ORDER BY open_time DESC LIMIT 1",
+                [symbol],
+            ).fetchone()
+        except duckdb.Error:
+            continue
+        if row is not None and row[0] is not None:
+            return Decimal(str(row[0]))
+    return None
+
+
+@dataclass
+class PriceQuote:
+    """A cached price, where it came from and when (time.monotonic())."""
+
+    price: Decimal
+    source: str  # "exchange" or "kline"
+    updated: float
+
+    def age(self) -> float:
+        return time.monotonic() - self.updated
+
+
+class PriceCache:
+    """Mark prices refreshed in the background and read from memory."""
+
+    def __init__(
+        self,
+        fetch=fetch_binance_mark_prices,
+        refresh_seconds: float = PRICE_REFRESH_SECONDS,
+        max_age_seconds: float = PRICE_MAX_AGE_SECONDS,
+    ):
+        """Initialize cache.
+
+        Args:
+            fetch: Callable returning a dict of symbol -> price for all symbols
+            refresh_seconds: Seconds between refreshes
+            max_age_seconds: Age after which a price is replaced by the kline close
+        """
+        self.fetch = fetch
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.symbols: frozenset[str] = frozenset()
+        self._quotes: dict[str, PriceQuote] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refreshes = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._hits = 0
+        self._kline_fallbacks = 0
+        self._stale = 0
+        self._misses = 0
+
+    def start(self, symbols: Iterable[str]) -> None:
+        """Start refreshing the given symbols in the background (no-op if running)."""
+        self.symbols = frozenset(symbols)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the background refresh."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_seconds)
+
+    def refresh(self) -> int:
+        """Fetch the prices of the tracked symbols once.
+
+        Returns:
+            Number of symbols updated (0 if the exchange could not be reached)
+        """
+        try:
+            prices = self.fetch()
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+                self._last_error = str(e)
+            logger.warning(f"Mark price refresh failed: {e}")
+            return 0
+
+        now = time.monotonic()
+        updated = {
+            symbol: PriceQuote(price, "exchange", now)
+            for symbol, price in prices.items()
+            if symbol in self.symbols
+        }
+        with self._lock:
+            self._quotes.update(updated)
+            self._refreshes += 1
+            self._last_error = None
+        return len(updated)
+
+    def get_price(
+        self, symbol: str, conn: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> Optional[Decimal]:
+        """Current price of a symbol, without calling the exchange.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            conn: DuckDB connection for the kline close fallback
+
+        Returns:
+            Fresh cached price, else the latest kline close, else the last
+            cached price however old, else None
+        """
+        with self._lock:
+            quote = self._quotes.get(symbol)
+            if quote is not None and quote.age() <= self.max_age_seconds:
+                self._hits += 1
+                return quote.price
+
+        close = latest_kline_close(conn, symbol) if conn is not None else None
+        with self._lock:
+            if close is not None:
+                # Exchange prices that arrived meanwhile are not overwritten
+                current = self._quotes.get(symbol)
+                if current is None or current.age() > self.max_age_seconds:
+                    self._quotes[symbol] = PriceQuote(close, "kline", time.monotonic())
+                self._kline_fallbacks += 1
+                return close
+            if quote is not None:
+                self._stale += 1
+                return quote.price
+            self._misses += 1
+            return None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            dict with per-symbol price, source and age, refresh counts and the
+            outcome counts of reads
+        """
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "refresh_seconds": self.refresh_seconds,
+                "max_age_seconds": self.max_age_seconds,
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "hits": self._hits,
+                "kline_fallbacks": self._kline_fallbacks,
+                "stale": self._stale,
+                "misses": self._misses,
+                "prices": {
+                    symbol: {
+                        "price": str(quote.price),
+                        "source": quote.source,
+                        "age_seconds": round(quote.age(), 3),
+                    }
+                    for symbol, quote in sorted(self._quotes.items())
+                },
+            }
+
+
+_price_cache = PriceCache()
+
+
+def get_price_cache() -> PriceCache:
+    """The process-wide price cache (refreshing once the API has started it)."""
+    return _price_cache
@@ -0,0 +1,339 @@
+"""Partitioned Parquet store for pre-computed heatmap snapshots.
+
+Snapshots written by scripts/precompute_heatmap.py can be kept outside the
+main DuckDB file, as Hive-partitioned, zstd-compressed Parquet:
+
+    <root>/symbol=BTCUSDT/interval=15m/date=2025-11-01/part-<uuid>.parquet
+
+Each row is one price level with both sides (the long/short pivot of
+liquidation_snapshots), tagged with the bin size and leverage weights it was
+computed with and the time it was written. Every snapshot also gets one row
+with a NULL price, so re-writing a snapshot replaces all of its levels: reads
+keep only the latest write of each snapshot.
+
+Reads list the date partitions of the requested window only, so their cost
+follows the window rather than the stored history, and they never touch the
+DuckDB file that ingestion holds locks on. Each write adds files; compact()
+merges the files of a partition into one.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+# Store used for pre-computed snapshots; unset keeps them in liquidation_snapshots
+SNAPSHOT_STORE_ENV = "LH_SNAPSHOT_STORE_DIR"
+
+# Key of one stored snapshot within a symbol and interval
+SNAPSHOT_KEY = "timestamp, price_bin_size, weights_key"
+
+
+class ParquetSnapshotStore:
+    """Hive-partitioned Parquet files of heatmap snapshots under one root."""
+
+    def __init__(self, root: str | Path, compression: str = "zstd"):
+        """Initialize store.
+
+        Args:
+            root: Directory holding the symbol=/interval=/date= partitions
+            compression: Parquet compression codec
+        """
+        self.root = Path(root)
+        self.compression = compression
+        # Private in-memory database: the store never opens the main DuckDB file
+        self._conn = duckdb.connect(":memory:")
+        self._lock = threading.Lock()
+
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            return self._conn.cursor()
+
+    def write(
+        self,
+        snapshots,  # Iterable of HeatmapSnapshot from models.position
+        interval: str,
+        price_bin_size: float,
+        weights_key: str,
+    ) -> int:
+        """Write a batch of snapshots as new files in their date partitions.
+
+        Snapshots written earlier with the same timestamp, bin size and
+        weights are superseded as a whole.
+
+        Args:
+            snapshots: HeatmapSnapshots with timestamp, symbol, and cells
+            interval: Candle interval the snapshots were computed with
+            price_bin_size: Price bucket size the snapshots were computed with
+            weights_key: leverage_weights_key() of the leverage distribution
+
+        Returns:
+            Number of levels written
+        """
+        import pandas as pd
+
+        columns = {
+            "symbol": [],
+            "timestamp": [],
+            "price_bucket": [],
+            "long_density": [],
+            "short_density": [],
+            "positions_created": [],
+            "positions_consumed": [],
+        }
+
+        def add(snapshot, price, long, short):
+            columns["symbol"].append(snapshot.symbol)
+            columns["timestamp"].append(snapshot.timestamp)
+            columns["price_bucket"].append(price)
+            columns["long_density"].append(long)
+            columns["short_density"].append(short)
+            columns["positions_created"].append(snapshot.positions_created)
+            columns["positions_consumed"].append(snapshot.positions_consumed)
+
+        levels = 0
+        for snapshot in snapshots:
+            add(snapshot, None, 0.0, 0.0)
+            for price_bucket, cell in snapshot.cells.items():
+                if cell.long_density > 0 or cell.short_density > 0:
+                    add(
+                        snapshot,
+                        float(price_bucket),
+                        float(cell.long_density),
+                        float(cell.short_density),
+                    )
+                    levels += 1
+        if not columns["timestamp"]:
+            return 0
+
+        cells = pd.DataFrame(columns)
+        self.root.mkdir(parents=True, exist_ok=True)
+        cursor = self._cursor()
+        try:
+            cursor.register("snapshot_levels_df", cells)
+            cursor.execute(
+                f"""
+                COPY (
+                    SELECT symbol, CAST(? AS VARCHAR) AS interval,
+                           strftime(timestamp, '%Y-%m-%d') AS date,
+                           CAST(timestamp AS TIMESTAMP) AS timestamp,
+                           CAST(price_bucket AS DOUBLE) AS price_bucket,
+                           long_density, short_density,
+                           CAST(positions_created AS INTEGER) AS positions_created,
+                           CAST(positions_consumed AS INTEGER) AS positions_consumed,
+                           CAST(? AS DOUBLE) AS price_bin_size,
+                           CAST(? AS VARCHAR) AS weights_key,
+                           CAST(? AS TIMESTAMP) AS written_at
+                    FROM snapshot_levels_df
+                    ORDER BY timestamp, price_bucket NULLS FIRST
+                ) TO '{self._sql_path(self.root)}' (
+                    FORMAT parquet, COMPRESSION {self.compression},
+                    PARTITION_BY (symbol, interval, date),
+                    FILENAME_PATTERN 'part-{{uuid}}', APPEND
+                )
+                """,
+                [interval, price_bin_size, weights_key, datetime.now()],
+            )
+        finally:
+            cursor.close()
+
+        logger.debug(
+            f"Wrote {levels} snapshot levels for {cells['timestamp'].nunique()} timestamps "
+            f"to {self.root}"
+        )
+        return levels
+
+    def load_columns(
+        self,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+        interval: Optional[str] = None,
+        price_bin_size: Optional[float] = None,
+        weights_key: Optional[str] = None,
+    ):
+        """Read the stored snapshots of a time range as SnapshotColumns.
+
+        Only the date partitions between start_time and end_time are read.
+
+        Args:
+            symbol: Trading pair (e.g., BTCUSDT)
+            start_time: Start of time range (datetime, inclusive)
+            end_time: End of time range (datetime, inclusive)
+            interval: Only snapshots computed with this interval (None for any)
+            price_bin_size: Only snapshots computed with this bin size (None for any)
+            weights_key: Only snapshots computed with these weights (None for any)
+
+        Returns:
+            SnapshotColumns in timestamp order (empty when nothing is stored)
+        """
+        from src.liquidationheatmap.models.time_evolving_heatmap import SnapshotColumns
+
+        files = self.files(symbol, interval, start_time, end_time)
+        if not files:
+            return SnapshotColumns.from_snapshots([])
+
+        query = f"""
+            WITH latest AS (
+                SELECT *
+                FROM read_parquet(?, hive_partitioning = true)
+                WHERE timestamp >= ? AND timestamp <= ?
+                  AND (CAST(? AS DOUBLE) IS NULL OR price_bin_size = ?)
+                  AND (CAST(? AS VARCHAR) IS NULL OR weights_key = ?)
+                QUALIFY written_at = MAX(written_at) OVER (PARTITION BY interval, {SNAPSHOT_KEY})
+            )
+            SELECT
+                timestamp,
+                price_bucket AS price,
+                MAX(long_density) AS long_density,
+                MAX(short_density) AS short_density,
+                MAX(positions_created) AS positions_created,
+                MAX(positions_consumed) AS positions_consumed
+            FROM latest
+            WHERE price_bucket IS NOT NULL
+            GROUP BY timestamp, price_bucket
+            ORDER BY timestamp, price_bucket
+        """
+        params = [
+            start_time,
+            end_time,
+            price_bin_size,
+            price_bin_size,
+            weights_key,
+            weights_key,
+        ]
+        cursor = self._cursor()
+        try:
+            try:
+                levels = cursor.execute(query, [files] + params).fetchnumpy()
+            except duckdb.IOException:
+                # A compaction replaced files after they were listed
+                files = self.files(symbol, interval, start_time, end_time)
+                levels = cursor.execute(query, [files] + params).fetchnumpy()
+        finally:
+            cursor.close()
+
+        return SnapshotColumns.from_levels(
+            levels["timestamp"],
+            levels["price"],
+            levels["long_density"],
+            levels["short_density"],
+            levels["positions_created"],
+            levels["positions_consumed"],
+        )
+
+    def files(
+        self,
+        symbol: str,
+        interval: Optional[str],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[str]:
+        """Parquet files of the date partitions overlapping a time range."""
+        intervals = (
+            [self.root / f"symbol={symbol}" / f"interval={interval}"]
+            if interval is not None
+            else sorted((self.root / f"symbol={symbol}").glob("interval=*"))
+        )
+        files = []
+        for interval_dir in intervals:
+            day = start_time.date()
+            while day <= end_time.date():
+                files.extend(
+                    sorted(str(path) for path in (interval_dir / f"date={day}").glob("*.parquet"))
+                )
+                day += timedelta(days=1)
+        return files
+
+    def partitions(
+        self, symbol: Optional[str] = None, interval: Optional[str] = None
+    ) -> list[Path]:
+        """Date partition directories, optionally of one symbol and interval."""
+        pattern = f"symbol={symbol or '*'}/interval={interval or '*'}/date=*"
+        return sorted(path for path in self.root.glob(pattern) if path.is_dir())
+
+    def compact(
+        self,
+        symbol: Optional[str] = None,
+        interval: Optional[str] = None,
+        min_files: int = 2,
+    ) -> dict[str, Any]:
+        """Merge the files of each date partition into one.
+
+        Superseded snapshot writes are dropped and rows are sorted by
+        timestamp. The merged file is written next to the old ones and moved
+        into place before they are removed, so readers see every snapshot
+        throughout; files written during compaction are left for the next run.
+
+        Args:
+            symbol: Only compact this symbol (None for all)
+            interval: Only compact this interval (None for all)
+            min_files: Partitions with fewer files are left as they are
+
+        Returns:
+            dict with partitions compacted, files merged, and bytes before and after
+        """
+        stats = {"partitions": 0, "files_merged": 0, "bytes_before": 0, "bytes_after": 0}
+        cursor = self._cursor()
+        try:
+            for partition in self.partitions(symbol, interval):
+                files = sorted(partition.glob("*.parquet"))
+                if len(files) < max(min_files, 1):
+                    continue
+
+                target = partition / f"part-{uuid.uuid4()}.parquet"
+                staging = partition / f".{target.name}.tmp"
+                cursor.execute(
+                    f"""
+                    COPY (
+                        SELECT *
+                        FROM read_parquet(?, hive_partitioning = false)
+                        QUALIFY written_at = MAX(written_at) OVER (PARTITION BY {SNAPSHOT_KEY})
+                        ORDER BY timestamp, price_bucket NULLS FIRST
+                    ) TO '{self._sql_path(staging)}'
+                    (FORMAT parquet, COMPRESSION {self.compression})
+                    """,
+                    [[str(path) for path in files]],
+                )
+                os.replace(staging, target)
+
+                stats["bytes_before"] += sum(path.stat().st_size for path in files)
+                stats["bytes_after"] += target.stat().st_size
+                for path in files:
+                    path.unlink()
+                stats["partitions"] += 1
+                stats["files_merged"] += len(files)
+        finally:
+            cursor.close()
+
+        logger.info(
+            f"Compacted {stats['files_merged']} files in {stats['partitions']} partitions "
+            f"({stats['bytes_before']} -> {stats['bytes_after']} bytes)"
+        )
+        return stats
+
+    @staticmethod
+    def _sql_path(path: Path) -> str:
+        return str(path).replace("'", "''")
+
+
+_stores: dict[str, ParquetSnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_snapshot_store() -> Optional[ParquetSnapshotStore]:
+    """The store configured with LH_SNAPSHOT_STORE_DIR, or None if unset."""
+    root = os.getenv(SNAPSHOT_STORE_ENV)
+    if not root:
+        return None
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = ParquetSnapshotStore(root)
+        return _stores[root]
@@ -102,6 +102,53 @@ class HeatmapSnapshot:
         }
 
 
+@dataclass
+class HeatmapFrame:
+    """Delta-encoded heatmap state at a single timestamp.
+
+    A keyframe carries every active cell. Any other frame only describes what
+    changed since the previous frame: first multiply every cell of the previous
+    state by `scale` (proportional removal on an OI decrease), then overwrite
+    the cells listed here. A listed cell with zero density on both sides has
+    been emptied and should be dropped.
+    """
+
+    timestamp: datetime
+    symbol: str
+    keyframe: bool
+    scale: float = 1.0
+    cells: dict[float, HeatmapCell] = field(default_factory=dict)
+
+    # Metadata (totals describe the full state, not just the changed cells)
+    total_long_volume: float = 0.0
+    total_short_volume: float = 0.0
+    positions_created: int = 0
+    positions_consumed: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to API response format."""
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "symbol": self.symbol,
+            "keyframe": self.keyframe,
+            "scale": self.scale,
+            "levels": [
+                {
+                    "price": float(cell.price_bucket),
+                    "long_density": float(cell.long_density),
+                    "short_density": float(cell.short_density),
+                }
+                for cell in sorted(self.cells.values(), key=lambda c: c.price_bucket)
+            ],
+            "meta": {
+                "total_long_volume": self.total_long_volume,
+                "total_short_volume": self.total_short_volume,
+                "positions_created": self.positions_created,
+                "positions_consumed": self.positions_consumed,
+            },
+        }
+
+
 def calculate_liq_price(
     entry_price: Decimal,
     leverage: int,
@@ -0,0 +1,711 @@
+"""Array-backed position book for the time-evolving heatmap engine.
+
+The reference engine in time_evolving_heatmap.py keeps every position as a
+LiquidationLevel inside dict[Decimal, list[LiquidationLevel]] and does Decimal
+math on each step. This module stores the same book as NumPy columns so that
+consumption, proportional removal and bucket aggregation run as vectorised
+operations on float64 arrays.
+
+Longs and shorts live in separate SideBooks kept sorted by liquidation price,
+oriented so that the positions a candle can liquidate always form the tail:
+- Longs sorted ascending: a candle consumes every long with liq_price >= low
+- Shorts sorted descending: a candle consumes every short with liq_price <= high
+
+Consumption is therefore a binary search plus a truncation, and its cost is
+proportional to the positions actually liquidated rather than the book size.
+
+Proportional removal (negative OI delta) is O(1): each side carries a scale
+factor, and a position's volume is its stored volume times that factor.
+Removal only multiplies the factor. Stored volumes are folded back into real
+volumes lazily, when some position may have dropped below DUST_VOLUME, so
+dust pruning keeps the Decimal engine's semantics at amortised cost.
+
+Each side also keeps running per-bucket totals (BucketTotals), updated only by
+creates, consumes and dust pruning. Emitting a snapshot reads the bucket
+vectors instead of re-aggregating the whole book on every candle.
+
+With track_changes=True the book also records which buckets those updates
+touched and the combined removal factor since the last drain_changes() call,
+which is exactly what a delta-encoded frame needs: every bucket scaled by the
+factor, plus the touched buckets at their new values.
+
+A book can be frozen into a BookCheckpoint (real volumes, scale folded in) and
+rebuilt from one, so that a run can resume from persisted state instead of
+replaying history from an empty book.
+
+Optional compaction (quantum=...) merges a new position into an existing one
+of the same side and leverage whose liq_price falls in the same price quantum
+(floor(liq_price / quantum)). The merged row keeps the existing liq_price and
+carries the summed volume, so the book grows with the price range covered
+rather than with the number of candles. Compaction is lossy: volume merged
+into a row is consumed at that row's price, at most one quantum away from
+its own. With a quantum that divides the price bucket size every merge stays
+within one heatmap bucket.
+
+Columns per side:
+- liq_price: Liquidation price
+- volume: Stored position size (real volume in USDT = stored volume * scale)
+- leverage: Leverage tier (5, 10, 25, 50, 100)
+- created_idx: Index of the candle that opened the position
+- bucket: Price bucket index (floor(liq_price / price_bucket_size))
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+LONG = 1
+SHORT = -1
+
+# Positions below this volume are dropped after proportional removal
+# (same threshold as remove_proportionally in the Decimal engine)
+DUST_VOLUME = 0.01
+
+
+@dataclass
+class BookCheckpoint:
+    """Active positions of a PositionBook at a point in time.
+
+    `timestamp` is a period boundary: the book holds the effect of every candle
+    with open_time < timestamp, and a resumed run continues with the first
+    candle at or after it.
+    """
+
+    timestamp: datetime
+    side: np.ndarray  # LONG / SHORT per position (int8)
+    liq_price: np.ndarray  # float64
+    volume: np.ndarray  # Real volume in USDT (float64)
+    leverage: np.ndarray  # int16
+
+    def __len__(self) -> int:
+        return len(self.liq_price)
+
+
+class BucketTotals:
+    """Running stored volume and position count per price bucket for one side.
+
+    Buckets are addressed by integer index (floor(liq_price / bucket size))
+    and held in dense arrays starting at `offset`, grown on demand. When
+    `track_changes` is set, the indices of every bucket touched since the
+    last drain_changes() call are recorded.
+
+    With `width` set, every bucket holds one volume and one count per column
+    (leverage-weight scenario, see scenario_book.py). A position only counts
+    towards the columns in which its stored volume is non-zero.
+    """
+
+    def __init__(self, track_changes: bool = False, width: int | None = None):
+        self.offset = 0
+        self.width = width
+        self.volume = self._zeros(0, np.float64)
+        self.count = self._zeros(0, np.int64)
+        self.track_changes = track_changes
+        self._changed: list[np.ndarray] = []
+
+    def _zeros(self, length: int, dtype: type) -> np.ndarray:
+        shape = (length,) if self.width is None else (length, self.width)
+        return np.zeros(shape, dtype=dtype)
+
+    def _held(self, stored: np.ndarray) -> np.ndarray | int:
+        """Count increment per position: 1, or per column where volume is held."""
+        return 1 if self.width is None else (stored > 0).astype(np.int64)
+
+    def _occupied_pos(self) -> np.ndarray:
+        """Array positions of buckets holding at least one position."""
+        if self.width is None:
+            return np.flatnonzero(self.count)
+        return np.flatnonzero(self.count.any(axis=1))
+
+    def _cover(self, lo: int, hi: int) -> None:
+        """Grow the dense arrays so that bucket indices lo..hi are addressable."""
+        length = len(self.volume)
+        if length and self.offset <= lo and hi < self.offset + length:
+            return
+
+        if length == 0:
+            new_lo, new_hi = lo, hi + 1
+        else:
+            new_lo, new_hi = min(lo, self.offset), max(hi + 1, self.offset + length)
+        # Pad both ends so that a drifting price does not regrow every candle
+        pad = max(64, (new_hi - new_lo) // 2)
+        new_lo, new_hi = new_lo - pad, new_hi + pad
+
+        volume = self._zeros(new_hi - new_lo, np.float64)
+        count = self._zeros(new_hi - new_lo, np.int64)
+        if length:
+            start = self.offset - new_lo
+            volume[start : start + length] = self.volume
+            count[start : start + length] = self.count
+        self.offset, self.volume, self.count = new_lo, volume, count
+
+    def add(self, bucket_idx: np.ndarray, stored: np.ndarray, new_positions: bool = True) -> None:
+        """Add positions to their buckets.
+
+        With new_positions=False only volume is added (merged into positions
+        already counted in these buckets).
+        """
+        self._cover(int(bucket_idx.min()), int(bucket_idx.max()))
+        pos = bucket_idx - self.offset
+        np.add.at(self.volume, pos, stored)
+        if new_positions:
+            np.add.at(self.count, pos, self._held(stored))
+        if self.track_changes:
+            self._changed.append(bucket_idx.copy())
+
+    def subtract(self, bucket_idx: np.ndarray, stored: np.ndarray) -> None:
+        """Remove positions from their buckets.
+
+        Buckets left without positions are reset to exactly zero so that
+        float residue never shows up as a phantom cell.
+        """
+        pos = bucket_idx - self.offset
+        np.subtract.at(self.volume, pos, stored)
+        np.subtract.at(self.count, pos, self._held(stored))
+        if self.width is None:
+            self.volume[pos[self.count[pos] == 0]] = 0.0
+        else:
+            rows, cols = np.nonzero(self.count[pos] == 0)
+            self.volume[pos[rows], cols] = 0.0
+        if self.track_changes:
+            self._changed.append(bucket_idx.copy())
+
+    def rebuild(self, bucket_idx: np.ndarray, stored: np.ndarray) -> None:
+        """Recompute all totals from scratch.
+
+        Every previously occupied bucket is reported as changed.
+        """
+        if self.track_changes:
+            self._changed.append(self._occupied_pos() + self.offset)
+        self.volume[:] = 0.0
+        self.count[:] = 0
+        if len(bucket_idx):
+            self.add(bucket_idx, stored)
+
+    def occupied(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return (bucket indices, stored volume) for buckets holding positions."""
+        pos = self._occupied_pos()
+        return pos + self.offset, self.volume[pos]
+
+    def occupied_columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Like occupied(), plus a (buckets, width) mask of columns holding positions."""
+        pos = self._occupied_pos()
+        return pos + self.offset, self.volume[pos], self.count[pos] > 0
+
+    def lookup(self, bucket_idx: np.ndarray) -> np.ndarray:
+        """Return stored volume for the given buckets (zero where unoccupied)."""
+        result = np.zeros(len(bucket_idx), dtype=np.float64)
+        pos = bucket_idx - self.offset
+        inside = (pos >= 0) & (pos < len(self.volume))
+        result[inside] = self.volume[pos[inside]]
+        return result
+
+    def drain_changes(self) -> np.ndarray:
+        """Return the sorted, unique bucket indices touched since the last drain."""
+        if not self._changed:
+            return np.zeros(0, dtype=np.int64)
+        changed = np.unique(np.concatenate(self._changed))
+        self._changed = []
+        return changed
+
+
+class SideBook:
+    """Positions of one side, sorted so that consumable rows form the tail.
+
+    Rows are ordered by `key`, which is liq_price for longs and -liq_price
+    for shorts. A candle consumes every row whose key is >= its threshold.
+
+    Alongside the columns the book tracks the running sum of stored volumes,
+    a lower bound on the smallest stored volume (so proportional removal only
+    needs to touch rows when one of them may have become dust) and the
+    per-bucket totals used to emit snapshots.
+    """
+
+    _COLUMNS: tuple[tuple[str, type], ...] = (
+        ("key", np.float64),
+        ("volume", np.float64),
+        ("leverage", np.int16),
+        ("created_idx", np.int32),
+        ("bucket", np.int64),
+    )
+
+    def __init__(
+        self,
+        side: int,
+        price_bucket_size: float,
+        capacity: int = 1024,
+        track_changes: bool = False,
+        quantum: float | None = None,
+    ):
+        """Initialize an empty side book.
+
+        Args:
+            side: LONG or SHORT
+            price_bucket_size: Size of price buckets for aggregation
+            capacity: Initial number of rows to allocate (grows by doubling)
+            track_changes: Record touched buckets for delta encoding
+            quantum: Optional compaction price quantum (None disables compaction)
+        """
+        self.side = side
+        self.price_bucket_size = price_bucket_size
+        self.quantum = quantum
+        self.buckets = BucketTotals(track_changes=track_changes)
+        self.scale = 1.0
+        self._size = 0
+        self._stored_total = 0.0
+        self._min_stored = np.inf
+        for name, dtype in self._COLUMNS:
+            setattr(self, f"_{name}", self._empty_column(name, dtype, capacity))
+
+    def _empty_column(self, name: str, dtype: type, capacity: int) -> np.ndarray:
+        """Allocate an uninitialized buffer for one column."""
+        return np.empty(capacity, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def liq_price(self) -> np.ndarray:
+        key = self._key[: self._size]
+        return key if self.side == LONG else -key
+
+    @property
+    def volume(self) -> np.ndarray:
+        """Real volumes (stored volume * scale)."""
+        return self._volume[: self._size] * self.scale
+
+    @property
+    def total_volume(self) -> float:
+        """Sum of real volumes across the side."""
+        return self._stored_total * self.scale
+
+    @property
+    def leverage(self) -> np.ndarray:
+        return self._leverage[: self._size]
+
+    @property
+    def created_idx(self) -> np.ndarray:
+        return self._created_idx[: self._size]
+
+    def _reserve(self, extra: int) -> None:
+        """Grow column buffers so that `extra` more rows fit."""
+        needed = self._size + extra
+        capacity = len(self._key)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, dtype in self._COLUMNS:
+            old = getattr(self, f"_{name}")
+            new = self._empty_column(name, dtype, capacity)
+            new[: self._size] = old[: self._size]
+            setattr(self, f"_{name}", new)
+
+    def _keep(self, keep: np.ndarray) -> None:
+        """Compact the book down to the rows selected by `keep` (order preserved)."""
+        kept = int(keep.sum())
+        for name, _ in self._COLUMNS:
+            column = getattr(self, f"_{name}")
+            column[:kept] = column[: self._size][keep]
+        self._size = kept
+
+    def insert(
+        self,
+        liq_prices: np.ndarray,
+        volumes: np.ndarray,
+        leverages: np.ndarray,
+        created_idx: int,
+    ) -> int:
+        """Insert new positions, keeping rows sorted by key.
+
+        Only the few new keys are sorted; existing rows above the smallest of
+        them are shifted up by block copies, never re-sorted.
+
+        Returns:
+            Number of positions inserted
+        """
+        count = len(liq_prices)
+        if count == 0:
+            return 0
+
+        stored = volumes / self.scale
+        self._stored_total += float(stored.sum())
+        if self.quantum is not None:
+            fresh = ~self._compact_into(liq_prices, stored, leverages)
+            if not fresh.any():
+                return count
+            liq_prices, stored, leverages = self._compact_batch(
+                liq_prices[fresh], stored[fresh], leverages[fresh]
+            )
+
+        new_keys = liq_prices if self.side == LONG else -liq_prices
+        bucket_idx = np.floor(liq_prices / self.price_bucket_size).astype(np.int64)
+        self._min_stored = min(self._min_stored, float(stored.min()))
+        self.buckets.add(bucket_idx, stored)
+        self._merge(
+            {
+                "key": new_keys,
+                "volume": stored,
+                "leverage": leverages,
+                "created_idx": np.full(len(new_keys), created_idx, dtype=np.int32),
+                "bucket": bucket_idx,
+            }
+        )
+        return count
+
+    def _compact_batch(
+        self, liq_prices: np.ndarray, stored: np.ndarray, leverages: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Merge new positions sharing a leverage and price quantum among themselves.
+
+        Returns:
+            (liq_prices, stored volumes, leverages) with one row per group,
+            each keeping the price of its first position
+        """
+        # Positions opened on one candle normally have one row per leverage tier
+        if len(set(leverages.tolist())) == len(leverages):
+            return liq_prices, stored, leverages
+
+        ticks = np.floor(liq_prices / self.quantum).astype(np.int64)
+        groups = ticks * 1024 + leverages  # leverage tiers are below 1024
+        _, first, inverse = np.unique(groups, return_index=True, return_inverse=True)
+        if len(first) == len(liq_prices):
+            return liq_prices, stored, leverages
+        summed = np.zeros(len(first), dtype=np.float64)
+        np.add.at(summed, inverse, stored)
+        return liq_prices[first], summed, leverages[first]
+
+    def _compact_into(
+        self, liq_prices: np.ndarray, stored: np.ndarray, leverages: np.ndarray
+    ) -> np.ndarray:
+        """Add new positions to existing rows with the same leverage and price quantum.
+
+        Returns:
+            Boolean mask of the new positions that were absorbed
+        """
+        size = self._size
+        absorbed = np.zeros(len(liq_prices), dtype=bool)
+        if size == 0:
+            return absorbed
+
+        quantum = self.quantum
+        ticks = np.floor(liq_prices / quantum)
+        if self.side == LONG:
+            lo_keys, hi_keys = ticks * quantum, (ticks + 1) * quantum
+        else:
+            lo_keys, hi_keys = -(ticks + 1) * quantum, -ticks * quantum
+        keys = self._key[:size]
+        # One row of slack on each side absorbs rounding at the quantum edges
+        starts = np.maximum(np.searchsorted(keys, lo_keys, side="left") - 1, 0)
+        ends = np.minimum(np.searchsorted(keys, hi_keys, side="right") + 1, size)
+
+        # Candidate rows of every new position, flattened into one ragged range
+        lengths = ends - starts
+        owner = np.repeat(np.arange(len(liq_prices)), lengths)
+        candidates = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        candidates += np.repeat(starts, lengths)
+        candidate_prices = keys[candidates] if self.side == LONG else -keys[candidates]
+        matches = (self._leverage[candidates] == leverages[owner]) & (
+            np.floor(candidate_prices / quantum) == ticks[owner]
+        )
+        # Rows are unique per (leverage, quantum), so each position matches at most once
+        rows = np.zeros(len(liq_prices), dtype=np.int64)
+        rows[owner[matches]] = candidates[matches]
+        absorbed[owner[matches]] = True
+
+        if absorbed.any():
+            rows = rows[absorbed]
+            np.add.at(self._volume, rows, stored[absorbed])
+            self.buckets.add(self._bucket[rows], stored[absorbed], new_positions=False)
+        return absorbed
+
+    def _merge(self, new_columns: dict[str, np.ndarray]) -> None:
+        """Merge new rows into the sorted columns.
+
+        The new rows are sorted among themselves and their slots found by
+        binary search. Existing rows between consecutive slots move up as one
+        block each, last block first, and the new rows fill the gaps; rows
+        with equal keys keep the existing ones first.
+        """
+        order = np.argsort(new_columns["key"], kind="stable")
+        count = len(order)
+        self._reserve(count)
+
+        size = self._size
+        slots = np.searchsorted(self._key[:size], new_columns["key"][order], side="right")
+        bounds = np.append(slots, size).tolist()
+        targets = slots + np.arange(count)
+        for name, _ in self._COLUMNS:
+            column = getattr(self, f"_{name}")
+            for i in range(count - 1, -1, -1):
+                lo, hi = bounds[i], bounds[i + 1]
+                if lo < hi:
+                    column[lo + i + 1 : hi + i + 1] = column[lo:hi]
+            column[targets] = new_columns[name][order]
+
+        self._size = size + count
+
+    def pop_crossed(self, threshold: float) -> int:
+        """Remove every row whose key is >= threshold.
+
+        Args:
+            threshold: Candle low for longs, -(candle high) for shorts
+
+        Returns:
+            Number of rows removed
+        """
+        cut = int(np.searchsorted(self._key[: self._size], threshold, side="left"))
+        popped = self._size - cut
+        if popped:
+            stored = self._volume[cut : self._size]
+            self._stored_total -= float(stored.sum())
+            self.buckets.subtract(self._bucket[cut : self._size], stored)
+            self._size = cut
+            if cut == 0:
+                self._reset_scale()
+        return popped
+
+    def rescale(self, factor: float) -> None:
+        """Multiply every volume by `factor` in O(1).
+
+        Rows are only visited when the smallest stored volume may have fallen
+        below DUST_VOLUME, in which case dust is pruned and the scale folded
+        back into the stored volumes.
+
+        Args:
+            factor: Multiplier in [0, 1]
+        """
+        if self._size == 0:
+            return
+
+        self.scale *= factor
+        if self._min_stored * self.scale < DUST_VOLUME:
+            self._prune_dust()
+
+    def _prune_dust(self) -> None:
+        """Drop rows below DUST_VOLUME and fold the scale into stored volumes."""
+        real = self._volume[: self._size] * self.scale
+        self._volume[: self._size] = real
+        self._keep(real >= DUST_VOLUME)
+        self._reset_scale()
+
+    def _reset_scale(self) -> None:
+        """Recompute running totals from the stored columns, with scale reset to 1.
+
+        Only valid when stored volumes already equal real volumes.
+        """
+        stored = self._volume[: self._size]
+        self.scale = 1.0
+        self._stored_total = float(stored.sum())
+        self._min_stored = float(stored.min()) if self._size else np.inf
+        self.buckets.rebuild(self._bucket[: self._size], stored)
+
+    def bucket_totals(self) -> tuple[np.ndarray, np.ndarray]:
+        """Real volume per occupied price bucket, read from the running totals.
+
+        Returns:
+            Tuple of (bucket indices, volume per bucket), sorted by bucket index
+        """
+        bucket_idx, stored = self.buckets.occupied()
+        return bucket_idx, stored * self.scale
+
+    def bucket_volume(self, bucket_idx: np.ndarray) -> np.ndarray:
+        """Real volume in the given buckets (zero where unoccupied)."""
+        return self.buckets.lookup(bucket_idx) * self.scale
+
+
+class PositionBook:
+    """Columnar book of liquidation levels, split into sorted long and short sides."""
+
+    def __init__(
+        self,
+        price_bucket_size: float = 100.0,
+        capacity: int = 1024,
+        track_changes: bool = False,
+        quantum: float | None = None,
+    ):
+        """Initialize an empty book.
+
+        Args:
+            price_bucket_size: Size of price buckets for aggregation
+            capacity: Initial number of rows to allocate per side
+            track_changes: Record touched buckets and removal factors so that
+                drain_changes() can describe each step as a delta
+            quantum: Optional compaction price quantum (None disables compaction)
+        """
+        self.price_bucket_size = price_bucket_size
+        self.longs = SideBook(LONG, price_bucket_size, capacity, track_changes, quantum)
+        self.shorts = SideBook(SHORT, price_bucket_size, capacity, track_changes, quantum)
+        self._pending_scale = 1.0
+
+    def __len__(self) -> int:
+        """Number of active positions."""
+        return len(self.longs) + len(self.shorts)
+
+    def add(
+        self,
+        liq_prices: np.ndarray,
+        volumes: np.ndarray,
+        side: int,
+        leverages: np.ndarray,
+        created_idx: int,
+    ) -> int:
+        """Add new positions opened on one candle.
+
+        Args:
+            liq_prices: Liquidation price per position
+            volumes: Volume per position
+            side: LONG or SHORT
+            leverages: Leverage tier per position
+            created_idx: Index of the candle that opened them
+
+        Returns:
+            Number of positions added
+        """
+        book = self.longs if side == LONG else self.shorts
+        return book.insert(liq_prices, volumes, leverages, created_idx)
+
+    def consume(self, low: float, high: float) -> int:
+        """Remove positions whose liquidation price was crossed by a candle.
+
+        Uses the same inclusive boundaries as should_liquidate():
+        longs at liq_price >= low, shorts at liq_price <= high.
+
+        Args:
+            low: Candle low
+            high: Candle high
+
+        Returns:
+            Number of positions consumed
+        """
+        return self.longs.pop_crossed(low) + self.shorts.pop_crossed(-high)
+
+    def remove_proportionally(self, volume_to_remove: float) -> None:
+        """Remove volume proportionally from all active positions.
+
+        Mirrors remove_proportionally() in the Decimal engine: the removal
+        ratio is capped at 100% and positions left below DUST_VOLUME are dropped.
+        Runs in O(1) unless some position may have become dust.
+
+        Args:
+            volume_to_remove: Amount of volume to remove (absolute value)
+        """
+        total_volume = self.longs.total_volume + self.shorts.total_volume
+        if total_volume <= 0:
+            return
+
+        removal_ratio = min(volume_to_remove / total_volume, 1.0)
+        self.longs.rescale(1.0 - removal_ratio)
+        self.shorts.rescale(1.0 - removal_ratio)
+        self._pending_scale *= 1.0 - removal_ratio
+
+    def aggregate(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Aggregate active positions into price buckets.
+
+        Reads the running per-bucket totals, so the cost depends on the number
+        of occupied buckets rather than the number of positions.
+
+        Returns:
+            Tuple of (bucket prices, long density, short density), sorted by price.
+            Only buckets holding at least one active position are returned.
+        """
+        long_idx, long_totals = self.longs.bucket_totals()
+        short_idx, short_totals = self.shorts.bucket_totals()
+
+        buckets = np.union1d(long_idx, short_idx)
+        long_density = np.zeros(len(buckets), dtype=np.float64)
+        short_density = np.zeros(len(buckets), dtype=np.float64)
+        long_density[np.searchsorted(buckets, long_idx)] = long_totals
+        short_density[np.searchsorted(buckets, short_idx)] = short_totals
+        return buckets * self.price_bucket_size, long_density, short_density
+
+    def bucket_densities(self, bucket_idx: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Read long and short density for specific buckets.
+
+        Args:
+            bucket_idx: Bucket indices, as returned by drain_changes()
+
+        Returns:
+            Tuple of (bucket prices, long density, short density) in the order given.
+            Unoccupied buckets have zero density on both sides.
+        """
+        return (
+            bucket_idx * self.price_bucket_size,
+            self.longs.bucket_volume(bucket_idx),
+            self.shorts.bucket_volume(bucket_idx),
+        )
+
+    def drain_changes(self) -> tuple[np.ndarray, float]:
+        """Return what changed since the previous call and start a new interval.
+
+        Requires track_changes=True. Applying the result to the previous state
+        reproduces the current one: multiply every bucket by the scale factor,
+        then overwrite the changed buckets with bucket_densities(changed).
+
+        Returns:
+            Tuple of (changed bucket indices, combined removal factor)
+        """
+        changed = np.union1d(
+            self.longs.buckets.drain_changes(), self.shorts.buckets.drain_changes()
+        )
+        scale, self._pending_scale = self._pending_scale, 1.0
+        return changed, scale
+
+    def checkpoint(self, timestamp: datetime) -> BookCheckpoint:
+        """Freeze the active positions into a BookCheckpoint.
+
+        Args:
+            timestamp: Period boundary the book has been advanced to
+
+        Returns:
+            BookCheckpoint holding real volumes (scale folded in)
+        """
+        sides = (self.longs, self.shorts)
+        return BookCheckpoint(
+            timestamp=timestamp,
+            side=np.concatenate([np.full(len(book), book.side, dtype=np.int8) for book in sides]),
+            liq_price=np.concatenate([book.liq_price for book in sides]),
+            volume=np.concatenate([book.volume for book in sides]),
+            leverage=np.concatenate([book.leverage for book in sides]),
+        )
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        checkpoint: BookCheckpoint,
+        price_bucket_size: float = 100.0,
+        track_changes: bool = False,
+        quantum: float | None = None,
+    ) -> "PositionBook":
+        """Rebuild a book from a BookCheckpoint.
+
+        Restored positions get created_idx -1 (opened before this run). With a
+        quantum, the restored positions are compacted as they are added.
+
+        Args:
+            checkpoint: Persisted book state
+            price_bucket_size: Size of price buckets for aggregation
+            track_changes: Record touched buckets for delta encoding
+            quantum: Optional compaction price quantum
+
+        Returns:
+            PositionBook holding the checkpoint's positions
+        """
+        book = cls(
+            price_bucket_size=price_bucket_size,
+            capacity=max(1024, len(checkpoint)),
+            track_changes=track_changes,
+            quantum=quantum,
+        )
+        for side in (LONG, SHORT):
+            mask = checkpoint.side == side
+            book.add(
+                liq_prices=checkpoint.liq_price[mask].astype(np.float64),
+                volumes=checkpoint.volume[mask].astype(np.float64),
+                side=side,
+                leverages=checkpoint.leverage[mask].astype(np.int16),
+                created_idx=-1,
+            )
+        # Restoring is not a change relative to the checkpoint
+        book.drain_changes()
+        return book
@@ -0,0 +1,309 @@
+"""Position book that evaluates several leverage-weight scenarios in one pass.
+
+A liquidation level's price depends only on the entry price and the leverage
+tier, never on the weights. Every scenario therefore creates and consumes
+levels at exactly the same prices, and only the volumes differ. ScenarioBook
+keeps one row per level and a (rows, K) volume matrix, one column per
+scenario, instead of K separate PositionBooks:
+
+- Consumption pops rows once for all scenarios (the sorted tail is shared).
+- Creation inserts one row per leverage tier carrying K volumes.
+- Proportional removal differs per scenario (each scenario has its own total
+  volume), so the lazy scale factor, running total and dust bound are (K,)
+  vectors instead of scalars.
+
+A zero entry means the scenario holds nothing at that level: the tier is not
+in its distribution, or the position was pruned as dust in that scenario.
+"""
+
+import numpy as np
+
+from src.liquidationheatmap.models.position_book import (
+    DUST_VOLUME,
+    LONG,
+    SHORT,
+    BookCheckpoint,
+    BucketTotals,
+    SideBook,
+)
+
+
+class ScenarioSideBook(SideBook):
+    """SideBook whose volume column is a (rows, K) matrix."""
+
+    def __init__(self, side: int, price_bucket_size: float, scenarios: int, capacity: int = 1024):
+        """Initialize an empty side book.
+
+        Args:
+            side: LONG or SHORT
+            price_bucket_size: Size of price buckets for aggregation
+            scenarios: Number of weight scenarios (volume columns)
+            capacity: Initial number of rows to allocate (grows by doubling)
+        """
+        self.scenarios = scenarios
+        super().__init__(side, price_bucket_size, capacity)
+        self.buckets = BucketTotals(width=scenarios)
+        self.scale = np.ones(scenarios, dtype=np.float64)
+        self._stored_total = np.zeros(scenarios, dtype=np.float64)
+        self._min_stored = np.full(scenarios, np.inf)
+        self._held = np.zeros(scenarios, dtype=np.int64)
+
+    def _empty_column(self, name: str, dtype: type, capacity: int) -> np.ndarray:
+        """Allocate one column; volume gets one entry per scenario."""
+        if name == "volume":
+            return np.empty((capacity, self.scenarios), dtype=dtype)
+        return np.empty(capacity, dtype=dtype)
+
+    def insert(
+        self,
+        liq_prices: np.ndarray,
+        volumes: np.ndarray,
+        leverages: np.ndarray,
+        created_idx: int,
+    ) -> np.ndarray:
+        """Insert new levels, keeping rows sorted by key.
+
+        Args:
+            liq_prices: Liquidation price per row
+            volumes: (rows, K) volume per row and scenario
+            leverages: Leverage tier per row
+            created_idx: Index of the candle that opened them
+
+        Returns:
+            Number of positions inserted per scenario
+        """
+        if len(liq_prices) == 0:
+            return np.zeros(self.scenarios, dtype=np.int64)
+
+        stored = volumes / self.scale
+        held = stored > 0
+        bucket_idx = np.floor(liq_prices / self.price_bucket_size).astype(np.int64)
+        self._stored_total += stored.sum(axis=0)
+        self._min_stored = np.minimum(self._min_stored, np.where(held, stored, np.inf).min(axis=0))
+        created = held.sum(axis=0)
+        self._held += created
+        self.buckets.add(bucket_idx, stored)
+        self._merge(
+            {
+                "key": liq_prices if self.side == LONG else -liq_prices,
+                "volume": stored,
+                "leverage": leverages,
+                "created_idx": np.full(len(liq_prices), created_idx, dtype=np.int32),
+                "bucket": bucket_idx,
+            }
+        )
+        return created
+
+    def pop_crossed(self, threshold: float) -> np.ndarray:
+        """Remove every row whose key is >= threshold.
+
+        Args:
+            threshold: Candle low for longs, -(candle high) for shorts
+
+        Returns:
+            Number of positions removed per scenario
+        """
+        cut = int(np.searchsorted(self._key[: self._size], threshold, side="left"))
+        if cut == self._size:
+            return np.zeros(self.scenarios, dtype=np.int64)
+
+        stored = self._volume[cut : self._size]
+        popped = (stored > 0).sum(axis=0)
+        self._stored_total -= stored.sum(axis=0)
+        self._held -= popped
+        self.buckets.subtract(self._bucket[cut : self._size], stored)
+        self._size = cut
+        if cut == 0:
+            self._reset_scale()
+        else:
+            # Scenarios left empty start over, as an empty SideBook would
+            emptied = self._held == 0
+            self.scale[emptied] = 1.0
+            self._stored_total[emptied] = 0.0
+            self._min_stored[emptied] = np.inf
+        return popped
+
+    def rescale(self, factor: np.ndarray) -> None:
+        """Multiply each scenario's volumes by its factor in O(K).
+
+        Args:
+            factor: (K,) multipliers in [0, 1]
+        """
+        # Scenarios holding nothing on this side keep their scale, as an
+        # empty SideBook would
+        held = self._held > 0
+        if not held.any():
+            return
+
+        self.scale[held] *= factor[held]
+        if np.any(self._min_stored[held] * self.scale[held] < DUST_VOLUME):
+            self._prune_dust()
+
+    def _prune_dust(self) -> None:
+        """Zero entries below DUST_VOLUME and drop rows no scenario holds."""
+        real = self._volume[: self._size] * self.scale
+        real[real < DUST_VOLUME] = 0.0
+        self._volume[: self._size] = real
+        self._keep((real > 0).any(axis=1))
+        self._reset_scale()
+
+    def _reset_scale(self) -> None:
+        """Recompute the per-scenario running totals, with scale reset to 1."""
+        stored = self._volume[: self._size]
+        held = stored > 0
+        self.scale = np.ones(self.scenarios, dtype=np.float64)
+        self._stored_total = stored.sum(axis=0)
+        self._min_stored = np.where(held, stored, np.inf).min(axis=0, initial=np.inf)
+        self._held = held.sum(axis=0)
+        self.buckets.rebuild(self._bucket[: self._size], stored)
+
+    def bucket_totals(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Real volume per occupied price bucket and scenario.
+
+        Returns:
+            Tuple of (bucket indices, (buckets, K) volume, (buckets, K) mask of
+            scenarios holding positions in the bucket), sorted by bucket index
+        """
+        bucket_idx, stored, present = self.buckets.occupied_columns()
+        return bucket_idx, stored * self.scale, present
+
+
+class ScenarioBook:
+    """PositionBook counterpart holding K weight scenarios side by side."""
+
+    def __init__(self, scenarios: int, price_bucket_size: float = 100.0, capacity: int = 1024):
+        """Initialize an empty book.
+
+        Args:
+            scenarios: Number of weight scenarios
+            price_bucket_size: Size of price buckets for aggregation
+            capacity: Initial number of rows to allocate per side
+        """
+        self.scenarios = scenarios
+        self.price_bucket_size = price_bucket_size
+        self.longs = ScenarioSideBook(LONG, price_bucket_size, scenarios, capacity)
+        self.shorts = ScenarioSideBook(SHORT, price_bucket_size, scenarios, capacity)
+
+    def __len__(self) -> int:
+        """Number of active levels (rows), across all scenarios."""
+        return len(self.longs) + len(self.shorts)
+
+    def add(
+        self,
+        liq_prices: np.ndarray,
+        volumes: np.ndarray,
+        side: int,
+        leverages: np.ndarray,
+        created_idx: int,
+    ) -> np.ndarray:
+        """Add new levels opened on one candle.
+
+        Args:
+            liq_prices: Liquidation price per level
+            volumes: (levels, K) volume per level and scenario
+            side: LONG or SHORT
+            leverages: Leverage tier per level
+            created_idx: Index of the candle that opened them
+
+        Returns:
+            Number of positions added per scenario
+        """
+        book = self.longs if side == LONG else self.shorts
+        return book.insert(liq_prices, volumes, leverages, created_idx)
+
+    def consume(self, low: float, high: float) -> np.ndarray:
+        """Remove levels whose liquidation price was crossed by a candle.
+
+        Returns:
+            Number of positions consumed per scenario
+        """
+        return self.longs.pop_crossed(low) + self.shorts.pop_crossed(-high)
+
+    def remove_proportionally(self, volume_to_remove: float) -> None:
+        """Remove the same absolute volume from every scenario, proportionally.
+
+        Each scenario gets its own removal ratio (capped at 100%), computed
+        from its own total volume, as PositionBook.remove_proportionally() would.
+
+        Args:
+            volume_to_remove: Amount of volume to remove (absolute value)
+        """
+        total_volume = self.longs.total_volume + self.shorts.total_volume
+        active = total_volume > 0
+        if not active.any():
+            return
+
+        ratio = np.zeros(self.scenarios, dtype=np.float64)
+        np.divide(volume_to_remove, total_volume, out=ratio, where=active)
+        factor = 1.0 - np.minimum(ratio, 1.0)
+        self.longs.rescale(factor)
+        self.shorts.rescale(factor)
+
+    def aggregate(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Aggregate active positions into price buckets for every scenario.
+
+        Returns:
+            Tuple of (bucket prices, long density (B, K), short density (B, K),
+            present (B, K)), sorted by price. `present` marks the buckets each
+            scenario holds at least one position in; PositionBook.aggregate()
+            for scenario k returns exactly the rows where present[:, k].
+        """
+        long_idx, long_totals, long_present = self.longs.bucket_totals()
+        short_idx, short_totals, short_present = self.shorts.bucket_totals()
+
+        buckets = np.union1d(long_idx, short_idx)
+        shape = (len(buckets), self.scenarios)
+        long_density = np.zeros(shape, dtype=np.float64)
+        short_density = np.zeros(shape, dtype=np.float64)
+        present = np.zeros(shape, dtype=bool)
+        long_pos = np.searchsorted(buckets, long_idx)
+        short_pos = np.searchsorted(buckets, short_idx)
+        long_density[long_pos] = long_totals
+        short_density[short_pos] = short_totals
+        present[long_pos] |= long_present
+        present[short_pos] |= short_present
+        return buckets * self.price_bucket_size, long_density, short_density, present
+
+    @classmethod
+    def from_checkpoints(
+        cls,
+        checkpoints: list[BookCheckpoint],
+        price_bucket_size: float = 100.0,
+    ) -> "ScenarioBook":
+        """Rebuild a book from one BookCheckpoint per scenario.
+
+        Each checkpoint's positions carry volume only in their own scenario's
+        column. Restored positions get created_idx -1 (opened before this run).
+
+        Args:
+            checkpoints: Persisted book state per scenario, same timestamp
+            price_bucket_size: Size of price buckets for aggregation
+
+        Returns:
+            ScenarioBook holding every checkpoint's positions
+
+        Raises:
+            ValueError: If the checkpoints are not all at the same timestamp
+        """
+        if len({checkpoint.timestamp for checkpoint in checkpoints}) > 1:
+            raise ValueError("Scenario checkpoints must share the same timestamp")
+
+        scenarios = len(checkpoints)
+        book = cls(
+            scenarios,
+            price_bucket_size=price_bucket_size,
+            capacity=max(1024, sum(len(checkpoint) for checkpoint in checkpoints)),
+        )
+        for k, checkpoint in enumerate(checkpoints):
+            for side in (LONG, SHORT):
+                mask = checkpoint.side == side
+                volumes = np.zeros((int(mask.sum()), scenarios), dtype=np.float64)
+                volumes[:, k] = checkpoint.volume[mask]
+                book.add(
+                    liq_prices=checkpoint.liq_price[mask].astype(np.float64),
+                    volumes=volumes,
+                    side=side,
+                    leverages=checkpoint.leverage[mask].astype(np.int16),
+                    created_idx=-1,
+                )
+        return book
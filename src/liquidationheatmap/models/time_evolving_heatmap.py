@@ -13,18 +13,65 @@ Research decisions (see research.md):
 - Q1: Proportional removal for negative OI delta
 - Q2: Inclusive boundary check for price crossing (<=, >=)
 - Q3: Configurable leverage distribution with sensible defaults
+
+Two precision modes are available through calculate_time_evolving_heatmap(precision=...):
+- "decimal" (default): Reference engine, LiquidationLevel objects with
+  Decimal math. Kept for audit and validation.
+- "float64": NumPy-backed PositionBook with float64 math (see
+  position_book.py). Used for serving: the API and precompute_heatmap.py
+  request it explicitly. Its snapshot cells hold float values.
+
+Float64 results stay within FLOAT64_MAX_REL_DEVIATION of the Decimal
+reference on every cell density and snapshot total, or within
+FLOAT64_MAX_ABS_DEVIATION USDT for values near zero.
+
+calculate_heatmap_frames() runs the float64 engine in delta-encoded form: a
+keyframe every `keyframe_interval` candles and, in between, only the buckets
+that changed plus the proportional removal factor. decode_frames() turns
+frames back into full snapshots. advance_heatmap_frames() continues a live
+book with delta frames only, for streaming.
+
+calculate_heatmap_scenarios() evaluates K leverage distributions in a single
+float64 pass over a ScenarioBook (see scenario_book.py), one volume column
+per distribution.
+
+Both float64 entry points accept `compaction_quantum`, which merges positions
+of the same side and leverage within one price quantum (see position_book.py)
+so that long windows keep a book sized by price range, not candle count.
+
+The float64 engine can also start from a BookCheckpoint instead of an empty
+book. build_book_checkpoints() advances a book through history and freezes it
+at every period boundary (daily by default); a request then loads the nearest
+checkpoint and replays only the candles after it, with `emit_from` skipping
+output for the warm-up candles before the requested window.
+calculate_rolling_heatmap() also returns the book frozen before the last
+candle, so a window that moves forward can resume there instead of replaying
+from the window start.
 """
 
 from collections import defaultdict
-from datetime import datetime
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Any, Literal, Protocol
 
+import numpy as np
+
 from src.liquidationheatmap.models.position import (
+    HeatmapCell,
+    HeatmapFrame,
     HeatmapSnapshot,
     LiquidationLevel,
     calculate_liq_price,
 )
+from src.liquidationheatmap.models.position_book import (
+    LONG,
+    SHORT,
+    BookCheckpoint,
+    PositionBook,
+)
+from src.liquidationheatmap.models.scenario_book import ScenarioBook
 
 # Default leverage distribution (see research.md Q3)
 DEFAULT_LEVERAGE_WEIGHTS: list[tuple[int, Decimal]] = [
@@ -35,6 +82,23 @@ DEFAULT_LEVERAGE_WEIGHTS: list[tuple[int, Decimal]] = [
     (100, Decimal("0.10")),  # 10% at 100x (high risk)
 ]
 
+# Maintenance margin rate used by calculate_liq_price()
+DEFAULT_MMR = Decimal("0.004")
+
+HeatmapPrecision = Literal["float64", "decimal"]
+
+# Documented maximum deviation of precision="float64" from the Decimal reference
+# (asserted by the equivalence tests in tests/unit/models/test_position_book.py)
+FLOAT64_MAX_REL_DEVIATION = 1e-9
+FLOAT64_MAX_ABS_DEVIATION = 1e-6  # USDT, for densities near zero
+
+# Frames between keyframes in delta-encoded output (one day of 15m candles)
+DEFAULT_KEYFRAME_INTERVAL = 96
+
+# Spacing of persisted engine checkpoints; boundaries are aligned to CHECKPOINT_EPOCH
+DEFAULT_CHECKPOINT_EVERY = timedelta(days=1)
+CHECKPOINT_EPOCH = datetime(1970, 1, 1)
+
 
 class CandleLike(Protocol):
     """Protocol for candle-like objects."""
@@ -46,6 +110,289 @@ class CandleLike(Protocol):
     close: Decimal
 
 
+@dataclass
+class Candle:
+    """OHLCV candle as loaded from the klines tables."""
+
+    open_time: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal
+
+
+@dataclass
+class CandleColumns:
+    """Engine inputs as parallel columns, one row per candle.
+
+    The float64 engine reads these directly; DuckDBService.load_heatmap_inputs()
+    fills them from fetchnumpy() with the OI delta already joined in SQL, so no
+    per-row objects are built before the algorithm starts.
+    """
+
+    open_time: np.ndarray  # datetime64
+    open: np.ndarray  # float64
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    oi_delta: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    @classmethod
+    def from_candles(cls, candles: list[Any], oi_deltas: list[Decimal]) -> "CandleColumns":
+        """Build columns from candle-like objects and their OI deltas.
+
+        Raises:
+            ValueError: If candles and oi_deltas have different lengths
+        """
+        if len(candles) != len(oi_deltas):
+            raise ValueError(
+                f"candles ({len(candles)}) and oi_deltas ({len(oi_deltas)}) must have same length"
+            )
+        return cls(
+            open_time=np.array([c.open_time for c in candles], dtype="datetime64[us]"),
+            open=np.array([float(c.open) for c in candles], dtype=np.float64),
+            high=np.array([float(c.high) for c in candles], dtype=np.float64),
+            low=np.array([float(c.low) for c in candles], dtype=np.float64),
+            close=np.array([float(c.close) for c in candles], dtype=np.float64),
+            oi_delta=np.array([float(d) for d in oi_deltas], dtype=np.float64),
+        )
+
+    def sorted(self) -> "CandleColumns":
+        """Return the rows in open_time order (stable), copying only if needed."""
+        if np.all(self.open_time[1:] >= self.open_time[:-1]):
+            return self
+        return self._take(np.argsort(self.open_time, kind="stable"))
+
+    def since(self, start: datetime) -> "CandleColumns":
+        """Return the rows with open_time >= start. Rows must be sorted."""
+        return self._take(slice(self.index_at(start), None))
+
+    def index_at(self, start: datetime) -> int:
+        """Index of the first row with open_time >= start. Rows must be sorted."""
+        return int(np.searchsorted(self.open_time, np.datetime64(start, "us"), side="left"))
+
+    def timestamps(self) -> list[datetime]:
+        """open_time as datetime objects."""
+        return self.open_time.astype("datetime64[us]").tolist()
+
+    def to_candles(self) -> tuple[list[Candle], list[Decimal]]:
+        """Convert back to Candle objects and Decimal deltas for the decimal engine."""
+        candles = [
+            Candle(
+                open_time=open_time,
+                open=Decimal(str(o)),
+                high=Decimal(str(h)),
+                low=Decimal(str(lo)),
+                close=Decimal(str(c)),
+                volume=Decimal("0"),
+            )
+            for open_time, o, h, lo, c in zip(
+                self.timestamps(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+            )
+        ]
+        return candles, [Decimal(str(delta)) for delta in self.oi_delta.tolist()]
+
+    def _take(self, rows: Any) -> "CandleColumns":
+        return CandleColumns(
+            open_time=self.open_time[rows],
+            open=self.open[rows],
+            high=self.high[rows],
+            low=self.low[rows],
+            close=self.close[rows],
+            oi_delta=self.oi_delta[rows],
+        )
+
+
+@dataclass
+class SnapshotColumns:
+    """Heatmap snapshots as parallel columns, with the levels in CSR form.
+
+    timestamp and the position counts hold one row per snapshot. price,
+    long_density and short_density hold one row per occupied level, sorted by
+    price within a snapshot; the levels of snapshot i are rows offsets[i] to
+    offsets[i + 1]. DuckDBService.load_snapshot_columns() fills them from
+    fetchnumpy() with the long/short pivot done in SQL, so stored snapshots
+    are served without per-cell HeatmapSnapshot objects.
+    """
+
+    timestamp: np.ndarray  # datetime64[us]
+    positions_created: np.ndarray  # int64
+    positions_consumed: np.ndarray
+    offsets: np.ndarray  # int64, len(timestamp) + 1
+    price: np.ndarray  # float64
+    long_density: np.ndarray
+    short_density: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @classmethod
+    def from_levels(
+        cls,
+        level_time: np.ndarray,
+        price: np.ndarray,
+        long_density: np.ndarray,
+        short_density: np.ndarray,
+        positions_created: np.ndarray,
+        positions_consumed: np.ndarray,
+    ) -> "SnapshotColumns":
+        """Group level rows sorted by (timestamp, price) into snapshots.
+
+        The position counts are per level row; each snapshot takes those of its
+        first level.
+        """
+        level_time = np.asarray(level_time, dtype="datetime64[us]")
+        timestamp, starts = np.unique(level_time, return_index=True)
+        offsets = np.append(starts, len(level_time)).astype(np.int64)
+        return cls(
+            timestamp=timestamp,
+            positions_created=np.asarray(positions_created, dtype=np.int64)[starts],
+            positions_consumed=np.asarray(positions_consumed, dtype=np.int64)[starts],
+            offsets=offsets,
+            price=np.asarray(price, dtype=np.float64),
+            long_density=np.asarray(long_density, dtype=np.float64),
+            short_density=np.asarray(short_density, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_snapshots(
+        cls, snapshots: list[HeatmapSnapshot] | list[HeatmapFrame], keep_empty: bool = False
+    ) -> "SnapshotColumns":
+        """Build columns from engine snapshots, keeping the levels that hold volume.
+
+        With keep_empty=True every listed level is kept, as delta frames need:
+        a level with zero density on both sides marks one that was removed.
+        """
+        counts, prices, longs, shorts = [], [], [], []
+        for snapshot in snapshots:
+            cells = sorted(
+                (float(cell.price_bucket), float(cell.long_density), float(cell.short_density))
+                for cell in snapshot.cells.values()
+                if keep_empty or cell.total_density > 0
+            )
+            counts.append(len(cells))
+            for price, long_density, short_density in cells:
+                prices.append(price)
+                longs.append(long_density)
+                shorts.append(short_density)
+
+        offsets = np.zeros(len(snapshots) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            timestamp=np.array([s.timestamp for s in snapshots], dtype="datetime64[us]"),
+            positions_created=np.array([s.positions_created for s in snapshots], dtype=np.int64),
+            positions_consumed=np.array([s.positions_consumed for s in snapshots], dtype=np.int64),
+            offsets=offsets,
+            price=np.array(prices, dtype=np.float64),
+            long_density=np.array(longs, dtype=np.float64),
+            short_density=np.array(shorts, dtype=np.float64),
+        )
+
+    @classmethod
+    def concatenate(cls, parts: list["SnapshotColumns"]) -> "SnapshotColumns":
+        """Join snapshot columns end to end (parts must not overlap in time)."""
+        level_starts = np.cumsum([0] + [len(part.price) for part in parts[:-1]])
+        return cls(
+            timestamp=np.concatenate(
+                [np.empty(0, "datetime64[us]")] + [part.timestamp for part in parts]
+            ),
+            positions_created=np.concatenate(
+                [np.empty(0, np.int64)] + [part.positions_created for part in parts]
+            ),
+            positions_consumed=np.concatenate(
+                [np.empty(0, np.int64)] + [part.positions_consumed for part in parts]
+            ),
+            offsets=np.concatenate(
+                [np.zeros(1, np.int64)]
+                + [part.offsets[1:] + start for part, start in zip(parts, level_starts)]
+            ),
+            price=np.concatenate([np.empty(0)] + [part.price for part in parts]),
+            long_density=np.concatenate([np.empty(0)] + [part.long_density for part in parts]),
+            short_density=np.concatenate([np.empty(0)] + [part.short_density for part in parts]),
+        )
+
+    def take(self, index: np.ndarray) -> "SnapshotColumns":
+        """The snapshots at the given row positions, in that order."""
+        index = np.asarray(index, dtype=np.int64)
+        counts = self.offsets[index + 1] - self.offsets[index]
+        offsets = np.zeros(len(index) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        rows = np.repeat(self.offsets[index] - offsets[:-1], counts) + np.arange(
+            offsets[-1], dtype=np.int64
+        )
+        return SnapshotColumns(
+            timestamp=self.timestamp[index],
+            positions_created=self.positions_created[index],
+            positions_consumed=self.positions_consumed[index],
+            offsets=offsets,
+            price=self.price[rows],
+            long_density=self.long_density[rows],
+            short_density=self.short_density[rows],
+        )
+
+    def reindex(self, timestamps: np.ndarray) -> "SnapshotColumns":
+        """Snapshots at the given sorted timestamps.
+
+        Timestamps without a stored snapshot get an empty one with zero
+        position counts; stored snapshots at other timestamps are dropped.
+        """
+        timestamps = np.asarray(timestamps, dtype="datetime64[us]")
+        index = np.searchsorted(self.timestamp, timestamps)
+        clipped = np.minimum(index, max(len(self) - 1, 0))
+        found = (index < len(self)) & (self.timestamp[clipped] == timestamps)
+        index = index[found]
+
+        counts = np.zeros(len(timestamps), dtype=np.int64)
+        counts[found] = self.offsets[index + 1] - self.offsets[index]
+        offsets = np.zeros(len(timestamps) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        # Source row of every kept level: its snapshot's start plus its rank within it
+        kept = counts[found]
+        rows = np.repeat(self.offsets[index] - offsets[:-1][found], kept) + np.arange(
+            kept.sum(), dtype=np.int64
+        )
+
+        created = np.zeros(len(timestamps), dtype=np.int64)
+        consumed = np.zeros(len(timestamps), dtype=np.int64)
+        created[found] = self.positions_created[index]
+        consumed[found] = self.positions_consumed[index]
+        return SnapshotColumns(
+            timestamp=timestamps,
+            positions_created=created,
+            positions_consumed=consumed,
+            offsets=offsets,
+            price=self.price[rows],
+            long_density=self.long_density[rows],
+            short_density=self.short_density[rows],
+        )
+
+    def window(self, start: datetime, end: datetime) -> slice:
+        """Rows of the snapshots with start <= timestamp <= end."""
+        lo = np.searchsorted(self.timestamp, np.datetime64(start, "us"), side="left")
+        hi = np.searchsorted(self.timestamp, np.datetime64(end, "us"), side="right")
+        return slice(int(lo), int(hi))
+
+    def totals(self) -> tuple[np.ndarray, np.ndarray]:
+        """Total long and short density of every snapshot."""
+        rows = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        return (
+            np.bincount(rows, weights=self.long_density, minlength=len(self)),
+            np.bincount(rows, weights=self.short_density, minlength=len(self)),
+        )
+
+    def timestamps(self) -> list[datetime]:
+        """timestamp as datetime objects."""
+        return self.timestamp.astype("datetime64[us]").tolist()
+
+
 def should_liquidate(pos: LiquidationLevel, candle: CandleLike) -> bool:
     """Check if candle price action would trigger this liquidation.
 
@@ -302,12 +649,50 @@ def _aggregate_to_snapshot(
     return snapshot
 
 
+def _sort_inputs(
+    candles: list[Any] | CandleColumns, oi_deltas: list[Decimal] | None
+) -> list[tuple[Any, Decimal]]:
+    """Validate input lengths and pair candles with OI deltas in chronological order.
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths
+    """
+    if isinstance(candles, CandleColumns):
+        candles, oi_deltas = _column_inputs(candles, oi_deltas).to_candles()
+    if len(candles) != len(oi_deltas):
+        raise ValueError(
+            f"candles ({len(candles)}) and oi_deltas ({len(oi_deltas)}) must have same length"
+        )
+
+    return sorted(zip(candles, oi_deltas), key=lambda x: x[0].open_time)
+
+
+def _column_inputs(
+    candles: list[Any] | CandleColumns, oi_deltas: list[Decimal] | None
+) -> CandleColumns:
+    """Engine inputs as CandleColumns in chronological order.
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths, or
+            oi_deltas is given alongside CandleColumns (which carry their own)
+    """
+    if isinstance(candles, CandleColumns):
+        if oi_deltas is not None:
+            raise ValueError("CandleColumns already carry oi_delta; pass oi_deltas=None")
+        return candles.sorted()
+    return CandleColumns.from_candles(candles, oi_deltas if oi_deltas is not None else []).sorted()
+
+
 def calculate_time_evolving_heatmap(
-    candles: list[Any],
-    oi_deltas: list[Decimal],
+    candles: list[Any] | CandleColumns,
+    oi_deltas: list[Decimal] | None,
     symbol: str,
     leverage_weights: list[tuple[int, Decimal]] | None = None,
     price_bucket_size: Decimal = Decimal("100"),
+    precision: HeatmapPrecision = "decimal",
+    checkpoint: BookCheckpoint | None = None,
+    emit_from: datetime | None = None,
+    compaction_quantum: Decimal | None = None,
 ) -> list[HeatmapSnapshot]:
     """Calculate time-evolving liquidation heatmap.
 
@@ -315,29 +700,52 @@ def calculate_time_evolving_heatmap(
     tracking position lifecycle (creation → consumption → closure) with
     proper price-crossing detection logic.
 
+    precision="float64" produces the same snapshots as the "decimal"
+    reference within FLOAT64_MAX_REL_DEVIATION (relative, on densities and
+    totals), but its cells hold float values instead of Decimal.
+
     Args:
-        candles: List of candle-like objects with OHLC data
-        oi_deltas: List of OI delta values, one per candle
+        candles: List of candle-like objects with OHLC data, or CandleColumns
+        oi_deltas: List of OI delta values, one per candle (None with CandleColumns)
         symbol: Trading pair symbol (e.g., "BTCUSDT")
         leverage_weights: Optional custom leverage distribution
         price_bucket_size: Size of price buckets for visualization
+        precision: "float64" (NumPy position book) or "decimal" (reference)
+        checkpoint: Optional book state to resume from (float64 only).
+            Candles before checkpoint.timestamp are already in it and are skipped.
+        emit_from: Optional start of output. Earlier candles still advance the
+            book (warm-up) but produce no snapshot.
+        compaction_quantum: Optional price quantum for position compaction
+            (float64 only, see position_book.py). None keeps every position.
 
     Returns:
-        List of HeatmapSnapshot objects, one per candle
+        List of HeatmapSnapshot objects, one per emitted candle
 
     Raises:
-        ValueError: If candles and oi_deltas have different lengths
+        ValueError: If candles and oi_deltas have different lengths, precision
+            is unknown, or a checkpoint or compaction is requested with "decimal"
     """
-    if len(candles) != len(oi_deltas):
-        raise ValueError(
-            f"candles ({len(candles)}) and oi_deltas ({len(oi_deltas)}) must have same length"
+    if precision not in ("float64", "decimal"):
+        raise ValueError(f"Unknown precision: {precision}. Expected 'float64' or 'decimal'")
+
+    if precision == "float64":
+        return _calculate_with_position_book(
+            columns=_column_inputs(candles, oi_deltas),
+            symbol=symbol,
+            leverage_weights=leverage_weights,
+            price_bucket_size=price_bucket_size,
+            checkpoint=checkpoint,
+            emit_from=emit_from,
+            compaction_quantum=compaction_quantum,
         )
 
-    if not candles:
-        return []
+    if checkpoint is not None:
+        raise ValueError("Checkpoints are only supported with precision='float64'")
+    if compaction_quantum is not None:
+        raise ValueError("Compaction is only supported with precision='float64'")
 
     # Sort candles chronologically
-    sorted_pairs = sorted(zip(candles, oi_deltas), key=lambda x: x[0].open_time)
+    sorted_pairs = _sort_inputs(candles, oi_deltas)
 
     active_positions: dict[Decimal, list[LiquidationLevel]] = defaultdict(list)
     snapshots: list[HeatmapSnapshot] = []
@@ -350,6 +758,9 @@ def calculate_time_evolving_heatmap(
             leverage_weights=leverage_weights,
         )
 
+        if emit_from is not None and candle.open_time < emit_from:
+            continue
+
         snapshot = _aggregate_to_snapshot(
             timestamp=candle.open_time,
             symbol=symbol,
@@ -362,3 +773,691 @@ def calculate_time_evolving_heatmap(
         snapshots.append(snapshot)
 
     return snapshots
+
+
+def calculate_heatmap_frames(
+    candles: list[Any] | CandleColumns,
+    oi_deltas: list[Decimal] | None,
+    symbol: str,
+    leverage_weights: list[tuple[int, Decimal]] | None = None,
+    price_bucket_size: Decimal = Decimal("100"),
+    keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    checkpoint: BookCheckpoint | None = None,
+    emit_from: datetime | None = None,
+    compaction_quantum: Decimal | None = None,
+) -> list[HeatmapFrame]:
+    """Calculate the time-evolving heatmap as delta-encoded frames.
+
+    Runs the float64 engine and emits a keyframe (every active cell) on the
+    first emitted candle and every `keyframe_interval` candles after it. The frames in
+    between carry only the buckets touched by creates, consumes or dust
+    pruning, plus the proportional removal factor, read straight from the
+    position book's change tracking. Full snapshots are never built, so the
+    cost per frame follows the number of changed buckets.
+
+    decode_frames(result) reproduces calculate_time_evolving_heatmap(...,
+    precision="float64") within float64 rounding.
+
+    Args:
+        candles: List of candle-like objects with OHLC data, or CandleColumns
+        oi_deltas: List of OI delta values, one per candle (None with CandleColumns)
+        symbol: Trading pair symbol (e.g., "BTCUSDT")
+        leverage_weights: Optional custom leverage distribution
+        price_bucket_size: Size of price buckets for visualization
+        keyframe_interval: Number of frames between keyframes
+        checkpoint: Optional book state to resume from
+        emit_from: Optional start of output (earlier candles are warm-up)
+        compaction_quantum: Optional price quantum for position compaction
+
+    Returns:
+        List of HeatmapFrame objects, one per emitted candle
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths,
+            or keyframe_interval is not positive
+    """
+    if keyframe_interval < 1:
+        raise ValueError(f"keyframe_interval must be positive, got {keyframe_interval}")
+
+    columns, book = _prepare_position_book(
+        _column_inputs(candles, oi_deltas),
+        price_bucket_size,
+        checkpoint,
+        track_changes=True,
+        compaction_quantum=compaction_quantum,
+    )
+    timestamps = columns.timestamps()
+    emit_start = columns.index_at(emit_from) if emit_from is not None else 0
+    frames: list[HeatmapFrame] = []
+
+    for idx, created, consumed in _run_position_book(columns, book, leverage_weights):
+        changed, scale = book.drain_changes()
+        if idx < emit_start:
+            continue
+
+        frames.append(
+            _frame_from_book(
+                timestamp=timestamps[idx],
+                symbol=symbol,
+                book=book,
+                keyframe=len(frames) % keyframe_interval == 0,
+                changed=changed,
+                scale=scale,
+                positions_created=created,
+                positions_consumed=consumed,
+            )
+        )
+
+    return frames
+
+
+def advance_heatmap_frames(
+    book: PositionBook,
+    candles: list[Any] | CandleColumns,
+    oi_deltas: list[Decimal] | None,
+    symbol: str,
+    leverage_weights: list[tuple[int, Decimal]] | None = None,
+    emit_from: datetime | None = None,
+) -> list[HeatmapFrame]:
+    """Advance a live, change-tracking book and return one delta frame per candle.
+
+    For consumers that keep a book between calls (heatmap streaming): unlike
+    calculate_heatmap_frames() no keyframes are emitted, so the frames
+    continue whatever state the consumer already holds. Use heatmap_keyframe()
+    to describe the book in full.
+
+    Args:
+        book: PositionBook created with track_changes=True; mutated in place
+        candles: List of candle-like objects with OHLC data, or CandleColumns
+        oi_deltas: List of OI delta values, one per candle (None with CandleColumns)
+        symbol: Trading pair symbol (e.g., "BTCUSDT")
+        leverage_weights: Optional custom leverage distribution
+        emit_from: Optional start of output (earlier candles only advance the book)
+
+    Returns:
+        List of non-key HeatmapFrame objects, one per emitted candle
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths
+    """
+    columns = _column_inputs(candles, oi_deltas)
+    timestamps = columns.timestamps()
+    emit_start = columns.index_at(emit_from) if emit_from is not None else 0
+    frames: list[HeatmapFrame] = []
+
+    for idx, created, consumed in _run_position_book(columns, book, leverage_weights):
+        changed, scale = book.drain_changes()
+        if idx >= emit_start:
+            frames.append(
+                _frame_from_book(
+                    timestamp=timestamps[idx],
+                    symbol=symbol,
+                    book=book,
+                    keyframe=False,
+                    changed=changed,
+                    scale=scale,
+                    positions_created=created,
+                    positions_consumed=consumed,
+                )
+            )
+
+    return frames
+
+
+def heatmap_keyframe(book: PositionBook, timestamp: datetime, symbol: str) -> HeatmapFrame:
+    """Describe every active cell of a book as a keyframe.
+
+    Does not drain the book's change tracking, so frames from a later
+    advance_heatmap_frames() call still apply on top of this keyframe.
+    """
+    return _frame_from_book(
+        timestamp=timestamp,
+        symbol=symbol,
+        book=book,
+        keyframe=True,
+        changed=None,
+        scale=1.0,
+        positions_created=0,
+        positions_consumed=0,
+    )
+
+
+def _frame_from_book(
+    timestamp: datetime,
+    symbol: str,
+    book: PositionBook,
+    keyframe: bool,
+    changed: np.ndarray | None,
+    scale: float,
+    positions_created: int,
+    positions_consumed: int,
+) -> HeatmapFrame:
+    """Build a keyframe (every active cell) or a delta frame (the changed buckets)."""
+    if keyframe:
+        prices, long_density, short_density = book.aggregate()
+        scale = 1.0
+    else:
+        prices, long_density, short_density = book.bucket_densities(changed)
+
+    return HeatmapFrame(
+        timestamp=timestamp,
+        symbol=symbol,
+        keyframe=keyframe,
+        scale=scale,
+        cells={
+            price: HeatmapCell(price_bucket=price, long_density=long_vol, short_density=short_vol)
+            for price, long_vol, short_vol in zip(
+                prices.tolist(), long_density.tolist(), short_density.tolist()
+            )
+        },
+        total_long_volume=book.longs.total_volume,
+        total_short_volume=book.shorts.total_volume,
+        positions_created=positions_created,
+        positions_consumed=positions_consumed,
+    )
+
+
+def decode_frames(frames: list[HeatmapFrame]) -> list[HeatmapSnapshot]:
+    """Expand delta-encoded frames back into full snapshots.
+
+    Reference decoder for calculate_heatmap_frames(); API clients apply the
+    same rules to the delta response format.
+
+    Args:
+        frames: Frames in order, starting with a keyframe
+
+    Returns:
+        List of HeatmapSnapshot objects, one per frame
+
+    Raises:
+        ValueError: If the first frame is not a keyframe
+    """
+    if frames and not frames[0].keyframe:
+        raise ValueError("Frame sequence must start with a keyframe")
+
+    state: dict[float, tuple[float, float]] = {}
+    snapshots: list[HeatmapSnapshot] = []
+
+    for frame in frames:
+        if frame.keyframe:
+            state = {}
+        elif frame.scale != 1.0:
+            state = {
+                price: (long_vol * frame.scale, short_vol * frame.scale)
+                for price, (long_vol, short_vol) in state.items()
+            }
+
+        for price, cell in frame.cells.items():
+            if cell.long_density > 0 or cell.short_density > 0:
+                state[price] = (cell.long_density, cell.short_density)
+            else:
+                state.pop(price, None)
+
+        snapshot = HeatmapSnapshot(
+            timestamp=frame.timestamp,
+            symbol=frame.symbol,
+            total_long_volume=frame.total_long_volume,
+            total_short_volume=frame.total_short_volume,
+            positions_created=frame.positions_created,
+            positions_consumed=frame.positions_consumed,
+        )
+        snapshot.cells = {
+            price: HeatmapCell(price_bucket=price, long_density=long_vol, short_density=short_vol)
+            for price, (long_vol, short_vol) in sorted(state.items())
+        }
+        snapshots.append(snapshot)
+
+    return snapshots
+
+
+def calculate_heatmap_scenarios(
+    candles: list[Any] | CandleColumns,
+    oi_deltas: list[Decimal] | None,
+    symbol: str,
+    weight_scenarios: list[list[tuple[int, Decimal]] | None],
+    price_bucket_size: Decimal = Decimal("100"),
+    checkpoints: list[BookCheckpoint] | None = None,
+    emit_from: datetime | None = None,
+) -> list[list[HeatmapSnapshot]]:
+    """Calculate the time-evolving heatmap for K leverage distributions in one pass.
+
+    Liquidation prices depend only on the leverage tier, so every scenario
+    creates and consumes levels at the same prices. The float64 engine runs
+    once on a ScenarioBook carrying a (levels, K) volume matrix instead of K
+    times on separate books; proportional removal is applied per scenario.
+
+    Result k matches calculate_time_evolving_heatmap(...,
+    leverage_weights=weight_scenarios[k], precision="float64") within float64
+    rounding. Repeated leverages within one distribution are merged into a
+    single tier, so positions_created counts tiers, not duplicate entries.
+
+    Args:
+        candles: List of candle-like objects with OHLC data, or CandleColumns
+        oi_deltas: List of OI delta values, one per candle (None with CandleColumns)
+        symbol: Trading pair symbol (e.g., "BTCUSDT")
+        weight_scenarios: K leverage distributions (None for the defaults)
+        price_bucket_size: Size of price buckets for visualization
+        checkpoints: Optional book state per scenario to resume from (same timestamp)
+        emit_from: Optional start of output (earlier candles are warm-up)
+
+    Returns:
+        K lists of HeatmapSnapshot objects, one list per scenario and one
+        snapshot per emitted candle
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths, no scenario
+            is given, or checkpoints do not match the scenarios
+    """
+    if not weight_scenarios:
+        raise ValueError("At least one weight scenario is required")
+    if checkpoints is not None and len(checkpoints) != len(weight_scenarios):
+        raise ValueError("Expected one checkpoint per weight scenario")
+
+    columns = _column_inputs(candles, oi_deltas)
+    leverages, weights = _scenario_weight_matrix(weight_scenarios)
+    scenarios = len(weight_scenarios)
+
+    if checkpoints is None:
+        book = ScenarioBook(scenarios, price_bucket_size=float(price_bucket_size))
+    else:
+        book = ScenarioBook.from_checkpoints(
+            checkpoints, price_bucket_size=float(price_bucket_size)
+        )
+        columns = columns.since(checkpoints[0].timestamp)
+
+    timestamps = columns.timestamps()
+    emit_start = columns.index_at(emit_from) if emit_from is not None else 0
+    results: list[list[HeatmapSnapshot]] = [[] for _ in range(scenarios)]
+    for idx, created, consumed in _advance_book(columns, book, leverages, weights):
+        if idx < emit_start:
+            continue
+
+        prices, long_density, short_density, present = book.aggregate()
+        created = np.broadcast_to(created, (scenarios,)).tolist()
+        consumed = consumed.tolist()
+        for k, snapshots in enumerate(results):
+            rows = present[:, k]
+            snapshots.append(
+                _snapshot_from_densities(
+                    timestamp=timestamps[idx],
+                    symbol=symbol,
+                    prices=prices[rows],
+                    long_density=long_density[rows, k],
+                    short_density=short_density[rows, k],
+                    positions_created=created[k],
+                    positions_consumed=consumed[k],
+                )
+            )
+
+    return results
+
+
+def _scenario_weight_matrix(
+    weight_scenarios: list[list[tuple[int, Decimal]] | None],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build the (tiers, K) weight matrix over the union of leverage tiers.
+
+    Returns:
+        Tuple of (leverage per tier, weight per tier and scenario)
+    """
+    scenarios = [
+        DEFAULT_LEVERAGE_WEIGHTS if weights is None else weights for weights in weight_scenarios
+    ]
+    tiers = sorted({lev for weights in scenarios for lev, _ in weights})
+    row = {lev: i for i, lev in enumerate(tiers)}
+
+    matrix = np.zeros((len(tiers), len(scenarios)), dtype=np.float64)
+    for k, weights in enumerate(scenarios):
+        for lev, weight in weights:
+            matrix[row[lev], k] += float(weight)
+    return np.array(tiers, dtype=np.int16), matrix
+
+
+def _run_position_book(
+    columns: CandleColumns,
+    book: PositionBook,
+    leverage_weights: list[tuple[int, Decimal]] | None,
+) -> Iterator[tuple[int, int, int]]:
+    """Advance a PositionBook through the candles, one step per candle.
+
+    Same three steps per candle as process_candle() (consume, create, remove),
+    with liquidation prices and volumes held as float64 columns.
+
+    Args:
+        columns: Candles and OI deltas in chronological order
+        book: Position book to mutate
+        leverage_weights: Optional custom leverage distribution
+
+    Yields:
+        (candle index, positions created, positions consumed) after each step
+    """
+    if leverage_weights is None:
+        leverage_weights = DEFAULT_LEVERAGE_WEIGHTS
+
+    leverages = np.array([lev for lev, _ in leverage_weights], dtype=np.int16)
+    weights = np.array([float(w) for _, w in leverage_weights], dtype=np.float64)
+    return _advance_book(columns, book, leverages, weights)
+
+
+def _advance_book(
+    columns: CandleColumns,
+    book: PositionBook | ScenarioBook,
+    leverages: np.ndarray,
+    weights: np.ndarray,
+) -> Iterator[tuple[int, Any, Any]]:
+    """Advance a PositionBook or ScenarioBook through the candles.
+
+    Args:
+        columns: Candles and OI deltas in chronological order
+        book: Book to mutate
+        leverages: Leverage per tier
+        weights: Weight per tier, or a (tiers, K) matrix for a ScenarioBook
+
+    Yields:
+        (candle index, positions created, positions consumed) after each step;
+        the counts are (K,) arrays for a ScenarioBook
+    """
+    # Same formula as calculate_liq_price(), precomputed per tier
+    inv_lev = 1.0 / leverages
+    mmr = float(DEFAULT_MMR)
+    long_factors = 1.0 - inv_lev + mmr * inv_lev
+    short_factors = 1.0 + inv_lev - mmr * inv_lev
+
+    # Tiers without weight never create positions
+    keep = weights > 0 if weights.ndim == 1 else (weights > 0).any(axis=1)
+    leverages, weights = leverages[keep], weights[keep]
+    long_factors, short_factors = long_factors[keep], short_factors[keep]
+
+    # Same rule as infer_side(): bullish and doji candles open longs
+    opens_long = (columns.close >= columns.open).tolist()
+
+    for candle_idx, (low, high, close, delta) in enumerate(
+        zip(
+            columns.low.tolist(),
+            columns.high.tolist(),
+            columns.close.tolist(),
+            columns.oi_delta.tolist(),
+        )
+    ):
+        # 1. CHECK CONSUMPTION
+        consumed = book.consume(low, high)
+
+        # 2. ADD NEW POSITIONS
+        created = 0
+        if delta > 0:
+            if opens_long[candle_idx]:
+                side, factors = LONG, long_factors
+            else:
+                side, factors = SHORT, short_factors
+            created = book.add(
+                liq_prices=close * factors,
+                volumes=delta * weights,
+                side=side,
+                leverages=leverages,
+                created_idx=candle_idx,
+            )
+
+        # 3. REMOVE CLOSED POSITIONS
+        if delta < 0:
+            book.remove_proportionally(-delta)
+
+        yield candle_idx, created, consumed
+
+
+def _calculate_with_position_book(
+    columns: CandleColumns,
+    symbol: str,
+    leverage_weights: list[tuple[int, Decimal]] | None,
+    price_bucket_size: Decimal,
+    checkpoint: BookCheckpoint | None = None,
+    emit_from: datetime | None = None,
+    compaction_quantum: Decimal | None = None,
+) -> list[HeatmapSnapshot]:
+    """Run the time-evolving algorithm on an array-backed PositionBook.
+
+    Args:
+        columns: Candles and OI deltas in chronological order
+        symbol: Trading pair symbol
+        leverage_weights: Optional custom leverage distribution
+        price_bucket_size: Size of price buckets for aggregation
+        checkpoint: Optional book state to resume from
+        emit_from: Optional start of output (earlier candles are warm-up)
+        compaction_quantum: Optional price quantum for position compaction
+
+    Returns:
+        List of HeatmapSnapshot objects with float densities, one per emitted candle
+    """
+    columns, book = _prepare_position_book(
+        columns, price_bucket_size, checkpoint, compaction_quantum=compaction_quantum
+    )
+    timestamps = columns.timestamps()
+    emit_start = columns.index_at(emit_from) if emit_from is not None else 0
+
+    return [
+        _snapshot_from_book(
+            timestamp=timestamps[idx],
+            symbol=symbol,
+            book=book,
+            positions_created=created,
+            positions_consumed=consumed,
+        )
+        for idx, created, consumed in _run_position_book(columns, book, leverage_weights)
+        if idx >= emit_start
+    ]
+
+
+def _prepare_position_book(
+    columns: CandleColumns,
+    price_bucket_size: Decimal,
+    checkpoint: BookCheckpoint | None,
+    track_changes: bool = False,
+    compaction_quantum: Decimal | None = None,
+) -> tuple[CandleColumns, PositionBook]:
+    """Create the starting book and drop candles already folded into the checkpoint."""
+    quantum = float(compaction_quantum) if compaction_quantum is not None else None
+    if checkpoint is None:
+        book = PositionBook(
+            price_bucket_size=float(price_bucket_size),
+            track_changes=track_changes,
+            quantum=quantum,
+        )
+        return columns, book
+
+    book = PositionBook.from_checkpoint(
+        checkpoint,
+        price_bucket_size=float(price_bucket_size),
+        track_changes=track_changes,
+        quantum=quantum,
+    )
+    return columns.since(checkpoint.timestamp), book
+
+
+def calculate_rolling_heatmap(
+    candles: list[Any] | CandleColumns,
+    oi_deltas: list[Decimal] | None,
+    symbol: str,
+    leverage_weights: list[tuple[int, Decimal]] | None = None,
+    price_bucket_size: Decimal = Decimal("100"),
+    checkpoint: BookCheckpoint | None = None,
+    emit_from: datetime | None = None,
+    compaction_quantum: Decimal | None = None,
+) -> tuple[list[HeatmapSnapshot], BookCheckpoint | None]:
+    """Run the float64 engine and freeze the book before the last candle.
+
+    Same snapshots as calculate_time_evolving_heatmap(precision="float64").
+    The returned checkpoint lets a later run over a window that ends further
+    on resume at the last candle instead of replaying the whole window. The
+    last candle itself is replayed by that run, because it may still change:
+    an interval candle whose base candles are not all ingested yet, or a
+    bucket whose open interest is still arriving.
+
+    Args:
+        candles: List of candle-like objects with OHLC data, or CandleColumns
+        oi_deltas: List of OI delta values, one per candle (None with CandleColumns)
+        symbol: Trading pair symbol (e.g., "BTCUSDT")
+        leverage_weights: Optional custom leverage distribution
+        price_bucket_size: Size of price buckets for visualization
+        checkpoint: Optional book state to resume from
+        emit_from: Optional start of output (earlier candles are warm-up)
+        compaction_quantum: Optional price quantum for position compaction
+
+    Returns:
+        Tuple of (snapshots, checkpoint at the last candle's open_time). The
+        checkpoint is the one passed in when there are no candles to replay.
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths
+    """
+    columns, book = _prepare_position_book(
+        _column_inputs(candles, oi_deltas),
+        price_bucket_size,
+        checkpoint,
+        compaction_quantum=compaction_quantum,
+    )
+    if not len(columns):
+        return [], checkpoint
+
+    timestamps = columns.timestamps()
+    emit_start = columns.index_at(emit_from) if emit_from is not None else 0
+    last = len(columns) - 1
+    frozen = book.checkpoint(timestamps[last]) if last == 0 else None
+
+    snapshots: list[HeatmapSnapshot] = []
+    for idx, created, consumed in _run_position_book(columns, book, leverage_weights):
+        if idx >= emit_start:
+            snapshots.append(
+                _snapshot_from_book(
+                    timestamp=timestamps[idx],
+                    symbol=symbol,
+                    book=book,
+                    positions_created=created,
+                    positions_consumed=consumed,
+                )
+            )
+        if idx == last - 1:
+            frozen = book.checkpoint(timestamps[last])
+
+    return snapshots, frozen
+
+
+def checkpoint_boundary(
+    timestamp: datetime, every: timedelta = DEFAULT_CHECKPOINT_EVERY
+) -> datetime:
+    """Return the latest checkpoint boundary at or before `timestamp`."""
+    return CHECKPOINT_EPOCH + ((timestamp - CHECKPOINT_EPOCH) // every) * every
+
+
+def leverage_weights_key(leverage_weights: list[tuple[int, Decimal]] | None) -> str:
+    """Canonical string identifying a leverage distribution for checkpoint lookup.
+
+    Args:
+        leverage_weights: Leverage distribution, or None for DEFAULT_LEVERAGE_WEIGHTS
+
+    Returns:
+        "default", or "lev:weight" pairs sorted by leverage (e.g. "10:0.5,25:0.5")
+    """
+    if leverage_weights is None:
+        return "default"
+    return ",".join(
+        f"{lev}:{Decimal(weight).normalize()}" for lev, weight in sorted(leverage_weights)
+    )
+
+
+def build_book_checkpoints(
+    candles: list[Any] | CandleColumns,
+    oi_deltas: list[Decimal] | None = None,
+    leverage_weights: list[tuple[int, Decimal]] | None = None,
+    checkpoint: BookCheckpoint | None = None,
+    every: timedelta = DEFAULT_CHECKPOINT_EVERY,
+) -> list[BookCheckpoint]:
+    """Advance a position book through the candles, checkpointing it at period boundaries.
+
+    A checkpoint is taken at a boundary only once a candle at or after it has
+    been seen, so a period whose candles are still being ingested is never
+    frozen. When several boundaries fall in a gap without candles, only the
+    latest one is emitted (the book is the same for all of them).
+
+    Args:
+        candles: List of candle-like objects with OHLC data, or CandleColumns
+        oi_deltas: List of OI delta values, one per candle (None with CandleColumns)
+        leverage_weights: Optional custom leverage distribution
+        checkpoint: Optional previous checkpoint to continue from
+        every: Spacing between checkpoints (aligned to CHECKPOINT_EPOCH)
+
+    Returns:
+        New BookCheckpoint objects in chronological order
+
+    Raises:
+        ValueError: If candles and oi_deltas have different lengths
+    """
+    columns, book = _prepare_position_book(
+        _column_inputs(candles, oi_deltas), Decimal("100"), checkpoint
+    )
+    if not len(columns):
+        return []
+
+    timestamps = columns.timestamps()
+    checkpoints: list[BookCheckpoint] = []
+    boundary = checkpoint_boundary(timestamps[0], every) + every
+
+    for candle_idx, _, _ in _run_position_book(columns, book, leverage_weights):
+        if candle_idx + 1 == len(timestamps):
+            break
+        next_open_time = timestamps[candle_idx + 1]
+        if next_open_time >= boundary:
+            reached = checkpoint_boundary(next_open_time, every)
+            checkpoints.append(book.checkpoint(reached))
+            boundary = reached + every
+
+    return checkpoints
+
+
+def _snapshot_from_book(
+    timestamp: datetime,
+    symbol: str,
+    book: PositionBook,
+    positions_created: int,
+    positions_consumed: int,
+) -> HeatmapSnapshot:
+    """Build a heatmap snapshot from the book's running bucket totals.
+
+    Float counterpart of _aggregate_to_snapshot(), without a pass over positions.
+    """
+    buckets, long_density, short_density = book.aggregate()
+    return _snapshot_from_densities(
+        timestamp=timestamp,
+        symbol=symbol,
+        prices=buckets,
+        long_density=long_density,
+        short_density=short_density,
+        positions_created=positions_created,
+        positions_consumed=positions_consumed,
+    )
+
+
+def _snapshot_from_densities(
+    timestamp: datetime,
+    symbol: str,
+    prices: np.ndarray,
+    long_density: np.ndarray,
+    short_density: np.ndarray,
+    positions_created: int,
+    positions_consumed: int,
+) -> HeatmapSnapshot:
+    """Build a heatmap snapshot from per-bucket density arrays."""
+    snapshot = HeatmapSnapshot(
+        timestamp=timestamp,
+        symbol=symbol,
+        positions_created=positions_created,
+        positions_consumed=positions_consumed,
+    )
+    snapshot.cells = {
+        price: HeatmapCell(price_bucket=price, long_density=long_vol, short_density=short_vol)
+        for price, long_vol, short_vol in zip(
+            prices.tolist(), long_density.tolist(), short_density.tolist()
+        )
+    }
+    snapshot.total_long_volume = float(long_density.sum())
+    snapshot.total_short_volume = float(short_density.sum())
+
+    return snapshot
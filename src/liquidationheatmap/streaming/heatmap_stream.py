@@ -0,0 +1,295 @@
+"""Shared heatmap streams: one engine advance per topic, fanned out to subscribers.
+
+A topic is the heatmap of one (symbol, interval, price bucket size). The first
+subscriber starts it: the topic builds a change-tracking PositionBook from the
+newest engine checkpoint (or from an empty book `warmup_candles` before the
+latest closed candle) and then polls the data watermark. Each time a candle
+closes, a single job advances the book by the new candles, and the resulting
+delta frames are encoded once and queued for every subscriber.
+
+Subscribers first receive a keyframe of the current book, then one delta
+frame per closed candle, with the same rules as encoding=delta responses:
+scale the previous levels by `scale`, then overwrite the listed levels (a
+level with zero density is removed). A subscriber whose queue is full has its
+backlog replaced by a fresh keyframe, so a slow client skips frames instead of
+holding memory or holding up the others. A topic stops when its last
+subscriber leaves.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from src.liquidationheatmap.ingestion.db_service import HEATMAP_INTERVAL_MINUTES
+from src.liquidationheatmap.models.position import HeatmapFrame
+from src.liquidationheatmap.models.position_book import PositionBook
+from src.liquidationheatmap.models.time_evolving_heatmap import (
+    advance_heatmap_frames,
+    heatmap_keyframe,
+    leverage_weights_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# time_bucket() origin of load_heatmap_inputs(); every interval divides a day
+TIME_BUCKET_ORIGIN = datetime(2000, 1, 3)
+
+# (event name, encoded JSON frame)
+StreamMessage = tuple[str, bytes]
+
+
+def _base_minutes(interval: str) -> int:
+    """Minutes per candle of the base klines table an interval is built from."""
+    return 5 if interval == "30m" else min(HEATMAP_INTERVAL_MINUTES[interval], 15)
+
+
+def last_closed_candle(watermark: tuple, interval: str) -> Optional[datetime]:
+    """Open time of the latest candle whose data is complete.
+
+    A candle is closed once its last base-table candle (5m, or 15m for 1h and
+    above) has been ingested and open interest has caught up with it.
+
+    Args:
+        watermark: DuckDBService.get_data_watermark() result
+        interval: Candle interval (5m, 15m, 30m, 1h, 2h, 4h, 8h, 12h, 1d)
+
+    Returns:
+        Candle open time, or None if no candle has been ingested
+    """
+    ready = watermark[0]
+    if ready is None:
+        return None
+    if len(watermark) > 1 and watermark[1] is not None:
+        ready = min(ready, watermark[1])
+
+    minutes = HEATMAP_INTERVAL_MINUTES[interval]
+    last_open = ready - timedelta(minutes=minutes - _base_minutes(interval))
+    return last_open - (last_open - TIME_BUCKET_ORIGIN) % timedelta(minutes=minutes)
+
+
+def encode_frame(frame: HeatmapFrame, interval: str) -> StreamMessage:
+    """Encode a frame as a stream message, in the encoding=delta frame layout."""
+    message = {
+        "symbol": frame.symbol,
+        "interval": interval,
+        "timestamp": frame.timestamp.isoformat(),
+        "keyframe": frame.keyframe,
+        "scale": frame.scale,
+        "levels": [
+            {
+                "price": price,
+                "long_density": cell.long_density,
+                "short_density": cell.short_density,
+            }
+            for price, cell in sorted(frame.cells.items())
+        ],
+        "positions_created": frame.positions_created,
+        "positions_consumed": frame.positions_consumed,
+    }
+    event = "keyframe" if frame.keyframe else "delta"
+    return event, json.dumps(message, separators=(",", ":")).encode()
+
+
+class Subscription:
+    """Queue of stream messages for one subscriber."""
+
+    def __init__(self, topic: "_Topic", max_queue: int):
+        self.topic = topic
+        self.queue: asyncio.Queue[StreamMessage] = asyncio.Queue(max_queue)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[StreamMessage]:
+        """Wait for the next message.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            (event, message), or None if nothing arrived within `timeout`
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _Topic:
+    """Live engine state of one streamed heatmap."""
+
+    def __init__(self, key: tuple[str, str, float]):
+        self.key = key
+        self.subscribers: set[Subscription] = set()
+        self.book: Optional[PositionBook] = None
+        self.last_candle: Optional[datetime] = None
+        self.keyframe: Optional[StreamMessage] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class HeatmapStreamHub:
+    """Runs one engine per streamed heatmap and fans its frames out.
+
+    All methods except the advance job run on the event loop. Database reads
+    and engine work go through `run_query` (ComputePool.run_query), one job
+    at a time per topic.
+    """
+
+    def __init__(
+        self,
+        run_query: Callable[..., Awaitable[Any]],
+        poll_seconds: float = 15.0,
+        warmup_candles: int = 96,
+        max_queue: int = 32,
+    ):
+        """Initialize hub.
+
+        Args:
+            run_query: Async callable running fn(db, *args) against the database
+            poll_seconds: Seconds between data watermark checks per topic
+            warmup_candles: Candles replayed before the first keyframe when
+                there is no engine checkpoint to start from
+            max_queue: Messages a subscriber may fall behind before it is
+                resynchronised with a keyframe
+        """
+        self.run_query = run_query
+        self.poll_seconds = poll_seconds
+        self.warmup_candles = max(1, warmup_candles)
+        self.max_queue = max(1, max_queue)
+        self._topics: dict[tuple[str, str, float], _Topic] = {}
+        self._advances = 0
+        self._frames = 0
+        self._deliveries = 0
+        self._resyncs = 0
+
+    def subscribe(self, symbol: str, interval: str, price_bin_size: float) -> Subscription:
+        """Subscribe to a heatmap, starting its topic if needed.
+
+        The subscription receives the current keyframe first (as soon as the
+        topic has one), then every delta frame published after it.
+        """
+        key = (symbol, interval, float(price_bin_size))
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = _Topic(key)
+            topic.task = asyncio.create_task(self._run(topic))
+
+        subscription = Subscription(topic, self.max_queue)
+        topic.subscribers.add(subscription)
+        if topic.keyframe is not None:
+            subscription.queue.put_nowait(topic.keyframe)
+            self._deliveries += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription, stopping its topic if it was the last one."""
+        topic = subscription.topic
+        topic.subscribers.discard(subscription)
+        if not topic.subscribers and self._topics.get(topic.key) is topic:
+            del self._topics[topic.key]
+            topic.task.cancel()
+
+    async def _run(self, topic: _Topic) -> None:
+        """Poll the data watermark and advance the topic whenever a candle closes."""
+        symbol, interval, _ = topic.key
+        while True:
+            try:
+                watermark = await self.run_query(lambda db: db.get_data_watermark(symbol, interval))
+                closed = last_closed_candle(watermark, interval)
+                if closed is not None and (topic.last_candle is None or closed > topic.last_candle):
+                    try:
+                        messages, keyframe = await self.run_query(self._advance, topic, closed)
+                    except Exception:
+                        # The book may be half advanced: rebuild it and send a keyframe
+                        topic.book = None
+                        raise
+                    self._publish(topic, messages, keyframe)
+            except Exception as e:
+                logger.warning(f"Heatmap stream {symbol} {interval} could not advance: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def _advance(
+        self, db: Any, topic: _Topic, closed: datetime
+    ) -> tuple[list[StreamMessage], StreamMessage]:
+        """Advance the topic's book through `closed` (runs on a compute pool worker).
+
+        Returns:
+            Tuple of (messages, keyframe message). The messages are the delta
+            frames, or just the keyframe when the book was (re)built.
+        """
+        symbol, interval, price_bin_size = topic.key
+        grid = timedelta(minutes=HEATMAP_INTERVAL_MINUTES[interval])
+        # Last base-table candle inside the closed candle
+        end = closed + grid - timedelta(minutes=_base_minutes(interval))
+
+        if topic.book is None:
+            checkpoint = db.load_book_checkpoint(
+                symbol, interval, leverage_weights_key(None), closed
+            )
+            if checkpoint is not None:
+                book = PositionBook.from_checkpoint(
+                    checkpoint, price_bucket_size=price_bin_size, track_changes=True
+                )
+                start = checkpoint.timestamp
+            else:
+                book = PositionBook(price_bucket_size=price_bin_size, track_changes=True)
+                start = closed - (self.warmup_candles - 1) * grid
+            inputs = db.load_heatmap_inputs(symbol, interval, start, end)
+            # Warm-up only: the first keyframe describes the resulting book
+            advance_heatmap_frames(book, inputs, None, symbol, emit_from=end + grid)
+            topic.book = book
+            frames = None
+        else:
+            inputs = db.load_heatmap_inputs(symbol, interval, topic.last_candle + grid, end)
+            frames = advance_heatmap_frames(topic.book, inputs, None, symbol)
+
+        topic.last_candle = closed
+        self._advances += 1
+        keyframe = encode_frame(heatmap_keyframe(topic.book, closed, symbol), interval)
+        if frames is None:
+            return [keyframe], keyframe
+        return [encode_frame(frame, interval) for frame in frames], keyframe
+
+    def _publish(
+        self, topic: _Topic, messages: list[StreamMessage], keyframe: StreamMessage
+    ) -> None:
+        """Queue new messages for every subscriber of a topic."""
+        topic.keyframe = keyframe
+        self._frames += len(messages)
+
+        for subscription in topic.subscribers:
+            queue = subscription.queue
+            for message in messages:
+                if queue.full():
+                    # Slow subscriber: replace its backlog with the current state
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(keyframe)
+                    self._resyncs += 1
+                    self._deliveries += 1
+                    break
+                queue.put_nowait(message)
+                self._deliveries += 1
+
+    def get_stats(self) -> dict:
+        """Get hub statistics.
+
+        Returns:
+            dict with topics, subscribers, engine advances, frames published
+            (once per topic), messages delivered (once per subscriber) and resyncs
+        """
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(len(topic.subscribers) for topic in self._topics.values()),
+            "advances": self._advances,
+            "frames_published": self._frames,
+            "messages_delivered": self._deliveries,
+            "resyncs": self._resyncs,
+            "poll_seconds": self.poll_seconds,
+        }
+
+    def shutdown(self) -> None:
+        """Stop every topic; subscribers receive nothing further."""
+        for topic in self._topics.values():
+            topic.task.cancel()
+        self._topics.clear()
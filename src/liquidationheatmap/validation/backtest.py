@@ -15,6 +15,10 @@ from pathlib import Path
 from typing import Any
 
 import duckdb
+import numpy as np
+
+from src.liquidationheatmap.ingestion.db_service import query_snapshot_columns
+from src.liquidationheatmap.ingestion.snapshot_store import get_snapshot_store
 
 
 @dataclass
@@ -219,6 +223,43 @@ def get_predicted_zones(
     ]
 
 
+def predicted_zones_from_columns(
+    columns: Any,
+    timestamp: datetime,
+    horizon_minutes: int = 60,
+    limit: int = 50,
+) -> list[dict]:
+    """Get predicted liquidation zones from snapshots loaded as columns.
+
+    Same zones as get_predicted_zones() reads from liquidation_snapshots,
+    selected from SnapshotColumns already in memory instead of one query
+    per timestamp.
+
+    Args:
+        columns: SnapshotColumns covering the backtest period
+        timestamp: Point in time for prediction
+        horizon_minutes: How far ahead predictions apply
+        limit: Maximum number of zones, largest volume first
+
+    Returns:
+        List of predicted zones with price and side
+    """
+    from datetime import timedelta
+
+    rows = columns.window(timestamp - timedelta(minutes=horizon_minutes), timestamp)
+    levels = slice(int(columns.offsets[rows.start]), int(columns.offsets[rows.stop]))
+    prices = np.tile(columns.price[levels], 2)
+    volumes = np.concatenate([columns.long_density[levels], columns.short_density[levels]])
+    sides = np.repeat(["long", "short"], len(prices) // 2)
+
+    held = np.flatnonzero(volumes > 0)
+    top = held[np.argsort(-volumes[held], kind="stable")[:limit]]
+    return [
+        {"price": float(price), "side": str(side), "volume": float(volume), "confidence": 1.0}
+        for price, side, volume in zip(prices[top], sides[top], volumes[top])
+    ]
+
+
 def get_actual_liquidations(
     conn: duckdb.DuckDBPyConnection,
     symbol: str,
@@ -393,21 +434,48 @@ def run_backtest(
     conn = duckdb.connect(config.db_path, read_only=True)
 
     try:
-        # Get distinct timestamps with predictions
-        # Try liquidation_snapshots first, fallback to liquidation_levels
-        timestamps_query = """
-        SELECT DISTINCT DATE_TRUNC('hour', timestamp) as ts_hour
-        FROM liquidation_snapshots
-        WHERE symbol = ?
-          AND timestamp >= ?
-          AND timestamp < ?
-        ORDER BY ts_hour
-        """
+        # Load the snapshots of the whole period once, pivoted into columns,
+        # from the Parquet snapshot store if one is configured. Tables without
+        # the snapshot key columns fall back to per-hour queries.
+        from datetime import timedelta
 
-        timestamps = conn.execute(
-            timestamps_query,
-            [config.symbol, config.start_date, config.end_date],
-        ).fetchall()
+        period_start = config.start_date - timedelta(minutes=config.prediction_horizon_minutes)
+        columns = None
+        store = get_snapshot_store()
+        if store is not None:
+            columns = store.load_columns(config.symbol, period_start, config.end_date)
+        if columns is None or not len(columns):
+            try:
+                columns = query_snapshot_columns(conn, config.symbol, period_start, config.end_date)
+            except duckdb.Error:
+                columns = None
+
+        if columns is not None:
+            in_period = columns.timestamp[
+                (columns.timestamp >= np.datetime64(config.start_date, "us"))
+                & (columns.timestamp < np.datetime64(config.end_date, "us"))
+            ]
+            timestamps = [
+                (ts_hour,)
+                for ts_hour in np.unique(in_period.astype("datetime64[h]"))
+                .astype("datetime64[us]")
+                .tolist()
+            ]
+        else:
+            # Get distinct timestamps with predictions
+            timestamps_query = """
+            SELECT DISTINCT DATE_TRUNC('hour', timestamp) as ts_hour
+            FROM liquidation_snapshots
+            WHERE symbol = ?
+              AND timestamp >= ?
+              AND timestamp < ?
+            ORDER BY ts_hour
+            """
+
+            timestamps = conn.execute(
+                timestamps_query,
+                [config.symbol, config.start_date, config.end_date],
+            ).fetchall()
 
         if not timestamps:
             return BacktestResult(
@@ -423,16 +491,20 @@ def run_backtest(
         all_missed = []
         all_false_alarms = []
 
-        from datetime import timedelta
-
         for (ts_hour,) in timestamps:
-            # Get predictions at this hour
-            predictions = get_predicted_zones(
-                conn,
-                config.symbol,
-                ts_hour,
-                config.prediction_horizon_minutes,
-            )
+            # Get predictions at this hour, falling back to liquidation_levels
+            predictions = []
+            if columns is not None:
+                predictions = predicted_zones_from_columns(
+                    columns, ts_hour, config.prediction_horizon_minutes
+                )
+            if not predictions:
+                predictions = get_predicted_zones(
+                    conn,
+                    config.symbol,
+                    ts_hour,
+                    config.prediction_horizon_minutes,
+                )
 
             if not predictions:
                 continue
@@ -58,6 +58,7 @@ class TestHeatmapTimeseriesContract:
             assert "symbol" in meta
             assert "interval" in meta
             assert "total_snapshots" in meta
+            assert meta["source"] in ("computed", "precomputed", "stitched")
 
             # If snapshots present, verify structure
             if data["data"]:
@@ -139,3 +140,156 @@ class TestHeatmapTimeseriesContract:
         )
         # Invalid format should return 400
         assert response.status_code == 400
+
+    def test_delta_encoding_structure(self, client):
+        """Verify encoding=delta returns keyframe/scale frames."""
+        response = client.get(
+            "/liquidations/heatmap-timeseries",
+            params={
+                "symbol": "BTCUSDT",
+                "start_time": "2024-01-01T00:00:00Z",
+                "end_time": "2024-01-01T01:00:00Z",
+                "interval": "15m",
+                "encoding": "delta",
+                "keyframe_interval": 2,
+            },
+        )
+        assert response.status_code in [200, 500]
+
+        if response.status_code == 200:
+            data = response.json()
+            assert data["encoding"] == "delta"
+            assert data["keyframe_interval"] == 2
+            assert "meta" in data
+
+            if data["data"]:
+                frame = data["data"][0]
+                assert frame["keyframe"] is True
+                assert "scale" in frame
+                assert "levels" in frame
+                assert "positions_created" in frame
+                assert "positions_consumed" in frame
+
+    def test_invalid_encoding_returns_422(self, client):
+        """Verify unknown encoding or keyframe_interval returns validation error."""
+        base = {
+            "symbol": "BTCUSDT",
+            "start_time": "2024-01-01T00:00:00Z",
+            "end_time": "2024-01-01T01:00:00Z",
+        }
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries", params={**base, "encoding": "zip"}
+        )
+        assert response.status_code == 422
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries",
+            params={**base, "encoding": "delta", "keyframe_interval": 0},
+        )
+        assert response.status_code == 422
+
+    def test_precision_query_param(self, client):
+        """Verify precision accepts float64/decimal and rejects anything else."""
+        base = {
+            "symbol": "BTCUSDT",
+            "start_time": "2024-01-01T00:00:00Z",
+            "end_time": "2024-01-01T01:00:00Z",
+        }
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries", params={**base, "precision": "decimal"}
+        )
+        assert response.status_code in [200, 500]
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries", params={**base, "precision": "float32"}
+        )
+        assert response.status_code == 422
+
+    def test_delta_encoding_requires_float64(self, client):
+        """Verify the decimal reference engine cannot be combined with delta encoding."""
+        response = client.get(
+            "/liquidations/heatmap-timeseries",
+            params={
+                "symbol": "BTCUSDT",
+                "start_time": "2024-01-01T00:00:00Z",
+                "end_time": "2024-01-01T01:00:00Z",
+                "encoding": "delta",
+                "precision": "decimal",
+            },
+        )
+        assert response.status_code == 400
+
+    def test_compaction_quantum_query_param(self, client):
+        """Verify compaction_quantum must be positive and requires float64."""
+        base = {
+            "symbol": "BTCUSDT",
+            "start_time": "2024-01-01T00:00:00Z",
+            "end_time": "2024-01-01T01:00:00Z",
+        }
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries", params={**base, "compaction_quantum": 10}
+        )
+        assert response.status_code in [200, 500]
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries", params={**base, "compaction_quantum": 0}
+        )
+        assert response.status_code == 422
+
+        response = client.get(
+            "/liquidations/heatmap-timeseries",
+            params={**base, "compaction_quantum": 10, "precision": "decimal"},
+        )
+        assert response.status_code == 400
+
+
+class TestHeatmapScenariosContract:
+    """Contract tests for /liquidations/heatmap-timeseries/scenarios endpoint."""
+
+    def test_response_has_one_result_per_scenario(self, client):
+        """Verify one timeseries per scenario, in request order."""
+        response = client.get(
+            "/liquidations/heatmap-timeseries/scenarios",
+            params={
+                "symbol": "BTCUSDT",
+                "start_time": "2024-01-01T00:00:00Z",
+                "end_time": "2024-01-01T01:00:00Z",
+                "scenarios": ["default", "10:50,25:50"],
+            },
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            assert [s["leverage_weights"] for s in data["scenarios"]] == [
+                "default",
+                "10:0.5,25:0.5",
+            ]
+            for scenario in data["scenarios"]:
+                assert "data" in scenario
+                assert scenario["meta"]["total_snapshots"] == len(scenario["data"])
+
+    def test_missing_scenarios_returns_422(self, client):
+        """Verify scenarios is required."""
+        response = client.get(
+            "/liquidations/heatmap-timeseries/scenarios", params={"symbol": "BTCUSDT"}
+        )
+        assert response.status_code == 422
+
+    def test_invalid_scenario_returns_400(self, client):
+        """Verify each scenario is validated like leverage_weights."""
+        response = client.get(
+            "/liquidations/heatmap-timeseries/scenarios",
+            params={"symbol": "BTCUSDT", "scenarios": ["default", "7:100"]},
+        )
+        assert response.status_code == 400
+
+    def test_too_many_scenarios_returns_400(self, client):
+        """Verify the number of scenarios per request is capped."""
+        response = client.get(
+            "/liquidations/heatmap-timeseries/scenarios",
+            params={"symbol": "BTCUSDT", "scenarios": ["default"] * 17},
+        )
+        assert response.status_code == 400
@@ -191,3 +191,191 @@ class TestSnapshotPersistence:
             "DELETE FROM liquidation_snapshots WHERE symbol = 'BTCUSDT' AND timestamp = ?",
             [test_time],
         )
+
+
+class TestPrecomputedReadPath:
+    """heatmap-timeseries serving from persisted snapshots, stitched with computed ones."""
+
+    @pytest.fixture
+    def history_db(self, db_service):
+        """Two days of 15m candles with open interest rising on every candle."""
+        db_service.conn.execute("""
+            CREATE TABLE klines_15m_history (
+                symbol VARCHAR, open_time TIMESTAMP, open DOUBLE, high DOUBLE,
+                low DOUBLE, close DOUBLE, volume DOUBLE
+            )
+        """)
+        db_service.conn.execute("""
+            CREATE TABLE open_interest_history (
+                symbol VARCHAR, timestamp TIMESTAMP, open_interest_value DOUBLE
+            )
+        """)
+        base = datetime(2025, 11, 1)
+        price = 95000.37
+        for i in range(192):
+            ts = base + timedelta(minutes=15 * i)
+            close = price * (1 + 0.004 * ((i * 7919) % 11 - 5) / 5)
+            db_service.conn.execute(
+                "INSERT INTO klines_15m_history VALUES ('BTCUSDT', ?, ?, ?, ?, ?, 10)",
+                [ts, price, max(price, close) * 1.002, min(price, close) * 0.998, close],
+            )
+            db_service.conn.execute(
+                "INSERT INTO open_interest_history VALUES ('BTCUSDT', ?, ?)",
+                [ts, 5e8 + 2e6 * i + 1e5 * ((i * 104729) % 13)],
+            )
+            price = close
+        return db_service
+
+    def test_stitches_head_stored_and_tail(self, history_db):
+        """Stored snapshots in the middle should be stitched with computed head and tail."""
+        from src.liquidationheatmap.api.main import _stitch_precomputed_columns
+        from src.liquidationheatmap.models.time_evolving_heatmap import (
+            build_book_checkpoints,
+            calculate_time_evolving_heatmap,
+        )
+
+        start, end = datetime(2025, 11, 1), datetime(2025, 11, 2, 23, 45)
+        stored_from, stored_to = datetime(2025, 11, 1, 12), datetime(2025, 11, 2, 6)
+        inputs = history_db.load_heatmap_inputs("BTCUSDT", "15m", start, end)
+        expected = calculate_time_evolving_heatmap(inputs, None, "BTCUSDT", precision="float64")
+        # The tail resumes from the checkpoint of 2025-11-02, built from the same start
+        for checkpoint in build_book_checkpoints(inputs):
+            history_db.save_book_checkpoint("BTCUSDT", "15m", "default", checkpoint)
+        stored = [s for s in expected if stored_from <= s.timestamp <= stored_to]
+        for snapshot in stored:
+            history_db.save_snapshot(
+                snapshot, interval="15m", price_bin_size=100.0, weights_key="default"
+            )
+        history_db.save_snapshot_coverage(
+            "BTCUSDT", "15m", 100.0, "default", stored_from, stored_to
+        )
+
+        response = _stitch_precomputed_columns(
+            history_db, "BTCUSDT", "15m", None, 100.0, start, end
+        ).to_response()
+
+        assert response.meta.source == "stitched"
+        assert response.meta.checkpoint_time == datetime(2025, 11, 2).isoformat()
+        assert [s.timestamp for s in response.data] == [s.timestamp.isoformat() for s in expected]
+        for snapshot, served in zip(expected, response.data):
+            assert served.positions_consumed == snapshot.positions_consumed
+            levels = {
+                float(cell.price_bucket): float(cell.long_density)
+                for cell in snapshot.cells.values()
+                if cell.total_density > 0
+            }
+            assert {level.price: level.long_density for level in served.levels} == (
+                pytest.approx(levels, rel=1e-9)
+            )
+
+    def test_tail_without_checkpoint_is_computed(self, history_db):
+        """A tail that would replay the whole window should not be stitched."""
+        from src.liquidationheatmap.api.main import _stitch_precomputed_columns
+
+        ts = datetime(2025, 11, 1, 12)
+        snapshot = HeatmapSnapshot(timestamp=ts, symbol="BTCUSDT")
+        snapshot.get_cell(Decimal("95000")).long_density = Decimal("1000")
+        history_db.save_snapshot(
+            snapshot, interval="15m", price_bin_size=100.0, weights_key="default"
+        )
+        history_db.save_snapshot_coverage("BTCUSDT", "15m", 100.0, "default", ts, ts)
+
+        stitched = _stitch_precomputed_columns(
+            history_db, "BTCUSDT", "15m", None, 100.0, ts, ts + timedelta(hours=6)
+        )
+
+        assert stitched is None
+
+    def test_fully_covered_range_is_precomputed(self, history_db):
+        """A request inside the stored range should not run the engine."""
+        from src.liquidationheatmap.api.main import _stitch_precomputed_columns
+
+        ts = datetime(2025, 11, 1, 12)
+        snapshot = HeatmapSnapshot(timestamp=ts, symbol="BTCUSDT")
+        snapshot.get_cell(Decimal("95000")).long_density = Decimal("1000")
+        history_db.save_snapshot(
+            snapshot, interval="15m", price_bin_size=100.0, weights_key="default"
+        )
+        history_db.save_snapshot_coverage("BTCUSDT", "15m", 100.0, "default", ts, ts)
+
+        response = _stitch_precomputed_columns(
+            history_db, "BTCUSDT", "15m", None, 100.0, ts, ts
+        ).to_response()
+        missing = _stitch_precomputed_columns(history_db, "BTCUSDT", "15m", None, 250.0, ts, ts)
+
+        assert response.meta.source == "precomputed"
+        assert response.meta.total_long_volume == 1000.0
+        assert missing is None
+
+    def test_covered_range_does_not_load_engine_inputs(self, history_db, monkeypatch):
+        """Stored snapshots should be put on the candle grid without the candle/OI query."""
+        from src.liquidationheatmap.api.main import _stitch_precomputed_columns
+
+        start, end = datetime(2025, 11, 1, 6), datetime(2025, 11, 1, 12)
+        grid = history_db.load_heatmap_inputs("BTCUSDT", "1h", start, end).open_time
+        ts = datetime(2025, 11, 1, 9)
+        snapshot = HeatmapSnapshot(timestamp=ts, symbol="BTCUSDT")
+        snapshot.get_cell(Decimal("95000")).long_density = Decimal("1000")
+        history_db.save_snapshot(
+            snapshot, interval="1h", price_bin_size=100.0, weights_key="default"
+        )
+        history_db.save_snapshot_coverage("BTCUSDT", "1h", 100.0, "default", start, end)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("load_heatmap_inputs() called for a covered range")
+
+        monkeypatch.setattr(history_db, "load_heatmap_inputs", fail)
+        stitched = _stitch_precomputed_columns(history_db, "BTCUSDT", "1h", None, 100.0, start, end)
+
+        assert stitched.meta.source == "precomputed"
+        assert stitched.columns.timestamp.tolist() == grid.tolist()
+        assert len(grid) == 7
+        assert stitched.columns.totals()[0].tolist() == [0, 0, 0, 1000.0, 0, 0, 0]
+
+    def test_columnar_output_matches_computed(self, history_db):
+        """Stored columns should pivot to the same columnar body as the computed snapshots."""
+        from src.liquidationheatmap.api.main import (
+            _columns_to_columnar,
+            _compute_heatmap_columns,
+            _engine_timeseries,
+            _stitch_precomputed_columns,
+            _timeseries_to_columnar,
+        )
+        from src.liquidationheatmap.models.time_evolving_heatmap import (
+            calculate_time_evolving_heatmap,
+        )
+
+        start, end = datetime(2025, 11, 1, 6), datetime(2025, 11, 1, 18)
+        computed, _ = _compute_heatmap_columns(
+            history_db, "BTCUSDT", "15m", None, 100.0, start, end, start
+        )
+        snapshots = calculate_time_evolving_heatmap(
+            history_db.load_heatmap_inputs("BTCUSDT", "15m", start, end),
+            None,
+            "BTCUSDT",
+            precision="float64",
+        )
+        history_db.save_snapshots(
+            snapshots, interval="15m", price_bin_size=100.0, weights_key="default"
+        )
+        history_db.save_snapshot_coverage("BTCUSDT", "15m", 100.0, "default", start, end)
+
+        stitched = _stitch_precomputed_columns(
+            history_db, "BTCUSDT", "15m", None, 100.0, start, end
+        )
+        expected = _timeseries_to_columnar(
+            _engine_timeseries(computed, "BTCUSDT", start, end, "15m").to_response(), "sparse"
+        )
+        served = _columns_to_columnar(stitched.columns, stitched.meta, "sparse")
+
+        assert stitched.meta.source == "precomputed"
+        assert served.timestamps == expected.timestamps
+        assert served.prices == expected.prices
+        assert served.offsets == expected.offsets
+        assert served.price_index == expected.price_index
+        assert served.long_density == pytest.approx(expected.long_density, rel=1e-9)
+        assert served.short_density == pytest.approx(expected.short_density, rel=1e-9)
+        assert served.positions_consumed == expected.positions_consumed
+        assert stitched.meta.total_long_volume == pytest.approx(
+            float(sum(s.total_long_volume for s in snapshots)), rel=1e-9
+        )
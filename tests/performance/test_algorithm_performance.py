@@ -333,3 +333,47 @@ class TestRemoveProportionallyPerformance:
         assert elapsed_ms < 100, (
             f"remove_proportionally took {elapsed_ms:.2f}ms for 5000 positions, expected <100ms"
         )
+
+
+class TestPositionBookRemovalPerformance:
+    """Proportional removal on the array-backed book must not scale with book size."""
+
+    @staticmethod
+    def _build_book(size: int):
+        import numpy as np
+
+        from src.liquidationheatmap.models.position_book import LONG, PositionBook
+
+        book = PositionBook()
+        prices = np.linspace(50000.0, 90000.0, size)
+        book.add(prices, np.full(size, 1e6), LONG, np.full(size, 10), 0)
+        return book
+
+    def test_removal_does_not_touch_rows(self, monkeypatch):
+        """Removals above the dust threshold only update the scale factor."""
+        import numpy as np
+
+        book = self._build_book(100_000)
+        longs = book.longs
+        stored = longs._volume[: len(longs)].copy()
+        pruned = []
+        monkeypatch.setattr(longs, "_prune_dust", lambda: pruned.append(True))
+
+        expected = longs.total_volume
+        for _ in range(2000):
+            removed = longs.total_volume * 0.001
+            book.remove_proportionally(removed)
+            expected -= removed
+
+        assert pruned == []
+        assert np.array_equal(longs._volume[: len(longs)], stored)
+        assert longs.total_volume == pytest.approx(expected, rel=1e-9)
+
+    def test_rows_visited_once_dust_threshold_is_crossed(self):
+        """Rows are only rewritten when the scale pushes the smallest volume below dust."""
+        book = self._build_book(100_000)
+
+        book.remove_proportionally(book.longs.total_volume * (1 - 1e-9))
+
+        assert len(book.longs) == 0
+        assert book.longs.scale == 1.0
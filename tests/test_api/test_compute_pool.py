@@ -0,0 +1,98 @@
+"""Tests for ComputePool, which runs blocking endpoint work off the event loop."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.liquidationheatmap.api.main import ComputePool
+from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+
+class TestComputePool:
+    """Blocking jobs run on worker threads and are reflected in the stats."""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive_during_blocking_job(self):
+        pool = ComputePool(max_workers=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await pool.run(lambda: time.sleep(0.2) or "done")
+        task.cancel()
+        pool.shutdown()
+
+        assert result == "done"
+        assert ticks > 5
+
+    @pytest.mark.asyncio
+    async def test_jobs_beyond_worker_count_queue_up(self):
+        pool = ComputePool(max_workers=1)
+        release = threading.Event()
+
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(lambda: "second"))
+        await asyncio.sleep(0.05)
+
+        stats = pool.get_stats()
+        assert stats["running"] == 1
+        assert stats["queue_depth"] == 1
+
+        release.set()
+        assert await second == "second"
+        await first
+        stats = pool.get_stats()
+        pool.shutdown()
+
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 2
+        assert stats["max_wait_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate_and_count_as_failed(self):
+        pool = ComputePool(max_workers=2)
+
+        def boom():
+            raise ValueError("bad input")
+
+        with pytest.raises(ValueError, match="bad input"):
+            await pool.run(boom)
+
+        stats = pool.get_stats()
+        pool.shutdown()
+        assert stats["failed"] == 1
+        assert stats["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_run_query_uses_a_private_cursor(self, tmp_path):
+        db_path = str(tmp_path / "pool.duckdb")
+        DuckDBService(db_path=db_path).conn.execute("CREATE TABLE t AS SELECT 42 AS x")
+        DuckDBService.reset_singletons(db_path)
+        pool = ComputePool(max_workers=2)
+        service = DuckDBService(db_path=db_path, read_only=True)
+
+        def query(db: DuckDBService) -> int:
+            assert db.conn is not service.conn
+            return db.conn.execute("SELECT x FROM t").fetchone()[0]
+
+        try:
+            with pytest.MonkeyPatch.context() as mp:
+                mp.setattr(
+                    "src.liquidationheatmap.api.main.DuckDBService",
+                    lambda read_only: service,
+                )
+                results = await asyncio.gather(*(pool.run_query(query) for _ in range(4)))
+
+            assert results == [42] * 4
+            # Closing the worker cursors leaves the singleton connection usable
+            assert service.conn.execute("SELECT x FROM t").fetchone()[0] == 42
+        finally:
+            pool.shutdown()
+            DuckDBService.reset_singletons(db_path)
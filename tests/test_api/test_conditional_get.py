@@ -0,0 +1,43 @@
+"""Tests for the ETag helpers behind conditional heatmap and klines requests."""
+
+from starlette.requests import Request
+
+from src.liquidationheatmap.api.main import _etag_matches, _make_etag
+
+
+def make_request(query: str = "symbol=BTCUSDT", if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request(
+        {
+            "type": "http",
+            "path": "/prices/klines",
+            "query_string": query.encode(),
+            "headers": headers,
+        }
+    )
+
+
+class TestETag:
+    """ETags follow the query and the data watermark."""
+
+    def test_same_query_and_watermark_give_same_tag(self):
+        a = _make_etag(make_request("symbol=BTCUSDT&limit=10"), ("2025-11-01 00:00:00",))
+        b = _make_etag(make_request("limit=10&symbol=BTCUSDT"), ("2025-11-01 00:00:00",))
+
+        assert a == b
+        assert a.startswith('W/"')
+
+    def test_new_data_or_query_changes_tag(self):
+        base = _make_etag(make_request(), ("2025-11-01 00:00:00",))
+
+        assert _make_etag(make_request(), ("2025-11-01 00:15:00",)) != base
+        assert _make_etag(make_request("symbol=ETHUSDT"), ("2025-11-01 00:00:00",)) != base
+
+    def test_if_none_match(self):
+        etag = _make_etag(make_request(), ("2025-11-01 00:00:00",))
+
+        assert _etag_matches(make_request(if_none_match=etag), etag)
+        assert _etag_matches(make_request(if_none_match=f'"other", {etag[2:]}'), etag)
+        assert _etag_matches(make_request(if_none_match="*"), etag)
+        assert not _etag_matches(make_request(if_none_match='W/"other"'), etag)
+        assert not _etag_matches(make_request(), etag)
@@ -0,0 +1,145 @@
+"""Tests for EnginePool, which runs heatmap engine replays in worker processes."""
+
+import asyncio
+import os
+import random
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import numpy as np
+import pytest
+
+from src.liquidationheatmap.api.engine_pool import (
+    EnginePool,
+    replay_heatmap,
+    replay_heatmap_frames,
+)
+from src.liquidationheatmap.api.main import ComputePool, app
+from src.liquidationheatmap.models.time_evolving_heatmap import (
+    Candle,
+    CandleColumns,
+    SnapshotColumns,
+    calculate_heatmap_frames,
+    calculate_time_evolving_heatmap,
+)
+
+# Pure-Python work that holds the GIL for about a second or two, like a long replay
+BUSY_RANGE = range(100_000_000)
+
+
+@pytest.fixture
+def engine():
+    pool = EnginePool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def random_walk(count: int, seed: int) -> CandleColumns:
+    rng = random.Random(seed)
+    price = 95000.0 + rng.random()
+    candles, oi_deltas = [], []
+    for i in range(count):
+        close = price * (1 + rng.gauss(0, 0.01))
+        candles.append(
+            Candle(
+                open_time=datetime(2025, 11, 1) + timedelta(minutes=15 * i),
+                open=Decimal(str(price)),
+                high=Decimal(str(max(price, close) * 1.002)),
+                low=Decimal(str(min(price, close) * 0.998)),
+                close=Decimal(str(close)),
+                volume=Decimal("100"),
+            )
+        )
+        oi_deltas.append(Decimal(str(rng.uniform(-2e6, 4e6))))
+        price = close
+    return CandleColumns.from_candles(candles, oi_deltas)
+
+
+def assert_columns_equal(actual: SnapshotColumns, expected: SnapshotColumns):
+    for field in (
+        "timestamp",
+        "positions_created",
+        "positions_consumed",
+        "offsets",
+        "price",
+        "long_density",
+        "short_density",
+    ):
+        np.testing.assert_array_equal(getattr(actual, field), getattr(expected, field))
+
+
+class TestEnginePool:
+    """Replays run in another process and come back as columns."""
+
+    @pytest.mark.asyncio
+    async def test_health_stays_responsive_while_a_replay_holds_the_gil(self, engine):
+        compute = ComputePool(max_workers=1)
+        # Spawn the worker before timing anything
+        engine.call(sum, range(10))
+
+        job = asyncio.ensure_future(compute.run(engine.call, sum, BUSY_RANGE))
+        await asyncio.sleep(0.1)
+        latencies = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for _ in range(5):
+                started = time.monotonic()
+                response = await client.get("/health")
+                latencies.append(time.monotonic() - started)
+                assert response.status_code == 200
+
+        assert not job.done()
+        assert await job == sum(BUSY_RANGE)
+        compute.shutdown()
+        assert max(latencies) < 0.1
+
+    def test_replay_matches_engine(self, engine):
+        inputs = random_walk(60, seed=7)
+        expected = calculate_time_evolving_heatmap(inputs, None, "BTCUSDT", precision="float64")
+
+        result = engine.call(
+            replay_heatmap, candles=inputs, oi_deltas=None, symbol="BTCUSDT", precision="float64"
+        )
+
+        assert_columns_equal(result.columns, SnapshotColumns.from_snapshots(expected))
+        assert result.total_long_volume.tolist() == [s.total_long_volume for s in expected]
+        assert engine.get_stats()["completed"] == 1
+
+    def test_frames_keep_removed_levels(self):
+        inputs = random_walk(40, seed=3)
+        frames = calculate_heatmap_frames(inputs, None, "BTCUSDT", keyframe_interval=10)
+
+        # Inline: same result without a worker process
+        result = EnginePool(max_workers=0).call(
+            replay_heatmap_frames,
+            candles=inputs,
+            oi_deltas=None,
+            symbol="BTCUSDT",
+            keyframe_interval=10,
+        )
+
+        assert result.keyframe.tolist() == [frame.keyframe for frame in frames]
+        assert result.scale.tolist() == [frame.scale for frame in frames]
+        assert np.diff(result.columns.offsets).tolist() == [len(f.cells) for f in frames]
+        assert (result.columns.long_density + result.columns.short_density == 0).any()
+
+    def test_exceptions_propagate(self, engine):
+        with pytest.raises(ValueError):
+            engine.call(int, "not a number")
+
+        stats = engine.get_stats()
+        assert stats["failed"] == 1
+        assert stats["running"] == 0
+
+    def test_dead_worker_restarts_the_pool(self, engine):
+        with pytest.raises(BrokenProcessPool):
+            engine.call(os._exit, 1)
+
+        assert engine.call(sum, [1, 2]) == 3
+        stats = engine.get_stats()
+        assert stats["restarts"] == 1
+        assert stats["failed"] == 1
+        assert stats["completed"] == 2
@@ -0,0 +1,308 @@
+"""Tests for HeatmapCache coalescing, stale-while-revalidate, byte-budgeted LRU
+and pre-encoded responses."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from src.liquidationheatmap.api.main import (
+    EncodedResponse,
+    HeatmapCache,
+    HeatmapLevel,
+    _snap_heatmap_range,
+)
+
+KEY = ("BTCUSDT", "tw:7d", None, "15m", 100.0, None)
+
+
+class Computation:
+    """Counts calls and returns a new value for each one."""
+
+    def __init__(self, delay: float = 0.01, error: Exception | None = None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"response-{self.calls}"
+
+
+class TestSingleFlight:
+    """Concurrent misses for one key should share a single computation."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        compute = Computation()
+
+        results = await asyncio.gather(*(cache.get_or_compute(*KEY, compute) for _ in range(10)))
+
+        assert compute.calls == 1
+        assert results == ["response-1"] * 10
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced_requests"] == 9
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_compute_separately(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        compute = Computation()
+
+        await asyncio.gather(
+            cache.get_or_compute(*KEY, compute),
+            cache.get_or_compute(*KEY, compute, "delta:96"),
+        )
+
+        assert compute.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter_and_are_not_cached(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        failing = Computation(error=ValueError("no data"))
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute(*KEY, failing) for _ in range(3)), return_exceptions=True
+        )
+
+        assert failing.calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await cache.get_or_compute(*KEY, Computation()) == "response-1"
+        assert cache.get_stats()["failed_computations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_computation(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        compute = Computation(delay=0.05)
+
+        first = asyncio.ensure_future(cache.get_or_compute(*KEY, compute))
+        second = asyncio.ensure_future(cache.get_or_compute(*KEY, compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "response-1"
+        assert compute.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_clear_discards_running_computation(self):
+        cache = HeatmapCache(ttl_seconds=60)
+
+        async def before_clear():
+            await asyncio.sleep(0.05)
+            return "before-clear"
+
+        async def after_clear():
+            await asyncio.sleep(0.01)
+            return "after-clear"
+
+        before = asyncio.ensure_future(cache.get_or_compute(*KEY, before_clear))
+        await asyncio.sleep(0.01)
+        cache.clear()
+        after = asyncio.ensure_future(cache.get_or_compute(*KEY, after_clear))
+
+        # The earlier waiter still gets its value, but it does not replace the new one
+        assert await after == "after-clear"
+        assert await before == "before-clear"
+        assert await cache.get_or_compute(*KEY, Computation()) == "after-clear"
+        assert cache.get_stats()["in_flight"] == 0
+
+
+class TestStaleWhileRevalidate:
+    """Expired entries should be served while one background refresh runs."""
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_during_single_refresh(self):
+        cache = HeatmapCache(ttl_seconds=0, stale_seconds=60)
+        compute = Computation()
+        await cache.get_or_compute(*KEY, compute)
+
+        stale = await asyncio.gather(*(cache.get_or_compute(*KEY, compute) for _ in range(5)))
+        assert stale == ["response-1"] * 5
+        assert cache.get_stats()["in_flight"] == 1
+
+        await asyncio.sleep(0.05)
+
+        assert compute.calls == 2
+        assert cache.get_stats()["stale_hits"] == 5
+        assert await cache.get_or_compute(*KEY, compute) == "response-2"
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_entry(self):
+        cache = HeatmapCache(ttl_seconds=0, stale_seconds=60)
+        await cache.get_or_compute(*KEY, Computation())
+
+        assert await cache.get_or_compute(*KEY, Computation(error=ValueError("down"))) == (
+            "response-1"
+        )
+        await asyncio.sleep(0.05)
+
+        assert await cache.get_or_compute(*KEY, Computation()) == "response-1"
+        assert cache.get_stats()["failed_computations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_entries_past_stale_window_are_recomputed(self):
+        cache = HeatmapCache(ttl_seconds=0, stale_seconds=0)
+        compute = Computation()
+
+        assert await cache.get_or_compute(*KEY, compute) == "response-1"
+        assert await cache.get_or_compute(*KEY, compute) == "response-2"
+        assert cache.get_stats()["stale_hits"] == 0
+
+
+class TestCanonicalKeys:
+    """Raw request ranges snap to the candle grid and share one cache entry."""
+
+    def test_start_floors_and_end_covers_its_candle(self):
+        start, end = _snap_heatmap_range(
+            datetime(2025, 11, 1, 0, 7, 31), datetime(2025, 11, 2, 9, 59), "1h"
+        )
+
+        assert start == datetime(2025, 11, 1, 0, 0)
+        # Last 15m base candle inside the 09:00 hourly candle
+        assert end == datetime(2025, 11, 2, 9, 45)
+
+    def test_end_is_clamped_to_latest_candle(self):
+        latest = datetime(2025, 11, 2, 6, 15)
+
+        for now in (datetime(2025, 11, 2, 8, 3), datetime(2025, 11, 2, 8, 41)):
+            start, end = _snap_heatmap_range(datetime(2025, 11, 1, 6, 2), now, "15m", latest)
+            assert (start, end) == (datetime(2025, 11, 1, 6, 0), latest)
+
+    def test_30m_ends_on_last_5m_candle(self):
+        _, end = _snap_heatmap_range(datetime(2025, 11, 1), datetime(2025, 11, 1, 12, 10), "30m")
+
+        assert end == datetime(2025, 11, 1, 12, 25)
+
+    @pytest.mark.asyncio
+    async def test_aliases_count_canonical_hits(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        compute = Computation()
+
+        await cache.get_or_compute(*KEY, compute, alias="2025-11-01T00:07:00|None")
+        await cache.get_or_compute(*KEY, compute, alias="2025-11-01T00:09:00|None")
+        await cache.get_or_compute(*KEY, compute, alias="2025-11-01T00:09:00|None")
+
+        stats = cache.get_stats()
+        assert compute.calls == 1
+        assert stats["hits"] == 2
+        assert stats["canonical_key_hits"] == 1
+        assert stats["raw_key_hit_rate_percent"] < stats["hit_rate_percent"]
+
+
+class TestByteBudget:
+    """LRU eviction by entry count and by serialized size."""
+
+    @staticmethod
+    def key(name: str) -> tuple:
+        return ("BTCUSDT", name, None, "15m", 100.0, None)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = HeatmapCache(ttl_seconds=60, max_size=2)
+        cache.set(*self.key("a"), b"a")
+        cache.set(*self.key("b"), b"b")
+        assert cache.get(*self.key("a")) == b"a"
+
+        cache.set(*self.key("c"), b"c")
+
+        assert cache.get(*self.key("b")) is None
+        assert cache.get(*self.key("a")) == b"a"
+        assert cache.get(*self.key("c")) == b"c"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_budget_evicts_until_it_fits(self):
+        cache = HeatmapCache(ttl_seconds=60, max_size=100, max_bytes=1000)
+        for name in ("a", "b", "c"):
+            cache.set(*self.key(name), b"x" * 300)
+
+        cache.set(*self.key("big"), b"x" * 700)
+
+        stats = cache.get_stats()
+        assert stats["cached_entries"] == 2
+        assert stats["bytes_used"] == 1000
+        assert stats["evictions"] == 2
+        assert stats["evicted_bytes"] == 600
+        assert cache.get(*self.key("c")) is not None
+
+    def test_oversized_response_is_not_cached(self):
+        cache = HeatmapCache(ttl_seconds=60, max_bytes=100)
+        cache.set(*self.key("a"), b"x" * 50)
+
+        cache.set(*self.key("a"), b"x" * 101)
+
+        stats = cache.get_stats()
+        assert cache.get(*self.key("a")) is None
+        assert stats["oversized_rejections"] == 1
+        assert stats["bytes_used"] == 0
+
+    def test_overwrite_and_clear_track_bytes(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        cache.set(*self.key("a"), b"x" * 10)
+        cache.set(*self.key("a"), b"x" * 25)
+        assert cache.get_stats()["bytes_used"] == 25
+
+        cache.clear()
+
+        assert cache.get_stats()["bytes_used"] == 0
+
+    def test_models_are_weighed_by_json_size(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        level = HeatmapLevel(price=95000.0, long_density=1.5, short_density=0.0)
+
+        cache.set(*self.key("a"), level)
+
+        assert cache.get_stats()["bytes_used"] == len(level.model_dump_json())
+
+
+class TestEncodedResponse:
+    """Responses are serialized once and sent as raw bytes."""
+
+    @staticmethod
+    def request(accept_encoding: str = ""):
+        from starlette.requests import Request
+
+        headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+        return Request({"type": "http", "headers": headers})
+
+    def test_body_is_the_model_json(self):
+        level = HeatmapLevel(price=95000.0, long_density=1.5, short_density=0.0)
+
+        encoded = EncodedResponse.from_model(level, gzip_min_bytes=0)
+        response = encoded.to_response(self.request("gzip"))
+
+        assert encoded.gzip_body is None
+        assert response.body == level.model_dump_json().encode()
+        assert response.media_type == "application/json"
+        assert "content-encoding" not in response.headers
+
+    def test_large_bodies_are_precompressed(self):
+        import gzip
+
+        level = HeatmapLevel(price=95000.0, long_density=1.5, short_density=0.0)
+        encoded = EncodedResponse.from_model(level, gzip_min_bytes=10)
+
+        compressed = encoded.to_response(self.request("gzip, deflate"))
+        plain = encoded.to_response(self.request())
+
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(compressed.body) == plain.body
+        assert plain.headers["vary"] == "Accept-Encoding"
+        assert len(encoded) == len(encoded.body) + len(encoded.gzip_body)
+
+    @pytest.mark.asyncio
+    async def test_hits_return_the_stored_bytes(self):
+        cache = HeatmapCache(ttl_seconds=60)
+        level = HeatmapLevel(price=95000.0, long_density=1.5, short_density=0.0)
+
+        async def compute():
+            return EncodedResponse.from_model(level)
+
+        first = await cache.get_or_compute(*KEY, compute)
+        second = await cache.get_or_compute(*KEY, compute)
+
+        assert second is first
+        assert cache.get_stats()["bytes_used"] == len(first)
@@ -0,0 +1,109 @@
+"""Tests for the columnar, Arrow and MessagePack heatmap-timeseries formats."""
+
+import pytest
+
+from src.liquidationheatmap.api.main import (
+    ARROW_STREAM_MEDIA_TYPE,
+    HeatmapLevel,
+    HeatmapSnapshotResponse,
+    HeatmapTimeseriesMetadata,
+    HeatmapTimeseriesResponse,
+    _encode_heatmap_timeseries,
+    _timeseries_to_columnar,
+)
+
+
+def make_response(levels_per_snapshot: list[list[tuple[float, float, float]]]):
+    data = [
+        HeatmapSnapshotResponse(
+            timestamp=f"2025-11-01T00:{15 * i:02d}:00",
+            levels=[
+                HeatmapLevel(price=price, long_density=long, short_density=short)
+                for price, long, short in levels
+            ],
+            positions_created=i + 1,
+            positions_consumed=i,
+        )
+        for i, levels in enumerate(levels_per_snapshot)
+    ]
+    meta = HeatmapTimeseriesMetadata(
+        symbol="BTCUSDT",
+        start_time="2025-11-01T00:00:00",
+        end_time="2025-11-01T00:30:00",
+        interval="15m",
+        total_snapshots=len(data),
+        price_range={"min": 0, "max": 0},
+        total_long_volume=0.0,
+        total_short_volume=0.0,
+        total_consumed=0,
+    )
+    return HeatmapTimeseriesResponse(data=data, meta=meta)
+
+
+RESPONSE = make_response(
+    [
+        [(94000.0, 5.0, 0.0), (96000.0, 0.0, 2.0)],
+        [(95000.0, 1.0, 0.0)],
+        [],
+    ]
+)
+
+
+class TestColumnar:
+    """Snapshots pivot onto one sorted price axis."""
+
+    def test_dense_layout(self):
+        columnar = _timeseries_to_columnar(RESPONSE, "dense")
+
+        assert columnar.prices == [94000.0, 95000.0, 96000.0]
+        assert columnar.timestamps == [s.timestamp for s in RESPONSE.data]
+        assert columnar.long_density == [[5.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]]
+        assert columnar.short_density == [[0.0, 0.0, 2.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+        assert columnar.positions_created == [1, 2, 3]
+        assert columnar.offsets is None
+
+    def test_sparse_layout(self):
+        columnar = _timeseries_to_columnar(RESPONSE, "sparse")
+
+        assert columnar.offsets == [0, 2, 3, 3]
+        assert columnar.price_index == [0, 2, 1]
+        assert columnar.long_density == [5.0, 0.0, 1.0]
+        assert columnar.short_density == [0.0, 2.0, 0.0]
+
+    def test_empty_response(self):
+        columnar = _timeseries_to_columnar(make_response([]), "dense")
+
+        assert columnar.prices == []
+        assert columnar.long_density == []
+
+
+class TestBinaryFormats:
+    """Arrow and MessagePack carry the same columns as format=columnar."""
+
+    @pytest.mark.parametrize("layout", ["dense", "sparse"])
+    def test_arrow_stream(self, layout):
+        pa = pytest.importorskip("pyarrow")
+
+        encoded = _encode_heatmap_timeseries(RESPONSE, "arrow", layout)
+        table = pa.ipc.open_stream(encoded.body).read_all()
+
+        assert encoded.media_type == ARROW_STREAM_MEDIA_TYPE
+        assert table.num_rows == 3
+        assert table.schema.metadata[b"layout"] == layout.encode()
+        assert table.column("long_density").to_pylist()[0][:1] == [5.0]
+        assert table.column("positions_consumed").to_pylist() == [0, 1, 2]
+
+    def test_arrow_stream_without_levels(self):
+        pa = pytest.importorskip("pyarrow")
+
+        encoded = _encode_heatmap_timeseries(make_response([[], []]), "arrow", "dense")
+
+        assert pa.ipc.open_stream(encoded.body).read_all().num_rows == 2
+
+    def test_msgpack(self):
+        msgpack = pytest.importorskip("msgpack")
+
+        encoded = _encode_heatmap_timeseries(RESPONSE, "msgpack", "sparse")
+        decoded = msgpack.unpackb(encoded.body)
+
+        assert decoded == _timeseries_to_columnar(RESPONSE, "sparse").model_dump()
@@ -0,0 +1,211 @@
+"""Tests for the shared heatmap stream hub and its SSE/WebSocket endpoints."""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.liquidationheatmap.ingestion.db_service import DuckDBService
+from src.liquidationheatmap.models.time_evolving_heatmap import calculate_time_evolving_heatmap
+from src.liquidationheatmap.streaming.heatmap_stream import HeatmapStreamHub, last_closed_candle
+
+BASE = datetime(2025, 11, 1)
+
+
+def at(candle: int) -> datetime:
+    return BASE + timedelta(minutes=15 * candle)
+
+
+class Market:
+    """15m random-walk candles with open interest in a DuckDB file."""
+
+    def __init__(self, db: DuckDBService):
+        self.db = db
+        self.rng = random.Random(3)
+        self.price, self.oi, self.count = 95000.0, 1e8, 0
+        db.conn.execute("""
+            CREATE TABLE klines_15m_history (
+                symbol VARCHAR, open_time TIMESTAMP, open DOUBLE, high DOUBLE,
+                low DOUBLE, close DOUBLE, volume DOUBLE
+            )
+        """)
+        db.conn.execute("""
+            CREATE TABLE open_interest_history (
+                symbol VARCHAR, timestamp TIMESTAMP, open_interest_value DOUBLE
+            )
+        """)
+
+    def add_candles(self, count: int) -> None:
+        for _ in range(count):
+            close = self.price * (1 + self.rng.gauss(0, 0.01))
+            high = max(self.price, close) * 1.002
+            low = min(self.price, close) * 0.998
+            self.oi += self.rng.uniform(-3e6, 5e6)
+            self.db.conn.execute(
+                "INSERT INTO klines_15m_history VALUES ('BTCUSDT', ?, ?, ?, ?, ?, 10)",
+                [at(self.count), self.price, high, low, close],
+            )
+            self.db.conn.execute(
+                "INSERT INTO open_interest_history VALUES ('BTCUSDT', ?, ?)",
+                [at(self.count), self.oi],
+            )
+            self.price = close
+            self.count += 1
+
+
+@pytest.fixture
+def market(tmp_path):
+    with DuckDBService(str(tmp_path / "stream.duckdb")) as db:
+        market = Market(db)
+        market.add_candles(100)
+        yield market
+
+
+def make_hub(market: Market, **kwargs) -> HeatmapStreamHub:
+    async def run_query(fn, *args):
+        return fn(market.db, *args)
+
+    return HeatmapStreamHub(run_query, poll_seconds=0.01, warmup_candles=50, **kwargs)
+
+
+def apply(state: dict, message: dict) -> dict:
+    """Client-side decoding of a stream message."""
+    if message["keyframe"]:
+        state = {}
+    else:
+        state = {
+            price: (lv * message["scale"], sv * message["scale"])
+            for price, (lv, sv) in state.items()
+        }
+    for level in message["levels"]:
+        if level["long_density"] > 0 or level["short_density"] > 0:
+            state[level["price"]] = (level["long_density"], level["short_density"])
+        else:
+            state.pop(level["price"], None)
+    return state
+
+
+class TestLastClosedCandle:
+    """A candle is streamed once its last base candle and open interest are in."""
+
+    def test_base_interval(self):
+        assert last_closed_candle((at(10), at(10)), "15m") == at(10)
+        assert last_closed_candle((None, None), "15m") is None
+
+    def test_aggregated_interval_waits_for_last_base_candle(self):
+        assert last_closed_candle((BASE.replace(hour=9, minute=30), None), "1h") == BASE.replace(
+            hour=8
+        )
+        assert last_closed_candle((BASE.replace(hour=9, minute=45), None), "1h") == BASE.replace(
+            hour=9
+        )
+        assert last_closed_candle((BASE.replace(hour=12, minute=25),), "30m") == BASE.replace(
+            hour=12
+        )
+
+    def test_lagging_open_interest_holds_candles_back(self):
+        klines, oi = BASE.replace(hour=9, minute=45), BASE.replace(hour=7, minute=10)
+
+        assert last_closed_candle((klines, oi), "1h") == BASE.replace(hour=6)
+
+
+class TestHeatmapStreamHub:
+    """One engine advance per closed candle, fanned out to every subscriber."""
+
+    @pytest.mark.asyncio
+    async def test_subscribers_share_keyframe_and_deltas(self, market):
+        hub = make_hub(market)
+        first = hub.subscribe("BTCUSDT", "15m", 100)
+        second = hub.subscribe("BTCUSDT", "15m", 100)
+
+        keyframes = [await sub.next(5) for sub in (first, second)]
+        market.add_candles(3)
+        deltas = [[await sub.next(5) for _ in range(3)] for sub in (first, second)]
+        stats = hub.get_stats()
+        hub.shutdown()
+
+        assert [event for event, _ in keyframes] == ["keyframe", "keyframe"]
+        assert keyframes[0][1] == keyframes[1][1]
+        assert deltas[0] == deltas[1]
+        assert [event for event, _ in deltas[0]] == ["delta"] * 3
+        assert stats["advances"] == 2
+        assert stats["topics"] == 1 and stats["subscribers"] == 2
+
+        # Keyframe plus deltas rebuild the heatmap of the same candles
+        messages = [json.loads(data) for _, data in [keyframes[0]] + deltas[0]]
+        state: dict = {}
+        for message in messages:
+            state = apply(state, message)
+        inputs = market.db.load_heatmap_inputs("BTCUSDT", "15m", at(50), at(102))
+        expected = calculate_time_evolving_heatmap(inputs, None, "BTCUSDT", precision="float64")[-1]
+        assert messages[-1]["timestamp"] == at(102).isoformat()
+        assert sorted(state) == sorted(expected.cells)
+        for price, cell in expected.cells.items():
+            assert state[price][0] == pytest.approx(cell.long_density, rel=1e-9)
+            assert state[price][1] == pytest.approx(cell.short_density, rel=1e-9)
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_resynced_with_keyframe(self, market):
+        hub = make_hub(market, max_queue=1)
+        subscription = hub.subscribe("BTCUSDT", "15m", 100)
+        await subscription.next(5)
+
+        market.add_candles(2)
+        while hub.get_stats()["advances"] < 2:
+            await asyncio.sleep(0.01)
+        message = await subscription.next(5)
+        stats = hub.get_stats()
+        hub.shutdown()
+
+        assert message[0] == "keyframe"
+        assert json.loads(message[1])["timestamp"] == at(101).isoformat()
+        assert stats["resyncs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_last_unsubscribe_stops_topic(self, market):
+        hub = make_hub(market)
+        subscription = hub.subscribe("BTCUSDT", "15m", 100)
+        await subscription.next(5)
+        task = subscription.topic.task
+
+        hub.unsubscribe(subscription)
+        await asyncio.sleep(0)
+
+        assert hub.get_stats()["topics"] == 0
+        assert task.cancelled() or task.cancelling()
+
+
+class TestStreamEndpoints:
+    """The WebSocket endpoint relays hub frames; bad symbols are refused."""
+
+    def test_websocket_receives_keyframe(self, market, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        from src.liquidationheatmap.api import main
+
+        monkeypatch.setattr(main, "_heatmap_streams", make_hub(market))
+        client = TestClient(main.app)
+
+        with client.websocket_connect(
+            "/liquidations/heatmap-stream/ws?symbol=BTCUSDT&interval=15m"
+        ) as websocket:
+            message = websocket.receive_json()
+
+        assert message["keyframe"] is True
+        assert message["timestamp"] == at(99).isoformat()
+
+    def test_invalid_symbol(self):
+        from fastapi.testclient import TestClient
+        from starlette.websockets import WebSocketDisconnect
+
+        from src.liquidationheatmap.api.main import app
+
+        client = TestClient(app)
+
+        assert client.get("/liquidations/heatmap-stream?symbol=NOPEUSDT").status_code == 400
+        with pytest.raises(WebSocketDisconnect) as excinfo:
+            with client.websocket_connect("/liquidations/heatmap-stream/ws?symbol=NOPEUSDT"):
+                pass
+        assert excinfo.value.code == 1008
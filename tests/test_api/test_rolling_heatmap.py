@@ -0,0 +1,120 @@
+"""Tests for rolling heatmap windows that extend the previous engine state."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.liquidationheatmap.api import main
+from src.liquidationheatmap.api.main import RollingHeatmapStore, _compute_rolling_timeseries
+from src.liquidationheatmap.ingestion.db_service import DuckDBService
+from src.liquidationheatmap.models.time_evolving_heatmap import build_book_checkpoints
+
+BASE = datetime(2025, 11, 1)
+KEY = ("BTCUSDT", "tw:7d", "15m", 100.0, "default", None)
+
+
+def at(candle: int) -> datetime:
+    return BASE + timedelta(minutes=15 * candle)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """300 random-walk 15m candles with open interest."""
+    with DuckDBService(str(tmp_path / "rolling.duckdb")) as db:
+        db.conn.execute("""
+            CREATE TABLE klines_15m_history (
+                symbol VARCHAR, open_time TIMESTAMP, open DOUBLE, high DOUBLE,
+                low DOUBLE, close DOUBLE, volume DOUBLE
+            )
+        """)
+        db.conn.execute("""
+            CREATE TABLE open_interest_history (
+                symbol VARCHAR, timestamp TIMESTAMP, open_interest_value DOUBLE
+            )
+        """)
+        rng = random.Random(7)
+        price, oi = 95000.0, 1e8
+        for i in range(300):
+            close = price * (1 + rng.gauss(0, 0.01))
+            high = max(price, close) * (1 + abs(rng.gauss(0, 0.004)))
+            low = min(price, close) * (1 - abs(rng.gauss(0, 0.004)))
+            oi += rng.uniform(-3e6, 5e6)
+            db.conn.execute(
+                "INSERT INTO klines_15m_history VALUES ('BTCUSDT', ?, ?, ?, ?, ?, 10)",
+                [at(i), price, high, low, close],
+            )
+            db.conn.execute(
+                "INSERT INTO open_interest_history VALUES ('BTCUSDT', ?, ?)", [at(i), oi]
+            )
+            price = close
+        yield db
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = RollingHeatmapStore()
+    monkeypatch.setattr(main, "_rolling_heatmaps", store)
+    return store
+
+
+def compute(db, start: datetime, end: datetime):
+    return _compute_rolling_timeseries(db, KEY, "BTCUSDT", "15m", None, 100.0, start, end)
+
+
+def full_run(db, start: datetime, end: datetime):
+    """The same window computed without any previous state."""
+    main._rolling_heatmaps.clear()
+    return compute(db, start, end)
+
+
+def assert_same_timeseries(expected, actual):
+    assert [s.timestamp for s in actual.data] == [s.timestamp for s in expected.data]
+    for exp, act in zip(expected.data, actual.data):
+        assert [level.price for level in act.levels] == [level.price for level in exp.levels]
+        assert [level.long_density for level in act.levels] == pytest.approx(
+            [level.long_density for level in exp.levels], rel=1e-9
+        )
+        assert act.positions_consumed == exp.positions_consumed
+    assert actual.meta.total_long_volume == pytest.approx(expected.meta.total_long_volume)
+    assert actual.meta.total_consumed == expected.meta.total_consumed
+
+
+class TestRollingHeatmap:
+    """A later window replays only the new candles and matches a full run."""
+
+    def test_end_extension_replays_only_new_candles(self, db, store):
+        compute(db, at(0), at(200))
+        extended = compute(db, at(0), at(203))
+
+        stats = store.get_stats()
+        assert stats["full_runs"] == 1
+        assert stats["extensions"] == 1
+        # The previous last candle plus three new ones
+        assert stats["avg_extension_candles"] == 4
+        assert_same_timeseries(full_run(db, at(0), at(203)), extended)
+
+    def test_moving_start_needs_a_persisted_checkpoint(self, db, store):
+        compute(db, at(10), at(200))
+        compute(db, at(12), at(202))
+
+        assert store.get_stats()["extensions"] == 0
+
+    def test_moving_start_extends_from_persisted_checkpoint(self, db, store):
+        inputs = db.load_heatmap_inputs("BTCUSDT", "15m", at(0), at(299))
+        for checkpoint in build_book_checkpoints(inputs):
+            db.save_book_checkpoint("BTCUSDT", "15m", "default", checkpoint)
+
+        compute(db, at(100), at(250))
+        moved = compute(db, at(104), at(254))
+
+        assert store.get_stats()["extensions"] == 1
+        assert moved.data[0].timestamp == at(104).isoformat()
+        assert moved.meta.checkpoint_time == datetime(2025, 11, 2).isoformat()
+        assert_same_timeseries(full_run(db, at(104), at(254)), moved)
+
+    def test_earlier_window_is_computed_in_full(self, db, store):
+        compute(db, at(0), at(200))
+        compute(db, at(0), at(150))
+
+        assert store.get_stats()["full_runs"] == 2
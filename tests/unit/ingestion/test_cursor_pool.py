@@ -0,0 +1,145 @@
+"""Tests for the DuckDB cursor pool behind DuckDBService.thread_view()."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pytest
+
+from src.liquidationheatmap.ingestion.db_service import (
+    CursorPool,
+    CursorPoolTimeoutError,
+    DuckDBService,
+)
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect(":memory:")
+    conn.execute("CREATE TABLE t AS SELECT range AS x FROM range(1000)")
+    yield conn
+    conn.close()
+
+
+class TestCursorPool:
+    """Cursors are reused, bounded, health-checked and accounted for."""
+
+    def test_cursors_are_reused_across_checkouts(self, conn):
+        pool = CursorPool(conn, max_size=2)
+
+        with pool.checkout() as first:
+            assert first is not conn
+        with pool.checkout() as second:
+            assert second.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1000
+
+        stats = pool.get_stats()
+        assert second is first
+        assert stats["created"] == 1
+        assert stats["checkouts"] == 2
+        assert stats["in_use"] == 0 and stats["idle"] == 1
+
+    def test_concurrent_checkouts_get_distinct_cursors(self, conn):
+        pool = CursorPool(conn, max_size=4)
+        barrier = threading.Barrier(4)
+
+        def query(_):
+            with pool.checkout() as cursor:
+                barrier.wait(5)
+                return id(cursor), cursor.execute("SELECT SUM(x) FROM t").fetchone()[0]
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(query, range(4)))
+
+        assert len({cursor_id for cursor_id, _ in results}) == 4
+        assert {total for _, total in results} == {499500}
+        assert pool.get_stats()["idle"] == 4
+
+    def test_checkout_beyond_max_size_waits_then_times_out(self, conn):
+        pool = CursorPool(conn, max_size=1)
+        released = threading.Event()
+
+        def hold():
+            with pool.checkout():
+                released.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        while pool.get_stats()["in_use"] == 0:
+            pass
+
+        with pytest.raises(CursorPoolTimeoutError):
+            with pool.checkout(timeout=0.05):
+                pass
+
+        threading.Timer(0.05, released.set).start()
+        with pool.checkout(timeout=5) as cursor:
+            assert cursor.execute("SELECT 1").fetchone() == (1,)
+        holder.join()
+
+        stats = pool.get_stats()
+        assert stats["waits"] == 1
+        assert stats["max_wait_ms"] > 0
+        assert stats["created"] == 1
+
+    def test_unhealthy_cursor_is_replaced(self, conn):
+        pool = CursorPool(conn, max_size=1)
+        with pool.checkout() as cursor:
+            pass
+        cursor.close()
+
+        with pool.checkout() as replacement:
+            assert replacement.execute("SELECT 1").fetchone() == (1,)
+
+        assert replacement is not cursor
+        assert pool.get_stats()["replaced"] == 1
+
+    def test_close_closes_idle_and_returned_cursors(self, conn):
+        pool = CursorPool(conn, max_size=2)
+        with pool.checkout() as idle:
+            pass
+
+        with pool.checkout() as busy:
+            pool.close()
+            assert busy.execute("SELECT 1").fetchone() == (1,)
+
+        for cursor in (idle, busy):
+            with pytest.raises(duckdb.ConnectionException):
+                cursor.execute("SELECT 1")
+        with pytest.raises(duckdb.ConnectionException):
+            with pool.checkout():
+                pass
+
+
+class TestServiceCursorPool:
+    """thread_view() draws from the singleton's pool, which closes with it."""
+
+    def test_thread_views_share_the_pool(self, tmp_path):
+        db_path = str(tmp_path / "views.duckdb")
+        service = DuckDBService(db_path=db_path)
+        service.conn.execute("CREATE TABLE t AS SELECT 42 AS x")
+
+        for _ in range(3):
+            with service.thread_view() as view:
+                assert view.conn is not service.conn
+                assert view.conn.execute("SELECT x FROM t").fetchone()[0] == 42
+
+        stats = DuckDBService.get_cursor_pool_stats()
+        key = f"{tmp_path.resolve() / 'views.duckdb'} (read-write)"
+        assert stats[key]["checkouts"] == 3
+        assert stats[key]["created"] == 1
+
+    def test_reset_closes_the_pool(self, tmp_path):
+        db_path = str(tmp_path / "reset.duckdb")
+        service = DuckDBService(db_path=db_path)
+        service.conn.execute("CREATE TABLE t AS SELECT 1 AS x")
+        with service.thread_view():
+            pass
+        pool = service.cursor_pool
+
+        DuckDBService.reset_singletons(db_path)
+
+        assert pool.get_stats()["idle"] == 0
+        fresh = DuckDBService(db_path=db_path)
+        assert fresh.cursor_pool is not pool
+        with fresh.thread_view() as view:
+            assert view.conn.execute("SELECT x FROM t").fetchone()[0] == 1
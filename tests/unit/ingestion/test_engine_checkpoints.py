@@ -0,0 +1,204 @@
+"""Unit tests for engine checkpoint persistence and heatmap input loading in DuckDBService."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.liquidationheatmap.models.position_book import LONG, SHORT, PositionBook
+
+
+def make_checkpoint(timestamp: datetime, scale: float = 1.0):
+    """Build a small checkpoint with both sides populated."""
+    book = PositionBook()
+    book.add(
+        np.array([90010.0, 91050.0]), np.array([10.0, 30.0]) * scale, LONG, np.array([10, 5]), 0
+    )
+    book.add(np.array([99020.0]), np.array([20.0]) * scale, SHORT, np.array([25]), 0)
+    return book.checkpoint(timestamp)
+
+
+class TestBookCheckpointPersistence:
+    """Tests for save_book_checkpoint() / load_book_checkpoint()."""
+
+    def test_round_trip(self, tmp_path):
+        """A saved checkpoint should load back with identical columns."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            checkpoint = make_checkpoint(datetime(2025, 11, 2))
+            rows = db.save_book_checkpoint("BTCUSDT", "15m", "default", checkpoint)
+
+            loaded = db.load_book_checkpoint("BTCUSDT", "15m", "default", datetime(2025, 11, 2))
+
+            assert rows == 3
+            assert loaded.timestamp == datetime(2025, 11, 2)
+            order = np.argsort(loaded.liq_price)
+            expected = np.argsort(checkpoint.liq_price)
+            assert loaded.liq_price[order].tolist() == checkpoint.liq_price[expected].tolist()
+            assert loaded.volume[order].tolist() == checkpoint.volume[expected].tolist()
+            assert loaded.side[order].tolist() == checkpoint.side[expected].tolist()
+            assert loaded.leverage[order].tolist() == checkpoint.leverage[expected].tolist()
+
+    def test_loads_nearest_checkpoint_before_time(self, tmp_path):
+        """The latest checkpoint at or before the requested time should be returned."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            for day in (1, 2, 3):
+                db.save_book_checkpoint(
+                    "BTCUSDT", "15m", "default", make_checkpoint(datetime(2025, 11, day))
+                )
+
+            assert db.load_book_checkpoint(
+                "BTCUSDT", "15m", "default", datetime(2025, 11, 2, 18)
+            ).timestamp == datetime(2025, 11, 2)
+            assert db.load_book_checkpoint("BTCUSDT", "15m", "default").timestamp == datetime(
+                2025, 11, 3
+            )
+            assert (
+                db.load_book_checkpoint("BTCUSDT", "15m", "default", datetime(2025, 10, 31)) is None
+            )
+            assert db.load_book_checkpoint("BTCUSDT", "1h", "default") is None
+            assert db.load_book_checkpoint("BTCUSDT", "15m", "10:1") is None
+
+    def test_save_replaces_existing_checkpoint(self, tmp_path):
+        """Saving twice at the same key should keep only the latest positions."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            ts = datetime(2025, 11, 2)
+            db.save_book_checkpoint("BTCUSDT", "15m", "default", make_checkpoint(ts))
+            db.save_book_checkpoint("BTCUSDT", "15m", "default", make_checkpoint(ts, scale=2.0))
+
+            loaded = db.load_book_checkpoint("BTCUSDT", "15m", "default", ts)
+
+            assert len(loaded) == 3
+            assert sorted(loaded.volume.tolist()) == [20.0, 40.0, 60.0]
+
+    def test_missing_tables_return_none(self, tmp_path):
+        """Loading before any checkpoint was saved should return None, not raise."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            assert db.load_book_checkpoint("BTCUSDT", "15m", "default") is None
+
+
+class TestLoadHeatmapInputs:
+    """Tests for load_heatmap_inputs()."""
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.conn.execute("""
+                CREATE TABLE klines_15m_history (
+                    symbol VARCHAR, open_time TIMESTAMP, open DOUBLE, high DOUBLE,
+                    low DOUBLE, close DOUBLE, volume DOUBLE
+                )
+            """)
+            db.conn.execute("""
+                CREATE TABLE open_interest_history (
+                    symbol VARCHAR, timestamp TIMESTAMP, open_interest_value DOUBLE
+                )
+            """)
+            base = datetime(2025, 11, 1)
+            for i in range(8):
+                ts = base + timedelta(minutes=15 * i)
+                db.conn.execute(
+                    "INSERT INTO klines_15m_history VALUES ('BTCUSDT', ?, ?, ?, ?, ?, 10)",
+                    [ts, 95000 + i, 95100 + i, 94900 + i, 95050 + i],
+                )
+                db.conn.execute(
+                    "INSERT INTO open_interest_history VALUES ('BTCUSDT', ?, ?)",
+                    [ts, 1_000_000 + 1000 * i * i],
+                )
+            yield db
+
+    def test_loads_candles_and_deltas(self, db):
+        """Candles should be float64 OHLC columns in time order with one delta per candle."""
+        inputs = db.load_heatmap_inputs(
+            "BTCUSDT", "15m", datetime(2025, 11, 1), datetime(2025, 11, 1, 1, 45)
+        )
+
+        assert len(inputs) == 8
+        assert inputs.timestamps()[0] == datetime(2025, 11, 1)
+        assert inputs.close.dtype == np.float64
+        assert inputs.close[0] == 95050.0
+        assert inputs.oi_delta[0] == 0.0
+        assert inputs.oi_delta[3] == 5000.0  # 9000 - 4000
+
+    def test_first_delta_uses_previous_bucket(self, db):
+        """A window starting mid-history should still get the first candle's delta."""
+        inputs = db.load_heatmap_inputs(
+            "BTCUSDT", "15m", datetime(2025, 11, 1, 0, 45), datetime(2025, 11, 1, 1, 45)
+        )
+
+        assert inputs.timestamps()[0] == datetime(2025, 11, 1, 0, 45)
+        assert inputs.oi_delta[0] == 5000.0
+
+    def test_aggregates_larger_intervals(self, db):
+        """1h candles should be aggregated from the 15m table."""
+        inputs = db.load_heatmap_inputs(
+            "BTCUSDT", "1h", datetime(2025, 11, 1), datetime(2025, 11, 1, 1, 45)
+        )
+
+        assert inputs.timestamps() == [datetime(2025, 11, 1), datetime(2025, 11, 1, 1)]
+        assert inputs.open[0] == 95000.0
+        assert inputs.close[0] == 95053.0
+        assert inputs.high[1] == 95107.0
+        assert len(inputs.oi_delta) == 2
+
+    def test_candles_without_oi_get_zero_delta(self, db):
+        """The SQL join should fill candles that have no OI bucket with zero."""
+        db.conn.execute(
+            "DELETE FROM open_interest_history WHERE timestamp = ?", [datetime(2025, 11, 1, 1)]
+        )
+
+        inputs = db.load_heatmap_inputs(
+            "BTCUSDT", "15m", datetime(2025, 11, 1), datetime(2025, 11, 1, 1, 45)
+        )
+
+        assert len(inputs) == 8
+        assert inputs.oi_delta[4] == 0.0
+        assert inputs.oi_delta[5] == 25000.0 - 9000.0  # against the last bucket present
+
+    def test_matches_candle_objects(self, db):
+        """The engine should give the same result from columns as from Candle objects."""
+        from src.liquidationheatmap.models.time_evolving_heatmap import (
+            calculate_time_evolving_heatmap,
+        )
+
+        inputs = db.load_heatmap_inputs(
+            "BTCUSDT", "15m", datetime(2025, 11, 1), datetime(2025, 11, 1, 1, 45)
+        )
+        candles, oi_deltas = inputs.to_candles()
+
+        from_columns = calculate_time_evolving_heatmap(inputs, None, "BTCUSDT", precision="float64")
+        from_objects = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )
+
+        assert [s.timestamp for s in from_columns] == [s.timestamp for s in from_objects]
+        assert [s.cells for s in from_columns] == [s.cells for s in from_objects]
+
+    def test_empty_range(self, db):
+        """No candles in range should return empty columns."""
+        inputs = db.load_heatmap_inputs(
+            "BTCUSDT", "15m", datetime(2024, 1, 1), datetime(2024, 1, 2)
+        )
+
+        assert len(inputs) == 0
+
+    def test_data_watermark(self, db):
+        """The watermark should be the latest candle and OI time for the symbol."""
+        last = datetime(2025, 11, 1, 1, 45)
+
+        assert db.get_data_watermark("BTCUSDT", "4h") == (last, last)
+        assert db.get_data_watermark("BTCUSDT", "15m", include_open_interest=False) == (last,)
+        assert db.get_data_watermark("ETHUSDT", "15m") == (None, None)
+
+    def test_data_watermark_missing_table(self, db):
+        """A missing base klines table should give None instead of raising."""
+        assert db.get_data_watermark("BTCUSDT", "5m") == (None, datetime(2025, 11, 1, 1, 45))
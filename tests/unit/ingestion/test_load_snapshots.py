@@ -8,6 +8,7 @@ Tests for T033: Implement load_snapshots(symbol, start_time, end_time) method.
 from datetime import datetime
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
 from src.liquidationheatmap.models.position import HeatmapSnapshot
@@ -236,3 +237,178 @@ class TestLoadSnapshots:
             # Second snapshot should have cell at 96000
             assert result[1].timestamp == ts2
             assert Decimal("96000") in result[1].cells
+
+    def test_load_snapshots_filters_by_parameters(self, tmp_path):
+        """Interval, bin size and weights filters should only match tagged snapshots."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            ts = datetime(2025, 11, 15, 12, 0, 0)
+            for interval, volume in (("15m", "1000"), ("1h", "2000"), (None, "3000")):
+                snapshot = HeatmapSnapshot(timestamp=ts, symbol="BTCUSDT")
+                snapshot.get_cell(Decimal("95000")).long_density = Decimal(volume)
+                db.save_snapshot(
+                    snapshot,
+                    interval=interval,
+                    price_bin_size=100.0 if interval else None,
+                    weights_key="default" if interval else None,
+                )
+
+            result = db.load_snapshots(
+                "BTCUSDT", ts, ts, interval="1h", price_bin_size=100.0, weights_key="default"
+            )
+
+            assert len(result) == 1
+            assert result[0].cells[Decimal("95000")].long_density == Decimal("2000")
+            assert db.load_snapshots("BTCUSDT", ts, ts, interval="1h", price_bin_size=50.0) == []
+            assert len(db.load_snapshots("BTCUSDT", ts, ts)) == 1
+
+    def test_load_snapshots_restores_totals_and_counts(self, tmp_path):
+        """Side totals and position counts should survive the round trip."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            ts = datetime(2025, 11, 15, 12, 0, 0)
+            snapshot = HeatmapSnapshot(
+                timestamp=ts, symbol="BTCUSDT", positions_created=10, positions_consumed=4
+            )
+            snapshot.get_cell(Decimal("95000")).long_density = Decimal("1000")
+            snapshot.get_cell(Decimal("96000")).long_density = Decimal("500")
+            snapshot.get_cell(Decimal("99000")).short_density = Decimal("250")
+            db.save_snapshot(snapshot)
+
+            loaded = db.load_snapshots("BTCUSDT", ts, ts)[0]
+
+            assert loaded.total_long_volume == Decimal("1500")
+            assert loaded.total_short_volume == Decimal("250")
+            assert loaded.positions_created == 10
+            assert loaded.positions_consumed == 4
+
+
+class TestLoadSnapshotColumns:
+    """Tests for DuckDBService.load_snapshot_columns()."""
+
+    def _save(self, db, ts, cells, created=0, consumed=0):
+        snapshot = HeatmapSnapshot(
+            timestamp=ts, symbol="BTCUSDT", positions_created=created, positions_consumed=consumed
+        )
+        for price, (long, short) in cells.items():
+            cell = snapshot.get_cell(Decimal(price))
+            cell.long_density = Decimal(long)
+            cell.short_density = Decimal(short)
+        db.save_snapshot(snapshot, interval="15m", price_bin_size=100.0, weights_key="default")
+
+    def test_long_and_short_rows_are_pivoted_per_level(self, tmp_path):
+        """Each price level should be one row holding both sides, like load_snapshots()."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            first, second = datetime(2025, 11, 15, 12), datetime(2025, 11, 15, 12, 15)
+            self._save(db, first, {"96000": ("500", "0"), "95000": ("1000", "250")}, 10, 4)
+            self._save(db, second, {"97000": ("0", "750")}, 12, 1)
+
+            columns = db.load_snapshot_columns(
+                "BTCUSDT", first, second, interval="15m", price_bin_size=100.0
+            )
+
+            assert columns.timestamps() == [first, second]
+            assert columns.offsets.tolist() == [0, 2, 3]
+            assert columns.price.tolist() == [95000.0, 96000.0, 97000.0]
+            assert columns.long_density.tolist() == [1000.0, 500.0, 0.0]
+            assert columns.short_density.tolist() == [250.0, 0.0, 750.0]
+            assert columns.positions_created.tolist() == [10, 12]
+            assert columns.positions_consumed.tolist() == [4, 1]
+
+            long_totals, short_totals = columns.totals()
+            assert long_totals.tolist() == [1500.0, 0.0]
+            assert short_totals.tolist() == [250.0, 750.0]
+
+    def test_reindex_fills_empty_snapshots(self, tmp_path):
+        """Grid timestamps without stored rows should become empty snapshots."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            ts = datetime(2025, 11, 15, 12, 15)
+            self._save(db, ts, {"95000": ("1000", "0")}, 3, 2)
+
+            columns = db.load_snapshot_columns("BTCUSDT", ts, ts)
+            grid = [datetime(2025, 11, 15, 12), ts, datetime(2025, 11, 15, 12, 30)]
+            reindexed = columns.reindex(np.array(grid, dtype="datetime64[us]"))
+
+            assert reindexed.timestamps() == grid
+            assert reindexed.offsets.tolist() == [0, 0, 1, 1]
+            assert reindexed.positions_created.tolist() == [0, 3, 0]
+            assert reindexed.positions_consumed.tolist() == [0, 2, 0]
+
+    def test_returns_empty_columns_when_no_data(self, tmp_path):
+        """A range without snapshots (or without the tables) should load no rows."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            columns = db.load_snapshot_columns(
+                "BTCUSDT", datetime(2025, 11, 15), datetime(2025, 11, 16)
+            )
+
+            assert len(columns) == 0
+            assert columns.offsets.tolist() == [0]
+            assert columns.totals()[0].tolist() == []
+
+
+class TestSnapshotCoverage:
+    """Tests for save_snapshot_coverage() / load_snapshot_coverage()."""
+
+    KEY = ("BTCUSDT", "15m", 100.0, "default")
+
+    def test_overlapping_and_adjacent_ranges_merge(self, tmp_path):
+        """Ranges within max_gap of each other should collapse into one."""
+        from datetime import timedelta
+
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            gap = timedelta(minutes=15)
+            db.save_snapshot_coverage(
+                *self.KEY, datetime(2025, 11, 1), datetime(2025, 11, 2), max_gap=gap
+            )
+            db.save_snapshot_coverage(
+                *self.KEY, datetime(2025, 11, 2, 0, 15), datetime(2025, 11, 3), max_gap=gap
+            )
+            merged = db.save_snapshot_coverage(
+                *self.KEY, datetime(2025, 11, 1, 12), datetime(2025, 11, 1, 18), max_gap=gap
+            )
+
+            rows = db.conn.execute("SELECT COUNT(*) FROM liquidation_snapshot_coverage").fetchone()[
+                0
+            ]
+            assert rows == 1
+            assert merged == (datetime(2025, 11, 1), datetime(2025, 11, 3))
+
+    def test_load_returns_covered_part_of_best_range(self, tmp_path):
+        """The range overlapping the request the most should be clipped to it."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.save_snapshot_coverage(*self.KEY, datetime(2025, 11, 1), datetime(2025, 11, 2))
+            db.save_snapshot_coverage(*self.KEY, datetime(2025, 11, 4), datetime(2025, 11, 8))
+
+            covered = db.load_snapshot_coverage(
+                *self.KEY, datetime(2025, 11, 1, 12), datetime(2025, 11, 6)
+            )
+
+            assert covered == (datetime(2025, 11, 4), datetime(2025, 11, 6))
+            assert (
+                db.load_snapshot_coverage(
+                    "BTCUSDT", "1h", 100.0, "default", datetime(2025, 11, 1), datetime(2025, 11, 6)
+                )
+                is None
+            )
+
+    def test_missing_tables_return_none(self, tmp_path):
+        """Looking up coverage before any snapshot was saved should not raise."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            assert (
+                db.load_snapshot_coverage(*self.KEY, datetime(2025, 11, 1), datetime(2025, 11, 2))
+                is None
+            )
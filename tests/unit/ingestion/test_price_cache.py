@@ -0,0 +1,127 @@
+"""Tests for the background mark price cache."""
+
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import duckdb
+import pytest
+
+from src.liquidationheatmap.ingestion import price_cache
+from src.liquidationheatmap.ingestion.db_service import DuckDBService, _get_fallback_price
+from src.liquidationheatmap.ingestion.price_cache import PriceCache
+
+
+def fake_fetch(prices):
+    def fetch():
+        return {symbol: Decimal(price) for symbol, price in prices.items()}
+
+    return fetch
+
+
+def failing_fetch():
+    raise OSError("exchange unreachable")
+
+
+@pytest.fixture
+def klines_conn():
+    conn = duckdb.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE klines_5m_history (open_time TIMESTAMP, symbol VARCHAR, close DECIMAL(18, 8))"
+    )
+    base = datetime(2025, 11, 1)
+    for i, close in enumerate(["95000.5", "95100.25", "95200.75"]):
+        conn.execute(
+            "INSERT INTO klines_5m_history VALUES (?, 'BTCUSDT', ?)",
+            [base + timedelta(minutes=5 * i), close],
+        )
+    yield conn
+    conn.close()
+
+
+class TestPriceCache:
+    """Reads come from memory, then the latest kline close, then stale prices."""
+
+    def test_refresh_keeps_tracked_symbols_only(self):
+        cache = PriceCache(fetch=fake_fetch({"BTCUSDT": "95123.4", "DOGEUSDT": "0.2"}))
+        cache.symbols = frozenset({"BTCUSDT", "ETHUSDT"})
+
+        assert cache.refresh() == 1
+        assert cache.get_price("BTCUSDT") == Decimal("95123.4")
+        assert cache.get_price("DOGEUSDT") is None
+
+        stats = cache.get_stats()
+        assert stats["refreshes"] == 1 and stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["prices"]["BTCUSDT"]["source"] == "exchange"
+
+    def test_failed_refresh_is_counted_and_keeps_prices(self):
+        cache = PriceCache(fetch=fake_fetch({"BTCUSDT": "95123.4"}))
+        cache.symbols = frozenset({"BTCUSDT"})
+        cache.refresh()
+        cache.fetch = failing_fetch
+
+        assert cache.refresh() == 0
+        assert cache.get_price("BTCUSDT") == Decimal("95123.4")
+        stats = cache.get_stats()
+        assert stats["failures"] == 1
+        assert stats["last_error"] == "exchange unreachable"
+
+    def test_kline_close_fills_missing_price(self, klines_conn):
+        cache = PriceCache(fetch=failing_fetch)
+
+        assert cache.get_price("BTCUSDT", klines_conn) == Decimal("95200.75")
+        # Cached, so the next read does not query DuckDB
+        assert cache.get_price("BTCUSDT") == Decimal("95200.75")
+        assert cache.get_price("ETHUSDT", klines_conn) is None
+
+        stats = cache.get_stats()
+        assert stats["kline_fallbacks"] == 1 and stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["prices"]["BTCUSDT"]["source"] == "kline"
+
+    def test_stale_price_prefers_kline_close(self, klines_conn):
+        cache = PriceCache(fetch=fake_fetch({"BTCUSDT": "90000"}), max_age_seconds=0)
+        cache.symbols = frozenset({"BTCUSDT"})
+        cache.refresh()
+
+        assert cache.get_price("BTCUSDT", klines_conn) == Decimal("95200.75")
+        # Without klines the stale exchange price still beats no price
+        cache.refresh()
+        assert cache.get_price("BTCUSDT") == Decimal("90000")
+        assert cache.get_stats()["stale"] == 1
+
+    def test_background_refresh(self):
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return {"BTCUSDT": Decimal("95000")}
+
+        cache = PriceCache(fetch=fetch, refresh_seconds=60)
+        cache.start(["BTCUSDT"])
+        try:
+            assert refreshed.wait(5)
+            assert cache.get_stats()["running"]
+        finally:
+            cache.stop()
+
+        assert not cache.get_stats()["running"]
+        assert cache.get_price("BTCUSDT") == Decimal("95000")
+
+
+class TestServiceCurrentPrice:
+    """get_current_price() never calls the exchange."""
+
+    def test_falls_back_to_static_estimate(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(price_cache, "_price_cache", PriceCache(fetch=failing_fetch))
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            assert db.get_current_price("BTCUSDT") == _get_fallback_price("BTCUSDT")
+
+    def test_reads_cached_price(self, tmp_path, monkeypatch):
+        cache = PriceCache(fetch=fake_fetch({"BTCUSDT": "95123.4"}))
+        cache.symbols = frozenset({"BTCUSDT"})
+        cache.refresh()
+        monkeypatch.setattr(price_cache, "_price_cache", cache)
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            assert db.get_current_price("BTCUSDT") == Decimal("95123.4")
@@ -210,3 +210,97 @@ class TestSaveSnapshot:
             rows_inserted = db.save_snapshot(snapshot)
 
             assert rows_inserted == 0
+
+
+def make_snapshot(timestamp: datetime, densities: dict[int, tuple[str, str]]) -> HeatmapSnapshot:
+    snapshot = HeatmapSnapshot(timestamp=timestamp, symbol="BTCUSDT", positions_created=3)
+    for price, (long_density, short_density) in densities.items():
+        cell = snapshot.get_cell(Decimal(price))
+        cell.long_density = Decimal(long_density)
+        cell.short_density = Decimal(short_density)
+    return snapshot
+
+
+class TestSaveSnapshots:
+    """Tests for the batched DuckDBService.save_snapshots() upsert."""
+
+    PARAMS = {"interval": "15m", "price_bin_size": 100.0, "weights_key": "default"}
+
+    def test_batch_upserts_on_cell_key(self, tmp_path):
+        """Re-saving a batch updates existing cells and inserts only new ones."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            first = [
+                make_snapshot(datetime(2025, 11, 15, 12, 0), {95000: ("1000", "0")}),
+                make_snapshot(datetime(2025, 11, 15, 12, 15), {95000: ("1500", "700")}),
+            ]
+            assert db.save_snapshots(first, **self.PARAMS) == 3
+
+            second = [
+                make_snapshot(datetime(2025, 11, 15, 12, 15), {95000: ("2500", "700")}),
+                make_snapshot(datetime(2025, 11, 15, 12, 30), {96000: ("10", "20")}),
+            ]
+            assert db.save_snapshots(second, **self.PARAMS) == 2
+
+            rows = db.conn.execute("""
+                SELECT timestamp, price_bucket, side, active_volume, positions_created
+                FROM liquidation_snapshots ORDER BY timestamp, price_bucket, side
+            """).fetchall()
+            ids = db.conn.execute("SELECT id FROM liquidation_snapshots").fetchall()
+
+        assert len(rows) == 5
+        assert len(set(ids)) == 5
+        assert rows[1][2:4] == ("long", Decimal("2500"))
+        assert {row[4] for row in rows} == {3}
+
+    def test_parameters_are_part_of_the_key(self, tmp_path):
+        """The same cell computed with other parameters is a separate row."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        snapshot = make_snapshot(datetime(2025, 11, 15, 12, 0), {95000: ("1000", "0")})
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.save_snapshots([snapshot], **self.PARAMS)
+            db.save_snapshots([snapshot], **{**self.PARAMS, "interval": "1h"})
+            db.save_snapshots([snapshot])
+            db.save_snapshots([snapshot])
+
+            count = db.conn.execute("SELECT COUNT(*) FROM liquidation_snapshots").fetchone()[0]
+
+        assert count == 3
+
+    def test_legacy_duplicates_fall_back_to_delete_and_insert(self, tmp_path):
+        """Without the unique key index, saves still replace matching cells."""
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+
+        snapshot = make_snapshot(datetime(2025, 11, 15, 12, 0), {95000: ("1000", "0")})
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.conn.execute("""
+                CREATE TABLE liquidation_snapshots (
+                    id INTEGER PRIMARY KEY, timestamp TIMESTAMP NOT NULL,
+                    symbol VARCHAR(20) NOT NULL, price_bucket DECIMAL(18, 2) NOT NULL,
+                    side VARCHAR(10) NOT NULL, active_volume DECIMAL(20, 8) NOT NULL DEFAULT 0,
+                    consumed_volume DECIMAL(20, 8) NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    interval VARCHAR, price_bin_size DOUBLE, weights_key VARCHAR,
+                    positions_created INTEGER DEFAULT 0, positions_consumed INTEGER DEFAULT 0
+                )
+            """)
+            for row_id in (1, 2):
+                db.conn.execute(
+                    """
+                    INSERT INTO liquidation_snapshots
+                    (id, timestamp, symbol, price_bucket, side, active_volume,
+                     interval, price_bin_size, weights_key)
+                    VALUES (?, '2025-11-15 12:00:00', 'BTCUSDT', 95000, 'long', 1,
+                            '15m', 100.0, 'default')
+                    """,
+                    [row_id],
+                )
+
+            inserted = db.save_snapshots([snapshot], **self.PARAMS)
+            rows = db.conn.execute("SELECT active_volume FROM liquidation_snapshots").fetchall()
+
+        assert db._snapshot_key_indexed is False
+        assert inserted == 0
+        assert rows == [(Decimal("1000"),)]
@@ -0,0 +1,159 @@
+"""Tests for the partitioned Parquet snapshot store."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import duckdb
+import pytest
+
+from src.liquidationheatmap.ingestion.db_service import DuckDBService
+from src.liquidationheatmap.ingestion.snapshot_store import ParquetSnapshotStore
+from src.liquidationheatmap.models.position import HeatmapSnapshot
+from src.liquidationheatmap.models.time_evolving_heatmap import SnapshotColumns
+
+BASE = datetime(2025, 11, 1, 18)
+PARAMS = {"interval": "15m", "price_bin_size": 100.0, "weights_key": "default"}
+
+
+def make_snapshots(count: int, scale: int = 1) -> list[HeatmapSnapshot]:
+    """15m snapshots from BASE, spanning midnight after 24 of them."""
+    snapshots = []
+    for i in range(count):
+        snapshot = HeatmapSnapshot(
+            timestamp=BASE + timedelta(minutes=15 * i),
+            symbol="BTCUSDT",
+            positions_created=i,
+            positions_consumed=i // 2,
+        )
+        for j in range(5):
+            cell = snapshot.get_cell(Decimal(95000 + 100 * j))
+            cell.long_density = Decimal(scale * ((i + j) % 4))
+            cell.short_density = Decimal(scale * ((i * j) % 3))
+        snapshots.append(snapshot)
+    return snapshots
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ParquetSnapshotStore(tmp_path / "snapshots")
+
+
+class TestParquetSnapshotStore:
+    """Writes land in symbol/interval/date partitions and read back as columns."""
+
+    def test_round_trip_matches_duckdb_table(self, store, tmp_path):
+        snapshots = make_snapshots(40)
+        store.write(snapshots, **PARAMS)
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.save_snapshots(snapshots, **PARAMS)
+            expected = db.load_snapshot_columns("BTCUSDT", BASE, BASE + timedelta(days=1))
+
+        loaded = store.load_columns("BTCUSDT", BASE, BASE + timedelta(days=1), **PARAMS)
+
+        assert loaded.timestamps() == expected.timestamps()
+        assert loaded.offsets.tolist() == expected.offsets.tolist()
+        assert loaded.price.tolist() == expected.price.tolist()
+        assert loaded.long_density.tolist() == expected.long_density.tolist()
+        assert loaded.short_density.tolist() == expected.short_density.tolist()
+        assert loaded.positions_created.tolist() == expected.positions_created.tolist()
+
+        partitions = [p.relative_to(store.root).as_posix() for p in store.partitions()]
+        assert partitions == [
+            "symbol=BTCUSDT/interval=15m/date=2025-11-01",
+            "symbol=BTCUSDT/interval=15m/date=2025-11-02",
+        ]
+        codecs = duckdb.sql(
+            f"SELECT DISTINCT compression FROM parquet_metadata('{store.root}/**/*.parquet')"
+        ).fetchall()
+        assert codecs == [("ZSTD",)]
+
+    def test_reads_only_partitions_of_the_window(self, store):
+        store.write(make_snapshots(40), **PARAMS)
+
+        files = store.files("BTCUSDT", "15m", BASE, BASE + timedelta(hours=3))
+        loaded = store.load_columns("BTCUSDT", BASE, BASE + timedelta(hours=3), **PARAMS)
+
+        assert len(files) == 1 and "date=2025-11-01" in files[0]
+        assert len(loaded) == 13
+        assert store.files("BTCUSDT", "1h", BASE, BASE) == []
+        assert len(store.load_columns("BTCUSDT", BASE, BASE, interval="1h")) == 0
+
+    def test_rewrite_supersedes_whole_snapshots(self, store):
+        snapshots = make_snapshots(4)
+        store.write(snapshots, **PARAMS)
+        rewritten = make_snapshots(2, scale=10)
+        for snapshot in rewritten:
+            # A level that emptied out must not come back from the first write
+            del snapshot.cells[Decimal(95400)]
+        store.write(rewritten, **PARAMS)
+
+        loaded = store.load_columns("BTCUSDT", BASE, BASE + timedelta(hours=1), **PARAMS)
+
+        # Snapshots that were not rewritten keep their first write
+        expected = SnapshotColumns.from_snapshots(rewritten + snapshots[2:])
+        assert loaded.offsets.tolist() == expected.offsets.tolist()
+        assert loaded.price.tolist() == expected.price.tolist()
+        assert loaded.long_density.tolist() == expected.long_density.tolist()
+        assert 95400.0 not in loaded.price[: loaded.offsets[2]].tolist()
+
+    def test_compact_merges_files_and_drops_superseded_rows(self, store):
+        for start in range(0, 40, 10):
+            store.write(make_snapshots(40)[start : start + 10], **PARAMS)
+        store.write(make_snapshots(3, scale=10), **PARAMS)
+        before = store.load_columns("BTCUSDT", BASE, BASE + timedelta(days=1), **PARAMS)
+
+        stats = store.compact()
+        after = store.load_columns("BTCUSDT", BASE, BASE + timedelta(days=1), **PARAMS)
+
+        assert [len(list(p.glob("*.parquet"))) for p in store.partitions()] == [1, 1]
+        assert stats["partitions"] == 2 and stats["files_merged"] == 6
+        assert after.timestamps() == before.timestamps()
+        assert after.long_density.tolist() == before.long_density.tolist()
+        rows = duckdb.sql(f"SELECT COUNT(*) FROM '{store.root}/**/*.parquet'").fetchone()[0]
+        # One marker row per snapshot plus its occupied levels
+        assert rows == 40 + len(after.price)
+        assert store.compact()["partitions"] == 0
+
+
+class TestServiceReadsSnapshotStore:
+    """load_snapshot_columns() prefers the configured store over the table."""
+
+    def test_store_first_then_table(self, store, tmp_path, monkeypatch):
+        monkeypatch.setenv("LH_SNAPSHOT_STORE_DIR", str(store.root))
+        store.write(make_snapshots(4, scale=10), **PARAMS)
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.save_snapshots(make_snapshots(4), **PARAMS)
+            db.save_snapshots(make_snapshots(4, scale=2), **{**PARAMS, "weights_key": "other"})
+            stored = db.load_snapshot_columns("BTCUSDT", BASE, BASE + timedelta(hours=1))
+            # Ranges missing from the store are still served from the table
+            fallback = db.load_snapshot_columns(
+                "BTCUSDT", BASE, BASE + timedelta(hours=1), weights_key="other"
+            )
+            monkeypatch.delenv("LH_SNAPSHOT_STORE_DIR")
+            table = db.load_snapshot_columns(
+                "BTCUSDT", BASE, BASE + timedelta(hours=1), weights_key="default"
+            )
+
+        assert stored.long_density.max() == 30.0
+        assert fallback.long_density.max() == 6.0
+        assert table.long_density.max() == 3.0
+
+    def test_range_split_across_store_and_table(self, store, tmp_path, monkeypatch):
+        monkeypatch.setenv("LH_SNAPSHOT_STORE_DIR", str(store.root))
+        older, newer = make_snapshots(26), make_snapshots(48, scale=10)[24:]
+        store.write(newer, **PARAMS)
+
+        with DuckDBService(str(tmp_path / "test.duckdb")) as db:
+            db.save_snapshots(older, **PARAMS)
+            loaded = db.load_snapshot_columns(
+                "BTCUSDT", BASE, BASE + timedelta(hours=12) - timedelta(minutes=15), **PARAMS
+            )
+
+        # Every candle is served; the store wins where both hold a snapshot
+        expected = SnapshotColumns.from_snapshots(older[:24] + newer)
+        assert loaded.timestamps() == expected.timestamps()
+        assert loaded.offsets.tolist() == expected.offsets.tolist()
+        assert loaded.price.tolist() == expected.price.tolist()
+        assert loaded.long_density.tolist() == expected.long_density.tolist()
+        assert loaded.positions_created.tolist() == expected.positions_created.tolist()
@@ -0,0 +1,728 @@
+"""Unit tests for the array-backed PositionBook and its equivalence to the Decimal reference."""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.liquidationheatmap.models.position_book import LONG, SHORT, PositionBook
+from src.liquidationheatmap.models.scenario_book import ScenarioBook
+from src.liquidationheatmap.models.time_evolving_heatmap import (
+    FLOAT64_MAX_ABS_DEVIATION,
+    FLOAT64_MAX_REL_DEVIATION,
+    advance_heatmap_frames,
+    build_book_checkpoints,
+    calculate_heatmap_frames,
+    calculate_heatmap_scenarios,
+    calculate_rolling_heatmap,
+    calculate_time_evolving_heatmap,
+    checkpoint_boundary,
+    decode_frames,
+    heatmap_keyframe,
+    leverage_weights_key,
+)
+
+# Documented maximum deviation of precision="float64" from the Decimal reference
+REL_TOL = FLOAT64_MAX_REL_DEVIATION
+# Absolute floor for comparing near-zero densities
+ABS_TOL = FLOAT64_MAX_ABS_DEVIATION
+
+
+@dataclass
+class MockCandle:
+    """Mock candle for testing."""
+
+    open_time: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal = Decimal("100")
+
+
+def generate_random_walk(count: int, seed: int) -> tuple[list[MockCandle], list[Decimal]]:
+    """Generate candles and OI deltas with non-round prices.
+
+    Non-round prices keep liquidation levels away from exact bucket boundaries,
+    where float and Decimal floor division could legitimately disagree.
+    """
+    rng = random.Random(seed)
+    base_time = datetime(2025, 11, 1)
+    price = 95000.0 + rng.random()
+    candles = []
+    oi_deltas = []
+
+    for i in range(count):
+        open_price = price
+        close_price = open_price * (1 + rng.gauss(0, 0.01))
+        high = max(open_price, close_price) * (1 + abs(rng.gauss(0, 0.004)))
+        low = min(open_price, close_price) * (1 - abs(rng.gauss(0, 0.004)))
+        candles.append(
+            MockCandle(
+                open_time=base_time + timedelta(minutes=15 * i),
+                open=Decimal(f"{open_price:.2f}"),
+                high=Decimal(f"{high:.2f}"),
+                low=Decimal(f"{low:.2f}"),
+                close=Decimal(f"{close_price:.2f}"),
+            )
+        )
+        if rng.random() < 0.6:
+            oi_deltas.append(Decimal(f"{rng.uniform(1e4, 5e6):.2f}"))
+        else:
+            oi_deltas.append(Decimal(f"{-rng.uniform(1e4, 3e6):.2f}"))
+        price = float(candles[-1].close)
+
+    return candles, oi_deltas
+
+
+def assert_snapshots_equivalent(reference, candidate):
+    """Assert two snapshot series match within REL_TOL."""
+    assert len(reference) == len(candidate)
+
+    for ref, cand in zip(reference, candidate):
+        assert ref.timestamp == cand.timestamp
+        assert ref.positions_created == cand.positions_created
+        assert ref.positions_consumed == cand.positions_consumed
+        assert float(cand.total_long_volume) == pytest.approx(
+            float(ref.total_long_volume), rel=REL_TOL, abs=ABS_TOL
+        )
+        assert float(cand.total_short_volume) == pytest.approx(
+            float(ref.total_short_volume), rel=REL_TOL, abs=ABS_TOL
+        )
+
+        ref_cells = {float(price): cell for price, cell in ref.cells.items()}
+        cand_cells = {float(price): cell for price, cell in cand.cells.items()}
+        assert sorted(ref_cells) == sorted(cand_cells)
+
+        for price, ref_cell in ref_cells.items():
+            cand_cell = cand_cells[price]
+            assert float(cand_cell.long_density) == pytest.approx(
+                float(ref_cell.long_density), rel=REL_TOL, abs=ABS_TOL
+            )
+            assert float(cand_cell.short_density) == pytest.approx(
+                float(ref_cell.short_density), rel=REL_TOL, abs=ABS_TOL
+            )
+
+
+class TestPositionBook:
+    """Tests for PositionBook column operations."""
+
+    def test_add_keeps_sides_sorted(self):
+        """Longs should be sorted ascending and shorts descending by liq_price."""
+        book = PositionBook(capacity=2)
+
+        book.add(np.array([91000.0, 90000.0, 92000.0]), np.ones(3), LONG, np.array([10, 5, 25]), 7)
+        book.add(np.array([90500.0]), np.ones(1), LONG, np.array([50]), 8)
+        book.add(np.array([99000.0, 101000.0]), np.ones(2), SHORT, np.array([10, 5]), 8)
+
+        assert len(book) == 6
+        assert book.longs.liq_price.tolist() == [90000.0, 90500.0, 91000.0, 92000.0]
+        assert book.longs.leverage.tolist() == [5, 50, 10, 25]
+        assert book.longs.created_idx.tolist() == [7, 8, 7, 7]
+        assert book.shorts.liq_price.tolist() == [101000.0, 99000.0]
+
+    def test_consume_uses_inclusive_boundaries(self):
+        """Longs at liq >= low and shorts at liq <= high should be consumed."""
+        book = PositionBook()
+        book.add(np.array([90000.0, 89000.0]), np.array([1.0, 1.0]), LONG, np.array([10, 5]), 0)
+        book.add(np.array([99000.0, 101000.0]), np.array([1.0, 1.0]), SHORT, np.array([10, 5]), 0)
+
+        consumed = book.consume(low=90000.0, high=99000.0)
+
+        assert consumed == 2
+        assert book.longs.liq_price.tolist() == [89000.0]
+        assert book.shorts.liq_price.tolist() == [101000.0]
+
+    def test_consume_only_touches_crossed_tail(self):
+        """Consumption should truncate the crossed tail and leave the rest in order."""
+        book = PositionBook()
+        prices = np.arange(80000.0, 90000.0, 10.0)
+        book.add(prices, np.ones(len(prices)), LONG, np.full(len(prices), 10), 0)
+
+        consumed = book.consume(low=89955.0, high=1e9)
+
+        assert consumed == 4
+        assert book.longs.liq_price[-1] == 89950.0
+        assert len(book) == len(prices) - 4
+
+    def test_remove_proportionally_scales_and_drops_dust(self):
+        """Removal should scale all active volume and drop positions below 0.01."""
+        book = PositionBook()
+        book.add(np.array([90000.0, 80000.0]), np.array([100.0, 0.015]), LONG, np.array([10, 5]), 0)
+
+        book.remove_proportionally(50.0075)
+
+        assert len(book) == 1
+        assert book.longs.volume[0] == pytest.approx(50.0)
+
+    def test_remove_proportionally_is_lazy(self):
+        """Removal should only change the scale factor while no position is dust."""
+        book = PositionBook()
+        book.add(np.array([90000.0, 80000.0]), np.array([100.0, 300.0]), LONG, np.array([10, 5]), 0)
+        book.add(np.array([99000.0]), np.array([100.0]), SHORT, np.array([10]), 0)
+
+        book.remove_proportionally(250.0)
+        book.add(np.array([85000.0]), np.array([10.0]), LONG, np.array([25]), 1)
+
+        assert book.longs.scale == pytest.approx(0.5)
+        assert book.longs.volume.tolist() == pytest.approx([300.0 * 0.5, 10.0, 100.0 * 0.5])
+        assert book.shorts.volume.tolist() == pytest.approx([50.0])
+        assert book.longs.total_volume == pytest.approx(210.0)
+
+    def test_dust_pruning_folds_scale(self):
+        """Once a position drops below 0.01 it is pruned and the scale reset."""
+        book = PositionBook()
+        book.add(np.array([90000.0, 80000.0]), np.array([1.0, 1000.0]), LONG, np.array([10, 5]), 0)
+
+        book.remove_proportionally(book.longs.total_volume * 0.95)
+        assert len(book) == 2
+
+        book.remove_proportionally(book.longs.total_volume * 0.95)
+        assert len(book) == 1
+        assert book.longs.scale == 1.0
+        assert book.longs.volume[0] == pytest.approx(2.5)
+
+    def test_aggregate_groups_by_bucket_and_side(self):
+        """Aggregation should sum volumes per bucket, split by side."""
+        book = PositionBook(price_bucket_size=100.0)
+        book.add(np.array([90010.0, 90090.0]), np.array([1.0, 2.0]), LONG, np.array([10, 5]), 0)
+        book.add(np.array([90050.0, 95000.0]), np.array([4.0, 8.0]), SHORT, np.array([10, 5]), 0)
+
+        buckets, long_density, short_density = book.aggregate()
+
+        assert buckets.tolist() == [90000.0, 95000.0]
+        assert long_density.tolist() == [3.0, 0.0]
+        assert short_density.tolist() == [4.0, 8.0]
+
+    def test_bucket_totals_follow_consumption_and_removal(self):
+        """Running bucket totals should track consumes and lazy removal without a rescan."""
+        book = PositionBook(price_bucket_size=100.0)
+        book.add(np.array([90010.0, 90090.0, 91050.0]), np.ones(3) * 10, LONG, np.full(3, 10), 0)
+
+        book.consume(low=91000.0, high=1e9)
+        book.remove_proportionally(10.0)
+        buckets, long_density, _ = book.aggregate()
+
+        assert buckets.tolist() == [90000.0]
+        assert long_density.tolist() == pytest.approx([10.0])
+
+        book.consume(low=80000.0, high=1e9)
+        buckets, long_density, _ = book.aggregate()
+
+        assert buckets.tolist() == []
+        assert long_density.tolist() == []
+
+    def test_drain_changes_reports_touched_buckets_and_scale(self):
+        """Change tracking should report touched buckets and the combined removal factor."""
+        book = PositionBook(price_bucket_size=100.0, track_changes=True)
+        book.add(np.array([90010.0, 91050.0]), np.array([10.0, 10.0]), LONG, np.full(2, 10), 0)
+        book.add(np.array([99020.0]), np.array([20.0]), SHORT, np.array([10]), 0)
+
+        changed, scale = book.drain_changes()
+        assert changed.tolist() == [900, 910, 990]
+        assert scale == 1.0
+
+        book.consume(low=91000.0, high=95000.0)
+        book.remove_proportionally(7.5)
+        changed, scale = book.drain_changes()
+        prices, long_density, short_density = book.bucket_densities(changed)
+
+        assert changed.tolist() == [910]
+        assert scale == pytest.approx(0.75)
+        assert prices.tolist() == [91000.0]
+        assert long_density.tolist() == [0.0]
+        assert short_density.tolist() == [0.0]
+        assert book.drain_changes()[0].tolist() == []
+
+    def test_checkpoint_round_trip(self):
+        """A book rebuilt from its checkpoint should hold the same real volumes."""
+        book = PositionBook(price_bucket_size=100.0)
+        book.add(np.array([90010.0, 91050.0]), np.array([10.0, 30.0]), LONG, np.array([10, 5]), 0)
+        book.add(np.array([99020.0]), np.array([20.0]), SHORT, np.array([25]), 1)
+        book.remove_proportionally(30.0)
+
+        checkpoint = book.checkpoint(datetime(2025, 11, 2))
+        restored = PositionBook.from_checkpoint(checkpoint, price_bucket_size=100.0)
+
+        assert len(checkpoint) == 3
+        assert restored.longs.scale == 1.0
+        assert restored.longs.liq_price.tolist() == [90010.0, 91050.0]
+        assert restored.longs.volume.tolist() == pytest.approx([5.0, 15.0])
+        assert restored.shorts.leverage.tolist() == [25]
+        for original, copy in zip(book.aggregate(), restored.aggregate()):
+            assert copy.tolist() == pytest.approx(original.tolist())
+
+
+class TestFloat64Precision:
+    """precision="float64" must match the Decimal reference within the documented deviation."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_random_walk_matches_decimal_reference(self, seed):
+        """Snapshots from both precisions should agree on a random walk."""
+        candles, oi_deltas = generate_random_walk(300, seed)
+
+        reference = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="decimal"
+        )
+        candidate = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )
+
+        assert_snapshots_equivalent(reference, candidate)
+
+    def test_long_run_stays_within_documented_deviation(self):
+        """Rounding must not accumulate past the bound over a long series."""
+        candles, oi_deltas = generate_random_walk(1500, seed=21)
+
+        reference = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="decimal"
+        )
+        candidate = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )
+
+        assert_snapshots_equivalent(reference, candidate)
+
+    def test_custom_weights_and_bucket_size_match(self):
+        """Custom leverage weights (including a zero weight) should match too."""
+        candles, oi_deltas = generate_random_walk(200, seed=42)
+        weights = [(5, Decimal("0.5")), (25, Decimal("0")), (100, Decimal("0.5"))]
+
+        reference = calculate_time_evolving_heatmap(
+            candles,
+            oi_deltas,
+            "ETHUSDT",
+            leverage_weights=weights,
+            price_bucket_size=Decimal("250"),
+            precision="decimal",
+        )
+        candidate = calculate_time_evolving_heatmap(
+            candles,
+            oi_deltas,
+            "ETHUSDT",
+            leverage_weights=weights,
+            price_bucket_size=Decimal("250"),
+            precision="float64",
+        )
+
+        assert_snapshots_equivalent(reference, candidate)
+
+    def test_full_removal_empties_book(self):
+        """An OI drop larger than the book should clear it in both precisions."""
+        candles, _ = generate_random_walk(3, seed=7)
+        oi_deltas = [Decimal("1000000"), Decimal("-5000000"), Decimal("0")]
+
+        reference = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="decimal"
+        )
+        candidate = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )
+
+        assert_snapshots_equivalent(reference, candidate)
+        assert candidate[1].cells == {}
+
+    def test_cell_types_follow_precision(self):
+        """decimal is the default and yields Decimal; float64 yields floats."""
+        candles, oi_deltas = generate_random_walk(5, seed=8)
+        oi_deltas = [abs(delta) for delta in oi_deltas]
+
+        default = calculate_time_evolving_heatmap(candles, oi_deltas, "BTCUSDT")
+        fast = calculate_time_evolving_heatmap(candles, oi_deltas, "BTCUSDT", precision="float64")
+
+        default_cell = next(iter(default[-1].cells.values()))
+        fast_cell = next(iter(fast[-1].cells.values()))
+        assert isinstance(fast_cell.long_density + fast_cell.short_density, float)
+        assert isinstance(default_cell.long_density, Decimal)
+        assert isinstance(default[-1].total_long_volume, Decimal)
+
+    def test_unknown_precision_raises(self):
+        """An unknown precision should raise ValueError."""
+        candles, oi_deltas = generate_random_walk(2, seed=1)
+
+        with pytest.raises(ValueError, match="Unknown precision"):
+            calculate_time_evolving_heatmap(candles, oi_deltas, "BTCUSDT", precision="float32")
+
+
+class TestHeatmapFrames:
+    """Delta-encoded frames must decode back to the float64 engine's snapshots."""
+
+    @pytest.mark.parametrize("keyframe_interval", [1, 7, 96])
+    def test_frames_decode_to_snapshots(self, keyframe_interval):
+        """Decoding frames should reproduce the full snapshot series."""
+        candles, oi_deltas = generate_random_walk(300, seed=5)
+
+        expected = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )
+        frames = calculate_heatmap_frames(
+            candles, oi_deltas, "BTCUSDT", keyframe_interval=keyframe_interval
+        )
+
+        assert_snapshots_equivalent(expected, decode_frames(frames))
+
+    def test_keyframes_are_periodic(self):
+        """Keyframes should appear on the first frame and every keyframe_interval after."""
+        candles, oi_deltas = generate_random_walk(25, seed=1)
+
+        frames = calculate_heatmap_frames(candles, oi_deltas, "BTCUSDT", keyframe_interval=10)
+
+        assert [i for i, frame in enumerate(frames) if frame.keyframe] == [0, 10, 20]
+        assert all(frame.scale == 1.0 for frame in frames if frame.keyframe)
+
+    def test_delta_frames_only_carry_changed_buckets(self):
+        """A pure OI decrease should be encoded as a scale with no cells."""
+        candles, _ = generate_random_walk(3, seed=3)
+        # Keep the price still so that nothing is consumed after the first candle
+        flat = [
+            MockCandle(
+                open_time=c.open_time,
+                open=Decimal("50000.5"),
+                high=Decimal("50001.5"),
+                low=Decimal("49999.5"),
+                close=Decimal("50000.5"),
+            )
+            for c in candles
+        ]
+        oi_deltas = [Decimal("1000000"), Decimal("-250000"), Decimal("0")]
+
+        frames = calculate_heatmap_frames(flat, oi_deltas, "BTCUSDT")
+
+        assert frames[0].keyframe and len(frames[0].cells) == 5
+        assert frames[1].cells == {}
+        assert frames[1].scale == pytest.approx(0.75)
+        assert frames[2].cells == {}
+        assert frames[2].scale == 1.0
+
+    def test_live_book_frames_continue_a_keyframe(self):
+        """Frames from successive advances apply on top of a keyframe of the live book."""
+        candles, oi_deltas = generate_random_walk(200, seed=6)
+        book = PositionBook(track_changes=True)
+
+        warmup = advance_heatmap_frames(
+            book, candles[:120], oi_deltas[:120], "BTCUSDT", emit_from=candles[120].open_time
+        )
+        keyframe = heatmap_keyframe(book, candles[119].open_time, "BTCUSDT")
+        live = [keyframe]
+        for start in range(120, 200, 40):
+            live += advance_heatmap_frames(
+                book, candles[start : start + 40], oi_deltas[start : start + 40], "BTCUSDT"
+            )
+
+        expected = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )[119:]
+        assert warmup == []
+        assert not any(frame.keyframe for frame in live[1:])
+        decoded = decode_frames(live)
+        # The keyframe carries no position counts; the levels it sets are checked
+        # through every frame decoded on top of it
+        assert sorted(decoded[0].cells) == sorted(float(price) for price in expected[0].cells)
+        assert_snapshots_equivalent(expected[1:], decoded[1:])
+
+    def test_invalid_keyframe_interval_raises(self):
+        """A non-positive keyframe interval should raise ValueError."""
+        candles, oi_deltas = generate_random_walk(2, seed=1)
+
+        with pytest.raises(ValueError, match="keyframe_interval"):
+            calculate_heatmap_frames(candles, oi_deltas, "BTCUSDT", keyframe_interval=0)
+
+
+class TestBookCheckpoints:
+    """Resuming from a checkpoint must match a continuous run from the same start."""
+
+    def test_checkpoints_land_on_daily_boundaries(self):
+        """Checkpoints are taken at each crossed day boundary, not for the open day."""
+        candles, oi_deltas = generate_random_walk(300, seed=11)  # 15m candles, ~3.1 days
+
+        checkpoints = build_book_checkpoints(candles, oi_deltas)
+
+        assert [cp.timestamp for cp in checkpoints] == [
+            datetime(2025, 11, 2),
+            datetime(2025, 11, 3),
+            datetime(2025, 11, 4),
+        ]
+
+    def test_resume_matches_continuous_run(self):
+        """Snapshots after a checkpoint should equal those of an uninterrupted run."""
+        candles, oi_deltas = generate_random_walk(400, seed=12)
+        window_start = datetime(2025, 11, 3, 6, 0)
+
+        continuous = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", emit_from=window_start, precision="float64"
+        )
+        prefix = [i for i, c in enumerate(candles) if c.open_time < window_start]
+        checkpoints = build_book_checkpoints(
+            [candles[i] for i in prefix], [oi_deltas[i] for i in prefix]
+        )
+        checkpoint = checkpoints[-1]
+        resumed = calculate_time_evolving_heatmap(
+            candles,
+            oi_deltas,
+            "BTCUSDT",
+            checkpoint=checkpoint,
+            emit_from=window_start,
+            precision="float64",
+        )
+
+        assert checkpoint.timestamp == datetime(2025, 11, 3)
+        assert resumed[0].timestamp == window_start
+        assert_snapshots_equivalent(continuous, resumed)
+
+    def test_incremental_build_matches_single_pass(self):
+        """Building checkpoints in two runs should give the same books as one run."""
+        candles, oi_deltas = generate_random_walk(400, seed=13)
+
+        single_pass = build_book_checkpoints(candles, oi_deltas)
+        first = build_book_checkpoints(candles[:150], oi_deltas[:150])
+        second = build_book_checkpoints(candles, oi_deltas, checkpoint=first[-1])
+
+        combined = first + second
+        assert [cp.timestamp for cp in combined] == [cp.timestamp for cp in single_pass]
+        for expected, actual in zip(single_pass, combined):
+            assert actual.liq_price.tolist() == pytest.approx(expected.liq_price.tolist())
+            assert actual.volume.tolist() == pytest.approx(expected.volume.tolist(), rel=REL_TOL)
+
+    def test_rolling_run_resumes_at_last_candle(self):
+        """A rolling run freezes the book before its last candle, which the next run replays."""
+        candles, oi_deltas = generate_random_walk(300, seed=16)
+
+        continuous = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", precision="float64"
+        )
+        first, frozen = calculate_rolling_heatmap(candles[:200], oi_deltas[:200], "BTCUSDT")
+        rest, refrozen = calculate_rolling_heatmap(
+            candles[199:], oi_deltas[199:], "BTCUSDT", checkpoint=frozen
+        )
+
+        assert frozen.timestamp == candles[199].open_time
+        assert refrozen.timestamp == candles[-1].open_time
+        assert_snapshots_equivalent(first, continuous[:200])
+        assert_snapshots_equivalent(continuous, first[:199] + rest)
+        assert calculate_rolling_heatmap([], [], "BTCUSDT", checkpoint=frozen) == ([], frozen)
+
+    def test_resumed_frames_start_with_keyframe(self):
+        """Delta frames resumed from a checkpoint start with a keyframe at emit_from."""
+        candles, oi_deltas = generate_random_walk(200, seed=14)
+        checkpoint = build_book_checkpoints(candles, oi_deltas)[0]
+        window_start = datetime(2025, 11, 2, 3, 0)
+
+        frames = calculate_heatmap_frames(
+            candles, oi_deltas, "BTCUSDT", checkpoint=checkpoint, emit_from=window_start
+        )
+        expected = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", emit_from=window_start, precision="float64"
+        )
+
+        assert frames[0].keyframe and frames[0].timestamp == window_start
+        assert_snapshots_equivalent(expected, decode_frames(frames))
+
+    def test_decimal_precision_rejects_checkpoint(self):
+        """Checkpoints are a float64 feature."""
+        candles, oi_deltas = generate_random_walk(200, seed=15)
+        checkpoint = build_book_checkpoints(candles, oi_deltas)[0]
+
+        with pytest.raises(ValueError, match="float64"):
+            calculate_time_evolving_heatmap(
+                candles, oi_deltas, "BTCUSDT", precision="decimal", checkpoint=checkpoint
+            )
+
+    def test_boundary_and_weights_key(self):
+        """Boundaries floor to the period; weights keys ignore order and trailing zeros."""
+        assert checkpoint_boundary(datetime(2025, 11, 3, 23, 45)) == datetime(2025, 11, 3)
+        assert leverage_weights_key(None) == "default"
+        assert leverage_weights_key([(25, Decimal("0.50")), (10, Decimal("0.5"))]) == (
+            "10:0.5,25:0.5"
+        )
+
+
+# Distributions with different tier sets, including a zero-weight tier
+WEIGHT_SCENARIOS = [
+    None,
+    [(10, Decimal("0.5")), (25, Decimal("0.5"))],
+    [(5, Decimal("0")), (50, Decimal("0.2")), (100, Decimal("0.8"))],
+    [(5, Decimal("1"))],
+]
+
+
+class TestHeatmapScenarios:
+    """calculate_heatmap_scenarios() must match one float64 run per distribution."""
+
+    @pytest.mark.parametrize("seed", [21, 22])
+    def test_each_scenario_matches_single_run(self, seed):
+        """Result k should equal calculate_time_evolving_heatmap with weights k."""
+        candles, oi_deltas = generate_random_walk(600, seed=seed)
+
+        results = calculate_heatmap_scenarios(candles, oi_deltas, "BTCUSDT", WEIGHT_SCENARIOS)
+
+        assert len(results) == len(WEIGHT_SCENARIOS)
+        for weights, snapshots in zip(WEIGHT_SCENARIOS, results):
+            expected = calculate_time_evolving_heatmap(
+                candles, oi_deltas, "BTCUSDT", leverage_weights=weights, precision="float64"
+            )
+            assert_snapshots_equivalent(expected, snapshots)
+
+    def test_removal_ratio_is_per_scenario(self):
+        """The same OI decrease removes a different share from each scenario."""
+        book = ScenarioBook(2)
+        volumes = np.array([[100.0, 10.0], [100.0, 0.0]])
+        book.add(np.array([90000.0, 91000.0]), volumes, LONG, np.array([10, 25]), 0)
+
+        book.remove_proportionally(5.0)
+
+        assert book.longs.total_volume.tolist() == pytest.approx([195.0, 5.0])
+        _, long_density, _, present = book.aggregate()
+        assert long_density[:, 1].tolist() == pytest.approx([5.0, 0.0])
+        assert present.tolist() == [[True, True], [True, False]]
+
+    def test_consume_counts_only_held_positions(self):
+        """Levels a scenario holds no volume in are not counted as consumed for it."""
+        book = ScenarioBook(2)
+        volumes = np.array([[1.0, 1.0], [1.0, 0.0]])
+        created = book.add(np.array([90000.0, 91000.0]), volumes, LONG, np.array([10, 25]), 0)
+
+        consumed = book.consume(low=90500.0, high=95000.0)
+
+        assert created.tolist() == [2, 1]
+        assert consumed.tolist() == [1, 0]
+        assert len(book) == 1
+
+    def test_resume_from_checkpoints(self):
+        """Per-scenario checkpoints should resume each scenario's own book."""
+        candles, oi_deltas = generate_random_walk(300, seed=23)
+        window_start = datetime(2025, 11, 2, 6, 0)
+        checkpoints = [
+            build_book_checkpoints(candles[:100], oi_deltas[:100], leverage_weights=weights)[0]
+            for weights in WEIGHT_SCENARIOS
+        ]
+
+        results = calculate_heatmap_scenarios(
+            candles,
+            oi_deltas,
+            "BTCUSDT",
+            WEIGHT_SCENARIOS,
+            checkpoints=checkpoints,
+            emit_from=window_start,
+        )
+
+        for weights, checkpoint, snapshots in zip(WEIGHT_SCENARIOS, checkpoints, results):
+            expected = calculate_time_evolving_heatmap(
+                candles,
+                oi_deltas,
+                "BTCUSDT",
+                leverage_weights=weights,
+                checkpoint=checkpoint,
+                emit_from=window_start,
+                precision="float64",
+            )
+            assert snapshots[0].timestamp == window_start
+            assert_snapshots_equivalent(expected, snapshots)
+
+    def test_invalid_arguments_raise(self):
+        """Scenarios are required and checkpoints must pair up with them."""
+        candles, oi_deltas = generate_random_walk(10, seed=24)
+
+        with pytest.raises(ValueError, match="scenario"):
+            calculate_heatmap_scenarios(candles, oi_deltas, "BTCUSDT", [])
+        with pytest.raises(ValueError, match="checkpoint"):
+            calculate_heatmap_scenarios(candles, oi_deltas, "BTCUSDT", [None], checkpoints=[])
+
+
+class TestCompaction:
+    """Optional compaction of same-side, same-leverage positions within one price quantum."""
+
+    def test_merges_into_existing_row(self):
+        """A new position in an occupied quantum should add to the existing row."""
+        book = PositionBook(price_bucket_size=100.0, quantum=10.0)
+        book.add(np.array([90012.0]), np.array([10.0]), LONG, np.array([10]), 0)
+        book.add(np.array([90018.0, 90018.0]), np.array([5.0, 7.0]), LONG, np.array([10, 25]), 1)
+
+        assert book.longs.liq_price.tolist() == [90012.0, 90018.0]
+        assert book.longs.leverage.tolist() == [10, 25]
+        assert book.longs.volume.tolist() == [15.0, 7.0]
+
+    def test_merges_within_one_batch(self):
+        """New positions sharing a quantum and leverage should become one row."""
+        book = PositionBook(price_bucket_size=100.0, quantum=10.0)
+        book.add(
+            np.array([99021.0, 99025.0, 99031.0]),
+            np.array([1.0, 2.0, 4.0]),
+            SHORT,
+            np.array([5, 5, 5]),
+            0,
+        )
+
+        assert book.shorts.liq_price.tolist() == [99031.0, 99021.0]
+        assert book.shorts.volume.tolist() == [4.0, 3.0]
+
+    def test_bucket_totals_follow_merged_rows(self):
+        """Merged volume should leave its bucket when the merged row is consumed."""
+        book = PositionBook(price_bucket_size=100.0, quantum=10.0)
+        book.add(np.array([90012.0]), np.array([10.0]), LONG, np.array([10]), 0)
+        book.add(np.array([90015.0]), np.array([5.0]), LONG, np.array([10]), 1)
+        book.add(np.array([89500.0]), np.array([1.0]), LONG, np.array([10]), 1)
+
+        prices, long_density, _ = book.aggregate()
+        assert prices.tolist() == [89500.0, 90000.0]
+        assert long_density.tolist() == [1.0, 15.0]
+
+        book.consume(90012.0, 91000.0)
+
+        prices, long_density, _ = book.aggregate()
+        assert prices.tolist() == [89500.0]
+        assert long_density.tolist() == [1.0]
+
+    def test_compacted_heatmap_stays_close_and_book_shrinks(self):
+        """Total volume is preserved and the book holds fewer rows."""
+        candles, oi_deltas = generate_random_walk(500, seed=31)
+
+        exact = calculate_time_evolving_heatmap(candles, oi_deltas, "BTCUSDT", precision="float64")
+        compacted = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", compaction_quantum=Decimal("50"), precision="float64"
+        )
+
+        assert [s.timestamp for s in compacted] == [s.timestamp for s in exact]
+        for ref, cand in zip(exact, compacted):
+            assert ref.positions_created == cand.positions_created
+        # Consumption happens at the merged row's price, so totals drift only
+        # where a candle wick lands inside a merged quantum
+        assert float(compacted[-1].total_long_volume) == pytest.approx(
+            float(exact[-1].total_long_volume), rel=0.05
+        )
+
+        exact_book = build_book_checkpoints(candles, oi_deltas)[-1]
+        compacted_book = PositionBook.from_checkpoint(exact_book, quantum=50.0)
+        assert len(compacted_book) < len(exact_book)
+        assert compacted_book.longs.total_volume + compacted_book.shorts.total_volume == (
+            pytest.approx(float(exact_book.volume.sum()))
+        )
+
+    def test_frames_decode_to_compacted_snapshots(self):
+        """Delta frames with compaction should decode to the compacted snapshots."""
+        candles, oi_deltas = generate_random_walk(120, seed=32)
+        quantum = Decimal("25")
+
+        snapshots = calculate_time_evolving_heatmap(
+            candles, oi_deltas, "BTCUSDT", compaction_quantum=quantum, precision="float64"
+        )
+        frames = calculate_heatmap_frames(
+            candles, oi_deltas, "BTCUSDT", keyframe_interval=10, compaction_quantum=quantum
+        )
+
+        assert_snapshots_equivalent(snapshots, decode_frames(frames))
+
+    def test_decimal_precision_rejects_compaction(self):
+        """The Decimal reference engine never compacts."""
+        candles, oi_deltas = generate_random_walk(5, seed=33)
+
+        with pytest.raises(ValueError, match="Compaction"):
+            calculate_time_evolving_heatmap(
+                candles,
+                oi_deltas,
+                "BTCUSDT",
+                precision="decimal",
+                compaction_quantum=Decimal("10"),
+            )
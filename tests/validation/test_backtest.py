@@ -154,6 +154,83 @@ class TestBacktestResult:
         assert data["symbol"] == "BTCUSDT"
 
 
+class TestPredictedZonesFromColumns:
+    """Zones from snapshot columns match the per-timestamp snapshot query."""
+
+    @pytest.fixture
+    def snapshot_db(self, tmp_path):
+        """Six hours of 15m snapshots plus trades, in a closed DuckDB file."""
+        from datetime import timedelta
+        from decimal import Decimal
+
+        from src.liquidationheatmap.ingestion.db_service import DuckDBService
+        from src.liquidationheatmap.models.position import HeatmapSnapshot
+
+        db_path = str(tmp_path / "backtest.duckdb")
+        with DuckDBService(db_path) as db:
+            snapshots = []
+            for i in range(24):
+                snapshot = HeatmapSnapshot(
+                    timestamp=datetime(2024, 6, 1) + timedelta(minutes=15 * i), symbol="BTCUSDT"
+                )
+                for j in range(40):
+                    cell = snapshot.get_cell(Decimal(90000 + 100 * j))
+                    cell.long_density = Decimal((i * 31 + j * 17) % 97)
+                    cell.short_density = Decimal((i * 13 + j * 29) % 89)
+                snapshots.append(snapshot)
+            db.save_snapshots(snapshots)
+            db.conn.execute("""
+                CREATE TABLE aggtrades_history AS
+                SELECT 'BTCUSDT' AS symbol,
+                       TIMESTAMP '2024-06-01' + INTERVAL (range) MINUTE AS timestamp,
+                       90000 + (range * 37) % 4000 AS price
+                FROM range(360)
+            """)
+        DuckDBService.reset_singletons(db_path)
+        return db_path
+
+    def test_zones_match_snapshot_query(self, snapshot_db):
+        import duckdb
+
+        from src.liquidationheatmap.ingestion.db_service import query_snapshot_columns
+        from src.liquidationheatmap.validation.backtest import (
+            get_predicted_zones,
+            predicted_zones_from_columns,
+        )
+
+        conn = duckdb.connect(snapshot_db, read_only=True)
+        columns = query_snapshot_columns(
+            conn, "BTCUSDT", datetime(2024, 6, 1), datetime(2024, 6, 2)
+        )
+        for hour in range(1, 7):
+            timestamp = datetime(2024, 6, 1, hour)
+            zones = predicted_zones_from_columns(columns, timestamp, 60)
+            expected = get_predicted_zones(conn, "BTCUSDT", timestamp, 60)
+
+            assert len(zones) == len(expected) == 50
+            assert [zone["volume"] for zone in zones] == [zone["volume"] for zone in expected]
+            # Equal volumes may be listed in a different order
+            threshold = zones[-1]["volume"]
+            assert {
+                (zone["price"], zone["side"]) for zone in zones if zone["volume"] > threshold
+            } == {(zone["price"], zone["side"]) for zone in expected if zone["volume"] > threshold}
+        conn.close()
+
+    def test_backtest_runs_on_snapshot_columns(self, snapshot_db):
+        config = BacktestConfig(
+            symbol="BTCUSDT",
+            start_date=datetime(2024, 6, 1),
+            end_date=datetime(2024, 6, 1, 6),
+            db_path=snapshot_db,
+        )
+
+        result = run_backtest(config)
+
+        assert result.error == ""
+        assert result.snapshots_analyzed == 6
+        assert result.true_positives + result.false_negatives > 0
+
+
 class TestRunBacktest:
     """Integration tests for backtest execution."""
 